@@ -40,6 +40,19 @@ class Settings(BaseSettings):
 
     # Redis (Optional)
     REDIS_URL: str = "redis://localhost:6379"
+    # 실시간(WebSocket) 브로커: "local"(단일 워커) | "redis"(다중 워커 — REDIS_URL pub/sub 사용)
+    REALTIME_BROKER: str = "local"
+    # 청크 업로드 세션 저장소: "db"(기본 — 재시작 후 이어받기) | "redis"(REDIS_URL)
+    UPLOAD_SESSION_STORE: str = "db"
+    # 청크를 미리 잡아둔 최종 파일에 바로 쓰기(pwrite). False면 청크 파일 + complete 때 조립
+    UPLOAD_DIRECT_WRITE: bool = True
+
+    # 미디어 처리 작업 큐(services/media_jobs.py): "inline"(API가 워커 프로세스 풀 실행) |
+    # "external"(API는 넣기만 — python -m app.media_worker 를 따로 실행)
+    MEDIA_WORKER_MODE: str = "inline"
+    # 이 머신의 동시 압축 수 × ffmpeg 스레드 = 미디어 처리에 내주는 CPU 예산
+    MEDIA_WORKER_CONCURRENCY: int = 2
+    MEDIA_FFMPEG_THREADS: int = 4
 
     # Web Push (VAPID)
     VAPID_PRIVATE_KEY: str = ""
@@ -56,6 +69,15 @@ class Settings(BaseSettings):
     APNS_BUNDLE_ID: str = "com.solact.academy"
     APNS_USE_SANDBOX: bool = False  # 개발 빌드는 True (api.sandbox.push.apple.com)
 
+    # 푸시 디스패처 — 고정 워커 수 / 대기 작업 상한(작업 1건 = notify 1회의 수신자 전체)
+    PUSH_WORKERS: int = 4
+    PUSH_QUEUE_MAX: int = 1000
+    # 같은 (사용자, 태그) 푸시는 이 창(초) 안에서 다이제스트 1건으로 병합
+    PUSH_COALESCE_SEC: int = 60
+
+    # /api/home 섹션을 각자 세션으로 동시에 구성(커넥션 풀이 있는 PostgreSQL용). SQLite는 쓰기 잠금이라 끔.
+    HOME_PARALLEL: bool = False
+
     # CORS — localhost origins only active when DEBUG=True
     CORS_ORIGINS: List[str] = [
         "https://sol-manager.com",
@@ -1,4 +1,6 @@
+from fastapi import Request
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
@@ -28,14 +30,16 @@ engine = create_engine(settings.DATABASE_URL, **_engine_kwargs)
 #  WAL: 쓰기 중에도 읽기가 막히지 않음(다중 사용자 동시 조회 안정).
 #  busy_timeout: 쓰기 잠금 충돌 시 즉시 실패('database is locked') 대신 최대 5초 대기.
 #  synchronous=NORMAL: WAL에서 안전하면서 디스크 fsync 부담↓(쓰기 처리량↑).
+def _sqlite_pragmas(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA busy_timeout=5000")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.close()
+
+
 if settings.DATABASE_URL.startswith("sqlite"):
-    @event.listens_for(engine, "connect")
-    def _sqlite_pragmas(dbapi_conn, _record):
-        cur = dbapi_conn.cursor()
-        cur.execute("PRAGMA journal_mode=WAL")
-        cur.execute("PRAGMA busy_timeout=5000")
-        cur.execute("PRAGMA synchronous=NORMAL")
-        cur.close()
+    event.listen(engine, "connect", _sqlite_pragmas)
 
 # 세션 팩토리
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -51,3 +55,44 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ── 비동기 세션(async def 라우트 전용) ──
+# async 라우트에서 동기 Session을 쓰면 쿼리/커밋 동안 단일 이벤트루프가 멈춰 WebSocket까지 전부 얼어붙는다.
+# 같은 DB를 비동기 드라이버(SQLite=aiosqlite, PostgreSQL=asyncpg)로 여는 AsyncSession을 따로 둔다.
+# 기존 동기 헬퍼(get_class_student_ids 등)는 `await db.run_sync(helper, ...)`로 그대로 재사용 가능.
+def _async_url(url: str) -> str:
+    """동기 DATABASE_URL → 비동기 드라이버 URL."""
+    if url.startswith("sqlite+aiosqlite") or "+asyncpg" in url:
+        return url
+    if url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + url[len("sqlite"):]
+    if url.startswith(("postgresql", "postgres")):
+        rest = url.split("://", 1)[1]
+        return "postgresql+asyncpg://" + rest
+    return url
+
+
+_async_engine_kwargs = {"echo": settings.DEBUG}
+if not settings.DATABASE_URL.startswith("sqlite"):
+    _async_engine_kwargs.update({
+        "pool_pre_ping": True,
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_recycle": 1800,
+    })
+
+async_engine = create_async_engine(_async_url(settings.DATABASE_URL), **_async_engine_kwargs)
+if settings.DATABASE_URL.startswith("sqlite"):
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+
+# expire_on_commit=False: 커밋 후 속성 접근이 암묵적 재조회(=await 불가 지점의 lazy IO)를 일으키지 않게.
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+
+# Dependency: 비동기 DB 세션 (async def 라우트용)
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        from app.services.entity_versions import track_request
+        track_request(request, db.sync_session)  # 자기 쓰기 → 목록 ETag 무효화
+        yield db
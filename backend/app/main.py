@@ -5,6 +5,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, JSONResponse
 from app.config import settings
+from app.utils.upload_urls import SignedJSONResponse
+from app.utils.edge import EdgeMiddleware
+from app.utils.file_response import RangedFileResponse
 from app.database import engine, Base
 
 logger = logging.getLogger(__name__)
@@ -15,11 +18,17 @@ from app.routers import (
     lessons, journals, attendance, evaluations, portfolios, auditions, private_lessons,
     ws, upload, admin, push, praise_stickers, music, badges, practice, plans, gamification,
     submissions, achievements, sessions, exams, content, routines, dashboard, exchange, mock_tests, ai,
-    missions, analysis, app_config
+    missions, analysis, app_config, sync, home
 )
 
 # DB 테이블 생성 (개발 환경용, 프로덕션에서는 Alembic 사용)
 Base.metadata.create_all(bind=engine)
+# 기존 DB에 /api/sync 변경 시각 컬럼·인덱스 보강(create_all은 기존 테이블을 건드리지 않음)
+from app.services.sync import ensure_schema
+ensure_schema(engine)
+# 교사 → 반 인덱스를 classes.subject_teachers에 맞춤(기존 DB·이벤트 밖에서 바뀐 반)
+from app.services import class_scope
+class_scope.reconcile(engine)
 
 # FastAPI 앱 생성 — 프로덕션에서는 API 문서 비활성화
 app = FastAPI(
@@ -28,7 +37,8 @@ app = FastAPI(
     version=settings.VERSION,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
-    redirect_slashes=False,  # We handle slash normalization in middleware below
+    redirect_slashes=False,  # 슬래시 정규화는 EdgeMiddleware(app/utils/edge.py)에서
+    default_response_class=SignedJSONResponse,  # 응답 JSON의 /uploads/ URL 서명(직렬화 1패스)
 )
 
 
@@ -52,57 +62,6 @@ app.add_middleware(
 )
 
 
-# Trailing-slash normalization: try current path first, if no route matches,
-# toggle the trailing slash and retry internally. This avoids 307 redirects
-# which strip Authorization headers in cross-origin (ngrok) environments.
-from starlette.routing import Match
-
-@app.middleware("http")
-async def normalize_trailing_slash(request, call_next):
-    path = request.scope.get("path", "")
-    # Only normalize /api/ paths (skip /uploads/, /ws/, etc.)
-    if path.startswith("/api/"):
-        # Check if current path matches any route
-        matched = any(
-            route.matches(request.scope)[0] != Match.NONE
-            for route in app.routes
-        )
-        if not matched:
-            # Toggle trailing slash and try again
-            alt = path.rstrip("/") if path.endswith("/") else path + "/"
-            request.scope["path"] = alt
-    return await call_next(request)
-
-
-# ngrok 경고 우회 + CORS 보장 미들웨어
-@app.middleware("http")
-async def add_extra_headers(request, call_next):
-    from starlette.responses import Response as StarletteResponse
-    origin = request.headers.get("origin")
-
-    # Handle CORS preflight (OPTIONS) directly — ngrok can strip CORSMiddleware headers
-    if request.method == "OPTIONS" and origin and origin in settings.effective_cors_origins:
-        return StarletteResponse(
-            status_code=204,
-            headers={
-                "access-control-allow-origin": origin,
-                "access-control-allow-credentials": "true",
-                "access-control-allow-methods": "GET, POST, PUT, DELETE, PATCH, OPTIONS",
-                "access-control-allow-headers": "authorization, content-type, ngrok-skip-browser-warning",
-                "access-control-max-age": "86400",
-                "ngrok-skip-browser-warning": "true",
-            },
-        )
-
-    response = await call_next(request)
-    response.headers["ngrok-skip-browser-warning"] = "true"
-    # Ensure CORS headers on all responses (307 redirects, errors, etc.)
-    if origin and origin in settings.effective_cors_origins:
-        response.headers["access-control-allow-origin"] = origin
-        response.headers["access-control-allow-credentials"] = "true"
-    return response
-
-
 # 반배정 안 된 학생 전면 차단 게이트(교사·원장은 통과). 서비스 '기능' 라우터에만 부착.
 from app.utils.auth import require_enrolled_student
 GATE = [Depends(require_enrolled_student)]
@@ -119,6 +78,7 @@ app.include_router(ws.router, prefix="/ws", tags=["WebSocket"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin (localhost only)"])
 app.include_router(push.router, prefix="/api/push", tags=["Push Notifications"])
 app.include_router(app_config.router, prefix="/api/app", tags=["App Config"])  # 버전 게이트(공개, 로그인 전에도 조회)
+app.include_router(sync.router, prefix="/api/sync", tags=["Sync"])  # 미배정 학생은 게이트 대상 엔티티를 내부에서 제외
 
 # 차단 대상(실제 서비스 기능): 미배정 학생은 403 "반배정 대기 중입니다".
 app.include_router(assignments.router, prefix="/api/assignments", tags=["Assignments"], dependencies=GATE)
@@ -152,6 +112,7 @@ app.include_router(content.router, prefix="/api/content", tags=["Learn Content"]
 app.include_router(routines.router, prefix="/api/routines", tags=["Routines"], dependencies=GATE)
 app.include_router(missions.router, prefix="/api/missions", tags=["Missions"], dependencies=GATE)
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"], dependencies=GATE)
+app.include_router(home.router, prefix="/api/home", tags=["Home"], dependencies=GATE)  # 홈 섹션 일괄(실행 시 왕복 1회)
 app.include_router(exchange.router, prefix="/api/exchange", tags=["Exchange"], dependencies=GATE)
 app.include_router(mock_tests.router, prefix="/api/mock-tests", tags=["Mock Tests"], dependencies=GATE)
 app.include_router(analysis.router, prefix="/api/analyses", tags=["Work Analysis"], dependencies=GATE)
@@ -185,115 +146,18 @@ class SecureStaticFiles(StaticFiles):
         await super().__call__(scope, receive, send_with_headers)
 
 
-from starlette.responses import Response as StarletteFileResponse
-
-_RANGE_CHUNK = 512 * 1024  # 512KB — Range 스트리밍 청크(전량 메모리 적재 방지)
-
-
-def _file_range_iter(file_path: str, start: int, length: int):
-    """파일의 [start, start+length) 바이트를 청크로 내보내는 동기 제너레이터.
-    Starlette StreamingResponse가 동기 제너레이터를 threadpool(iterate_in_threadpool)에서
-    돌리므로, 이 blocking read가 단일 이벤트루프를 막지 않고 메모리도 청크 크기로 제한된다.
-    (기존엔 async 미들웨어에서 f.read(구간전체)를 루프 위에서 직접 실행 → 큰 영상 시 루프 블로킹+RSS 급증.)"""
-    with open(file_path, "rb") as f:
-        f.seek(start)
-        remaining = length
-        while remaining > 0:
-            data = f.read(min(_RANGE_CHUNK, remaining))
-            if not data:
-                break
-            remaining -= len(data)
-            yield data
-
-
-def _serve_file_ranged(file_path: str, request: Request, extra_headers: dict):
-    """Serve a file with HTTP Range (206) support.
-
-    iOS Safari / WKWebView require Range responses to play <video>/<audio>.
-    Falls back to a normal 200 FileResponse when there is no Range header.
-    """
-    import mimetypes
-    from starlette.responses import Response, StreamingResponse, FileResponse as SFileResponse
-    media_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
-    base = {"Accept-Ranges": "bytes", **extra_headers}
-
-    range_header = request.headers.get("range")
-    if range_header and range_header.startswith("bytes="):
-        file_size = os.path.getsize(file_path)
-        try:
-            start_s, end_s = range_header[len("bytes="):].split("-", 1)
-            start = int(start_s) if start_s else 0
-            end = int(end_s) if end_s else file_size - 1
-        except ValueError:
-            start, end = 0, file_size - 1
-        start = max(0, start)
-        end = min(end, file_size - 1)
-        if start > end:
-            return Response(status_code=416, headers={**base, "Content-Range": f"bytes */{file_size}"})
-        length = end - start + 1
-        return StreamingResponse(
-            _file_range_iter(file_path, start, length), status_code=206, media_type=media_type,
-            headers={**base, "Content-Range": f"bytes {start}-{end}/{file_size}", "Content-Length": str(length)},
-        )
-
-    resp = SFileResponse(file_path, media_type=media_type)
-    for k, v in base.items():
-        resp.headers[k] = v
-    return resp
-
-
 # ── /uploads/ 서명 토큰(무인증 공개 접근 차단) ──
-# 서버가 응답에 실어 보내는 /uploads/ URL에만 HMAC 토큰(?t=)을 붙이고, 서빙 시 검증한다.
-# 경로 기반 안정 서명(만료 없음)이라 캐싱을 깨지 않고, SECRET_KEY 없이는 위조 불가.
-import hmac as _hmac, hashlib as _hashlib, re as _re
-from starlette.responses import Response
+# 응답 JSON의 /uploads/ URL 서명은 직렬화 단계(SignedJSONResponse, 앱 기본 응답 클래스)에서 한다.
+# 여기서는 서빙 시 토큰 검증만.
+from app.utils.upload_urls import verify_upload
 
 
-def _sign_upload(rel: str) -> str:
-    return _hmac.new(settings.SECRET_KEY.encode(), ("uploads:" + rel).encode(), _hashlib.sha256).hexdigest()[:24]
-
-
-def _verify_upload(rel: str, token: str) -> bool:
-    return bool(token) and _hmac.compare_digest(token, _sign_upload(rel))
-
-
-# 파일명에 콜론(타임스탬프 16:35:04)·공백·한글 등이 있을 수 있어, 안전문자 화이트리스트 대신
-# JSON 문자열/쿼리 구분자(" ? \)만 제외하고 전부 경로로 캡처(=끊김 없이 정확히 서명).
-_UPLOADS_URL_RE = _re.compile(rb'/uploads/([^"?\\]+)')
-
-
-def _sign_upload_match(m):
-    rel = m.group(1).decode("utf-8", "ignore")
-    return b'/uploads/' + m.group(1) + b'?t=' + _sign_upload(rel).encode()
-
-
-async def _sign_uploads_in_response(request: Request, call_next):
-    """비-/uploads/ 응답: JSON 본문의 /uploads/ URL에 서명 토큰을 부착(중앙 처리)."""
-    response = await call_next(request)
-    ctype = response.headers.get("content-type", "")
-    if not ctype.startswith("application/json") or not hasattr(response, "body_iterator"):
-        return response
-    body = b"".join([chunk async for chunk in response.body_iterator])
-    try:
-        new_body = _UPLOADS_URL_RE.sub(_sign_upload_match, body)
-    except Exception:
-        new_body = body  # 실패 시 원본 유지(응답 절대 안 깨지게)
-    headers = dict(response.headers)
-    headers["content-length"] = str(len(new_body))
-    return Response(content=new_body, status_code=response.status_code, headers=headers)
-
-
-@app.middleware("http")
-async def serve_uploads(request: Request, call_next):
+def serve_uploads(request: Request):
     """Serve /uploads/ files from external SSD first, then local (Range-enabled)."""
     path = request.url.path
-    if not path.startswith("/uploads/"):
-        # 비-uploads 요청: JSON 응답의 /uploads/ URL에 서명 토큰 부착
-        return await _sign_uploads_in_response(request, call_next)
-
     rel = path[len("/uploads/"):]  # strip prefix
     # 서명 토큰 검증 — 서버가 발급한(서명된) URL만 서빙(무인증 공개 다운로드 차단)
-    if not _verify_upload(rel, request.query_params.get("t", "")):
+    if not verify_upload(rel, request.query_params.get("t", "")):
         return JSONResponse(status_code=403, content={"detail": "Forbidden"})
 
     # Cache headers for static uploads (images/videos don't change after upload).
@@ -316,30 +180,23 @@ async def serve_uploads(request: Request, call_next):
     if name:
         ext_file = _safe(f"/Volumes/{name}/sol-act-uploads")
         if ext_file:
-            return _serve_file_ranged(ext_file, request, cache_headers)
+            return RangedFileResponse(ext_file, headers=cache_headers)
 
     # Fall back to local
     local_file = _safe("backend/uploads")
     if local_file:
-        return _serve_file_ranged(local_file, request, cache_headers)
+        return RangedFileResponse(local_file, headers=cache_headers)
 
     return JSONResponse(status_code=404, content={"detail": "Not found"})
 
 
-@app.middleware("http")
-async def serve_music_files(request: Request, call_next):
+def serve_music_files(request: Request):
     """Serve /music-files/ audio from the external SSD `music` folder.
 
     Explicit HTTP Range support (206 Partial Content) — iOS WKWebView requires
     Range/Accept-Ranges to play and seek <audio> reliably.
     """
     path = request.url.path
-    if not path.startswith("/music-files/"):
-        return await call_next(request)
-
-    import mimetypes
-    from starlette.responses import Response, StreamingResponse, FileResponse as SFileResponse
-
     rel = path[len("/music-files/"):]  # already percent-decoded by Starlette
     name = settings.EXTERNAL_DRIVE_NAME
     if not name:
@@ -351,36 +208,20 @@ async def serve_music_files(request: Request, call_next):
     if not (music_file == base or music_file.startswith(base + os.sep)) or not os.path.isfile(music_file):
         return JSONResponse(status_code=404, content={"detail": "Not found"})
 
-    media_type = mimetypes.guess_type(music_file)[0] or "audio/mpeg"
-    common = {
-        "Accept-Ranges": "bytes",
+    return RangedFileResponse(music_file, default_media_type="audio/mpeg", headers={
         "Cache-Control": "public, max-age=86400",
         "x-content-type-options": "nosniff",
-    }
+    })
 
-    range_header = request.headers.get("range")
-    if range_header and range_header.startswith("bytes="):
-        file_size = os.path.getsize(music_file)
-        try:
-            start_s, end_s = range_header[len("bytes="):].split("-", 1)
-            start = int(start_s) if start_s else 0
-            end = int(end_s) if end_s else file_size - 1
-        except ValueError:
-            start, end = 0, file_size - 1
-        start = max(0, start)
-        end = min(end, file_size - 1)
-        if start > end:
-            return Response(status_code=416, headers={**common, "Content-Range": f"bytes */{file_size}"})
-        length = end - start + 1
-        return StreamingResponse(
-            _file_range_iter(music_file, start, length), status_code=206, media_type=media_type,
-            headers={**common, "Content-Range": f"bytes {start}-{end}/{file_size}", "Content-Length": str(length)},
-        )
-
-    resp = SFileResponse(music_file, media_type=media_type)
-    for k, v in common.items():
-        resp.headers[k] = v
-    return resp
+
+# 앞단 미들웨어 1층(순수 ASGI): 파일 서빙 접두사 → CORS preflight/ngrok 헤더 → /api/ 슬래시 정규화.
+# 가장 나중에 추가 = 가장 바깥(CORSMiddleware보다 먼저 실행) — 예전 @app.middleware 순서와 같다.
+app.add_middleware(
+    EdgeMiddleware,
+    routes_app=app,
+    cors_origins=settings.effective_cors_origins,
+    prefix_handlers={"/music-files/": serve_music_files, "/uploads/": serve_uploads},
+)
 
 
 # Admin dashboard (local access only)
@@ -400,6 +241,44 @@ async def startup_scheduler():
     asyncio.create_task(run_in_threadpool(sweep_orphan_chunk_dirs))
 
 
+@app.on_event("startup")
+async def _start_realtime_broker():
+    # 다중 워커: REALTIME_BROKER=redis 면 모든 워커가 같은 채널을 구독해 자기 소켓에만 전달
+    from app.services.realtime_broker import build_broker
+    from app.services.websocket_manager import manager
+    await manager.start_broker(build_broker())
+
+
+@app.on_event("startup")
+async def _resume_push_outbox():
+    # 재시작 전 못 보낸 푸시(pending·임대 만료 sending)를 이어서 발송
+    from app.services.notification_service import web_push_configured
+    from app.services.native_push import native_push_configured
+    if web_push_configured() or native_push_configured():
+        from app.services.push_outbox import drainer
+        drainer.wake()
+
+
+@app.on_event("startup")
+async def _start_media_worker():
+    # 재시작 전 남은 압축 작업(pending·임대 만료 running)을 이어서 처리. external이면 app.media_worker가 맡는다
+    if settings.MEDIA_WORKER_MODE == "inline":
+        from app.services.media_jobs import worker
+        worker.wake()
+
+
+@app.on_event("shutdown")
+async def _stop_media_worker():
+    from app.services.media_jobs import worker
+    worker.stop()
+
+
+@app.on_event("shutdown")
+async def _stop_realtime_broker():
+    from app.services.websocket_manager import manager
+    await manager.stop_broker()
+
+
 @app.on_event("startup")
 async def _raise_threadpool_capacity():
     # 동기 라우트(def, ~109개)는 anyio 스레드풀에서 실행 — 기본 40에서 64로 상향해
@@ -0,0 +1,33 @@
+"""미디어 처리 워커 단독 실행 — settings.MEDIA_WORKER_MODE="external" 일 때.
+
+    python -m app.media_worker [--concurrency N]
+
+media_jobs 를 임대해 프로세스 풀에서 압축한다(services/media_jobs.py). 여러 대·여러 개를 띄워도 임대가
+작업을 나눠 갖는다. 동시 실행 수 기본값은 이 머신의 MEDIA_WORKER_CONCURRENCY.
+"""
+import argparse
+import logging
+import signal
+
+from app.database import Base, engine
+from app.services.media_jobs import MediaWorker
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SOL-ACT media transcoding worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="동시 압축 수(기본: MEDIA_WORKER_CONCURRENCY)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    Base.metadata.create_all(bind=engine, tables=[Base.metadata.tables["media_jobs"]])
+
+    worker = MediaWorker(concurrency=args.concurrency)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == "__main__":
+    main()
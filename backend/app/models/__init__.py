@@ -15,6 +15,10 @@ from .audition import Audition, AuditionChecklist
 from .private_lesson import PrivateLessonRequest
 from .push_subscription import PushSubscription
 from .device_token import DeviceToken
+from .push_outbox import PushOutbox
+from .sync_tombstone import SyncTombstone
+from .upload_session import UploadSession, UploadSessionChunk
+from .media_job import MediaJob
 from .praise_sticker import PraiseSticker
 from .music import Track, MusicDownloadRequest
 from .practice import PracticeScript, PracticeDraw, PracticeRequest
@@ -32,6 +36,9 @@ from .mock_test import MockTest, MockTestEntry, MockTestVideo
 from .scene import SceneRehearsal, AppSetting, InterviewRevision
 from .analysis import WorkAnalysis, AnalysisVersion, AnalysisFeedback, AnalysisFieldComment
 
+# class_teachers 동기화 매퍼 이벤트 — 모델만 import하는 스크립트(seed_data 등)의 쓰기에도 걸리게
+from app.services import class_scope as _class_scope  # noqa: E402,F401
+
 __all__ = [
     "User",
     "Assignment",
@@ -54,6 +61,11 @@ __all__ = [
     "PrivateLessonRequest",
     "PushSubscription",
     "DeviceToken",
+    "PushOutbox",
+    "SyncTombstone",
+    "UploadSession",
+    "UploadSessionChunk",
+    "MediaJob",
     "PraiseSticker",
     "Track",
     "MusicDownloadRequest",
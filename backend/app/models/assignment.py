@@ -28,7 +28,7 @@ class Assignment(Base):
     grade = Column(String, nullable=True)
     assigned_by = Column(String, ForeignKey("users.id"), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
 
     # Relationships
     student = relationship("User", back_populates="assignments", foreign_keys=[student_id])
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -6,12 +6,16 @@ from datetime import datetime
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # 반별 keyset 페이지: WHERE class_id=? AND (timestamp, id) < 커서 ORDER BY timestamp DESC, id DESC
+        Index("ix_chat_messages_class_ts", "class_id", "timestamp", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     class_id = Column(String, ForeignKey("classes.id"), nullable=False)
     sender_id = Column(String, ForeignKey("users.id"), nullable=False)
     content = Column(Text, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)  # 메시지는 수정 없음 — /api/sync 커서
 
     # Relationships
     sender = relationship("User", back_populates="sent_messages")
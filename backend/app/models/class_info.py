@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, Table, JSON
+from sqlalchemy import Column, String, Text, ForeignKey, Table, JSON, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -11,6 +11,18 @@ class_students = Table(
     Column('student_id', String, ForeignKey('users.id'), primary_key=True)
 )
 
+# subject_teachers(JSON)의 정규화 사본 — 교사 → 담당 반 조회를 인덱스로(JSON LIKE 풀스캔 대체).
+# ClassInfo 쓰기 시 app.services.class_scope 의 매퍼 이벤트가 자동 동기화한다. 직접 쓰지 말 것.
+# teacher_id는 FK를 두지 않는다: JSON 쪽은 제약이 없어 삭제된 교사 id가 남아 있을 수 있다.
+class_teachers = Table(
+    'class_teachers',
+    Base.metadata,
+    Column('class_id', String, ForeignKey('classes.id'), primary_key=True),
+    Column('subject', String, primary_key=True),
+    Column('teacher_id', String, nullable=False),
+    Index('ix_class_teachers_teacher', 'teacher_id'),
+)
+
 
 class ClassInfo(Base):
     __tablename__ = "classes"
@@ -41,6 +41,7 @@ class Lesson(Base):
     private_student_ids = Column(JSON, nullable=True)  # ["s1", "s2"]
     request_id = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # /api/sync 커서
 
     # Relationships
     class_info = relationship("ClassInfo", back_populates="lessons")
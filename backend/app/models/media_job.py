@@ -0,0 +1,34 @@
+"""미디어 처리(영상 압축·이미지 최적화) 작업 큐 — 업로드가 DB에 먼저 기록하고 워커가 임대해 처리.
+
+재시작해도 pending 행과 임대가 만료된 running 행을 다시 집어가므로 유실이 없다(services/media_jobs.py).
+status: pending(대기·재시도 대기) | running(임대 중) | done | dead(재시도 한도 초과)
+priority: 작을수록 먼저(레인 — 모의테스트 영상이 연습 영상보다 앞선다).
+"""
+from sqlalchemy import Column, String, Integer, Text, DateTime, Index
+from app.database import Base
+from datetime import datetime
+
+
+class MediaJob(Base):
+    __tablename__ = "media_jobs"
+    __table_args__ = (
+        # 워커 폴링·대기 순번: WHERE status=? ORDER BY priority, created_at
+        Index("ix_media_jobs_due", "status", "priority", "created_at"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    kind = Column(String, nullable=False)                     # video | image
+    path = Column(String, nullable=False)                     # 처리할 파일(UPLOAD_DIR 아래 절대 경로)
+    user_id = Column(String, nullable=True, index=True)       # 완료/실패 알림 대상(업로더)
+    content_key = Column(String, nullable=True)               # 처리 후 blob 등록 키(services/upload_blobs)
+    lane = Column(String, nullable=False, default="default")
+    priority = Column(Integer, nullable=False, default=40)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)     # 임대(시작) 횟수 — 처리 중 크래시도 센다
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    lease_owner = Column(String, nullable=True)               # 집어간 워커(다중 프로세스·머신 안전)
+    lease_until = Column(DateTime, nullable=True)             # 하트비트로 연장, 만료되면 다른 워커가 재수거
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
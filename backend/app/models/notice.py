@@ -14,3 +14,4 @@ class Notice(Base):
     class_id = Column(String, nullable=True)  # (legacy) 단일 반. 신규는 target_class_ids 사용
     target_class_ids = Column(JSON, nullable=True)  # ["c1","c2"] 대상 반들 / null·[] = 전체 공지
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # /api/sync 커서
@@ -25,6 +25,7 @@ class Notification(Base):
     message = Column(Text, nullable=False)
     read = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # /api/sync 커서
 
     # Relationships
     user = relationship("User", back_populates="notifications")
@@ -34,6 +34,8 @@ class Portfolio(Base):
     video_duration = Column(Integer, nullable=True)  # Duration in seconds
     practice_script_id = Column(String, nullable=True, index=True)  # 제시대사 연결(category=scripted일 때 어떤 대사를 연기했는지)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # /api/sync 커서 — 코멘트·영상·첨부 변경도 여기로 올린다(services/sync.py)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
 
     # Relationships
     student = relationship("User", back_populates="portfolios")
@@ -0,0 +1,36 @@
+"""푸시 아웃박스 — 발송 대기 푸시를 DB에 먼저 기록(재시작에도 유실 없음, at-least-once).
+
+알림(notifications) 행과 같은 트랜잭션으로 INSERT 되고, 백그라운드 드레이너가 집어가 발송한다.
+같은 (user_id, tag)에 대기 중인 행이 여럿이면 한 번의 다이제스트 푸시로 합친다.
+status: pending(대기·재시도 대기) | sending(임대 중) | sent | dead(재시도 한도 초과)
+"""
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, JSON, Index
+from app.database import Base
+from datetime import datetime
+
+
+class PushOutbox(Base):
+    __tablename__ = "push_outbox"
+    __table_args__ = (
+        # 드레이너 폴링: WHERE status=? AND next_attempt_at<=now
+        Index("ix_push_outbox_due", "status", "next_attempt_at"),
+        # 병합/최근 발송 조회: WHERE user_id IN (...) AND tag=?
+        Index("ix_push_outbox_user_tag", "user_id", "tag", "status"),
+    )
+
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    tag = Column(String, nullable=False, default="general")   # 웹푸시 tag = 병합 단위(chat-{class_id} 등)
+    title = Column(String, nullable=False, default="SOL-ACT")
+    message = Column(Text, nullable=False)
+    data = Column(JSON, nullable=True)                         # 네이티브 푸시 data(entity 등)
+    web = Column(Integer, nullable=False, default=1)           # 채널 on/off (0|1)
+    native = Column(Integer, nullable=False, default=1)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    lease_owner = Column(String, nullable=True)                # 집어간 드레이너 토큰(다중 워커 안전)
+    lease_until = Column(DateTime, nullable=True)              # 임대 만료 → 다른 워커/재시작 후 재수거
+    pushed_at = Column(DateTime, nullable=True)                # 마지막 발송 시도 시각(병합 창 기준)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,23 @@
+"""삭제 기록(tombstone) — /api/sync 가 '커서 이후 삭제된 id'를 돌려주기 위한 행.
+
+동기화 대상 엔티티의 ORM 삭제 때 같은 flush 안에서 기록된다(services/sync.py 매퍼 이벤트).
+owner_id/class_id는 가시성 필터용 힌트(소유 학생·수신자 / 소속 반). 보존 기간이 지나면 정리된다.
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Index
+from app.database import Base
+from datetime import datetime
+
+
+class SyncTombstone(Base):
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        # WHERE entity=? AND (deleted_at, seq) > 커서
+        Index("ix_sync_tombstones_entity_deleted", "entity", "deleted_at", "seq"),
+    )
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String, nullable=False)       # lessons | notices | assignments | portfolios | notifications | chat
+    entity_id = Column(String, nullable=False)
+    owner_id = Column(String, nullable=True)
+    class_id = Column(String, nullable=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
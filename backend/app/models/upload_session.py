@@ -0,0 +1,41 @@
+"""청크 업로드 세션 — 재시작·다중 워커에도 이어받기 가능하도록 DB에 둔다(services/upload_sessions.py).
+
+upload_session_chunks 한 행 = 받은 청크 하나(수신 비트맵). (upload_id, idx) PK라 같은 청크 재전송은
+INSERT 충돌로 걸러져 received_bytes가 두 번 오르지 않는다. complete는 세션 행 DELETE의 rowcount로
+"집어가기"를 판정한다(동시 complete 중 정확히 하나만 1).
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Index
+from app.database import Base
+from datetime import datetime
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+    __table_args__ = (
+        # 만료 정리: WHERE created_at < ?
+        Index("ix_upload_sessions_created", "created_at"),
+    )
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=False, index=True)
+    path = Column(String, nullable=False)            # 조립될 최종 파일
+    chunks_dir = Column(String, nullable=True)       # 청크 파일 모드의 스크래치 디렉토리(.chunks_<id>)
+    chunk_size = Column(Integer, nullable=True)      # 직접 쓰기 모드: 청크 i는 path의 i * chunk_size 위치
+    filename = Column(String, nullable=False)
+    subfolder = Column(String, nullable=False)
+    unique_name = Column(String, nullable=False)
+    target_type = Column(String, nullable=True)
+    target_id = Column(String, nullable=True)
+    total_size = Column(BigInteger, nullable=False)
+    received_bytes = Column(BigInteger, nullable=False, default=0)
+    next_idx = Column(Integer, nullable=False, default=0)  # 청크 이름에 인덱스가 없을 때 채번
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class UploadSessionChunk(Base):
+    __tablename__ = "upload_session_chunks"
+
+    upload_id = Column(String, primary_key=True)
+    idx = Column(Integer, primary_key=True)
+    size = Column(Integer, nullable=False)
+    digest = Column(String, nullable=True)  # 청크 sha256 — 제자리 쓰기 모드의 중복 제거 키(services/upload_blobs)
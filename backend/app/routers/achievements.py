@@ -5,11 +5,12 @@
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from pydantic import BaseModel
 import uuid
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User, UserRole
 from app.models.gamification import Streak
 from app.models.submission import Submission
@@ -80,19 +81,19 @@ class GrantBody(BaseModel):
 
 
 @router.post("/grant")
-async def grant_badge(body: GrantBody, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def grant_badge(body: GrantBody, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """강사수여(성장상 등) — 수동 뱃지만. 자동 뱃지는 발급 불가."""
     if current_user.role not in (UserRole.TEACHER, UserRole.DIRECTOR):
         raise HTTPException(status_code=403, detail="강사/원장 전용")
-    if current_user.role == UserRole.TEACHER and body.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and body.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생에게만 수여할 수 있어요.")
     if body.code not in MANUAL_CODES:
         raise HTTPException(status_code=400, detail="자동 뱃지는 수여할 수 없어요")
-    exists = db.query(UserBadge).filter(UserBadge.student_id == body.student_id, UserBadge.badge_code == body.code).first()
+    exists = await db.scalar(select(UserBadge).where(UserBadge.student_id == body.student_id, UserBadge.badge_code == body.code))
     if exists:
         return {"ok": True, "already": True}
     db.add(UserBadge(id=f"ub{uuid.uuid4().hex[:12]}", student_id=body.student_id, badge_code=body.code, granted_by=current_user.id))
-    db.commit()
+    await db.commit()
     meta = next((b for b in BADGE_DEFS if b["code"] == body.code), None)
     title = meta["title"] if meta else "뱃지"
     await notify_user(db, body.student_id, f"🌟 {title} 갈채를 받았어요!", entity="badge")
@@ -213,3 +213,20 @@ def admin_invite_codes(request: Request, db: Session = Depends(get_db)):
         }
         for c in codes
     ]
+
+
+@router.get("/realtime")
+def admin_realtime(request: Request):
+    """WebSocket 송신 큐 지표 — 연결 수, 큐 깊이, 드롭/느린 소비자 종료 횟수."""
+    require_admin(request)
+    from app.services.websocket_manager import manager
+    return manager.stats()
+
+
+@router.get("/push")
+def admin_push(request: Request):
+    """푸시 디스패처 지표 — 워커 수, 적체(backlog), 처리량, 실패/만료 구독 정리 수 + APNs 연결 지표."""
+    require_admin(request)
+    from app.services.push_dispatcher import dispatcher
+    from app.services.native_push import apns_stats
+    return {**dispatcher.stats(), "apns": apns_stats()}
@@ -11,8 +11,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User, UserRole
 from app.models.scene import SceneRehearsal, AppSetting, InterviewRevision
 from app.utils.auth import get_current_user
@@ -121,7 +122,7 @@ class ScenePartnerReq(BaseModel):
 
 
 @router.post("/interview-revise")
-async def interview_revise(data: ReviseReq, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def interview_revise(data: ReviseReq, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     q = (data.question or "").strip()[:1000]
     a = (data.answer or "").strip()
     if len(a) < 5:
@@ -138,10 +139,10 @@ async def interview_revise(data: ReviseReq, db: Session = Depends(get_db), curre
                 id=rid, student_id=current_user.id, question=q, answer=a,
                 revised=result.get("revised"), feedback=result.get("feedback"), summary=result.get("summary"),
             ))
-            db.commit()
+            await db.commit()
             result["revisionId"] = rid
         except Exception:
-            db.rollback()
+            await db.rollback()
     return result
 
 
@@ -178,7 +179,7 @@ def delete_interview_revision(revision_id: str, db: Session = Depends(get_db), c
 
 
 @router.post("/scene-partner")
-async def scene_partner(data: ScenePartnerReq, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def scene_partner(data: ScenePartnerReq, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """학생 대사(고정) 사이의 '상대 등장' 자리를 AI가 채우고 성별×나이 맞춤 TTS 합성.
     하루 생성 횟수 제한(원장 조절). 성공 시 학생 라이브러리에 자동 저장(불러오기 가능)."""
     turns = data.turns or []
@@ -195,8 +196,8 @@ async def scene_partner(data: ScenePartnerReq, db: Session = Depends(get_db), cu
         raise HTTPException(status_code=400, detail="장면이 너무 길어요(전체 4000자 이내).")
 
     # 하루 생성 제한 (저장된 장면 불러오기는 무제한 — 여긴 '새 생성'만 카운트)
-    limit = _daily_limit(db)
-    used = _today_count(db, current_user.id)
+    limit = await db.run_sync(_daily_limit)
+    used = await db.run_sync(_today_count, current_user.id)
     if used >= limit:
         raise HTTPException(status_code=429, detail=f"오늘 새 상대역 생성 한도({limit}회)를 다 썼어요. 저장된 장면을 불러와 연습하거나 내일 다시 시도해주세요.")
 
@@ -204,11 +205,11 @@ async def scene_partner(data: ScenePartnerReq, db: Session = Depends(get_db), cu
     result = await run_in_threadpool(_build_scene, turns, (data.partner or "")[:800], (data.situation or "")[:500], (data.voiceId or "").strip())
     if result.get("ok"):
         try:
-            result["sceneId"] = _save_scene(db, current_user.id, turns, result, (data.partner or "")[:800])
+            result["sceneId"] = await db.run_sync(_save_scene, current_user.id, turns, result, (data.partner or "")[:800])
         except Exception:
-            db.rollback()
+            await db.rollback()
         result["limit"] = limit
-        result["remaining"] = max(0, limit - _today_count(db, current_user.id))
+        result["remaining"] = max(0, limit - await db.run_sync(_today_count, current_user.id))
     return result
 
 
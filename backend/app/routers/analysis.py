@@ -7,12 +7,13 @@
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import uuid
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User, UserRole
 from app.models.analysis import WorkAnalysis, AnalysisVersion, AnalysisFeedback, AnalysisFieldComment
 from app.models.submission import Submission
@@ -179,29 +180,35 @@ def save_version(analysis_id: str, data: SaveVersion, db: Session = Depends(get_
 
 
 @router.post("/{analysis_id}/submit")
-async def submit_analysis(analysis_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def submit_analysis(analysis_id: str, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """현재 버전 제출 → 강사 알림 + 통합 인박스(Submission kind='analysis') 생성."""
-    a = _get_owned(db, analysis_id, current_user.id)
-    v = _current_version(db, a)
-    if not v:
-        raise HTTPException(status_code=404, detail="버전을 찾을 수 없어요")
-    if v.status == "submitted" and a.status == "submitted":
+    def submit(s: Session):
+        a = _get_owned(s, analysis_id, current_user.id)
+        v = _current_version(s, a)
+        if not v:
+            raise HTTPException(status_code=404, detail="버전을 찾을 수 없어요")
+        if v.status == "submitted" and a.status == "submitted":
+            return v, None
+        now = datetime.utcnow()
+        v.status = "submitted"
+        v.submitted_at = now
+        a.status = "submitted"
+        # 통합 인박스 편승 — note에 analysis_id 저장(딥링크·done 매칭용)
+        teachers = get_teacher_ids_for_student(s, current_user.id)
+        sub = Submission(
+            id=f"sub{uuid.uuid4().hex[:12]}", student_id=current_user.id,
+            teacher_id=(teachers[0] if teachers else None),
+            kind="analysis", title=f"{a.title} · {a.character or ''}".strip(" ·"),
+            note=a.id, status="open",
+        )
+        s.add(sub)
+        v.submission_id = sub.id
+        s.commit()
+        return v, teachers
+
+    v, teachers = await db.run_sync(submit)
+    if teachers is None:
         return {"ok": True, "already": True}
-    now = datetime.utcnow()
-    v.status = "submitted"
-    v.submitted_at = now
-    a.status = "submitted"
-    # 통합 인박스 편승 — note에 analysis_id 저장(딥링크·done 매칭용)
-    teachers = get_teacher_ids_for_student(db, current_user.id)
-    sub = Submission(
-        id=f"sub{uuid.uuid4().hex[:12]}", student_id=current_user.id,
-        teacher_id=(teachers[0] if teachers else None),
-        kind="analysis", title=f"{a.title} · {a.character or ''}".strip(" ·"),
-        note=a.id, status="open",
-    )
-    db.add(sub)
-    v.submission_id = sub.id
-    db.commit()
     await notify_users(db, teachers, f"{current_user.name}님이 작품분석을 제출했어요", entity="submission")
     return {"ok": True, "versionNo": v.version_no}
 
@@ -264,38 +271,43 @@ class FeedbackBody(BaseModel):
 
 
 @router.post("/version/{version_id}/feedback")
-async def submit_feedback(version_id: str, body: FeedbackBody, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def submit_feedback(version_id: str, body: FeedbackBody, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """강사 첨삭 — 루브릭+3분할 요약 저장 → reviewed + 인박스 done + 학생 알림."""
     _require_staff(current_user)
-    v = db.query(AnalysisVersion).filter(AnalysisVersion.id == version_id).first()
-    if not v:
-        raise HTTPException(status_code=404, detail="버전을 찾을 수 없어요")
-    a = db.query(WorkAnalysis).filter(WorkAnalysis.id == v.analysis_id).first()
-    if a:
-        _staff_scope_student(db, current_user, a.student_id)
-    fb = v.feedback
-    if fb is None:
-        fb = AnalysisFeedback(id=_uid("af"), version_id=v.id, author_id=current_user.id)
-        db.add(fb)
-    fb.author_id = current_user.id
-    fb.rubric = body.rubric or {}
-    fb.summary_good = body.good
-    fb.summary_fix = body.fix
-    fb.summary_next = body.next
-    v.status = "reviewed"
-    if a:
-        a.status = "reviewed"
-    # 통합 인박스 done 처리(리드타임 확정)
-    if v.submission_id:
-        sub = db.query(Submission).filter(Submission.id == v.submission_id).first()
-        if sub and sub.status != "done":
-            if sub.first_feedback_at is None:
-                sub.first_feedback_at = datetime.utcnow()
-            sub.status = "done"
-            sub.feedback = (body.fix or body.good or "첨삭 완료")[:500]
-            if not sub.teacher_id:
-                sub.teacher_id = current_user.id
-    db.commit()
+
+    def review(s: Session):
+        v = s.query(AnalysisVersion).filter(AnalysisVersion.id == version_id).first()
+        if not v:
+            raise HTTPException(status_code=404, detail="버전을 찾을 수 없어요")
+        a = s.query(WorkAnalysis).filter(WorkAnalysis.id == v.analysis_id).first()
+        if a:
+            _staff_scope_student(s, current_user, a.student_id)
+        fb = v.feedback
+        if fb is None:
+            fb = AnalysisFeedback(id=_uid("af"), version_id=v.id, author_id=current_user.id)
+            s.add(fb)
+        fb.author_id = current_user.id
+        fb.rubric = body.rubric or {}
+        fb.summary_good = body.good
+        fb.summary_fix = body.fix
+        fb.summary_next = body.next
+        v.status = "reviewed"
+        if a:
+            a.status = "reviewed"
+        # 통합 인박스 done 처리(리드타임 확정)
+        if v.submission_id:
+            sub = s.query(Submission).filter(Submission.id == v.submission_id).first()
+            if sub and sub.status != "done":
+                if sub.first_feedback_at is None:
+                    sub.first_feedback_at = datetime.utcnow()
+                sub.status = "done"
+                sub.feedback = (body.fix or body.good or "첨삭 완료")[:500]
+                if not sub.teacher_id:
+                    sub.teacher_id = current_user.id
+        s.commit()
+        return a
+
+    a = await db.run_sync(review)
     if a:
         await notify_user(db, a.student_id, f"{current_user.name} 선생님이 작품분석을 첨삭했어요", entity="feedback")
     return {"ok": True}
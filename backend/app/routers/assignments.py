@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
 from typing import List, Optional
 from pydantic import BaseModel
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.assignment import Assignment, AssignmentStatus
 from app.models.user import User, UserRole
 from app.models.notification import NotificationType
@@ -100,7 +101,7 @@ def get_assignment(assignment_id: str, db: Session = Depends(get_db), current_us
 @router.post("/", response_model=List[AssignmentResponse], status_code=status.HTTP_201_CREATED)
 async def create_assignment(
     data: AssignmentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
@@ -109,7 +110,7 @@ async def create_assignment(
     # Resolve target student IDs: class_id > student_ids > student_id
     target_ids: List[str] = []
     if data.class_id:
-        target_ids = get_class_student_ids(db, data.class_id)
+        target_ids = await db.run_sync(get_class_student_ids, data.class_id)
     elif data.student_ids:
         target_ids = data.student_ids
     elif data.student_id:
@@ -121,7 +122,7 @@ async def create_assignment(
 
     # Teacher: validate all targets are in their classes
     if current_user.role == UserRole.TEACHER:
-        my_student_ids = set(get_teacher_student_ids(db, current_user.id))
+        my_student_ids = set(await db.run_sync(get_teacher_student_ids, current_user.id))
         invalid = [sid for sid in target_ids if sid not in my_student_ids]
         if invalid:
             raise HTTPException(status_code=403, detail="Cannot assign to students outside your classes")
@@ -140,7 +141,7 @@ async def create_assignment(
         )
         db.add(assignment)
         assignments.append(assignment)
-    db.commit()
+    await db.commit()
 
     await notify_users(
         db, target_ids,
@@ -151,7 +152,7 @@ async def create_assignment(
 
     result = []
     for assignment in assignments:
-        a = db.query(Assignment).options(joinedload(Assignment.student)).filter(Assignment.id == assignment.id).first()
+        a = await db.scalar(select(Assignment).options(joinedload(Assignment.student)).where(Assignment.id == assignment.id))
         result.append(assignment_to_response(a))
     return result
 
@@ -160,23 +161,23 @@ async def create_assignment(
 async def update_assignment(
     assignment_id: str,
     update_data: AssignmentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    a = db.query(Assignment).options(joinedload(Assignment.student)).filter(Assignment.id == assignment_id).first()
+    a = await db.scalar(select(Assignment).options(joinedload(Assignment.student)).where(Assignment.id == assignment_id))
     if not a:
         raise HTTPException(status_code=404, detail="Assignment not found")
-    if current_user.role == UserRole.TEACHER and a.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and a.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 과제만 수정할 수 있어요")
 
     for field, value in update_data.model_dump(exclude_unset=True).items():
         setattr(a, field, value)
 
-    db.commit()
-    db.refresh(a)
+    await db.commit()
+    await db.refresh(a)
 
     await notify_user(
         db, a.student_id,
@@ -184,7 +185,7 @@ async def update_assignment(
         entity="assignments",
     )
 
-    return assignment_to_response(a)
+    return await db.run_sync(lambda s: assignment_to_response(a))
 
 
 class SubmissionData(BaseModel):
@@ -196,10 +197,10 @@ class SubmissionData(BaseModel):
 async def submit_assignment(
     assignment_id: str,
     data: SubmissionData,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    a = db.query(Assignment).options(joinedload(Assignment.student)).filter(Assignment.id == assignment_id).first()
+    a = await db.scalar(select(Assignment).options(joinedload(Assignment.student)).where(Assignment.id == assignment_id))
     if not a:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
@@ -213,27 +214,27 @@ async def submit_assignment(
     if data.submission_file_url:
         a.submission_file_url = data.submission_file_url
     a.status = AssignmentStatus.SUBMITTED
+    student_name = a.student.name if a.student else "학생"
 
-    db.commit()
-    db.refresh(a)
+    await db.commit()
+    await db.refresh(a)
 
     # Notify teachers about submission
-    teacher_ids = get_teacher_ids_for_student(db, a.student_id)
-    student_name = a.student.name if a.student else "학생"
+    teacher_ids = await db.run_sync(get_teacher_ids_for_student, a.student_id)
     await notify_users(
         db, teacher_ids,
         f"{student_name}님이 과제 '{a.title}'을 제출했습니다.",
         entity="assignments",
     )
 
-    return assignment_to_response(a)
+    return await db.run_sync(lambda s: assignment_to_response(a))
 
 
 @router.patch("/{assignment_id}/file", response_model=AssignmentResponse)
 async def patch_submission_file(
     assignment_id: str,
     file_url: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """Patch the submission file URL after an async upload completes.
@@ -241,16 +242,16 @@ async def patch_submission_file(
     Called when a background upload finishes after the initial submission.
     Does not change status or re-notify teachers.
     """
-    a = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    a = await db.scalar(select(Assignment).where(Assignment.id == assignment_id))
     if not a:
         raise HTTPException(status_code=404, detail="Assignment not found")
     if current_user.id != a.student_id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
     a.submission_file_url = file_url
-    db.commit()
-    db.refresh(a)
-    return assignment_to_response(a)
+    await db.commit()
+    await db.refresh(a)
+    return await db.run_sync(lambda s: assignment_to_response(a))
 
 
 class GradeData(BaseModel):
@@ -262,16 +263,16 @@ class GradeData(BaseModel):
 async def grade_assignment(
     assignment_id: str,
     data: GradeData,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Only teachers and directors can grade")
 
-    a = db.query(Assignment).options(joinedload(Assignment.student)).filter(Assignment.id == assignment_id).first()
+    a = await db.scalar(select(Assignment).options(joinedload(Assignment.student)).where(Assignment.id == assignment_id))
     if not a:
         raise HTTPException(status_code=404, detail="Assignment not found")
-    if current_user.role == UserRole.TEACHER and a.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and a.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 과제만 채점할 수 있어요")
 
     if a.status == AssignmentStatus.PENDING:
@@ -281,8 +282,8 @@ async def grade_assignment(
     a.feedback = data.feedback
     a.status = AssignmentStatus.GRADED
 
-    db.commit()
-    db.refresh(a)
+    await db.commit()
+    await db.refresh(a)
 
     # Notify student about grading
     await notify_user(
@@ -292,7 +293,7 @@ async def grade_assignment(
         entity="assignments",
     )
 
-    return assignment_to_response(a)
+    return await db.run_sync(lambda s: assignment_to_response(a))
 
 
 @router.post("/{assignment_id}/analyze")
@@ -324,22 +325,22 @@ def analyze_assignment(
 @router.delete("/{assignment_id}")
 async def delete_assignment(
     assignment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    a = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    a = await db.scalar(select(Assignment).where(Assignment.id == assignment_id))
     if not a:
         raise HTTPException(status_code=404, detail="Assignment not found")
-    if current_user.role == UserRole.TEACHER and a.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and a.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 과제만 삭제할 수 있어요")
 
     student_id = a.student_id
     title = getattr(a, "title", "") or "과제"
-    db.delete(a)
-    db.commit()
+    await db.delete(a)
+    await db.commit()
 
     await emit_data_changed([student_id], "assignments")
     # 학생 아이템 삭제 → 해당 학생에게 알림(평가 삭제 알림과 동일한 정책).
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import extract, func, select
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.attendance import Attendance, AttendanceStatus
 from app.models.lesson import Lesson
 from app.models.user import User, UserRole
@@ -19,12 +20,12 @@ router = APIRouter()
 _ATT_STATUS = {"present": "출석", "late": "지각", "absent": "결석", "excused": "공결"}
 
 
-async def _notify_attendance(db: Session, actor: User, student_id: str, status) -> None:
+async def _notify_attendance(db: AsyncSession, actor: User, student_id: str, status) -> None:
     """출결 단건 기록/수정 알림. 학생 셀프체크인 → 담당교사+원장 전원, 교사/원장 기록 → 해당 학생."""
     raw = getattr(status, "value", status)
     label = _ATT_STATUS.get(raw, raw)
     if actor.role == UserRole.STUDENT:
-        staff_ids = [uid for uid in get_teacher_ids_for_student(db, student_id) if uid != actor.id]
+        staff_ids = [uid for uid in await db.run_sync(get_teacher_ids_for_student, student_id) if uid != actor.id]
         if staff_ids:
             await notify_users(db, staff_ids, f"{actor.name}님이 출석 체크했어요 ({label})", entity="attendance")
     else:
@@ -80,17 +81,45 @@ def list_attendance(
     return [attendance_to_response(a) for a in records]
 
 
+_BREAKDOWNS = ("class", "month")
+
+
+def _empty_counts() -> dict:
+    return {"total": 0, "present": 0, "late": 0, "absent": 0, "excused": 0}
+
+
+def _with_rate(c: dict) -> dict:
+    rate = (c["present"] + c["late"]) / c["total"] * 100 if c["total"] > 0 else 0
+    return {**c, "rate": round(rate, 1)}
+
+
 # /stats and /bulk must be before /{id}
-@router.get("/stats", response_model=List[AttendanceStats])
+@router.get("/stats", response_model=List[AttendanceStats], response_model_exclude_none=True)
 def get_attendance_stats(
     student_id: Optional[str] = Query(None),
     class_id: Optional[str] = Query(None),
     date_from: Optional[str] = Query(None),
     date_to: Optional[str] = Query(None),
+    breakdown: Optional[str] = Query(None, description="쉼표 구분: class, month — 학생별 반/월 내역 추가"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(Attendance).join(Lesson, Attendance.lesson_id == Lesson.id)
+    """학생별 출결 통계 — (학생, 상태[, 반][, 월]) GROUP BY 1쿼리 + users 조인으로 이름.
+    응답 크기·비용이 출결 행 수가 아니라 학생 수(× 내역 칸 수)에 비례한다."""
+    parts = {b.strip() for b in breakdown.split(",") if b.strip()} if breakdown else set()
+    if parts - set(_BREAKDOWNS):
+        raise HTTPException(status_code=400, detail=f"breakdown must be one of: {', '.join(_BREAKDOWNS)}")
+
+    extra = []
+    if "class" in parts:
+        extra.append(Lesson.class_id)
+    if "month" in parts:
+        extra += [extract("year", Lesson.date), extract("month", Lesson.date)]
+    query = (
+        db.query(Attendance.student_id, User.name, Attendance.status, func.count(Attendance.id), *extra)
+        .join(Lesson, Attendance.lesson_id == Lesson.id)
+        .outerjoin(User, User.id == Attendance.student_id)
+    )
     # Student: only see own stats
     if current_user.role == UserRole.STUDENT:
         query = query.filter(Attendance.student_id == current_user.id)
@@ -108,83 +137,95 @@ def get_attendance_stats(
     if date_to:
         from datetime import datetime
         query = query.filter(Lesson.date <= datetime.strptime(date_to, "%Y-%m-%d").date())
+    rows = query.group_by(Attendance.student_id, User.name, Attendance.status, *extra).all()
 
-    records = query.all()
-
-    # Group by student
+    # 집계 행(학생 × 상태 × 내역 칸)을 접는다 — 출결 행 단위 루프 없음
     stats_map = {}
-    for r in records:
-        sid = r.student_id
-        if sid not in stats_map:
-            student = db.query(User).filter(User.id == sid).first()
-            stats_map[sid] = {
-                "student_id": sid,
-                "student_name": student.name if student else "",
-                "total": 0, "present": 0, "late": 0, "absent": 0, "excused": 0,
-            }
-        stats_map[sid]["total"] += 1
-        stats_map[sid][r.status.value] += 1
+    for row in rows:
+        sid, name, st, n = row[:4]
+        s = stats_map.get(sid)
+        if s is None:
+            s = stats_map[sid] = {"student_id": sid, "student_name": name or "", **_empty_counts(),
+                                  "by_class": {} if "class" in parts else None,
+                                  "by_month": {} if "month" in parts else None}
+        buckets = [s]
+        rest = list(row[4:])
+        if "class" in parts:
+            buckets.append(s["by_class"].setdefault(rest.pop(0) or "private", _empty_counts()))
+        if "month" in parts:
+            year, month = rest
+            buckets.append(s["by_month"].setdefault(f"{int(year):04d}-{int(month):02d}", _empty_counts()))
+        for b in buckets:
+            b["total"] += n
+            b[st.value] += n
 
     result = []
-    for sid, s in stats_map.items():
-        rate = (s["present"] + s["late"]) / s["total"] * 100 if s["total"] > 0 else 0
-        result.append(AttendanceStats(**s, rate=round(rate, 1)))
+    for sid in sorted(stats_map):
+        s = stats_map[sid]
+        for key in ("by_class", "by_month"):
+            if s[key] is not None:
+                s[key] = {k: _with_rate(v) for k, v in sorted(s[key].items())}
+        result.append(AttendanceStats(**_with_rate(s)))
     return result
 
 
 @router.post("/bulk", response_model=List[AttendanceResponse], status_code=status.HTTP_201_CREATED)
 async def bulk_create_attendance(
     data: AttendanceBulkCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    lesson = db.query(Lesson).filter(Lesson.id == data.lesson_id).first()
+    lesson = await db.scalar(select(Lesson).where(Lesson.id == data.lesson_id))
     if not lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
 
     # Teacher: validate lesson belongs to their class (or private lesson they teach)
     if current_user.role == UserRole.TEACHER:
         if lesson.class_id:
-            my_class_ids = get_teacher_class_ids(db, current_user.id)
+            my_class_ids = await db.run_sync(get_teacher_class_ids, current_user.id)
             if lesson.class_id not in my_class_ids:
                 raise HTTPException(status_code=403, detail="Cannot mark attendance for classes you don't teach")
         elif lesson.is_private and lesson.teacher_id != current_user.id:
             raise HTTPException(status_code=403, detail="담당 수업의 출결만 기록할 수 있어요")
 
-    created = []
-    for record in data.records:
-        # Update existing or create new
-        existing = db.query(Attendance).filter(
-            Attendance.lesson_id == data.lesson_id,
-            Attendance.student_id == record.student_id
-        ).first()
-
-        if existing:
-            existing.status = record.status
-            existing.note = record.note
-            existing.marked_by = current_user.id
-            created.append(existing)
-        else:
-            att = Attendance(
-                id=f"att{uuid.uuid4().hex[:7]}",
-                lesson_id=data.lesson_id,
-                student_id=record.student_id,
-                status=record.status,
-                note=record.note,
-                marked_by=current_user.id,
-            )
-            db.add(att)
-            created.append(att)
-
-    db.commit()
-    result = []
-    for att in created:
-        db.refresh(att)
-        a = db.query(Attendance).options(joinedload(Attendance.student)).filter(Attendance.id == att.id).first()
-        result.append(attendance_to_response(a))
+    def upsert(s: Session) -> list:
+        created = []
+        for record in data.records:
+            # Update existing or create new
+            existing = s.query(Attendance).filter(
+                Attendance.lesson_id == data.lesson_id,
+                Attendance.student_id == record.student_id
+            ).first()
+
+            if existing:
+                existing.status = record.status
+                existing.note = record.note
+                existing.marked_by = current_user.id
+                created.append(existing)
+            else:
+                att = Attendance(
+                    id=f"att{uuid.uuid4().hex[:7]}",
+                    lesson_id=data.lesson_id,
+                    student_id=record.student_id,
+                    status=record.status,
+                    note=record.note,
+                    marked_by=current_user.id,
+                )
+                s.add(att)
+                created.append(att)
+
+        s.commit()
+        result = []
+        for att in created:
+            s.refresh(att)
+            a = s.query(Attendance).options(joinedload(Attendance.student)).filter(Attendance.id == att.id).first()
+            result.append(attendance_to_response(a))
+        return result
+
+    result = await db.run_sync(upsert)
 
     status_map = {"present": "출석", "late": "지각", "absent": "결석", "excused": "공결"}
     for record in data.records:
@@ -201,18 +242,18 @@ async def bulk_create_attendance(
 @router.post("/", response_model=AttendanceResponse, status_code=status.HTTP_201_CREATED)
 async def create_attendance(
     data: AttendanceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Student: may self check-in only (own record, own lesson — class or private they belong to)
     if current_user.role == UserRole.STUDENT:
         if data.student_id != current_user.id:
             raise HTTPException(status_code=403, detail="본인 출석만 체크할 수 있어요")
-        lesson = db.query(Lesson).filter(Lesson.id == data.lesson_id).first()
+        lesson = await db.scalar(select(Lesson).where(Lesson.id == data.lesson_id))
         if not lesson:
             raise HTTPException(status_code=404, detail="Lesson not found")
         if lesson.class_id:
-            if not validate_class_access(db, lesson.class_id, current_user):
+            if not await db.run_sync(validate_class_access, lesson.class_id, current_user):
                 raise HTTPException(status_code=403, detail="이 수업의 학생이 아니에요")
         elif lesson.is_private:
             if current_user.id not in (lesson.private_student_ids or []):
@@ -220,42 +261,39 @@ async def create_attendance(
 
     # Teacher: validate lesson belongs to their class (or private lesson they teach)
     elif current_user.role == UserRole.TEACHER:
-        lesson = db.query(Lesson).filter(Lesson.id == data.lesson_id).first()
+        lesson = await db.scalar(select(Lesson).where(Lesson.id == data.lesson_id))
         if lesson and lesson.class_id:
-            my_class_ids = get_teacher_class_ids(db, current_user.id)
+            my_class_ids = await db.run_sync(get_teacher_class_ids, current_user.id)
             if lesson.class_id not in my_class_ids:
                 raise HTTPException(status_code=403, detail="Cannot mark attendance for classes you don't teach")
         elif lesson and lesson.is_private and lesson.teacher_id != current_user.id:
             raise HTTPException(status_code=403, detail="담당 수업의 출결만 기록할 수 있어요")
 
     # Check for duplicate: upsert if already exists
-    existing = db.query(Attendance).filter(
+    existing = await db.scalar(select(Attendance).where(
         Attendance.lesson_id == data.lesson_id,
         Attendance.student_id == data.student_id
-    ).first()
+    ))
     if existing:
         existing.status = data.status
         existing.note = data.note
         existing.marked_by = current_user.id
-        db.commit()
-        db.refresh(existing)
-        a = db.query(Attendance).options(joinedload(Attendance.student)).filter(Attendance.id == existing.id).first()
-        await emit_data_changed([data.student_id], "attendance")
-        await _notify_attendance(db, current_user, data.student_id, data.status)
-        return attendance_to_response(a)
-
-    att = Attendance(
-        id=f"att{uuid.uuid4().hex[:7]}",
-        lesson_id=data.lesson_id,
-        student_id=data.student_id,
-        status=data.status,
-        note=data.note,
-        marked_by=current_user.id,
+        att = existing
+    else:
+        att = Attendance(
+            id=f"att{uuid.uuid4().hex[:7]}",
+            lesson_id=data.lesson_id,
+            student_id=data.student_id,
+            status=data.status,
+            note=data.note,
+            marked_by=current_user.id,
+        )
+        db.add(att)
+    await db.commit()
+    a = await db.scalar(
+        select(Attendance).options(joinedload(Attendance.student))
+        .where(Attendance.id == att.id).execution_options(populate_existing=True)
     )
-    db.add(att)
-    db.commit()
-    db.refresh(att)
-    a = db.query(Attendance).options(joinedload(Attendance.student)).filter(Attendance.id == att.id).first()
 
     await emit_data_changed([data.student_id], "attendance")
     await _notify_attendance(db, current_user, data.student_id, data.status)
@@ -267,21 +305,21 @@ async def create_attendance(
 async def update_attendance(
     attendance_id: str,
     update_data: AttendanceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    a = db.query(Attendance).options(joinedload(Attendance.student)).filter(Attendance.id == attendance_id).first()
+    a = await db.scalar(select(Attendance).options(joinedload(Attendance.student)).where(Attendance.id == attendance_id))
     if not a:
         raise HTTPException(status_code=404, detail="Attendance record not found")
 
     # Teacher: validate lesson belongs to their class
     if current_user.role == UserRole.TEACHER:
-        lesson = db.query(Lesson).filter(Lesson.id == a.lesson_id).first()
+        lesson = await db.scalar(select(Lesson).where(Lesson.id == a.lesson_id))
         if lesson and lesson.class_id:
-            my_class_ids = get_teacher_class_ids(db, current_user.id)
+            my_class_ids = await db.run_sync(get_teacher_class_ids, current_user.id)
             if lesson.class_id not in my_class_ids:
                 raise HTTPException(status_code=403, detail="Cannot mark attendance for classes you don't teach")
 
@@ -289,8 +327,7 @@ async def update_attendance(
         setattr(a, field, value)
     a.marked_by = current_user.id
 
-    db.commit()
-    db.refresh(a)
+    await db.commit()
 
     await emit_data_changed([a.student_id], "attendance")
     await _notify_attendance(db, current_user, a.student_id, a.status)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.audition import Audition, AuditionChecklist, AuditionType, AuditionStatus
 from app.models.user import User, UserRole
 from app.schemas.audition import (
@@ -97,7 +99,7 @@ def get_audition(audition_id: str, db: Session = Depends(get_db), current_user:
 @router.post("/", response_model=AuditionResponse, status_code=status.HTTP_201_CREATED)
 async def create_audition(
     data: AuditionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     _require_staff(current_user)
@@ -114,11 +116,11 @@ async def create_audition(
         registration_end=data.registration_end,
     )
     db.add(audition)
-    db.commit()
-    db.refresh(audition)
+    await db.commit()
+    await db.refresh(audition)
 
     if data.class_id:
-        student_ids = get_class_student_ids(db, data.class_id)
+        student_ids = await db.run_sync(get_class_student_ids, data.class_id)
         if student_ids:
             await notify_users(
                 db, student_ids,
@@ -128,11 +130,10 @@ async def create_audition(
 
     await emit_data_changed([current_user.id], "auditions")
 
-    a = (
-        db.query(Audition)
+    a = await db.scalar(
+        select(Audition)
         .options(joinedload(Audition.creator), joinedload(Audition.checklists))
-        .filter(Audition.id == audition.id)
-        .first()
+        .where(Audition.id == audition.id)
     )
     return audition_to_response(a)
 
@@ -141,14 +142,13 @@ async def create_audition(
 async def update_audition(
     audition_id: str,
     update_data: AuditionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    a = (
-        db.query(Audition)
+    a = await db.scalar(
+        select(Audition)
         .options(joinedload(Audition.creator), joinedload(Audition.checklists))
-        .filter(Audition.id == audition_id)
-        .first()
+        .where(Audition.id == audition_id)
     )
     if not a:
         raise HTTPException(status_code=404, detail="Audition not found")
@@ -159,25 +159,24 @@ async def update_audition(
     for field, value in update_data.model_dump(exclude_unset=True).items():
         setattr(a, field, value)
 
-    db.commit()
-    db.refresh(a)
+    await db.commit()
 
     if a.class_id:
-        student_ids = get_class_student_ids(db, a.class_id)
+        student_ids = await db.run_sync(get_class_student_ids, a.class_id)
         if student_ids:
             await emit_data_changed(student_ids, "auditions")
 
-    return audition_to_response(a)
+    return await db.run_sync(lambda s: audition_to_response(a))
 
 
 @router.post("/{audition_id}/checklists", response_model=ChecklistResponse, status_code=status.HTTP_201_CREATED)
 async def add_checklist(
     audition_id: str,
     data: ChecklistCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    a = db.query(Audition).filter(Audition.id == audition_id).first()
+    a = await db.scalar(select(Audition).where(Audition.id == audition_id))
     if not a:
         raise HTTPException(status_code=404, detail="Audition not found")
 
@@ -189,11 +188,11 @@ async def add_checklist(
         sort_order=data.sort_order,
     )
     db.add(checklist)
-    db.commit()
-    db.refresh(checklist)
+    await db.commit()
+    await db.refresh(checklist)
 
     if a.class_id:
-        student_ids = get_class_student_ids(db, a.class_id)
+        student_ids = await db.run_sync(get_class_student_ids, a.class_id)
         if student_ids:
             await emit_data_changed(student_ids, "auditions")
 
@@ -205,13 +204,13 @@ async def update_checklist(
     audition_id: str,
     checklist_id: str,
     update_data: ChecklistUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    c = db.query(AuditionChecklist).filter(
+    c = await db.scalar(select(AuditionChecklist).where(
         AuditionChecklist.id == checklist_id,
         AuditionChecklist.audition_id == audition_id
-    ).first()
+    ))
     if not c:
         raise HTTPException(status_code=404, detail="Checklist item not found")
 
@@ -219,12 +218,12 @@ async def update_checklist(
     for field, value in update_data.model_dump(exclude_unset=True).items():
         setattr(c, field, value)
 
-    db.commit()
-    db.refresh(c)
+    await db.commit()
+    await db.refresh(c)
 
-    a = db.query(Audition).filter(Audition.id == audition_id).first()
+    a = await db.scalar(select(Audition).where(Audition.id == audition_id))
     if a and a.class_id:
-        student_ids = get_class_student_ids(db, a.class_id)
+        student_ids = await db.run_sync(get_class_student_ids, a.class_id)
         if student_ids:
             await emit_data_changed(student_ids, "auditions")
 
@@ -235,23 +234,23 @@ async def update_checklist(
 async def delete_checklist(
     audition_id: str,
     checklist_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    c = db.query(AuditionChecklist).filter(
+    c = await db.scalar(select(AuditionChecklist).where(
         AuditionChecklist.id == checklist_id,
         AuditionChecklist.audition_id == audition_id
-    ).first()
+    ))
     if not c:
         raise HTTPException(status_code=404, detail="Checklist item not found")
 
     _require_staff(current_user)
-    a = db.query(Audition).filter(Audition.id == audition_id).first()
-    db.delete(c)
-    db.commit()
+    a = await db.scalar(select(Audition).where(Audition.id == audition_id))
+    await db.delete(c)
+    await db.commit()
 
     if a and a.class_id:
-        student_ids = get_class_student_ids(db, a.class_id)
+        student_ids = await db.run_sync(get_class_student_ids, a.class_id)
         if student_ids:
             await emit_data_changed(student_ids, "auditions")
 
@@ -276,10 +275,10 @@ def generate_tips(
 @router.delete("/{audition_id}")
 async def delete_audition(
     audition_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    a = db.query(Audition).filter(Audition.id == audition_id).first()
+    a = await db.scalar(select(Audition).where(Audition.id == audition_id))
     if not a:
         raise HTTPException(status_code=404, detail="Audition not found")
 
@@ -288,10 +287,10 @@ async def delete_audition(
 
     affected_ids = []
     if a.class_id:
-        affected_ids = get_class_student_ids(db, a.class_id)
+        affected_ids = await db.run_sync(get_class_student_ids, a.class_id)
 
-    db.delete(a)
-    db.commit()
+    await db.delete(a)
+    await db.commit()
 
     if affected_ids:
         await emit_data_changed(affected_ids, "auditions")
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
 from app.models.user import User, UserRole
 from app.models.invite_code import InviteCode
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
@@ -40,13 +42,13 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Invite code is OPTIONAL — the academy shares the signup link internally.
     # If a code is provided it is still validated (backward compatible);
     # otherwise the requested role is used directly.
     invite = None
     if user_data.invite_code:
-        invite = db.query(InviteCode).filter(InviteCode.code == user_data.invite_code.upper()).first()
+        invite = await db.scalar(select(InviteCode).where(InviteCode.code == user_data.invite_code.upper()))
         if not invite:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="유효하지 않은 인증코드입니다.")
         if invite.used:
@@ -64,7 +66,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="선생님·원장 계정은 직접 가입할 수 없어요. 원장에게 문의하세요.")
 
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -83,20 +85,20 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.flush()
+    await db.flush()
 
     # Mark invite code as used (only when one was supplied)
     if invite:
         invite.used = True
         invite.used_by = new_user.id
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
-    all_ids = get_all_user_ids(db)
+    all_ids = await db.run_sync(get_all_user_ids)
     if all_ids:
         await emit_data_changed(all_ids, "users")
 
-    return new_user
+    return await db.run_sync(lambda s: UserResponse.model_validate(new_user))
 
 
 @router.post("/login", response_model=Token)
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from typing import List, Dict
+from sqlalchemy import and_, func, or_
+from typing import List, Dict, Optional
 from app.database import get_db
 from app.models.chat import ChatMessage, ChatReadStatus
 from app.models.class_info import ClassInfo
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.schemas.chat import ChatMessageCreate, ChatMessageResponse
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_principal, get_current_user
+from app.utils.pagination import keyset_cursor, parse_keyset_cursor
+from app.utils.principal_cache import Principal
 from app.services.notification_service import validate_class_access
 from datetime import datetime
 import uuid
@@ -15,6 +17,11 @@ import uuid
 router = APIRouter()
 
 
+def message_cursor(m: ChatMessage) -> str:
+    """메시지 위치 커서 (timestamp, id) — REST 응답과 WS new_message가 같은 형식."""
+    return keyset_cursor(m.timestamp, m.id)
+
+
 def chat_to_response(m: ChatMessage) -> dict:
     return {
         "id": m.id,
@@ -25,30 +32,85 @@ def chat_to_response(m: ChatMessage) -> dict:
         "avatar": m.sender.avatar or "" if m.sender else "",
         "content": m.content,
         "timestamp": m.timestamp,
+        "cursor": message_cursor(m),
     }
 
 
+def _my_class_ids(principal: Principal, class_ids: Optional[str]) -> Optional[List[str]]:
+    """요청 반 ∩ 접근 가능 반(주체 캐시 — 반마다 validate_class_access를 돌지 않는다).
+
+    class_ids 생략 = 내 반 전부. 원장은 모든 반 접근이라 생략하면 None(필터 없음)."""
+    ids = [cid.strip() for cid in class_ids.split(",") if cid.strip()] if class_ids else None
+    if principal.role == UserRole.DIRECTOR:
+        return ids
+    mine = set(principal.class_ids)
+    return list(mine) if ids is None else [cid for cid in ids if cid in mine]
+
+
+def _in_classes(query, ids: Optional[List[str]]):
+    return query if ids is None else query.filter(ChatMessage.class_id.in_(ids))
+
+
+def last_messages(db: Session, ids: Optional[List[str]]) -> Dict[str, dict]:
+    """반별 최신 메시지 — 윈도 함수 1쿼리(ix_chat_messages_class_ts로 반마다 끝에서 1건)."""
+    if ids == []:
+        return {}
+    ranked = _in_classes(db.query(
+        ChatMessage.id,
+        func.row_number().over(
+            partition_by=ChatMessage.class_id,
+            order_by=(ChatMessage.timestamp.desc(), ChatMessage.id.desc()),
+        ).label("rn"),
+    ), ids).subquery()
+    rows = (
+        db.query(ChatMessage)
+        .options(joinedload(ChatMessage.sender))
+        .join(ranked, ranked.c.id == ChatMessage.id)
+        .filter(ranked.c.rn == 1)
+        .all()
+    )
+    return {m.class_id: chat_to_response(m) for m in rows}
+
+
+def unread_counts(db: Session, user_id: str, ids: Optional[List[str]]) -> Dict[str, int]:
+    """반별 안 읽은 수(남이 보낸 것, last_read_at 이후) — chat_read_status LEFT JOIN + GROUP BY 1쿼리."""
+    if ids == []:
+        return {}
+    rows = _in_classes(
+        db.query(ChatMessage.class_id, func.count(ChatMessage.id))
+        .outerjoin(ChatReadStatus, and_(
+            ChatReadStatus.class_id == ChatMessage.class_id, ChatReadStatus.user_id == user_id,
+        ))
+        .filter(
+            ChatMessage.sender_id != user_id,
+            or_(ChatReadStatus.last_read_at.is_(None), ChatMessage.timestamp > ChatReadStatus.last_read_at),
+        ),
+        ids,
+    ).group_by(ChatMessage.class_id).all()
+    return {cid: n for cid, n in rows if n}
+
+
 @router.get("/last-messages")
 def get_last_messages(
-    class_ids: str = Query(..., description="Comma-separated class IDs"),
+    class_ids: Optional[str] = Query(None, description="Comma-separated class IDs (생략 = 내 반 전부)"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal),
 ) -> Dict[str, dict]:
-    ids = [cid.strip() for cid in class_ids.split(",") if cid.strip()]
-    result = {}
-    for class_id in ids:
-        if not validate_class_access(db, class_id, current_user):
-            continue
-        msg = (
-            db.query(ChatMessage)
-            .options(joinedload(ChatMessage.sender))
-            .filter(ChatMessage.class_id == class_id)
-            .order_by(ChatMessage.timestamp.desc())
-            .first()
-        )
-        if msg:
-            result[class_id] = chat_to_response(msg)
-    return result
+    return last_messages(db, _my_class_ids(principal, class_ids))
+
+
+@router.get("/overview")
+def get_overview(
+    class_ids: Optional[str] = Query(None, description="Comma-separated class IDs (생략 = 내 반 전부)"),
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal),
+):
+    """채팅 탭 첫 화면 — 반별 최신 메시지 + 안 읽은 수를 한 번에(쿼리 2회)."""
+    ids = _my_class_ids(principal, class_ids)
+    return {
+        "last_messages": last_messages(db, ids),
+        "unread_counts": unread_counts(db, principal.id, ids),
+    }
 
 
 @router.put("/mark-read")
@@ -75,52 +137,49 @@ def mark_read(
 
 @router.get("/unread-counts")
 def get_unread_counts(
-    class_ids: str = Query(..., description="Comma-separated class IDs"),
+    class_ids: Optional[str] = Query(None, description="Comma-separated class IDs (생략 = 내 반 전부)"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    principal: Principal = Depends(get_current_principal),
 ) -> Dict[str, int]:
-    ids = [cid.strip() for cid in class_ids.split(",") if cid.strip()]
-    result = {}
-    for class_id in ids:
-        if not validate_class_access(db, class_id, current_user):
-            continue
-        read_status = db.query(ChatReadStatus).filter(
-            ChatReadStatus.user_id == current_user.id,
-            ChatReadStatus.class_id == class_id,
-        ).first()
-        query = db.query(func.count(ChatMessage.id)).filter(
-            ChatMessage.class_id == class_id,
-            ChatMessage.sender_id != current_user.id,
-        )
-        if read_status:
-            query = query.filter(ChatMessage.timestamp > read_status.last_read_at)
-        count = query.scalar()
-        if count > 0:
-            result[class_id] = count
-    return result
+    return unread_counts(db, principal.id, _my_class_ids(principal, class_ids))
 
 
 @router.get("/messages", response_model=List[ChatMessageResponse])
 def list_messages(
     class_id: str = Query(..., description="Class ID to get messages for"),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    before: Optional[str] = Query(None, description="이 커서보다 오래된 메시지(최신순)"),
+    after: Optional[str] = Query(None, description="이 커서 이후 메시지(오래된순) — 재접속 시 빈틈 메우기"),
+    offset: Optional[int] = Query(None, ge=0, description="(구버전 클라이언트) 오래된순 offset 페이지"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    """반 채팅 이력 — (timestamp, id) keyset. 기본은 최신 limit개를 최신순으로."""
     if not validate_class_access(db, class_id, current_user):
         raise HTTPException(status_code=403, detail="Not a member of this class")
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after")
 
-    messages = (
+    query = (
         db.query(ChatMessage)
         .options(joinedload(ChatMessage.sender))
         .filter(ChatMessage.class_id == class_id)
-        .order_by(ChatMessage.timestamp.asc())
-        .offset(offset)
-        .limit(limit)
-        .all()
     )
-    return [chat_to_response(m) for m in messages]
+    if offset is not None and not (before or after):
+        query = query.order_by(ChatMessage.timestamp.asc(), ChatMessage.id.asc()).offset(offset)
+    elif after:
+        ts, mid = parse_keyset_cursor(after)
+        query = query.filter(or_(
+            ChatMessage.timestamp > ts, and_(ChatMessage.timestamp == ts, ChatMessage.id > mid),
+        )).order_by(ChatMessage.timestamp.asc(), ChatMessage.id.asc())
+    else:
+        if before:
+            ts, mid = parse_keyset_cursor(before)
+            query = query.filter(or_(
+                ChatMessage.timestamp < ts, and_(ChatMessage.timestamp == ts, ChatMessage.id < mid),
+            ))
+        query = query.order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())
+    return [chat_to_response(m) for m in query.limit(limit).all()]
 
 
 @router.post("/messages", response_model=ChatMessageResponse, status_code=status.HTTP_201_CREATED)
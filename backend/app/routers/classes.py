@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from pydantic import BaseModel
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.class_info import ClassInfo, class_students
 from app.models.lesson import Lesson, LessonStatus, LessonType, Subject
 from app.models.user import User, UserRole
@@ -106,6 +108,21 @@ def generate_lessons_for_class(cls: ClassInfo, db: Session) -> int:
 router = APIRouter()
 
 
+async def _load_class(db: AsyncSession, class_id: str) -> Optional[ClassInfo]:
+    """반 + 학생 목록을 한 번에 로드(비동기 세션에선 lazy load 불가 → selectinload)."""
+    return await db.scalar(
+        select(ClassInfo).options(selectinload(ClassInfo.students)).where(ClassInfo.id == class_id)
+    )
+
+
+def _member_ids(cls: ClassInfo, *extra: str) -> List[str]:
+    """반 구성원(학생 + 담당 강사) id — data_changed 브로드캐스트 대상."""
+    member_ids = [s.id for s in cls.students] + list(extra)
+    if cls.subject_teachers:
+        member_ids.extend([tid for tid in cls.subject_teachers.values() if tid])
+    return list(set(member_ids))
+
+
 def class_to_response(cls: ClassInfo) -> dict:
     return {
         "id": cls.id,
@@ -152,7 +169,7 @@ def get_class(class_id: str, db: Session = Depends(get_db), current_user: User =
 @router.post("/", response_model=ClassInfoResponse, status_code=status.HTTP_201_CREATED)
 async def create_class(
     data: ClassInfoCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != UserRole.DIRECTOR:
@@ -165,17 +182,17 @@ async def create_class(
         subject_teachers=data.subject_teachers,
         schedule=[s.model_dump() for s in data.schedule],
     )
+    students = []
     if data.student_ids:
-        students = db.query(User).filter(User.id.in_(data.student_ids)).all()
-        new_class.students = students
+        students = list((await db.scalars(select(User).where(User.id.in_(data.student_ids)))).all())
+    new_class.students = students
 
     db.add(new_class)
-    db.commit()
-    db.refresh(new_class)
+    await db.commit()
 
-    generated = generate_lessons_for_class(new_class, db)
+    generated = await db.run_sync(lambda s: generate_lessons_for_class(new_class, s))
     if generated:
-        db.commit()
+        await db.commit()
 
     await emit_data_changed([current_user.id], "classes")
     await emit_data_changed([current_user.id], "lessons")
@@ -198,13 +215,13 @@ async def create_class(
 async def update_class(
     class_id: str,
     update_data: ClassInfoUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != UserRole.DIRECTOR:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    cls = db.query(ClassInfo).filter(ClassInfo.id == class_id).first()
+    cls = await _load_class(db, class_id)
     if not cls:
         raise HTTPException(status_code=404, detail="Class not found")
 
@@ -218,32 +235,29 @@ async def update_class(
         setattr(cls, field, value)
 
     if student_ids is not None:
-        students = db.query(User).filter(User.id.in_(student_ids)).all()
-        cls.students = students
+        students = (await db.scalars(select(User).where(User.id.in_(student_ids)))).all()
+        cls.students = list(students)
 
-    db.commit()
-    db.refresh(cls)
+    await db.commit()
 
     # schedule이 변경된 경우 미래 예정 수업 재생성
     generated = 0
     if "schedule" in update_dict:
         today = today_kst()
-        db.query(Lesson).filter(
+        await db.execute(delete(Lesson).where(
             Lesson.class_id == class_id,
             Lesson.date >= today,
             Lesson.status == LessonStatus.SCHEDULED,
-        ).delete()
-        db.commit()
-        generated = generate_lessons_for_class(cls, db)
+        ))
+        await db.commit()
+        generated = await db.run_sync(lambda s: generate_lessons_for_class(cls, s))
         if generated:
-            db.commit()
+            await db.commit()
 
-    member_ids = [s.id for s in cls.students]
-    if cls.subject_teachers:
-        member_ids.extend([tid for tid in cls.subject_teachers.values() if tid])
+    member_ids = _member_ids(cls)
     if member_ids:
-        await emit_data_changed(list(set(member_ids)), "classes")
-        await emit_data_changed(list(set(member_ids)), "lessons")
+        await emit_data_changed(member_ids, "classes")
+        await emit_data_changed(member_ids, "lessons")
 
     resp = class_to_response(cls)
     resp["generated_lessons_count"] = generated
@@ -253,25 +267,23 @@ async def update_class(
 @router.delete("/{class_id}")
 async def delete_class(
     class_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != UserRole.DIRECTOR:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    cls = db.query(ClassInfo).filter(ClassInfo.id == class_id).first()
+    cls = await _load_class(db, class_id)
     if not cls:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    member_ids = [s.id for s in cls.students]
-    if cls.subject_teachers:
-        member_ids.extend([tid for tid in cls.subject_teachers.values() if tid])
+    member_ids = _member_ids(cls)
 
-    db.delete(cls)
-    db.commit()
+    await db.delete(cls)
+    await db.commit()
 
     if member_ids:
-        await emit_data_changed(list(set(member_ids)), "classes")
+        await emit_data_changed(member_ids, "classes")
 
     return {"message": "Class deleted"}
 
@@ -284,28 +296,24 @@ class AddStudentRequest(BaseModel):
 async def add_student(
     class_id: str,
     data: AddStudentRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != UserRole.DIRECTOR:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    cls = db.query(ClassInfo).filter(ClassInfo.id == class_id).first()
+    cls = await _load_class(db, class_id)
     if not cls:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    student = db.query(User).filter(User.id == data.student_id).first()
+    student = await db.scalar(select(User).where(User.id == data.student_id))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
     if student not in cls.students:
         cls.students.append(student)
-        db.commit()
-        db.refresh(cls)
-        member_ids = [s.id for s in cls.students]
-        if cls.subject_teachers:
-            member_ids.extend([tid for tid in cls.subject_teachers.values() if tid])
-        await emit_data_changed(list(set(member_ids)), "classes")
+        await db.commit()
+        await emit_data_changed(_member_ids(cls), "classes")
         await notify_user(
             db, data.student_id,
             f"'{cls.name}' 클래스에 등록되었습니다.",
@@ -319,25 +327,21 @@ async def add_student(
 async def remove_student(
     class_id: str,
     student_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != UserRole.DIRECTOR:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    cls = db.query(ClassInfo).filter(ClassInfo.id == class_id).first()
+    cls = await _load_class(db, class_id)
     if not cls:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    student = db.query(User).filter(User.id == student_id).first()
+    student = await db.scalar(select(User).where(User.id == student_id))
     if student and student in cls.students:
         cls.students.remove(student)
-        db.commit()
-        db.refresh(cls)
-        member_ids = [s.id for s in cls.students] + [student_id]
-        if cls.subject_teachers:
-            member_ids.extend([tid for tid in cls.subject_teachers.values() if tid])
-        await emit_data_changed(list(set(member_ids)), "classes")
+        await db.commit()
+        await emit_data_changed(_member_ids(cls, student_id), "classes")
         await notify_user(
             db, student_id,
             f"'{cls.name}' 클래스에서 제외되었습니다.",
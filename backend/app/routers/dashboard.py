@@ -1,5 +1,15 @@
-"""원장/강사 대시보드 — 예외만 보는 현황. 전부 신규 테이블 + 기존 테이블 read-only 집계."""
+"""원장/강사 대시보드 — 예외만 보는 현황. 전부 신규 테이블 + 기존 테이블 read-only 집계.
+
+반·학생별 수치는 GROUP BY 집계 몇 번으로(반/학생마다 COUNT를 돌지 않는다), 결과는 스태프 범위별로
+CACHE_TTL_SEC 동안 재사용 — 원장 화면이 학생 수에 비례해 느려지지 않게.
+"""
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import case, func, or_
 from sqlalchemy.orm import Session
 from datetime import datetime, date, timedelta
 
@@ -8,46 +18,65 @@ from app.models.user import User, UserRole
 from app.models.gamification import Streak, UserActivity
 from app.models.submission import Submission
 from app.models.lesson_journal import LessonJournal
-from app.models.class_info import ClassInfo
+from app.models.class_info import ClassInfo, class_students
 from app.utils.auth import get_current_user
 from app.services.notification_service import get_teacher_student_ids
 from app.utils.timezone import today_kst, kst_day_start_utc
 
 router = APIRouter()
 
+CACHE_TTL_SEC = 30.0
+
+_lock = threading.Lock()
+_cache: Dict[Tuple[str, str], Tuple[float, object]] = {}
+
 
 def _require_staff(u: User):
     if u.role not in (UserRole.TEACHER, UserRole.DIRECTOR):
         raise HTTPException(status_code=403, detail="강사/원장 전용")
 
 
-@router.get("/stats")
-def stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    _require_staff(current_user)
+def _cached(key: Tuple[str, str], build: Callable[[], object]):
+    """(화면, 스태프 범위)별 CACHE_TTL_SEC 캐시 — 대시보드는 초 단위 최신성이 필요 없다."""
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+    value = build()
+    with _lock:
+        _cache[key] = (now + CACHE_TTL_SEC, value)
+    return value
+
+
+def _leadtime_median_hours(db: Session, since: datetime) -> Optional[float]:
+    """최근 처리완료 제출의 리드타임 중앙값 — 두 시각 컬럼만 스트리밍(Submission 행 전체를 올리지 않음)."""
+    leads = [
+        (fb - created).total_seconds()
+        for created, fb in db.query(Submission.created_at, Submission.first_feedback_at).filter(
+            Submission.status == "done", Submission.first_feedback_at.isnot(None), Submission.first_feedback_at >= since,
+        ).yield_per(1000)
+        if created
+    ]
+    return round(statistics.median(leads) / 3600, 1) if leads else None
+
+
+def _build_stats(db: Session) -> dict:
     today = today_kst()
     now = datetime.utcnow()
     today0 = kst_day_start_utc()  # 수업일지 '오늘' = 한국 달력 오늘
 
-    students_total = db.query(User).filter(User.role == UserRole.STUDENT).count()
-    curtaincall_today = db.query(Streak).filter(Streak.last_date == today).count()
-    pending_feedback = db.query(Submission).filter(Submission.status == "open").count()
+    students_total = db.query(func.count(User.id)).filter(User.role == UserRole.STUDENT).scalar()
+    curtaincall_today = db.query(func.count(Streak.student_id)).filter(Streak.last_date == today).scalar()
+    pending_feedback = db.query(func.count(Submission.id)).filter(Submission.status == "open").scalar()
 
     # 리드타임 중앙값 (최근 14일 처리완료)
-    since = now - timedelta(days=14)
-    done = db.query(Submission).filter(
-        Submission.status == "done", Submission.first_feedback_at.isnot(None), Submission.first_feedback_at >= since,
-    ).all()
-    leads = sorted((s.first_feedback_at - s.created_at).total_seconds() for s in done if s.created_at and s.first_feedback_at)
-    if leads:
-        n = len(leads)
-        mid = leads[n // 2] if n % 2 else (leads[n // 2 - 1] + leads[n // 2]) / 2
-        leadtime_median_hours = round(mid / 3600, 1)
-    else:
-        leadtime_median_hours = None
+    leadtime_median_hours = _leadtime_median_hours(db, now - timedelta(days=14))
 
     # 수업일지 작성률(오늘)
-    journals_today = db.query(LessonJournal).filter(LessonJournal.created_at >= today0).count()
-    classes_total = db.query(ClassInfo).count()
+    journals_today = db.query(func.count(LessonJournal.id)).filter(LessonJournal.created_at >= today0).scalar()
+    classes = db.query(ClassInfo.id, ClassInfo.name).all()
+    classes_total = len(classes)
     journal_rate = round(min(journals_today, classes_total) / classes_total * 100) if classes_total else 0
 
     # 확인이 필요해요 — 슬럼프(3일+ 미접속)
@@ -57,14 +86,28 @@ def stats(db: Session = Depends(get_db), current_user: User = Depends(get_curren
     ).order_by(UserActivity.last_active_at.asc()).limit(10).all()
     attention = [{"name": u.name, "reason": f"{max(1, (now - ua.last_active_at).days)}일 미접속"} for ua, u in slump]
 
-    # 클래스별
-    classes = db.query(ClassInfo).all()
-    class_rows = []
-    for c in classes:
-        member_ids = [s.id for s in c.students] or ["__none__"]
-        opens = db.query(Submission).filter(Submission.status == "open", Submission.student_id.in_(member_ids)).count()
-        subs = db.query(Submission).filter(Submission.student_id.in_(member_ids), Submission.created_at >= now - timedelta(days=7)).count()
-        class_rows.append({"id": c.id, "name": c.name, "members": len([m for m in member_ids if m != "__none__"]), "open": opens, "submissions_week": subs})
+    # 클래스별 — class_students 기준 GROUP BY 2쿼리(인원 / 대기·주간 제출)
+    members = dict(
+        db.query(class_students.c.class_id, func.count(class_students.c.student_id))
+        .group_by(class_students.c.class_id).all()
+    )
+    week_since = now - timedelta(days=7)
+    sub_counts = {
+        cid: (opens or 0, week or 0)
+        for cid, opens, week in db.query(
+            class_students.c.class_id,
+            func.sum(case((Submission.status == "open", 1), else_=0)),
+            func.sum(case((Submission.created_at >= week_since, 1), else_=0)),
+        )
+        .join(Submission, Submission.student_id == class_students.c.student_id)
+        .filter(or_(Submission.status == "open", Submission.created_at >= week_since))
+        .group_by(class_students.c.class_id).all()
+    }
+    class_rows = [
+        {"id": cid, "name": name, "members": members.get(cid, 0),
+         "open": sub_counts.get(cid, (0, 0))[0], "submissions_week": sub_counts.get(cid, (0, 0))[1]}
+        for cid, name in classes
+    ]
 
     return {
         "students_total": students_total,
@@ -77,32 +120,44 @@ def stats(db: Session = Depends(get_db), current_user: User = Depends(get_curren
     }
 
 
-@router.get("/roster")
-def roster(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """강사=담당 학생 / 원장=전체 학생 — 스트릭·주간 제출·슬럼프."""
+@router.get("/stats")
+def stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     _require_staff(current_user)
+    # 학원 전체 현황 — 강사·원장 같은 값이라 범위 하나
+    return _cached(("stats", "*"), lambda: _build_stats(db))
+
+
+def _build_roster(db: Session, student_ids: Optional[List[str]]) -> List[dict]:
     now = datetime.utcnow()
-    if current_user.role == UserRole.DIRECTOR:
-        students = db.query(User).filter(User.role == UserRole.STUDENT).all()
-    else:
-        ids = get_teacher_student_ids(db, current_user.id) or ["__none__"]
-        students = db.query(User).filter(User.id.in_(ids)).all()
-
-    sids = [s.id for s in students] or ["__none__"]
-    streaks = {r.student_id: r for r in db.query(Streak).filter(Streak.student_id.in_(sids)).all()}
-    acts = {a.student_id: a for a in db.query(UserActivity).filter(UserActivity.student_id.in_(sids)).all()}
     week_since = now - timedelta(days=7)
-    rows = []
-    for s in students:
-        st = streaks.get(s.id)
-        act = acts.get(s.id)
-        week = db.query(Submission).filter(Submission.student_id == s.id, Submission.created_at >= week_since).count()
-        slump = bool(act and (now - act.last_active_at).days >= 3)
-        rows.append({
-            "id": s.id, "name": s.name,
-            "streak": st.current if st else 0,
-            "week_submissions": week,
-            "slump": slump,
-        })
+    q = (
+        db.query(User.id, User.name, Streak.current, UserActivity.last_active_at)
+        .outerjoin(Streak, Streak.student_id == User.id)
+        .outerjoin(UserActivity, UserActivity.student_id == User.id)
+    )
+    q = q.filter(User.role == UserRole.STUDENT) if student_ids is None else q.filter(User.id.in_(student_ids))
+    students = q.all()
+    week = dict(
+        db.query(Submission.student_id, func.count(Submission.id))
+        .filter(Submission.created_at >= week_since,
+                *([Submission.student_id.in_(student_ids)] if student_ids is not None else []))
+        .group_by(Submission.student_id).all()
+    )
+    rows = [{
+        "id": sid, "name": name,
+        "streak": streak or 0,
+        "week_submissions": week.get(sid, 0),
+        "slump": bool(last_active and (now - last_active).days >= 3),
+    } for sid, name, streak, last_active in students]
     rows.sort(key=lambda r: (-r["streak"], r["name"]))
     return rows
+
+
+@router.get("/roster")
+def roster(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """강사=담당 학생 / 원장=전체 학생 — 스트릭·주간 제출·슬럼프."""
+    _require_staff(current_user)
+    if current_user.role == UserRole.DIRECTOR:
+        return _cached(("roster", "*"), lambda: _build_roster(db, None))
+    return _cached(("roster", current_user.id),
+                   lambda: _build_roster(db, get_teacher_student_ids(db, current_user.id)))
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.diet import DietLog, WeightLog, MealType
 from app.models.user import User, UserRole
 from app.schemas.diet import DietLogCreate, DietLogUpdate, DietLogResponse, WeightLogCreate, WeightLogResponse
@@ -90,16 +92,16 @@ def analyze_diet_endpoint(
 @router.post("/", response_model=DietLogResponse, status_code=status.HTTP_201_CREATED)
 async def create_diet_log(
     data: DietLogCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    student = db.query(User).filter(User.id == data.student_id).first()
+    student = await db.scalar(select(User).where(User.id == data.student_id))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
     if current_user.role == UserRole.STUDENT and data.student_id != current_user.id:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
-    if current_user.role == UserRole.TEACHER and data.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and data.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 식단만 기록할 수 있어요")
 
     log = DietLog(
@@ -111,10 +113,9 @@ async def create_diet_log(
         image_url=data.image_url,
     )
     db.add(log)
-    db.commit()
-    db.refresh(log)
+    await db.commit()
 
-    teacher_ids = get_teacher_ids_for_student(db, data.student_id)
+    teacher_ids = await db.run_sync(get_teacher_ids_for_student, data.student_id)
     if teacher_ids:
         student_name = student.name if student else "학생"
         await notify_users(
@@ -123,7 +124,10 @@ async def create_diet_log(
             entity="diet",
         )
 
-    d = db.query(DietLog).options(joinedload(DietLog.student)).filter(DietLog.id == log.id).first()
+    d = await db.scalar(
+        select(DietLog).options(joinedload(DietLog.student))
+        .where(DietLog.id == log.id).execution_options(populate_existing=True)
+    )
     return diet_to_response(d)
 
 
@@ -131,16 +135,16 @@ async def create_diet_log(
 async def update_diet_log(
     diet_id: str,
     update_data: DietLogUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    d = db.query(DietLog).options(joinedload(DietLog.student)).filter(DietLog.id == diet_id).first()
+    d = await db.scalar(select(DietLog).options(joinedload(DietLog.student)).where(DietLog.id == diet_id))
     if not d:
         raise HTTPException(status_code=404, detail="Diet log not found")
 
     if current_user.role == UserRole.STUDENT and d.student_id != current_user.id:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
-    if current_user.role == UserRole.TEACHER and d.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and d.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 식단에만 피드백할 수 있어요")
 
     updates = update_data.model_dump(exclude_unset=True)
@@ -151,8 +155,7 @@ async def update_diet_log(
     for field, value in updates.items():
         setattr(d, field, value)
 
-    db.commit()
-    db.refresh(d)
+    await db.commit()
 
     if current_user.role in (UserRole.TEACHER, UserRole.DIRECTOR):
         # Teacher added/updated comment — notify the student
@@ -166,7 +169,7 @@ async def update_diet_log(
             await emit_data_changed([d.student_id], "diet")
     else:
         # Student updated their entry — refresh teacher views
-        teacher_ids = get_teacher_ids_for_student(db, d.student_id)
+        teacher_ids = await db.run_sync(get_teacher_ids_for_student, d.student_id)
         if teacher_ids:
             await emit_data_changed(teacher_ids, "diet")
 
@@ -176,10 +179,10 @@ async def update_diet_log(
 @router.delete("/{diet_id}")
 async def delete_diet_log(
     diet_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    d = db.query(DietLog).filter(DietLog.id == diet_id).first()
+    d = await db.scalar(select(DietLog).where(DietLog.id == diet_id))
     if not d:
         raise HTTPException(status_code=404, detail="Diet log not found")
 
@@ -189,10 +192,10 @@ async def delete_diet_log(
         raise HTTPException(status_code=403, detail="Teachers cannot delete student diet records")
 
     student_id = d.student_id
-    db.delete(d)
-    db.commit()
+    await db.delete(d)
+    await db.commit()
 
-    teacher_ids = get_teacher_ids_for_student(db, student_id)
+    teacher_ids = await db.run_sync(get_teacher_ids_for_student, student_id)
     if teacher_ids:
         await emit_data_changed(teacher_ids, "diet")
 
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.evaluation import Evaluation
 from app.models.lesson import Subject
 from app.models.user import User, UserRole
@@ -153,7 +155,7 @@ def get_evaluation(evaluation_id: str, db: Session = Depends(get_db), current_us
 @router.post("/", response_model=EvaluationResponse, status_code=status.HTTP_201_CREATED)
 async def create_evaluation(
     data: EvaluationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
@@ -161,7 +163,7 @@ async def create_evaluation(
 
     # Teacher: validate student is in their classes
     if current_user.role == UserRole.TEACHER:
-        my_student_ids = get_teacher_student_ids(db, current_user.id)
+        my_student_ids = await db.run_sync(get_teacher_student_ids, current_user.id)
         if data.student_id not in my_student_ids:
             raise HTTPException(status_code=403, detail="Cannot evaluate students outside your classes")
 
@@ -180,8 +182,8 @@ async def create_evaluation(
         comment=data.comment,
     )
     db.add(evaluation)
-    db.commit()
-    db.refresh(evaluation)
+    await db.commit()
+    await db.refresh(evaluation)
 
     await notify_user(
         db, data.student_id,
@@ -189,11 +191,10 @@ async def create_evaluation(
         entity="evaluations",
     )
 
-    e = (
-        db.query(Evaluation)
+    e = await db.scalar(
+        select(Evaluation)
         .options(joinedload(Evaluation.student), joinedload(Evaluation.evaluator), joinedload(Evaluation.class_info))
-        .filter(Evaluation.id == evaluation.id)
-        .first()
+        .where(Evaluation.id == evaluation.id)
     )
     return evaluation_to_response(e)
 
@@ -202,21 +203,20 @@ async def create_evaluation(
 async def update_evaluation(
     evaluation_id: str,
     update_data: EvaluationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    e = (
-        db.query(Evaluation)
+    e = await db.scalar(
+        select(Evaluation)
         .options(joinedload(Evaluation.student), joinedload(Evaluation.evaluator), joinedload(Evaluation.class_info))
-        .filter(Evaluation.id == evaluation_id)
-        .first()
+        .where(Evaluation.id == evaluation_id)
     )
     if not e:
         raise HTTPException(status_code=404, detail="Evaluation not found")
-    if current_user.role == UserRole.TEACHER and e.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and e.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 평가만 수정할 수 있어요.")
 
     update_dict = update_data.model_dump(exclude_unset=True)
@@ -230,8 +230,7 @@ async def update_evaluation(
     for field, value in update_dict.items():
         setattr(e, field, value)
 
-    db.commit()
-    db.refresh(e)
+    await db.commit()
 
     await notify_user(
         db, e.student_id,
@@ -239,7 +238,7 @@ async def update_evaluation(
         entity="evaluations",
     )
 
-    return evaluation_to_response(e)
+    return await db.run_sync(lambda s: evaluation_to_response(e))
 
 
 @router.post("/{evaluation_id}/ai-summary")
@@ -276,22 +275,22 @@ def generate_ai_summary(
 @router.delete("/{evaluation_id}")
 async def delete_evaluation(
     evaluation_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    e = db.query(Evaluation).filter(Evaluation.id == evaluation_id).first()
+    e = await db.scalar(select(Evaluation).where(Evaluation.id == evaluation_id))
     if not e:
         raise HTTPException(status_code=404, detail="Evaluation not found")
-    if current_user.role == UserRole.TEACHER and e.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and e.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 평가만 삭제할 수 있어요.")
 
     student_id = e.student_id
     period = e.period
-    db.delete(e)
-    db.commit()
+    await db.delete(e)
+    await db.commit()
 
     await notify_user(
         db, student_id,
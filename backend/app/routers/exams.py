@@ -1,12 +1,13 @@
 """시험 일정 / D-day — 원장 입력, 전 학생 홈 즉시 반영 + 알림."""
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from datetime import datetime, date
 from typing import Optional
 import uuid
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User, UserRole
 from app.models.exam import ExamSchedule
 from app.utils.auth import get_current_user
@@ -55,7 +56,7 @@ class CreateExam(BaseModel):
 
 
 @router.post("/create")
-async def create_exam(data: CreateExam, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_exam(data: CreateExam, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.DIRECTOR:
         raise HTTPException(status_code=403, detail="원장 전용")
     try:
@@ -64,9 +65,9 @@ async def create_exam(data: CreateExam, db: Session = Depends(get_db), current_u
         raise HTTPException(status_code=400, detail="날짜 형식은 YYYY-MM-DD 예: 2026-10-11")
     e = ExamSchedule(id=f"ex{uuid.uuid4().hex[:12]}", title=data.title.strip(), exam_date=ed, note=data.note, created_by=current_user.id)
     db.add(e)
-    db.commit()
-    db.refresh(e)
-    await notify_users(db, get_all_student_ids(db), f"새 시험 일정: {e.title} (D-{max(0, _dday(ed))})", entity="exam")
+    await db.commit()
+    await db.refresh(e)
+    await notify_users(db, await db.run_sync(get_all_student_ids), f"새 시험 일정: {e.title} (D-{max(0, _dday(ed))})", entity="exam")
     return _serialize(e)
 
 
@@ -1,11 +1,12 @@
 """교환소 — 박수 사용. 서버가 잔고 차감(spend_points). 빈 상품표는 lazy-seed."""
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel
 import uuid
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User
 from app.models.exchange import ExchangeItem, ExchangeOrder
 from app.models.gamification import Streak
@@ -48,27 +49,31 @@ class RedeemBody(BaseModel):
 
 
 @router.post("/redeem")
-async def redeem(body: RedeemBody, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    it = db.query(ExchangeItem).filter(ExchangeItem.id == body.item_id, ExchangeItem.active == True).first()  # noqa: E712
-    if not it:
-        raise HTTPException(status_code=404, detail="상품을 찾을 수 없어요")
-    # 동시 이중차감(더블탭·경합) 방지: 학생 행을 잠근 뒤 잔고를 재확인한 상태에서 차감.
-    db.query(User).filter(User.id == current_user.id).with_for_update().first()
-    ok = gamify.spend_points(db, current_user.id, it.cost, reason=f"exchange:{it.kind}", ref=it.id)
-    if not ok:
-        raise HTTPException(status_code=400, detail="박수가 부족해요")
-    db.add(ExchangeOrder(id=f"eo{uuid.uuid4().hex[:12]}", student_id=current_user.id, item_id=it.id, item_name=it.name, cost=it.cost))
-    # 프리즈는 즉시 커튼콜 프리즈 +1 (Streak 행이 없으면 생성 — 차감했는데 미지급되는 일 방지)
-    if it.kind == "freeze":
-        s = db.query(Streak).filter(Streak.student_id == current_user.id).first()
-        if s:
-            s.freezes = (s.freezes or 0) + 1
-        else:
-            db.add(Streak(student_id=current_user.id, current=0, longest=0, freezes=1))
-    db.commit()
+async def redeem(body: RedeemBody, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    def spend(s: Session) -> ExchangeItem:
+        it = s.query(ExchangeItem).filter(ExchangeItem.id == body.item_id, ExchangeItem.active == True).first()  # noqa: E712
+        if not it:
+            raise HTTPException(status_code=404, detail="상품을 찾을 수 없어요")
+        # 동시 이중차감(더블탭·경합) 방지: 학생 행을 잠근 뒤 잔고를 재확인한 상태에서 차감.
+        s.query(User).filter(User.id == current_user.id).with_for_update().first()
+        ok = gamify.spend_points(s, current_user.id, it.cost, reason=f"exchange:{it.kind}", ref=it.id)
+        if not ok:
+            raise HTTPException(status_code=400, detail="박수가 부족해요")
+        s.add(ExchangeOrder(id=f"eo{uuid.uuid4().hex[:12]}", student_id=current_user.id, item_id=it.id, item_name=it.name, cost=it.cost))
+        # 프리즈는 즉시 커튼콜 프리즈 +1 (Streak 행이 없으면 생성 — 차감했는데 미지급되는 일 방지)
+        if it.kind == "freeze":
+            st = s.query(Streak).filter(Streak.student_id == current_user.id).first()
+            if st:
+                st.freezes = (st.freezes or 0) + 1
+            else:
+                s.add(Streak(student_id=current_user.id, current=0, longest=0, freezes=1))
+        s.commit()
+        return it
+
+    it = await db.run_sync(spend)
     if it.kind != "freeze":
-        await notify_users(db, get_teacher_ids_for_student(db, current_user.id), f"{current_user.name}님이 '{it.name}'를 교환했어요", entity="exchange")
-    return {"ok": True, "balance": gamify.balance(db, current_user.id)}
+        await notify_users(db, await db.run_sync(get_teacher_ids_for_student, current_user.id), f"{current_user.name}님이 '{it.name}'를 교환했어요", entity="exchange")
+    return {"ok": True, "balance": await db.run_sync(gamify.balance, current_user.id)}
 
 
 @router.get("/orders")
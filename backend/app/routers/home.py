@@ -0,0 +1,118 @@
+"""홈 화면 집계 — GET /api/home
+
+앱 실행 시 홈이 따로 부르던 10여 개 GET(박수·루틴·미션·퀴즈·명언·이번 달 연습·배지·제시대사·D-day·
+시험·제출·공지·알림)을 한 번의 인증·반배정 게이트·DB 세션으로 묶는다. 각 섹션은 원래 엔드포인트
+핸들러를 그대로 호출하므로 응답 모양이 같다(개별 엔드포인트는 화면 단위 갱신용으로 그대로 둔다).
+
+  - 섹션 하나가 실패(권한 403 포함)해도 홈 전체를 막지 않는다: 그 섹션만 null.
+  - settings.HOME_PARALLEL: 섹션마다 자기 AsyncSession으로 동시에 구성(PostgreSQL 풀용).
+    기본은 요청 세션 하나로 순차 — SQLite는 쓰기 잠금이라 시드 커밋이 겹치면 오히려 느리다.
+  - 섹션별 소요 시간은 디버그용 Server-Timing 헤더 — settings.DEBUG이거나 ?timing=1 일 때만 싣는다
+    (브라우저 devtools·프록시 로그에서 확인).
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_async_db
+from app.models.user import User, UserRole
+from app.routers import (
+    achievements, content, exams, gamification, missions, notices, notifications, practice,
+    routines, sessions, submissions,
+)
+from app.schemas.notice import NoticeResponse
+from app.schemas.notification import NotificationResponse
+from app.schemas.practice import CurrentResponse
+from app.utils import principal_cache
+from app.utils.auth import get_current_principal
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+_Build = Callable[[Session, User], object]
+
+# (이름, 구성 함수, 학생 전용) — 이름이 응답 키이자 Server-Timing 항목
+SECTIONS: List[Tuple[str, _Build, bool]] = [
+    ("gamification", lambda db, u: gamification.my_gamification(db, u), True),
+    ("routines", lambda db, u: routines.today(db, u), True),
+    ("missions", lambda db, u: missions.today(db, u), True),
+    ("quiz", lambda db, u: content.quiz_today(db, u), True),
+    ("quote", lambda db, u: content.quote_today(db, u), False),
+    ("summary", lambda db, u: sessions.summary(db, u), True),
+    ("achievements", lambda db, u: achievements.my_badges(db, u), True),
+    ("practice", lambda db, u: CurrentResponse.model_validate(practice.get_current(db, u)).model_dump(), True),
+    ("dday", lambda db, u: exams.nearest_dday(db, u), False),
+    ("exams", lambda db, u: exams.list_exams(db, u), False),
+    ("submissions", lambda db, u: submissions.mine(db, u), True),
+    ("notices", lambda db, u: [NoticeResponse.model_validate(n).model_dump() for n in notices.list_notices(db, u)], False),
+    ("notifications", lambda db, u: [NotificationResponse.model_validate(n).model_dump()
+                                     for n in notifications.list_notifications(0, 100, db, u)], False),
+]
+
+
+def _run(name: str, build: _Build, db: Session, user: User) -> Tuple[object, float]:
+    started = time.perf_counter()
+    try:
+        value = build(db, user)
+    except HTTPException as e:
+        logger.info(f"home: section {name} skipped ({e.status_code})")
+        db.rollback()
+        value = None
+    except Exception as e:
+        logger.error(f"home: section {name} failed: {e}", exc_info=True)
+        db.rollback()
+        value = None
+    return value, (time.perf_counter() - started) * 1000
+
+
+async def _run_isolated(name: str, build: _Build, factory: async_sessionmaker, user: User) -> Tuple[object, float]:
+    """동시 모드: 섹션 전용 세션(한 세션을 동시 작업끼리 공유할 수 없다)."""
+    async with factory() as db:
+        return await db.run_sync(lambda s: _run(name, build, s, s.merge(user, load=False)))
+
+
+def _server_timing(timings: Dict[str, float], total: float) -> str:
+    parts = [f"{name};dur={ms:.1f}" for name, ms in timings.items()]
+    return ", ".join(parts + [f"total;dur={total:.1f}"])
+
+
+@router.get("")
+async def home(
+    response: Response,
+    sections: Optional[str] = None,
+    timing: bool = Query(False, description="섹션별 소요 시간을 Server-Timing 헤더로(디버그용)"),
+    db: AsyncSession = Depends(get_async_db),
+    principal: principal_cache.Principal = Depends(get_current_principal),
+):
+    """홈 화면 섹션 일괄. sections=쉼표 구분으로 일부만 요청 가능(당겨서 새로고침 등)."""
+    wanted = {s.strip() for s in sections.split(",")} if sections else None
+    plan = [(name, build) for name, build, student_only in SECTIONS
+            if (wanted is None or name in wanted)
+            and (not student_only or principal.role == UserRole.STUDENT)]
+
+    started = time.perf_counter()
+    if settings.HOME_PARALLEL:
+        # 분리된 사용자 스냅샷은 읽기 전용으로 섹션들이 공유(핸들러는 id·role 등 컬럼만 읽는다)
+        factory = async_sessionmaker(db.bind, expire_on_commit=False, autoflush=False)
+        results = await asyncio.gather(*(
+            _run_isolated(name, build, factory, principal.user) for name, build in plan
+        ))
+    else:
+        def run_all(s: Session):
+            user = principal_cache.attach(s, principal)
+            return [_run(name, build, s, user) for name, build in plan]
+        results = await db.run_sync(run_all)
+    total = (time.perf_counter() - started) * 1000
+
+    if settings.DEBUG or timing:
+        response.headers["Server-Timing"] = _server_timing(
+            {name: ms for (name, _), (_, ms) in zip(plan, results)}, total
+        )
+    return {name: value for (name, _), (value, _) in zip(plan, results)}
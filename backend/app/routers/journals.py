@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import or_, and_
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, and_, select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.lesson_journal import LessonJournal, LessonJournalComment, JournalType
 from app.models.lesson import Lesson
 from app.models.user import User, UserRole
@@ -141,10 +143,10 @@ def get_journal(journal_id: str, db: Session = Depends(get_db), current_user: Us
 @router.post("/", response_model=LessonJournalResponse, status_code=status.HTTP_201_CREATED)
 async def create_journal(
     data: LessonJournalCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    lesson = db.query(Lesson).filter(Lesson.id == data.lesson_id).first()
+    lesson = await db.scalar(select(Lesson).where(Lesson.id == data.lesson_id))
     if not lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
 
@@ -159,7 +161,7 @@ async def create_journal(
         # 반 과목담당(subject_teachers)이거나, 이 수업의 지정 담당교사(lesson.teacher_id)면 허용.
         # 수업 목록/상세(lessons.py)는 이미 teacher_id를 인정하므로 여기서도 맞춰 "수업은 보이는데 일지만 막히는" 불일치 방지.
         is_lesson_teacher = current_user.role in (UserRole.TEACHER, UserRole.DIRECTOR) and lesson.teacher_id == current_user.id
-        if not (validate_class_access(db, lesson.class_id, current_user) or is_lesson_teacher):
+        if not (await db.run_sync(validate_class_access, lesson.class_id, current_user) or is_lesson_teacher):
             raise HTTPException(status_code=403, detail="Not a member of this lesson's class")
     elif lesson.is_private:
         if current_user.role == UserRole.STUDENT and current_user.id not in (lesson.private_student_ids or []):
@@ -178,20 +180,19 @@ async def create_journal(
         media_urls=data.media_urls,
     )
     db.add(journal)
-    db.commit()
-    db.refresh(journal)
-    j = (
-        db.query(LessonJournal)
+    await db.commit()
+    await db.refresh(journal)
+    j = await db.scalar(
+        select(LessonJournal)
         .options(joinedload(LessonJournal.author), joinedload(LessonJournal.lesson), joinedload(LessonJournal.comments).joinedload(LessonJournalComment.author))
-        .filter(LessonJournal.id == journal.id)
-        .first()
+        .where(LessonJournal.id == journal.id)
     )
 
     # 알림 규칙:
     #  · 학생 일지(공개 대상=담당교사+원장) → 담당교사 전원 + 원장 전원에게 알림.
     #  · 교사 일지는 비공개(선생님·관리자만 열람) → 학생에게 알리지 않음(열람 불가한 항목 누설 방지).
     if journal.journal_type == JournalType.STUDENT:
-        staff_ids = [uid for uid in get_teacher_ids_for_student(db, current_user.id) if uid != current_user.id]
+        staff_ids = [uid for uid in await db.run_sync(get_teacher_ids_for_student, current_user.id) if uid != current_user.id]
         if staff_ids:
             await notify_users(
                 db, staff_ids,
@@ -206,14 +207,13 @@ async def create_journal(
 async def update_journal(
     journal_id: str,
     update_data: LessonJournalUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    j = (
-        db.query(LessonJournal)
+    j = await db.scalar(
+        select(LessonJournal)
         .options(joinedload(LessonJournal.author), joinedload(LessonJournal.lesson), joinedload(LessonJournal.comments).joinedload(LessonJournalComment.author))
-        .filter(LessonJournal.id == journal_id)
-        .first()
+        .where(LessonJournal.id == journal_id)
     )
     if not j:
         raise HTTPException(status_code=404, detail="Journal not found")
@@ -223,7 +223,7 @@ async def update_journal(
 
     # Teacher: only journals for lessons in their classes (or private lessons they teach)
     if current_user.role == UserRole.TEACHER and current_user.id != j.author_id and j.lesson:
-        my_class_ids = get_teacher_class_ids(db, current_user.id)
+        my_class_ids = await db.run_sync(get_teacher_class_ids, current_user.id)
         is_class = j.lesson.class_id in my_class_ids
         is_lesson_teacher = j.lesson.teacher_id == current_user.id  # 지정 담당교사(반·비공개 공통)
         if not (is_class or is_lesson_teacher):
@@ -232,25 +232,25 @@ async def update_journal(
     for field, value in update_data.model_dump(exclude_unset=True).items():
         setattr(j, field, value)
 
-    db.commit()
-    db.refresh(j)
+    await db.commit()
+    await db.refresh(j)
 
     # 실시간 갱신: 학생 일지는 담당교사+원장 전원이 다시 불러오도록. 교사(비공개) 일지는 학생 대상 아님.
     if j.journal_type == JournalType.STUDENT:
-        staff_ids = [uid for uid in get_teacher_ids_for_student(db, j.author_id) if uid != current_user.id]
+        staff_ids = [uid for uid in await db.run_sync(get_teacher_ids_for_student, j.author_id) if uid != current_user.id]
         if staff_ids:
             await emit_data_changed(staff_ids, "journals")
 
-    return journal_to_response(j)
+    return await db.run_sync(lambda s: journal_to_response(j))
 
 
 @router.post("/{journal_id}/ai-feedback")
 async def request_ai_feedback(
     journal_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    j = db.query(LessonJournal).options(joinedload(LessonJournal.lesson)).filter(LessonJournal.id == journal_id).first()
+    j = await db.scalar(select(LessonJournal).options(joinedload(LessonJournal.lesson)).where(LessonJournal.id == journal_id))
     if not j:
         raise HTTPException(status_code=404, detail="Journal not found")
 
@@ -258,13 +258,13 @@ async def request_ai_feedback(
     if current_user.role == UserRole.STUDENT and j.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
     if current_user.role == UserRole.TEACHER and j.lesson:
-        my_class_ids = get_teacher_class_ids(db, current_user.id)
+        my_class_ids = await db.run_sync(get_teacher_class_ids, current_user.id)
         if not (j.lesson.class_id in my_class_ids or (j.lesson.is_private and j.lesson.teacher_id == current_user.id)):
             raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
 
-    feedback = generate_journal_feedback(j.content, j.journal_type.value)
+    feedback = await run_in_threadpool(generate_journal_feedback, j.content, j.journal_type.value)
     j.ai_feedback = feedback
-    db.commit()
+    await db.commit()
 
     if j.author_id != current_user.id:
         await notify_user(
@@ -280,13 +280,13 @@ async def request_ai_feedback(
 async def add_journal_comment(
     journal_id: str,
     data: JournalCommentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """선생님/원장이 학생 일지에 코칭 댓글을 남김 → 작성 학생에게 알림."""
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="선생님만 댓글을 남길 수 있어요")
-    j = db.query(LessonJournal).filter(LessonJournal.id == journal_id).first()
+    j = await db.scalar(select(LessonJournal).where(LessonJournal.id == journal_id))
     if not j:
         raise HTTPException(status_code=404, detail="Journal not found")
 
@@ -297,8 +297,8 @@ async def add_journal_comment(
         content=data.content,
     )
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment)
 
     if j.author_id != current_user.id:
         await notify_user(
@@ -307,9 +307,9 @@ async def add_journal_comment(
             entity="journals",
         )
 
-    c = db.query(LessonJournalComment).options(
+    c = await db.scalar(select(LessonJournalComment).options(
         joinedload(LessonJournalComment.author)
-    ).filter(LessonJournalComment.id == comment.id).first()
+    ).where(LessonJournalComment.id == comment.id))
     return {
         "id": c.id,
         "author_id": c.author_id,
@@ -323,21 +323,21 @@ async def add_journal_comment(
 async def delete_journal_comment(
     journal_id: str,
     comment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    c = db.query(LessonJournalComment).filter(
+    c = await db.scalar(select(LessonJournalComment).where(
         LessonJournalComment.id == comment_id,
         LessonJournalComment.journal_id == journal_id,
-    ).first()
+    ))
     if not c:
         raise HTTPException(status_code=404, detail="Comment not found")
     if current_user.id != c.author_id and current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    j = db.query(LessonJournal).filter(LessonJournal.id == journal_id).first()
-    db.delete(c)
-    db.commit()
+    j = await db.scalar(select(LessonJournal).where(LessonJournal.id == journal_id))
+    await db.delete(c)
+    await db.commit()
 
     if j and j.author_id != current_user.id:
         await emit_data_changed([j.author_id], "journals")
@@ -348,10 +348,10 @@ async def delete_journal_comment(
 @router.delete("/{journal_id}")
 async def delete_journal(
     journal_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    j = db.query(LessonJournal).filter(LessonJournal.id == journal_id).first()
+    j = await db.scalar(select(LessonJournal).where(LessonJournal.id == journal_id))
     if not j:
         raise HTTPException(status_code=404, detail="Journal not found")
 
@@ -359,8 +359,8 @@ async def delete_journal(
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     author_id = j.author_id
-    db.delete(j)
-    db.commit()
+    await db.delete(j)
+    await db.commit()
 
     if author_id and author_id != current_user.id:
         await emit_data_changed([author_id], "journals")
@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date, timedelta
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.lesson import Lesson, LessonStatus, LessonType, Subject
 from app.models.class_info import ClassInfo
 from app.models.user import User, UserRole
 from app.schemas.lesson import LessonCreate, BulkLessonCreate, LessonUpdate, LessonResponse
 from app.utils.auth import get_current_user
 from app.services.notification_service import notify_users, get_class_student_ids, emit_data_changed, get_teacher_class_ids
+from app.services.entity_versions import conditional_list
 from app.models.notification import NotificationType
 import uuid
 
@@ -46,7 +49,7 @@ def lesson_to_response(l: Lesson) -> dict:
     }
 
 
-@router.get("/", response_model=List[LessonResponse])
+@router.get("/", response_model=List[LessonResponse], dependencies=[Depends(conditional_list("lessons"))])
 def list_lessons(
     class_id: Optional[str] = Query(None),
     teacher_id: Optional[str] = Query(None),
@@ -131,7 +134,7 @@ def get_lesson(lesson_id: str, db: Session = Depends(get_db), current_user: User
 @router.post("/", response_model=LessonResponse, status_code=status.HTTP_201_CREATED)
 async def create_lesson(
     data: LessonCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
@@ -139,7 +142,7 @@ async def create_lesson(
 
     # Teacher: validate class belongs to them
     if current_user.role == UserRole.TEACHER and data.class_id:
-        my_class_ids = get_teacher_class_ids(db, current_user.id)
+        my_class_ids = await db.run_sync(get_teacher_class_ids, current_user.id)
         if data.class_id not in my_class_ids:
             raise HTTPException(status_code=403, detail="Cannot create lessons for classes you don't teach")
 
@@ -159,11 +162,11 @@ async def create_lesson(
         request_id=data.request_id,
     )
     db.add(lesson)
-    db.commit()
-    db.refresh(lesson)
+    await db.commit()
+    await db.refresh(lesson)
 
     if data.class_id:
-        student_ids = get_class_student_ids(db, data.class_id)
+        student_ids = await db.run_sync(get_class_student_ids, data.class_id)
         if student_ids:
             await notify_users(
                 db, student_ids,
@@ -176,17 +179,17 @@ async def create_lesson(
     # Notify actor (teacher/director) so their own view refreshes
     await emit_data_changed([current_user.id], "lessons")
 
-    l = db.query(Lesson).options(
+    l = await db.scalar(select(Lesson).options(
         joinedload(Lesson.class_info),
         joinedload(Lesson.teacher)
-    ).filter(Lesson.id == lesson.id).first()
+    ).where(Lesson.id == lesson.id))
     return lesson_to_response(l)
 
 
 @router.post("/bulk", response_model=List[LessonResponse], status_code=status.HTTP_201_CREATED)
 async def create_bulk_lessons(
     data: BulkLessonCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
@@ -194,7 +197,7 @@ async def create_bulk_lessons(
 
     # Teacher: validate class belongs to them
     if current_user.role == UserRole.TEACHER and data.class_id:
-        my_class_ids = get_teacher_class_ids(db, current_user.id)
+        my_class_ids = await db.run_sync(get_teacher_class_ids, current_user.id)
         if data.class_id not in my_class_ids:
             raise HTTPException(status_code=403, detail="Cannot create lessons for classes you don't teach")
 
@@ -217,18 +220,18 @@ async def create_bulk_lessons(
             lessons.append(lesson)
         current += timedelta(days=1)
 
-    db.commit()
+    await db.commit()
     result = []
     for lesson in lessons:
-        db.refresh(lesson)
-        l = db.query(Lesson).options(
+        await db.refresh(lesson)
+        l = await db.scalar(select(Lesson).options(
             joinedload(Lesson.class_info),
             joinedload(Lesson.teacher)
-        ).filter(Lesson.id == lesson.id).first()
+        ).where(Lesson.id == lesson.id))
         result.append(lesson_to_response(l))
 
     if data.class_id and lessons:
-        student_ids = get_class_student_ids(db, data.class_id)
+        student_ids = await db.run_sync(get_class_student_ids, data.class_id)
         if student_ids:
             await notify_users(
                 db, student_ids,
@@ -244,30 +247,30 @@ async def create_bulk_lessons(
 async def update_lesson(
     lesson_id: str,
     update_data: LessonUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    l = db.query(Lesson).options(
+    l = await db.scalar(select(Lesson).options(
         joinedload(Lesson.class_info),
         joinedload(Lesson.teacher)
-    ).filter(Lesson.id == lesson_id).first()
+    ).where(Lesson.id == lesson_id))
     if not l:
         raise HTTPException(status_code=404, detail="Lesson not found")
     if current_user.role == UserRole.TEACHER:
-        _check_teacher_lesson_access(db, l, current_user.id)
+        await db.run_sync(_check_teacher_lesson_access, l, current_user.id)
 
     for field, value in update_data.model_dump(exclude_unset=True).items():
         setattr(l, field, value)
 
-    db.commit()
-    db.refresh(l)
+    await db.commit()
+    await db.refresh(l)
 
     affected_ids = []
     if l.class_id:
-        affected_ids = get_class_student_ids(db, l.class_id)
+        affected_ids = await db.run_sync(get_class_student_ids, l.class_id)
     elif l.private_student_ids:
         affected_ids = l.private_student_ids
     if affected_ids:
@@ -277,33 +280,33 @@ async def update_lesson(
             entity="lessons",
         )
 
-    return lesson_to_response(l)
+    return await db.run_sync(lambda s: lesson_to_response(l))
 
 
 @router.put("/{lesson_id}/cancel", response_model=LessonResponse)
 async def cancel_lesson(
     lesson_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    l = db.query(Lesson).options(
+    l = await db.scalar(select(Lesson).options(
         joinedload(Lesson.class_info),
         joinedload(Lesson.teacher)
-    ).filter(Lesson.id == lesson_id).first()
+    ).where(Lesson.id == lesson_id))
     if not l:
         raise HTTPException(status_code=404, detail="Lesson not found")
     if current_user.role == UserRole.TEACHER:
-        _check_teacher_lesson_access(db, l, current_user.id)
+        await db.run_sync(_check_teacher_lesson_access, l, current_user.id)
 
     l.status = LessonStatus.CANCELLED
-    db.commit()
-    db.refresh(l)
+    await db.commit()
+    await db.refresh(l)
 
     if l.class_id:
-        student_ids = get_class_student_ids(db, l.class_id)
+        student_ids = await db.run_sync(get_class_student_ids, l.class_id)
         if student_ids:
             await notify_users(
                 db, student_ids,
@@ -319,34 +322,34 @@ async def cancel_lesson(
             entity="lessons",
         )
 
-    return lesson_to_response(l)
+    return await db.run_sync(lambda s: lesson_to_response(l))
 
 
 @router.put("/{lesson_id}/complete", response_model=LessonResponse)
 async def complete_lesson(
     lesson_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    l = db.query(Lesson).options(
+    l = await db.scalar(select(Lesson).options(
         joinedload(Lesson.class_info),
         joinedload(Lesson.teacher)
-    ).filter(Lesson.id == lesson_id).first()
+    ).where(Lesson.id == lesson_id))
     if not l:
         raise HTTPException(status_code=404, detail="Lesson not found")
     if current_user.role == UserRole.TEACHER:
-        _check_teacher_lesson_access(db, l, current_user.id)
+        await db.run_sync(_check_teacher_lesson_access, l, current_user.id)
 
     l.status = LessonStatus.COMPLETED
-    db.commit()
-    db.refresh(l)
+    await db.commit()
+    await db.refresh(l)
 
     affected_ids = []
     if l.class_id:
-        affected_ids = get_class_student_ids(db, l.class_id)
+        affected_ids = await db.run_sync(get_class_student_ids, l.class_id)
     elif l.private_student_ids:
         affected_ids = l.private_student_ids
     if affected_ids:
@@ -356,32 +359,32 @@ async def complete_lesson(
             entity="lessons",
         )
 
-    return lesson_to_response(l)
+    return await db.run_sync(lambda s: lesson_to_response(l))
 
 
 @router.delete("/{lesson_id}")
 async def delete_lesson(
     lesson_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    l = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+    l = await db.scalar(select(Lesson).where(Lesson.id == lesson_id))
     if not l:
         raise HTTPException(status_code=404, detail="Lesson not found")
     if current_user.role == UserRole.TEACHER:
-        _check_teacher_lesson_access(db, l, current_user.id)
+        await db.run_sync(_check_teacher_lesson_access, l, current_user.id)
 
     affected_ids = []
     if l.class_id:
-        affected_ids = get_class_student_ids(db, l.class_id)
+        affected_ids = await db.run_sync(get_class_student_ids, l.class_id)
     elif l.private_student_ids:
         affected_ids = l.private_student_ids
 
-    db.delete(l)
-    db.commit()
+    await db.delete(l)
+    await db.commit()
 
     if affected_ids:
         await emit_data_changed(affected_ids, "lessons")
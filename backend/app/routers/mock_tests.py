@@ -6,13 +6,15 @@
 실제 URL 패치는 upload.py::_patch_target_file 에서 처리.
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional, List
 import uuid
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User, UserRole
 from app.models.mock_test import MockTest, MockTestEntry, MockTestVideo
 from app.models.notice import Notice
@@ -80,7 +82,7 @@ class CreateMockTest(BaseModel):
 
 
 @router.post("")
-async def create_mock_test(data: CreateMockTest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_mock_test(data: CreateMockTest, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     _require_director(current_user)
     td = None
     if data.test_date:
@@ -106,9 +108,9 @@ async def create_mock_test(data: CreateMockTest, db: Session = Depends(get_db),
         seen.add(sid)
         db.add(MockTestEntry(id=f"mte{uuid.uuid4().hex[:10]}", mock_test_id=mt.id, student_id=sid, sort_order=idx))
         idx += 1
-    db.commit()
-    db.refresh(mt)
-    return _serialize(mt, _names(db, list(seen)), with_detail=True)
+    await db.commit()
+    await db.refresh(mt)
+    return await db.run_sync(lambda s: _serialize(mt, _names(s, list(seen)), with_detail=True))
 
 
 @router.get("")
@@ -150,10 +152,12 @@ def reorder(mock_test_id: str, data: ReorderReq, db: Session = Depends(get_db),
 
 
 @router.post("/{mock_test_id}/announce")
-async def announce(mock_test_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def announce(mock_test_id: str, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """원장: 모의테스트를 공지로 발송 — 대상 학생 알림 + 공지 피드에 기록."""
     _require_director(current_user)
-    mt = db.query(MockTest).filter(MockTest.id == mock_test_id).first()
+    mt = await db.scalar(
+        select(MockTest).options(selectinload(MockTest.entries)).where(MockTest.id == mock_test_id)
+    )
     if not mt:
         raise HTTPException(status_code=404, detail="모의테스트를 찾을 수 없어요")
     student_ids = [e.student_id for e in mt.entries]
@@ -161,9 +165,9 @@ async def announce(mock_test_id: str, db: Session = Depends(get_db), current_use
         raise HTTPException(status_code=400, detail="참여 학생이 없어요")
 
     # 참여 학생들이 속한 반을 대상으로 공지 생성(공지 피드 노출)
-    class_rows = db.query(class_students.c.class_id).filter(
-        class_students.c.student_id.in_(student_ids)
-    ).distinct().all()
+    class_rows = await db.execute(
+        select(class_students.c.class_id).where(class_students.c.student_id.in_(student_ids)).distinct()
+    )
     target_class_ids = [r[0] for r in class_rows] or None
 
     when = f" ({mt.test_date.isoformat()})" if mt.test_date else ""
@@ -177,7 +181,7 @@ async def announce(mock_test_id: str, db: Session = Depends(get_db), current_use
         target_class_ids=target_class_ids,
     )
     db.add(notice)
-    db.commit()
+    await db.commit()
 
     await notify_users(db, student_ids, f"모의테스트 공지: {mt.title}", entity="mock_tests")
     await emit_data_changed(student_ids, "notices")
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.music import Track, MusicDownloadRequest, RequestStatus
 from app.models.notification import NotificationType
 from app.models.user import User, UserRole
@@ -11,6 +13,7 @@ from app.schemas.music import (
     RequestCreate, RequestRespond, RequestResponse,
 )
 from app.utils.auth import get_current_user
+from app.utils.file_response import RangedFileResponse
 from app.services.notification_service import (
     notify_user, notify_users, emit_data_changed,
     get_teacher_ids_for_student, get_teacher_student_ids,
@@ -135,14 +138,12 @@ def get_track(track_id: str, db: Session = Depends(get_db), current_user: User =
 
 
 @router.get("/tracks/{track_id}/stream")
-def stream_track(track_id: str, t: str = Query(...), request: Request = None, db: Session = Depends(get_db)):
+def stream_track(track_id: str, t: str = Query(...), db: Session = Depends(get_db)):
     """서명 토큰(t)으로 인증된 인앱 청취 스트림. HTTP Range(206) 지원.
 
     get_current_user를 쓰지 않는다 — <audio> 요소가 Authorization 헤더를 못 보내기 때문.
     대신 짧은 만료의 서명 토큰으로만 접근을 허용한다(목록 응답이 매번 새로 발급)."""
     import os
-    import mimetypes
-    from starlette.responses import Response, FileResponse as SFileResponse
 
     if not _verify_stream_token(t, track_id):
         raise HTTPException(status_code=403, detail="유효하지 않거나 만료된 링크예요")
@@ -163,32 +164,8 @@ def stream_track(track_id: str, t: str = Query(...), request: Request = None, db
     if not (music_file == base or music_file.startswith(base + os.sep)) or not os.path.isfile(music_file):
         raise HTTPException(status_code=404, detail="음원 파일을 찾을 수 없어요")
 
-    media_type = mimetypes.guess_type(music_file)[0] or "audio/mpeg"
-    common = {"Accept-Ranges": "bytes", "Cache-Control": "private, max-age=3600"}
-    range_header = request.headers.get("range") if request else None
-    if range_header and range_header.startswith("bytes="):
-        file_size = os.path.getsize(music_file)
-        try:
-            start_s, end_s = range_header[len("bytes="):].split("-", 1)
-            start = int(start_s) if start_s else 0
-            end = int(end_s) if end_s else file_size - 1
-        except ValueError:
-            start, end = 0, file_size - 1
-        start = max(0, start)
-        end = min(end, file_size - 1)
-        if start > end:
-            return Response(status_code=416, headers={**common, "Content-Range": f"bytes */{file_size}"})
-        with open(music_file, "rb") as f:
-            f.seek(start)
-            data = f.read(end - start + 1)
-        return Response(
-            content=data, status_code=206, media_type=media_type,
-            headers={**common, "Content-Range": f"bytes {start}-{end}/{file_size}", "Content-Length": str(len(data))},
-        )
-    resp = SFileResponse(music_file, media_type=media_type)
-    for k, v in common.items():
-        resp.headers[k] = v
-    return resp
+    return RangedFileResponse(music_file, default_media_type="audio/mpeg",
+                              headers={"Cache-Control": "private, max-age=3600"})
 
 
 @router.post("/tracks", response_model=TrackResponse, status_code=status.HTTP_201_CREATED)
@@ -286,13 +263,13 @@ def list_requests(
 @router.post("/requests", response_model=RequestResponse, status_code=status.HTTP_201_CREATED)
 async def create_request(
     data: RequestCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """학생이 다운로드 권한 요청 → 담당 선생님에게 알림."""
     if current_user.role != UserRole.STUDENT:
         raise HTTPException(status_code=403, detail="학생만 요청할 수 있어요")
-    track = db.query(Track).filter(Track.id == data.track_id).first()
+    track = await db.scalar(select(Track).where(Track.id == data.track_id))
     if not track:
         raise HTTPException(status_code=404, detail="Track not found")
 
@@ -304,11 +281,11 @@ async def create_request(
         status=RequestStatus.PENDING,
     )
     db.add(req)
-    db.commit()
-    db.refresh(req)
+    await db.commit()
+    await db.refresh(req)
 
     # 음원은 원장이 직접 전달하므로 원장에게만 알림
-    director_ids = [r[0] for r in db.query(User.id).filter(User.role == UserRole.DIRECTOR).all()]
+    director_ids = list((await db.scalars(select(User.id).where(User.role == UserRole.DIRECTOR))).all())
     if director_ids:
         await notify_users(
             db, director_ids,
@@ -316,10 +293,10 @@ async def create_request(
             entity="music",
         )
 
-    r = db.query(MusicDownloadRequest).options(
+    r = await db.scalar(select(MusicDownloadRequest).options(
         joinedload(MusicDownloadRequest.track),
         joinedload(MusicDownloadRequest.student),
-    ).filter(MusicDownloadRequest.id == req.id).first()
+    ).where(MusicDownloadRequest.id == req.id))
     return request_to_response(r)
 
 
@@ -327,7 +304,7 @@ async def create_request(
 async def respond_request(
     request_id: str,
     data: RequestRespond,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """원장이 요청을 승인 또는 거절 → 학생에게 알림."""
@@ -336,18 +313,17 @@ async def respond_request(
     if data.status not in [RequestStatus.APPROVED, RequestStatus.REJECTED]:
         raise HTTPException(status_code=400, detail="승인 또는 거절만 가능해요")
 
-    r = db.query(MusicDownloadRequest).options(
+    r = await db.scalar(select(MusicDownloadRequest).options(
         joinedload(MusicDownloadRequest.track),
         joinedload(MusicDownloadRequest.student),
-    ).filter(MusicDownloadRequest.id == request_id).first()
+    ).where(MusicDownloadRequest.id == request_id))
     if not r:
         raise HTTPException(status_code=404, detail="Request not found")
 
     r.status = data.status
     r.response_note = data.response_note
     r.responded_at = datetime.utcnow()
-    db.commit()
-    db.refresh(r)
+    await db.commit()
 
     if data.status == RequestStatus.APPROVED:
         msg = "음원 다운로드가 승인됐어요"
@@ -359,4 +335,4 @@ async def respond_request(
         notif_type = NotificationType.WARNING
     await notify_user(db, r.student_id, msg, notif_type, entity="music")
 
-    return request_to_response(r)
+    return await db.run_sync(lambda s: request_to_response(r))
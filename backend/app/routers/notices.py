@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
+from app.models.class_info import class_teachers
 from app.models.notice import Notice
 from app.models.user import User, UserRole
 from app.schemas.notice import NoticeCreate, NoticeUpdate, NoticeResponse
 from app.utils.auth import get_current_user
 from app.services.notification_service import notify_users, get_all_student_ids, get_class_student_ids, get_teacher_class_ids, emit_data_changed, validate_class_access
+from app.services.entity_versions import conditional_list
 import uuid
 
 router = APIRouter()
@@ -28,6 +32,25 @@ def _can_view_notice(db: Session, n: Notice, user: User) -> bool:
     return (not targets) or any(validate_class_access(db, cid, user) for cid in targets)
 
 
+def _target_student_ids(db: Session, targets: List[str]) -> List[str]:
+    """알림 대상: 대상 반들의 학생 합집합 / 대상 없으면 전체 학생."""
+    if not targets:
+        return get_all_student_ids(db)
+    ids = set()
+    for cid in targets:
+        ids.update(get_class_student_ids(db, cid))
+    return list(ids)
+
+
+def _staff_ids(db: Session, targets: List[str]) -> List[str]:
+    """공지를 볼 수 있는 교사: 대상 반 담당 교사 / 대상 없으면 전체 교사. 원장은 전체 범위("*") 태그라 제외."""
+    if not targets:
+        return [uid for (uid,) in db.query(User.id).filter(User.role == UserRole.TEACHER)]
+    return list(db.execute(
+        select(class_teachers.c.teacher_id).where(class_teachers.c.class_id.in_(targets)).distinct()
+    ).scalars())
+
+
 def _ensure_can_manage(db: Session, n: Notice, user: User) -> None:
     """수정·삭제 권한: 원장=전체 / 교사=본인 담당 반 공지만(전체 공지는 불가)."""
     if user.role == UserRole.DIRECTOR:
@@ -40,7 +63,7 @@ def _ensure_can_manage(db: Session, n: Notice, user: User) -> None:
         raise HTTPException(status_code=403, detail="담당 반 공지만 관리할 수 있어요")
 
 
-@router.get("/", response_model=List[NoticeResponse])
+@router.get("/", response_model=List[NoticeResponse], dependencies=[Depends(conditional_list("notices"))])
 def list_notices(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -76,7 +99,7 @@ def get_notice(notice_id: str, db: Session = Depends(get_db), current_user: User
 @router.post("/", response_model=NoticeResponse, status_code=status.HTTP_201_CREATED)
 async def create_notice(
     data: NoticeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
@@ -91,7 +114,7 @@ async def create_notice(
     if current_user.role == UserRole.TEACHER:
         if not targets:
             raise HTTPException(status_code=400, detail="선생님은 공지 대상 반을 지정해야 해요")
-        my_classes = set(get_teacher_class_ids(db, current_user.id))
+        my_classes = set(await db.run_sync(get_teacher_class_ids, current_user.id))
         if any(cid not in my_classes for cid in targets):
             raise HTTPException(status_code=403, detail="담당 반에만 공지할 수 있어요")
 
@@ -105,17 +128,11 @@ async def create_notice(
         target_class_ids=(targets or None),
     )
     db.add(notice)
-    db.commit()
-    db.refresh(notice)
+    await db.commit()
+    await db.refresh(notice)
 
     # 알림: 대상 반들의 학생 합집합 / 대상 없으면 전체 학생
-    if targets:
-        ids = set()
-        for cid in targets:
-            ids.update(get_class_student_ids(db, cid))
-        student_ids = list(ids)
-    else:
-        student_ids = get_all_student_ids(db)
+    student_ids = await db.run_sync(_target_student_ids, targets)
     if student_ids:
         await notify_users(
             db, student_ids,
@@ -131,48 +148,47 @@ async def create_notice(
 async def update_notice(
     notice_id: str,
     update_data: NoticeUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    notice = db.query(Notice).filter(Notice.id == notice_id).first()
+    notice = await db.scalar(select(Notice).where(Notice.id == notice_id))
     if not notice:
         raise HTTPException(status_code=404, detail="Notice not found")
 
     # 교사는 본인 담당 반 공지만 수정 가능(현재 대상 기준)
-    _ensure_can_manage(db, notice, current_user)
+    await db.run_sync(_ensure_can_manage, notice, current_user)
 
     new_fields = update_data.model_dump(exclude_unset=True)
     # 교사가 대상 반을 바꾸려 하면 새 대상도 본인 담당 반만 허용(전체 공지화 금지)
     if current_user.role == UserRole.TEACHER and "target_class_ids" in new_fields:
         new_targets = list(new_fields.get("target_class_ids") or [])
-        my_classes = set(get_teacher_class_ids(db, current_user.id))
+        my_classes = set(await db.run_sync(get_teacher_class_ids, current_user.id))
         if not new_targets or any(cid not in my_classes for cid in new_targets):
             raise HTTPException(status_code=403, detail="담당 반에만 공지할 수 있어요")
 
+    old_targets = _notice_targets(notice)
     for field, value in new_fields.items():
         setattr(notice, field, value)
 
-    db.commit()
-    db.refresh(notice)
+    await db.commit()
+    await db.refresh(notice)
 
     # 알림: 현재 대상 반들의 학생 합집합 / 대상 없으면 전체
-    targets = _notice_targets(notice)
-    if targets:
-        ids = set()
-        for cid in targets:
-            ids.update(get_class_student_ids(db, cid))
-        student_ids = list(ids)
-    else:
-        student_ids = get_all_student_ids(db)
+    student_ids = await db.run_sync(_target_student_ids, _notice_targets(notice))
     if student_ids:
         await notify_users(
             db, student_ids,
             f"공지사항이 수정되었습니다: {notice.title}",
             entity="notices",
         )
+    # 교사 목록(작성자 포함)도 갱신 — 대상이 바뀌었으면 옛 대상 반 교사까지
+    staff_ids = set(await db.run_sync(_staff_ids, old_targets))
+    staff_ids.update(await db.run_sync(_staff_ids, _notice_targets(notice)))
+    staff_ids.add(current_user.id)
+    await emit_data_changed(list(staff_ids), "notices")
 
     return notice
 
@@ -180,33 +196,28 @@ async def update_notice(
 @router.delete("/{notice_id}")
 async def delete_notice(
     notice_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    notice = db.query(Notice).filter(Notice.id == notice_id).first()
+    notice = await db.scalar(select(Notice).where(Notice.id == notice_id))
     if not notice:
         raise HTTPException(status_code=404, detail="Notice not found")
 
     # 교사는 본인 담당 반 공지만 삭제 가능
-    _ensure_can_manage(db, notice, current_user)
+    await db.run_sync(_ensure_can_manage, notice, current_user)
 
-    # 삭제 신호도 대상 반 학생에게만(생성/수정과 동일). 대상 없으면 전체. 삭제 전에 대상 캡처.
+    # 삭제 신호도 대상 반 학생 + 그 반 교사·작성자에게만(생성/수정과 동일). 대상 없으면 전체. 삭제 전에 대상 캡처.
     targets = _notice_targets(notice)
-    if targets:
-        ids = set()
-        for cid in targets:
-            ids.update(get_class_student_ids(db, cid))
-        student_ids = list(ids)
-    else:
-        student_ids = get_all_student_ids(db)
+    recipients = set(await db.run_sync(_target_student_ids, targets))
+    recipients.update(await db.run_sync(_staff_ids, targets))
+    recipients.add(current_user.id)
 
-    db.delete(notice)
-    db.commit()
+    await db.delete(notice)
+    await db.commit()
 
-    if student_ids:
-        await emit_data_changed(student_ids, "notices")
+    await emit_data_changed(list(recipients), "notices")
 
     return {"message": "Notice deleted"}
@@ -1,19 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.notification import Notification
 from app.models.user import User, UserRole
 from app.schemas.notification import NotificationCreate, NotificationResponse, NotificationUpdate
 from app.services.websocket_manager import manager
 from app.services.notification_service import get_teacher_student_ids
 from app.utils.auth import get_current_user
+from app.services.entity_versions import conditional_list
 import uuid
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[NotificationResponse])
+@router.get("/", response_model=List[NotificationResponse], dependencies=[Depends(conditional_list("notifications"))])
 def list_notifications(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
@@ -33,7 +35,7 @@ def list_notifications(
 @router.post("/", response_model=NotificationResponse, status_code=status.HTTP_201_CREATED)
 async def create_notification(
     data: NotificationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # 권한 검증: 학생은 본인에게만, 교사는 본인/담당 학생에게만, 원장은 제한 없음
@@ -42,7 +44,7 @@ async def create_notification(
     if (
         current_user.role == UserRole.TEACHER
         and data.user_id != current_user.id
-        and data.user_id not in get_teacher_student_ids(db, current_user.id)
+        and data.user_id not in await db.run_sync(get_teacher_student_ids, current_user.id)
     ):
         raise HTTPException(status_code=403, detail="담당 학생에게만 보낼 수 있어요")
 
@@ -53,8 +55,8 @@ async def create_notification(
         message=data.message,
     )
     db.add(notification)
-    db.commit()
-    db.refresh(notification)
+    await db.commit()
+    await db.refresh(notification)
 
     # Push via WebSocket if user is connected
     await manager.send_to_user(data.user_id, {
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime, date
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.plan import Plan, PlanItem, PlanType, week_start
 from app.models.user import User, UserRole
 from app.schemas.plan import PlanCreate, PlanUpdate, PlanResponse, PlanItemToggle
@@ -92,27 +94,27 @@ def list_plans(
 async def toggle_item(
     item_id: str,
     data: PlanItemToggle,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    item = db.query(PlanItem).filter(PlanItem.id == item_id).first()
+    item = await db.scalar(select(PlanItem).where(PlanItem.id == item_id))
     if not item:
         raise HTTPException(status_code=404, detail="Plan item not found")
-    plan = db.query(Plan).options(joinedload(Plan.student), joinedload(Plan.items)).filter(
+    plan = await db.scalar(select(Plan).options(joinedload(Plan.student), joinedload(Plan.items)).where(
         Plan.id == item.plan_id
-    ).first()
+    ))
     if not plan or plan.student_id != current_user.id:
         raise HTTPException(status_code=403, detail="본인 계획만 수정할 수 있어요")
 
     item.done = data.done
-    db.commit()
-    db.refresh(plan)
+    await db.commit()
+    await db.refresh(plan)
 
-    teacher_ids = get_teacher_ids_for_student(db, plan.student_id)
+    teacher_ids = await db.run_sync(get_teacher_ids_for_student, plan.student_id)
     if teacher_ids:
         await emit_data_changed(teacher_ids, "plans")
 
-    return plan_to_response(plan)
+    return await db.run_sync(lambda s: plan_to_response(plan))
 
 
 @router.get("/{plan_id}", response_model=PlanResponse)
@@ -136,10 +138,10 @@ def get_plan(
 @router.post("/", response_model=PlanResponse, status_code=status.HTTP_201_CREATED)
 async def create_plan(
     data: PlanCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    student = db.query(User).filter(User.id == data.student_id).first()
+    student = await db.scalar(select(User).where(User.id == data.student_id))
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     if current_user.role == UserRole.STUDENT and data.student_id != current_user.id:
@@ -151,11 +153,11 @@ async def create_plan(
     plan_date = week_start(data.plan_date) if data.plan_type == PlanType.WEEKLY else data.plan_date
 
     # 업서트: (학생, 타입, 날짜) 이미 있으면 그 계획을 이어서 편집
-    existing = db.query(Plan).filter(
+    existing = await db.scalar(select(Plan).where(
         Plan.student_id == data.student_id,
         Plan.plan_type == data.plan_type,
         Plan.plan_date == plan_date,
-    ).first()
+    ))
     is_new = existing is None
 
     if existing:
@@ -168,7 +170,7 @@ async def create_plan(
             plan_date=plan_date,
         )
         db.add(plan)
-        db.flush()
+        await db.flush()
 
     # 초기 항목 추가(업서트 시에도 보낸 항목을 추가)
     for idx, it in enumerate(data.items):
@@ -178,10 +180,10 @@ async def create_plan(
             content=it.content,
             sort_order=it.sort_order if it.sort_order else idx,
         ))
-    db.commit()
+    await db.commit()
 
     # 최초 작성 시에만 교사 알림(이후 편집/체크는 알림 없이 실시간 갱신만)
-    teacher_ids = get_teacher_ids_for_student(db, data.student_id)
+    teacher_ids = await db.run_sync(get_teacher_ids_for_student, data.student_id)
     if teacher_ids:
         if is_new:
             await notify_users(
@@ -192,42 +194,42 @@ async def create_plan(
         else:
             await emit_data_changed(teacher_ids, "plans")
 
-    p = db.query(Plan).options(joinedload(Plan.student), joinedload(Plan.items)).filter(
+    p = await db.scalar(select(Plan).options(joinedload(Plan.student), joinedload(Plan.items)).where(
         Plan.id == plan.id
-    ).first()
-    return plan_to_response(p)
+    ))
+    return await db.run_sync(lambda s: plan_to_response(p))
 
 
 @router.put("/{plan_id}", response_model=PlanResponse)
 async def update_plan(
     plan_id: str,
     update_data: PlanUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    p = db.query(Plan).options(joinedload(Plan.student), joinedload(Plan.items)).filter(
+    p = await db.scalar(select(Plan).options(joinedload(Plan.student), joinedload(Plan.items)).where(
         Plan.id == plan_id
-    ).first()
+    ))
     if not p:
         raise HTTPException(status_code=404, detail="Plan not found")
 
     is_student_owner = current_user.role == UserRole.STUDENT and p.student_id == current_user.id
     if current_user.role == UserRole.STUDENT and not is_student_owner:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
-    if current_user.role == UserRole.TEACHER and p.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and p.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 계획에만 피드백할 수 있어요")
 
     if current_user.role in (UserRole.TEACHER, UserRole.DIRECTOR):
         # 교사·원장: 코멘트만 수정 가능
         if update_data.teacher_comment is not None:
             p.teacher_comment = update_data.teacher_comment
-        db.commit()
-        db.refresh(p)
+        await db.commit()
+        await db.refresh(p)
         if update_data.teacher_comment:
             await notify_user(db, p.student_id, "선생님이 계획에 코멘트를 남겼어요.", entity="plans")
         else:
             await emit_data_changed([p.student_id], "plans")
-        return plan_to_response(p)
+        return await db.run_sync(lambda s: plan_to_response(p))
 
     # 학생-소유자: 체크리스트 항목 diff 갱신(done 보존)
     if update_data.items is not None:
@@ -253,25 +255,25 @@ async def update_plan(
         # 목록에서 빠진 기존 항목 삭제
         for old_id, row in existing_by_id.items():
             if old_id not in sent_ids:
-                db.delete(row)
+                await db.delete(row)
 
-    db.commit()
-    db.refresh(p)
+    await db.commit()
+    await db.refresh(p)
 
-    teacher_ids = get_teacher_ids_for_student(db, p.student_id)
+    teacher_ids = await db.run_sync(get_teacher_ids_for_student, p.student_id)
     if teacher_ids:
         await emit_data_changed(teacher_ids, "plans")
 
-    return plan_to_response(p)
+    return await db.run_sync(lambda s: plan_to_response(p))
 
 
 @router.delete("/{plan_id}")
 async def delete_plan(
     plan_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    p = db.query(Plan).filter(Plan.id == plan_id).first()
+    p = await db.scalar(select(Plan).where(Plan.id == plan_id))
     if not p:
         raise HTTPException(status_code=404, detail="Plan not found")
     if current_user.role == UserRole.STUDENT and p.student_id != current_user.id:
@@ -280,10 +282,10 @@ async def delete_plan(
         raise HTTPException(status_code=403, detail="Teachers cannot delete student plans")
 
     student_id = p.student_id
-    db.delete(p)
-    db.commit()
+    await db.delete(p)
+    await db.commit()
 
-    teacher_ids = get_teacher_ids_for_student(db, student_id)
+    teacher_ids = await db.run_sync(get_teacher_ids_for_student, student_id)
     if teacher_ids:
         await emit_data_changed(teacher_ids, "plans")
 
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from sqlalchemy import and_, case, exists, func, or_, select
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.portfolio import Portfolio, PortfolioComment, PortfolioVideo, PortfolioAttachment, PracticeJournal, PortfolioCategory
 from app.models.user import User, UserRole
 from app.schemas.portfolio import (
@@ -11,8 +13,10 @@ from app.schemas.portfolio import (
     PracticeJournalCreate, PracticeJournalUpdate, PracticeJournalResponse
 )
 from app.utils.auth import get_current_user
+from app.utils.pagination import keyset_cursor, parse_keyset_cursor
 from app.services.ai import analyze_portfolio
 from app.services.notification_service import notify_user, notify_users, emit_data_changed, get_teacher_ids_for_student, get_teacher_student_ids
+from app.services.entity_versions import conditional_list
 from datetime import datetime, timedelta
 import uuid
 import logging
@@ -108,6 +112,12 @@ def _journal_to_response(j: PracticeJournal) -> dict:
     }
 
 
+async def _load_journal(db: AsyncSession, journal_id: str) -> Optional[PracticeJournal]:
+    return await db.scalar(
+        select(PracticeJournal).options(joinedload(PracticeJournal.student)).where(PracticeJournal.id == journal_id)
+    )
+
+
 @router.get("/journals")
 def list_practice_journals(
     student_id: Optional[str] = Query(None),
@@ -134,7 +144,7 @@ def list_practice_journals(
 @router.post("/journals", response_model=PracticeJournalResponse, status_code=status.HTTP_201_CREATED)
 async def create_practice_journal(
     data: PracticeJournalCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a practice journal entry (student only)."""
@@ -146,11 +156,10 @@ async def create_practice_journal(
         attachment_url=data.attachment_url,
     )
     db.add(journal)
-    db.commit()
-    db.refresh(journal)
+    await db.commit()
 
     # 학생이 작성 → 선생님에게 알림
-    teacher_ids = get_teacher_ids_for_student(db, current_user.id)
+    teacher_ids = await db.run_sync(get_teacher_ids_for_student, current_user.id)
     if teacher_ids:
         await notify_users(
             db, teacher_ids,
@@ -158,7 +167,7 @@ async def create_practice_journal(
             entity="practice_journals",
         )
 
-    j = db.query(PracticeJournal).options(joinedload(PracticeJournal.student)).filter(PracticeJournal.id == journal.id).first()
+    j = await _load_journal(db, journal.id)
     return _journal_to_response(j)
 
 
@@ -166,40 +175,40 @@ async def create_practice_journal(
 async def update_practice_journal(
     journal_id: str,
     data: PracticeJournalUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    journal = db.query(PracticeJournal).options(joinedload(PracticeJournal.student)).filter(PracticeJournal.id == journal_id).first()
+    journal = await _load_journal(db, journal_id)
     if not journal:
         raise HTTPException(status_code=404, detail="Practice journal not found")
     if journal.student_id != current_user.id and current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
-    if current_user.role == UserRole.TEACHER and journal.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and journal.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 일지만 수정할 수 있어요.")
 
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(journal, field, value)
-    db.commit()
-    db.refresh(journal)
+    await db.commit()
+    await db.refresh(journal, ["updated_at"])
     return _journal_to_response(journal)
 
 
 @router.delete("/journals/{journal_id}")
 async def delete_practice_journal(
     journal_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    journal = db.query(PracticeJournal).filter(PracticeJournal.id == journal_id).first()
+    journal = await db.scalar(select(PracticeJournal).where(PracticeJournal.id == journal_id))
     if not journal:
         raise HTTPException(status_code=404, detail="Practice journal not found")
     if journal.student_id != current_user.id and current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
-    if current_user.role == UserRole.TEACHER and journal.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and journal.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 일지만 삭제할 수 있어요.")
 
-    db.delete(journal)
-    db.commit()
+    await db.delete(journal)
+    await db.commit()
     return {"message": "Practice journal deleted"}
 
 
@@ -277,79 +286,136 @@ def list_portfolios(
     return [portfolio_to_response(p) for p in portfolios]
 
 
-@router.get("/feed")
+def _feed_cards(base_filter):
+    """피드 카드 집계 서브쿼리 — 포트폴리오 1행 = 카드 멤버 1행, (student_id, practice_group)/단건으로 GROUP BY.
+
+    카드 값은 Python 루프와 같은 규칙:
+      - count: 그룹=멤버 수 / 단건=1+자식 영상 수
+      - pending: 재생 가능(video_url 또는 자식 영상)인데 코멘트 0개인 멤버 수
+      - cover: 최신 멤버부터 첫 썸네일(커버 → 정렬순 첫 자식 영상 썸네일)
+      - any_ready: 멤버 중 재생 가능 1건 이상(아니면 최신 멤버 나이로 uploading/failed)
+    """
+    pg = func.trim(func.coalesce(Portfolio.practice_group, ""))
+    is_group = pg != ""
+    has_video = exists().where(PortfolioVideo.portfolio_id == Portfolio.id)
+    ready = case((or_(func.trim(func.coalesce(Portfolio.video_url, "")) != "", has_video), 1), else_=0)
+    commented = exists().where(PortfolioComment.portfolio_id == Portfolio.id)
+    n_videos = (
+        select(func.count(PortfolioVideo.id)).where(PortfolioVideo.portfolio_id == Portfolio.id)
+        .correlate(Portfolio).scalar_subquery()
+    )
+    video_thumb = (
+        select(PortfolioVideo.thumbnail_url)
+        .where(PortfolioVideo.portfolio_id == Portfolio.id, func.coalesce(PortfolioVideo.thumbnail_url, "") != "")
+        .order_by(PortfolioVideo.sort_order).limit(1)
+        .correlate(Portfolio).scalar_subquery()
+    )
+    cover = func.coalesce(func.nullif(Portfolio.thumbnail_url, ""), video_thumb)
+    key = case((is_group, Portfolio.student_id + "::" + pg), else_=Portfolio.id)
+
+    members = base_filter(select(
+        key.label("key"),
+        case((is_group, 1), else_=0).label("is_group"),
+        case((is_group, pg), else_=Portfolio.title).label("title"),
+        Portfolio.id, Portfolio.student_id, Portfolio.created_at,
+        ready.label("ready"),
+        case((and_(ready == 1, ~commented), 1), else_=0).label("needs"),
+        case((is_group, 0), else_=n_videos).label("extra"),
+        cover.label("cover"),
+    )).subquery()
+    first_cover = func.first_value(members.c.cover).over(
+        partition_by=members.c.key,
+        order_by=(case((members.c.cover.is_(None), 1), else_=0), members.c.created_at.desc()),
+    )
+    ranked = select(members, first_cover.label("card_cover")).subquery()
+    return select(
+        ranked.c.key,
+        func.max(ranked.c.is_group).label("is_group"),
+        func.max(ranked.c.title).label("title"),
+        func.max(ranked.c.id).label("portfolio_id"),
+        func.max(ranked.c.student_id).label("student_id"),
+        func.max(ranked.c.created_at).label("latest_date"),
+        (func.count() + func.sum(ranked.c.extra)).label("count"),
+        func.sum(ranked.c.needs).label("pending_feedback"),
+        func.max(ranked.c.ready).label("any_ready"),
+        func.max(ranked.c.card_cover).label("cover_thumbnail"),
+    ).group_by(ranked.c.key).subquery()
+
+
+@router.get("/feed", dependencies=[Depends(conditional_list("portfolios"))])
 def portfolio_feed(
     student_id: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     search: Optional[str] = Query(None, description="제목/설명 부분일치"),
+    cursor: Optional[str] = Query(None, description="직전 페이지 마지막 카드의 cursor"),
     skip: int = Query(0, ge=0),
     limit: int = Query(24, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """영상 탭 피드 — individual 모드(같은 practice_group)는 (student_id, practice_group)로 묶은
-    group 카드, single 모드·단일은 single 카드. 카드 단위로 페이지네이션.
-    그룹핑 정확성 위해 스코프 전건 로드 후 집계·슬라이스(/practice-groups와 동일 방식, 규모상 허용)."""
-    query = db.query(Portfolio).options(
-        joinedload(Portfolio.student),
-        joinedload(Portfolio.comments).joinedload(PortfolioComment.author),
-        joinedload(Portfolio.videos),
-        joinedload(Portfolio.attachments),
-    )
-    if current_user.role == UserRole.TEACHER:
-        my_student_ids = get_teacher_student_ids(db, current_user.id)
-        query = query.filter(Portfolio.student_id.in_(my_student_ids))
-    elif current_user.role == UserRole.STUDENT:
-        query = query.filter(Portfolio.student_id == current_user.id)
-    if student_id:
-        query = query.filter(Portfolio.student_id == student_id)
+    group 카드, single 모드·단일은 single 카드. 최신 영상순, 카드 단위 페이지네이션.
+    카드 집계는 SQL(GROUP BY + 윈도 함수)에서, 전체 포트폴리오 응답은 이 페이지의 single 카드만 로드.
+    다음 페이지는 cursor=마지막 카드의 cursor(keyset). skip은 구버전 클라이언트용."""
     if category:
         try:
-            query = query.filter(Portfolio.category == PortfolioCategory(category))
+            category_value = PortfolioCategory(category)
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid category: {category}")
-    if search:
-        like = f"%{search.strip()}%"
-        query = query.filter(or_(Portfolio.title.ilike(like), Portfolio.description.ilike(like)))
-
-    rows = query.order_by(Portfolio.created_at.desc()).all()
-
-    cards = []
-    index = {}  # group key -> card
-    for p in rows:
-        pg = (p.practice_group or "").strip()
-        st = _upload_status(p)
-        # 피드백 필요: 재생가능(ready)인데 코멘트 0개
-        needs = 1 if (st == "ready" and len(p.comments or []) == 0) else 0
-        if pg:
-            key = f"{p.student_id}::{pg}"
-            card = index.get(key)
-            if card is None:
-                card = {
-                    "key": key, "kind": "group", "title": pg,
-                    "student_id": p.student_id, "student_name": p.student.name if p.student else "",
-                    "count": 1, "pending_feedback": needs, "cover_thumbnail": _cover_thumb(p),
-                    "latest_date": p.created_at, "upload_status": st, "portfolio": None,
-                }
-                index[key] = card
-                cards.append(card)
-            else:
-                card["count"] += 1
-                card["pending_feedback"] += needs
-                if card["upload_status"] != "ready" and st == "ready":
-                    card["upload_status"] = "ready"
-                if not card["cover_thumbnail"]:
-                    card["cover_thumbnail"] = _cover_thumb(p)
+    my_student_ids = get_teacher_student_ids(db, current_user.id) if current_user.role == UserRole.TEACHER else None
+
+    def scope(stmt):
+        if my_student_ids is not None:
+            stmt = stmt.where(Portfolio.student_id.in_(my_student_ids))
+        elif current_user.role == UserRole.STUDENT:
+            stmt = stmt.where(Portfolio.student_id == current_user.id)
+        if student_id:
+            stmt = stmt.where(Portfolio.student_id == student_id)
+        if category:
+            stmt = stmt.where(Portfolio.category == category_value)
+        if search:
+            like = f"%{search.strip()}%"
+            stmt = stmt.where(or_(Portfolio.title.ilike(like), Portfolio.description.ilike(like)))
+        return stmt
+
+    cards = _feed_cards(scope)
+    stmt = select(cards)
+    if cursor:
+        ts, key = parse_keyset_cursor(cursor)
+        stmt = stmt.where(or_(cards.c.latest_date < ts, and_(cards.c.latest_date == ts, cards.c.key < key)))
+    stmt = stmt.order_by(cards.c.latest_date.desc(), cards.c.key.desc()).limit(limit)
+    if skip and not cursor:
+        stmt = stmt.offset(skip)
+    rows = db.execute(stmt).all()
+
+    # 이 페이지 카드만: 학생 이름 1쿼리 + single 카드 전체 응답 1쿼리
+    names = dict(db.query(User.id, User.name).filter(User.id.in_({r.student_id for r in rows})).all()) if rows else {}
+    single_ids = [r.portfolio_id for r in rows if not r.is_group]
+    singles = {}
+    if single_ids:
+        singles = {p.id: portfolio_to_response(p) for p in db.query(Portfolio).options(
+            joinedload(Portfolio.student),
+            joinedload(Portfolio.comments).joinedload(PortfolioComment.author),
+            joinedload(Portfolio.videos),
+            joinedload(Portfolio.attachments),
+        ).filter(Portfolio.id.in_(single_ids)).all()}
+
+    now = datetime.utcnow()
+    out = []
+    for r in rows:
+        if r.any_ready:
+            st = "ready"
         else:
-            rep = portfolio_to_response(p)
-            cards.append({
-                "key": p.id, "kind": "single", "title": p.title,
-                "student_id": p.student_id, "student_name": p.student.name if p.student else "",
-                "count": 1 + len(rep.get("videos", [])), "pending_feedback": needs,
-                "cover_thumbnail": _cover_thumb(p),
-                "latest_date": p.created_at, "upload_status": st, "portfolio": rep,
-            })
-    return cards[skip: skip + limit]
+            st = "uploading" if now - r.latest_date < UPLOAD_TIMEOUT else "failed"
+        out.append({
+            "key": r.key, "kind": "group" if r.is_group else "single", "title": r.title,
+            "student_id": r.student_id, "student_name": names.get(r.student_id, ""),
+            "count": r.count, "pending_feedback": r.pending_feedback or 0,
+            "cover_thumbnail": r.cover_thumbnail, "latest_date": r.latest_date,
+            "upload_status": st, "portfolio": None if r.is_group else singles.get(r.portfolio_id),
+            "cursor": keyset_cursor(r.latest_date, r.key),
+        })
+    return out
 
 
 @router.get("/{portfolio_id}", response_model=PortfolioResponse)
@@ -379,7 +445,7 @@ def get_portfolio(portfolio_id: str, db: Session = Depends(get_db), current_user
 @router.post("/", response_model=PortfolioResponse, status_code=status.HTTP_201_CREATED)
 async def create_portfolio(
     data: PortfolioCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Log upload metadata
@@ -401,21 +467,20 @@ async def create_portfolio(
         video_duration=data.video_duration,
     )
     db.add(portfolio)
-    db.commit()
-    db.refresh(portfolio)
-    p = (
-        db.query(Portfolio)
+    await db.commit()
+    await db.refresh(portfolio)
+    p = await db.scalar(
+        select(Portfolio)
         .options(
             joinedload(Portfolio.student),
             joinedload(Portfolio.comments).joinedload(PortfolioComment.author),
         )
-        .filter(Portfolio.id == portfolio.id)
-        .first()
+        .where(Portfolio.id == portfolio.id)
     )
 
     # 영상이 이미 있을 때만 즉시 교사 알림. 백그라운드 업로드(create-first, video_url='')는
     # 실제 영상이 도착한 뒤 upload._emit_target_patched에서 알림한다.
-    teacher_ids = get_teacher_ids_for_student(db, current_user.id)
+    teacher_ids = await db.run_sync(get_teacher_ids_for_student, current_user.id)
     if teacher_ids and (data.video_url or '').strip():
         await notify_users(
             db, teacher_ids,
@@ -426,24 +491,23 @@ async def create_portfolio(
         # 영상 없는 빈 레코드 생성 — 교사 화면 목록만 갱신(알림은 영상 도착 후)
         await emit_data_changed(teacher_ids, "portfolios")
 
-    return portfolio_to_response(p)
+    return await db.run_sync(lambda s: portfolio_to_response(p))
 
 
 @router.put("/{portfolio_id}", response_model=PortfolioResponse)
 async def update_portfolio(
     portfolio_id: str,
     update_data: PortfolioUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    p = (
-        db.query(Portfolio)
+    p = await db.scalar(
+        select(Portfolio)
         .options(
             joinedload(Portfolio.student),
             joinedload(Portfolio.comments).joinedload(PortfolioComment.author),
         )
-        .filter(Portfolio.id == portfolio_id)
-        .first()
+        .where(Portfolio.id == portfolio_id)
     )
     if not p:
         raise HTTPException(status_code=404, detail="Portfolio not found")
@@ -451,44 +515,44 @@ async def update_portfolio(
     if current_user.id != p.student_id and current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     if current_user.role == UserRole.TEACHER and current_user.id != p.student_id:
-        if p.student_id not in get_teacher_student_ids(db, current_user.id):
+        if p.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
             raise HTTPException(status_code=403, detail="담당 학생의 영상만 수정할 수 있어요")
 
     for field, value in update_data.model_dump(exclude_unset=True).items():
         setattr(p, field, value)
 
-    db.commit()
-    db.refresh(p)
+    await db.commit()
+    await db.refresh(p)
 
     if current_user.id == p.student_id:
-        teacher_ids = get_teacher_ids_for_student(db, p.student_id)
+        teacher_ids = await db.run_sync(get_teacher_ids_for_student, p.student_id)
         if teacher_ids:
             await emit_data_changed(teacher_ids, "portfolios")
     else:
         await emit_data_changed([p.student_id], "portfolios")
 
-    return portfolio_to_response(p)
+    return await db.run_sync(lambda s: portfolio_to_response(p))
 
 
 @router.post("/{portfolio_id}/ai-feedback")
 async def request_ai_feedback(
     portfolio_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    p = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+    p = await db.scalar(select(Portfolio).where(Portfolio.id == portfolio_id))
     if not p:
         raise HTTPException(status_code=404, detail="Portfolio not found")
 
     # Students can only request AI feedback on their own portfolios
     if current_user.role == UserRole.STUDENT and p.student_id != current_user.id:
         raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
-    if current_user.role == UserRole.TEACHER and p.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and p.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="접근 권한이 없습니다.")
 
-    feedback = analyze_portfolio(p.title, p.description, p.category.value)
+    feedback = await run_in_threadpool(analyze_portfolio, p.title, p.description, p.category.value)
     p.ai_feedback = feedback
-    db.commit()
+    await db.commit()
 
     if p.student_id != current_user.id:
         await notify_user(
@@ -504,10 +568,10 @@ async def request_ai_feedback(
 async def add_comment(
     portfolio_id: str,
     data: PortfolioCommentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    p = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+    p = await db.scalar(select(Portfolio).where(Portfolio.id == portfolio_id))
     if not p:
         raise HTTPException(status_code=404, detail="Portfolio not found")
 
@@ -515,7 +579,7 @@ async def add_comment(
     if current_user.role == UserRole.STUDENT:
         raise HTTPException(status_code=403, detail="선생님만 영상 피드백을 남길 수 있어요")
     if current_user.role == UserRole.TEACHER:
-        my_student_ids = get_teacher_student_ids(db, current_user.id)
+        my_student_ids = await db.run_sync(get_teacher_student_ids, current_user.id)
         if p.student_id not in my_student_ids:
             raise HTTPException(status_code=403, detail="담당 학생의 영상에만 피드백할 수 있어요")
 
@@ -527,8 +591,8 @@ async def add_comment(
         content=data.content,
     )
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment)
 
     if p.student_id != current_user.id:
         await notify_user(
@@ -537,7 +601,7 @@ async def add_comment(
             entity="portfolios",
         )
 
-    c = db.query(PortfolioComment).options(joinedload(PortfolioComment.author)).filter(PortfolioComment.id == comment.id).first()
+    c = await db.scalar(select(PortfolioComment).options(joinedload(PortfolioComment.author)).where(PortfolioComment.id == comment.id))
     return {
         "id": c.id,
         "author_id": c.author_id,
@@ -552,22 +616,22 @@ async def add_comment(
 async def delete_comment(
     portfolio_id: str,
     comment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    c = db.query(PortfolioComment).filter(
+    c = await db.scalar(select(PortfolioComment).where(
         PortfolioComment.id == comment_id,
         PortfolioComment.portfolio_id == portfolio_id
-    ).first()
+    ))
     if not c:
         raise HTTPException(status_code=404, detail="Comment not found")
 
     if current_user.id != c.author_id and current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    p = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
-    db.delete(c)
-    db.commit()
+    p = await db.scalar(select(Portfolio).where(Portfolio.id == portfolio_id))
+    await db.delete(c)
+    await db.commit()
 
     if p:
         await emit_data_changed([p.student_id], "portfolios")
@@ -578,22 +642,22 @@ async def delete_comment(
 @router.delete("/{portfolio_id}")
 async def delete_portfolio(
     portfolio_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    p = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+    p = await db.scalar(select(Portfolio).where(Portfolio.id == portfolio_id))
     if not p:
         raise HTTPException(status_code=404, detail="Portfolio not found")
 
     if current_user.id != p.student_id and current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     if current_user.role == UserRole.TEACHER and current_user.id != p.student_id:
-        if p.student_id not in get_teacher_student_ids(db, current_user.id):
+        if p.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
             raise HTTPException(status_code=403, detail="담당 학생의 영상만 삭제할 수 있어요")
 
     student_id = p.student_id
-    db.delete(p)
-    db.commit()
+    await db.delete(p)
+    await db.commit()
 
     await emit_data_changed([student_id], "portfolios")
 
@@ -610,26 +674,26 @@ from app.services.file_upload import extract_thumbnail, UPLOAD_DIR
 async def add_portfolio_video(
     portfolio_id: str,
     video_url: str = Query(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Add a video to an existing portfolio."""
-    p = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+    p = await db.scalar(select(Portfolio).where(Portfolio.id == portfolio_id))
     if not p:
         raise HTTPException(status_code=404, detail="Portfolio not found")
     if p.student_id != current_user.id and current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     # Determine sort order
-    max_order = db.query(PortfolioVideo).filter(
+    max_order = await db.scalar(select(func.count()).select_from(PortfolioVideo).where(
         PortfolioVideo.portfolio_id == portfolio_id
-    ).count()
+    ))
 
-    # Extract thumbnail
+    # Extract thumbnail (ffmpeg — 이벤트 루프 밖에서)
     thumbnail_url = None
     if video_url.startswith("/uploads/"):
         file_path = str(UPLOAD_DIR / video_url.removeprefix("/uploads/"))
-        thumbnail_url = extract_thumbnail(file_path)
+        thumbnail_url = await run_in_threadpool(extract_thumbnail, file_path)
 
     video = PortfolioVideo(
         id=f"pv{uuid.uuid4().hex[:8]}",
@@ -639,8 +703,8 @@ async def add_portfolio_video(
         sort_order=max_order,
     )
     db.add(video)
-    db.commit()
-    db.refresh(video)
+    await db.commit()
+    await db.refresh(video)
 
     return {
         "id": video.id,
@@ -656,24 +720,24 @@ async def add_portfolio_video(
 async def delete_portfolio_video(
     portfolio_id: str,
     video_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    p = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+    p = await db.scalar(select(Portfolio).where(Portfolio.id == portfolio_id))
     if not p:
         raise HTTPException(status_code=404, detail="Portfolio not found")
     if p.student_id != current_user.id and current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    video = db.query(PortfolioVideo).filter(
+    video = await db.scalar(select(PortfolioVideo).where(
         PortfolioVideo.id == video_id,
         PortfolioVideo.portfolio_id == portfolio_id
-    ).first()
+    ))
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    db.delete(video)
-    db.commit()
+    await db.delete(video)
+    await db.commit()
 
     await emit_data_changed([p.student_id], "portfolios")
     return {"message": "Video deleted"}
@@ -687,11 +751,11 @@ async def add_portfolio_attachment(
     file_url: str = Query(...),
     file_name: str = Query(...),
     file_size: int = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Add a file attachment to an existing portfolio."""
-    p = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+    p = await db.scalar(select(Portfolio).where(Portfolio.id == portfolio_id))
     if not p:
         raise HTTPException(status_code=404, detail="Portfolio not found")
     if p.student_id != current_user.id and current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
@@ -705,7 +769,7 @@ async def add_portfolio_attachment(
         file_size=file_size,
     )
     db.add(attachment)
-    db.commit()
+    await db.commit()
 
     logger.warning(f"Attachment added to {portfolio_id} by {current_user.name}({current_user.id}): {file_name}")
     return {
@@ -721,25 +785,25 @@ async def add_portfolio_attachment(
 async def delete_portfolio_attachment(
     portfolio_id: str,
     attachment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a file attachment from a portfolio."""
-    p = db.query(Portfolio).filter(Portfolio.id == portfolio_id).first()
+    p = await db.scalar(select(Portfolio).where(Portfolio.id == portfolio_id))
     if not p:
         raise HTTPException(status_code=404, detail="Portfolio not found")
     if p.student_id != current_user.id and current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    att = db.query(PortfolioAttachment).filter(
+    att = await db.scalar(select(PortfolioAttachment).where(
         PortfolioAttachment.id == attachment_id,
         PortfolioAttachment.portfolio_id == portfolio_id
-    ).first()
+    ))
     if not att:
         raise HTTPException(status_code=404, detail="Attachment not found")
 
-    db.delete(att)
-    db.commit()
+    await db.delete(att)
+    await db.commit()
 
     await emit_data_changed([p.student_id], "portfolios")
     return {"message": "Attachment deleted"}
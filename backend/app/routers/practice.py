@@ -7,12 +7,13 @@
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func
 from datetime import datetime, timedelta
 import re
 import uuid
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.practice import PracticeScript, PracticeDraw, PracticeRequest
 from app.models.portfolio import Portfolio
 from app.models.user import User, UserRole
@@ -192,31 +193,37 @@ def draw(db: Session = Depends(get_db), current_user: User = Depends(get_current
 
 
 @router.post("/request-more")
-async def request_more(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def request_more(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """제시대사를 모두 소진한 학생이 새 대사를 요청 → 원장(DIRECTOR)에게 알림.
 
     12시간 내 같은 요청은 중복 알림하지 않는다(스팸 방지).
     """
     _require_student(current_user)
-    # 서버측 소진 검증 — 프론트 가드만으론 API 직접 호출을 못 막는다(GET /current의 exhausted와 동일 규칙).
-    total, seen = _counts(db, current_user.id)
-    if not (total > 0 and seen >= total):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="제시대사를 모두 연습한 뒤에 요청할 수 있어요.")
-    # 12시간 중복방지는 '학생 ID' 기준 — 이름은 학생이 바꿀 수 있어 우회 가능하므로 쓰지 않는다.
-    # check-then-notify가 원자적이지 않으면 동시 요청이 12h 가드를 통과해 원장 전원에게 중복 알림이 감.
-    # 학생 User 행에 row-level lock을 걸어 동시 요청을 직렬화한다(트랜잭션 커밋까지 유지).
-    db.query(User).filter(User.id == current_user.id).with_for_update().first()
-    recent = datetime.utcnow() - REQUEST_DEDUP
-    already = (
-        db.query(PracticeRequest.id)
-        .filter(PracticeRequest.student_id == current_user.id, PracticeRequest.created_at >= recent)
-        .first()
-        is not None
-    )
+
+    def record(s: Session):
+        # 서버측 소진 검증 — 프론트 가드만으론 API 직접 호출을 못 막는다(GET /current의 exhausted와 동일 규칙).
+        total, seen = _counts(s, current_user.id)
+        if not (total > 0 and seen >= total):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="제시대사를 모두 연습한 뒤에 요청할 수 있어요.")
+        # 12시간 중복방지는 '학생 ID' 기준 — 이름은 학생이 바꿀 수 있어 우회 가능하므로 쓰지 않는다.
+        # check-then-notify가 원자적이지 않으면 동시 요청이 12h 가드를 통과해 원장 전원에게 중복 알림이 감.
+        # 학생 User 행에 row-level lock을 걸어 동시 요청을 직렬화한다(트랜잭션 커밋까지 유지).
+        s.query(User).filter(User.id == current_user.id).with_for_update().first()
+        recent = datetime.utcnow() - REQUEST_DEDUP
+        already = (
+            s.query(PracticeRequest.id)
+            .filter(PracticeRequest.student_id == current_user.id, PracticeRequest.created_at >= recent)
+            .first()
+            is not None
+        )
+        if already:
+            return True, []
+        s.add(PracticeRequest(id=f"preq{uuid.uuid4().hex[:7]}", student_id=current_user.id))
+        s.commit()
+        return False, [u.id for u in s.query(User).filter(User.role == UserRole.DIRECTOR).all()]
+
+    already, directors = await db.run_sync(record)
     if not already:
-        db.add(PracticeRequest(id=f"preq{uuid.uuid4().hex[:7]}", student_id=current_user.id))
-        db.commit()
-        directors = [u.id for u in db.query(User).filter(User.role == UserRole.DIRECTOR).all()]
         if directors:
             msg = f"{current_user.name}님이 제시대사를 모두 연습했어요. 새 제시대사를 요청했어요."
             await notify_users(db, directors, msg, entity="practice")
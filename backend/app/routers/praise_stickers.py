@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.utils.auth import get_current_user
 from app.models.user import User, UserRole
 from app.models.praise_sticker import PraiseSticker
@@ -52,7 +54,7 @@ def list_stickers(
 @router.post("/", response_model=PraiseStickerResponse)
 async def create_sticker(
     data: PraiseStickerCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """Send a praise sticker to a student. Staff only."""
@@ -60,7 +62,7 @@ async def create_sticker(
         raise HTTPException(status_code=403, detail="학생은 스티커를 보낼 수 없습니다.")
 
     # Validate recipient is a student
-    recipient = db.query(User).filter(User.id == data.recipient_id).first()
+    recipient = await db.scalar(select(User).where(User.id == data.recipient_id))
     if not recipient:
         raise HTTPException(status_code=404, detail="학생을 찾을 수 없습니다.")
     if recipient.role != UserRole.STUDENT:
@@ -74,8 +76,8 @@ async def create_sticker(
         message=data.message,
     )
     db.add(sticker)
-    db.commit()
-    db.refresh(sticker)
+    await db.commit()
+    await db.refresh(sticker)
 
     # Notify the student
     await notify_user(
@@ -86,7 +88,7 @@ async def create_sticker(
         entity="praise_stickers",
     )
 
-    return _to_response(sticker)
+    return await db.run_sync(lambda s: _to_response(sticker))
 
 
 @router.delete("/{sticker_id}")
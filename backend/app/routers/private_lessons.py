@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.private_lesson import PrivateLessonRequest, RequestStatus
 from app.models.lesson import Lesson, LessonStatus, LessonType
 from app.models.user import User, UserRole
@@ -70,7 +72,7 @@ def list_requests(
 @router.post("/", response_model=PrivateLessonRequestResponse, status_code=status.HTTP_201_CREATED)
 async def create_request(
     data: PrivateLessonRequestCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     req = PrivateLessonRequest(
@@ -84,8 +86,8 @@ async def create_request(
         reason=data.reason,
     )
     db.add(req)
-    db.commit()
-    db.refresh(req)
+    await db.commit()
+    await db.refresh(req)
 
     await notify_user(
         db, data.teacher_id,
@@ -93,20 +95,20 @@ async def create_request(
         entity="private_lessons",
     )
 
-    return request_to_response(req)
+    return await db.run_sync(lambda s: request_to_response(req))
 
 
 @router.put("/{request_id}/respond", response_model=PrivateLessonRequestResponse)
 async def respond_to_request(
     request_id: str,
     data: PrivateLessonRequestRespond,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    req = db.query(PrivateLessonRequest).filter(PrivateLessonRequest.id == request_id).first()
+    req = await db.scalar(select(PrivateLessonRequest).where(PrivateLessonRequest.id == request_id))
     if not req:
         raise HTTPException(status_code=404, detail="Request not found")
 
@@ -133,10 +135,10 @@ async def respond_to_request(
             )
             db.add(lesson)
 
-        db.commit()
-        db.refresh(req)
+        await db.commit()
+        await db.refresh(req)
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to process request")
 
     status_text = "승인" if data.status == RequestStatus.APPROVED else "거절"
@@ -147,16 +149,16 @@ async def respond_to_request(
         entity="private_lessons",
     )
 
-    return request_to_response(req)
+    return await db.run_sync(lambda s: request_to_response(req))
 
 
 @router.delete("/{request_id}")
 async def delete_request(
     request_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    req = db.query(PrivateLessonRequest).filter(PrivateLessonRequest.id == request_id).first()
+    req = await db.scalar(select(PrivateLessonRequest).where(PrivateLessonRequest.id == request_id))
     if not req:
         raise HTTPException(status_code=404, detail="Request not found")
     # 요청 학생 본인, 지목된 담당교사, 또는 원장만 삭제 가능(교사가 남의 요청 삭제 차단)
@@ -166,8 +168,8 @@ async def delete_request(
         raise HTTPException(status_code=403, detail="접근 권한이 없어요.")
 
     teacher_id = req.teacher_id
-    db.delete(req)
-    db.commit()
+    await db.delete(req)
+    await db.commit()
 
     if teacher_id:
         await emit_data_changed([teacher_id], "private_lessons")
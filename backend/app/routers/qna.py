@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.qna import Question, Answer
 from app.models.user import User, UserRole
 from app.schemas.qna import QuestionCreate, AnswerCreate, QuestionResponse, AnswerResponse
@@ -74,7 +76,7 @@ def get_question(question_id: str, db: Session = Depends(get_db), current_user:
 @router.post("/questions", response_model=QuestionResponse, status_code=status.HTTP_201_CREATED)
 async def create_question(
     data: QuestionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     question = Question(
@@ -85,12 +87,12 @@ async def create_question(
         views=0,
     )
     db.add(question)
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
 
     # Notify teachers when a student posts a question
     if current_user.role == UserRole.STUDENT:
-        teacher_ids = get_teacher_ids_for_student(db, current_user.id)
+        teacher_ids = await db.run_sync(get_teacher_ids_for_student, current_user.id)
         if teacher_ids:
             await notify_users(
                 db, teacher_ids,
@@ -98,11 +100,10 @@ async def create_question(
                 entity="qna",
             )
 
-    q = (
-        db.query(Question)
+    q = await db.scalar(
+        select(Question)
         .options(joinedload(Question.author), joinedload(Question.answers))
-        .filter(Question.id == question.id)
-        .first()
+        .where(Question.id == question.id)
     )
     return question_to_response(q)
 
@@ -110,10 +111,10 @@ async def create_question(
 @router.delete("/questions/{question_id}")
 async def delete_question(
     question_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    q = db.query(Question).filter(Question.id == question_id).first()
+    q = await db.scalar(select(Question).where(Question.id == question_id))
     if not q:
         raise HTTPException(status_code=404, detail="Question not found")
 
@@ -121,8 +122,8 @@ async def delete_question(
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
     author_id = q.author_id
-    db.delete(q)
-    db.commit()
+    await db.delete(q)
+    await db.commit()
 
     if author_id:
         await emit_data_changed([author_id], "qna")
@@ -133,10 +134,10 @@ async def delete_question(
 @router.post("/questions/{question_id}/answers/ai", response_model=AnswerResponse)
 async def create_ai_answer(
     question_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    q = db.query(Question).filter(Question.id == question_id).first()
+    q = await db.scalar(select(Question).where(Question.id == question_id))
     if not q:
         raise HTTPException(status_code=404, detail="Question not found")
 
@@ -151,8 +152,8 @@ async def create_ai_answer(
         is_ai=True,
     )
     db.add(answer)
-    db.commit()
-    db.refresh(answer)
+    await db.commit()
+    await db.refresh(answer)
 
     if q.author_id:
         await emit_data_changed([q.author_id], "qna")
@@ -164,14 +165,14 @@ async def create_ai_answer(
 async def create_answer(
     question_id: str,
     data: AnswerCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # 답변은 선생님·원장님만 작성 가능 (학생이 스태프처럼 답변하는 것 차단)
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="선생님·원장님만 답변할 수 있어요")
 
-    q = db.query(Question).options(joinedload(Question.author)).filter(Question.id == question_id).first()
+    q = await db.scalar(select(Question).options(joinedload(Question.author)).where(Question.id == question_id))
     if not q:
         raise HTTPException(status_code=404, detail="Question not found")
 
@@ -184,8 +185,8 @@ async def create_answer(
         is_ai=False,
     )
     db.add(answer)
-    db.commit()
-    db.refresh(answer)
+    await db.commit()
+    await db.refresh(answer)
 
     if q.author_id:
         await notify_user(
@@ -200,19 +201,19 @@ async def create_answer(
 @router.delete("/answers/{answer_id}")
 async def delete_answer(
     answer_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role not in [UserRole.TEACHER, UserRole.DIRECTOR]:
         raise HTTPException(status_code=403, detail="Only teachers and directors can delete answers")
 
-    answer = db.query(Answer).filter(Answer.id == answer_id).first()
+    answer = await db.scalar(select(Answer).where(Answer.id == answer_id))
     if not answer:
         raise HTTPException(status_code=404, detail="Answer not found")
 
-    q = db.query(Question).filter(Question.id == answer.question_id).first()
-    db.delete(answer)
-    db.commit()
+    q = await db.scalar(select(Question).where(Question.id == answer.question_id))
+    await db.delete(answer)
+    await db.commit()
 
     if q and q.author_id:
         await emit_data_changed([q.author_id], "qna")
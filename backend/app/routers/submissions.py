@@ -4,13 +4,15 @@
 → 리드타임 산출 → done → 학생 알림(홈 배너). 기존 테이블 무접촉, 이 신규 테이블만 사용.
 """
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
 import uuid
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User, UserRole
 from app.models.submission import Submission
 from app.utils.auth import get_current_user
@@ -62,28 +64,33 @@ class CreateSubmission(BaseModel):
 
 
 @router.post("/submit")
-async def submit(data: CreateSubmission, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def submit(data: CreateSubmission, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """학생 제출 — open 생성 + 박수 + 강사 인박스 알림."""
     sid = current_user.id
-    teachers = get_teacher_ids_for_student(db, sid)
-    sub = Submission(
-        id=f"sub{uuid.uuid4().hex[:12]}", student_id=sid,
-        teacher_id=(teachers[0] if teachers else None),
-        kind=data.kind, title=data.title, note=data.note, status="open",
-    )
-    db.add(sub)
-    # 멱등성: 오늘 같은 (학생·종류·제목) 제출이 이미 있으면 레코드는 만들되 포인트는 재지급 안 함(이중 지급 방지)
-    today0 = kst_day_start_utc()
-    dup = db.query(Submission.id).filter(
-        Submission.student_id == sid, Submission.kind == data.kind,
-        Submission.title == data.title, Submission.created_at >= today0,
-    ).first()
-    if dup:
-        granted, streak_days = 0, gamify.record_action(db, sid, "submit", 0, ref=sub.id)[1]
-    else:
-        granted, streak_days = gamify.record_action(db, sid, "submit", SUBMIT_REWARD, ref=sub.id)
-    db.commit()
-    db.refresh(sub)
+
+    def create(s: Session):
+        teachers = get_teacher_ids_for_student(s, sid)
+        sub = Submission(
+            id=f"sub{uuid.uuid4().hex[:12]}", student_id=sid,
+            teacher_id=(teachers[0] if teachers else None),
+            kind=data.kind, title=data.title, note=data.note, status="open",
+        )
+        s.add(sub)
+        # 멱등성: 오늘 같은 (학생·종류·제목) 제출이 이미 있으면 레코드는 만들되 포인트는 재지급 안 함(이중 지급 방지)
+        today0 = kst_day_start_utc()
+        dup = s.query(Submission.id).filter(
+            Submission.student_id == sid, Submission.kind == data.kind,
+            Submission.title == data.title, Submission.created_at >= today0,
+        ).first()
+        if dup:
+            granted, streak_days = 0, gamify.record_action(s, sid, "submit", 0, ref=sub.id)[1]
+        else:
+            granted, streak_days = gamify.record_action(s, sid, "submit", SUBMIT_REWARD, ref=sub.id)
+        s.commit()
+        s.refresh(sub)
+        return teachers, sub, granted, streak_days
+
+    teachers, sub, granted, streak_days = await db.run_sync(create)
     label = KIND_LABEL.get(data.kind, "제출물")
     await notify_users(db, teachers, f"{current_user.name}님이 {label}을 제출했어요", entity="submission")
     return {"id": sub.id, "granted": granted, "streak_days": streak_days}
@@ -150,14 +157,14 @@ class FeedbackBody(BaseModel):
 
 
 @router.post("/{sub_id}/feedback")
-async def send_feedback(sub_id: str, body: FeedbackBody, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def send_feedback(sub_id: str, body: FeedbackBody, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     """강사 피드백 전송 — 리드타임 확정 + done + 학생 홈 배너."""
     if current_user.role not in (UserRole.TEACHER, UserRole.DIRECTOR):
         raise HTTPException(status_code=403, detail="강사/원장 전용")
-    sub = db.query(Submission).filter(Submission.id == sub_id).first()
+    sub = await db.scalar(select(Submission).where(Submission.id == sub_id))
     if not sub:
         raise HTTPException(status_code=404, detail="제출물을 찾을 수 없어요")
-    if current_user.role == UserRole.TEACHER and sub.student_id not in get_teacher_student_ids(db, current_user.id):
+    if current_user.role == UserRole.TEACHER and sub.student_id not in await db.run_sync(get_teacher_student_ids, current_user.id):
         raise HTTPException(status_code=403, detail="담당 학생의 제출물만 첨삭할 수 있어요.")
     if sub.first_feedback_at is None:
         sub.first_feedback_at = datetime.utcnow()
@@ -165,7 +172,7 @@ async def send_feedback(sub_id: str, body: FeedbackBody, db: Session = Depends(g
     sub.status = "done"
     if not sub.teacher_id:
         sub.teacher_id = current_user.id
-    db.commit()
+    await db.commit()
     lead = _lead(sub.created_at, sub.first_feedback_at)
     await notify_user(db, sub.student_id, f"{current_user.name} 선생님의 피드백이 도착했어요", entity="feedback")
     return {"id": sub.id, "status": sub.status, "lead": lead}
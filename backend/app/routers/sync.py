@@ -0,0 +1,253 @@
+"""증분 동기화 — GET /api/sync?since=<cursor>
+
+앱은 WebSocket data_changed {entity}를 받을 때마다(또 재접속 때마다) 목록 전체를 다시 받았다.
+이 엔드포인트는 커서 이후 생성·수정·삭제된 행만, 사용자가 볼 수 있는 범위에서 돌려준다.
+
+커서: 엔티티별 (변경시각, id) + (삭제시각, 삭제 seq) 위치를 담은 불투명 문자열. 엔티티마다 독립적으로
+PAGE_LIMIT씩 전진하고, 하나라도 잘리면 has_more=true(같은 커서로 다시 호출). 커밋 순서가 변경시각
+순서와 다를 수 있어, 마지막 페이지의 커서는 CURSOR_LAG_SEC 전까지만 전진한다(그 구간은 다음에 한 번 더
+받는다 — upsert라 무해). since가 없거나 삭제 기록 보존 기간보다 오래된 커서면 reset=true로 전체를 보낸다.
+
+가시성은 각 목록 엔드포인트와 같은 규칙. 미배정 학생은 게이트 대상 엔티티(수업·과제·포트폴리오·채팅)를 받지 않는다.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
+
+from app.database import get_db
+from app.models.assignment import Assignment
+from app.models.chat import ChatMessage
+from app.models.lesson import Lesson
+from app.models.notice import Notice
+from app.models.notification import Notification
+from app.models.portfolio import Portfolio, PortfolioComment
+from app.models.sync_tombstone import SyncTombstone
+from app.models.user import UserRole
+from app.routers.assignments import assignment_to_response
+from app.routers.chat import chat_to_response
+from app.routers.lessons import lesson_to_response
+from app.routers.notices import _notice_targets
+from app.routers.portfolios import portfolio_to_response
+from app.schemas.notice import NoticeResponse
+from app.schemas.notification import NotificationResponse
+from app.services.class_scope import teacher_student_ids
+from app.services.sync import TOMBSTONE_TTL_DAYS
+from app.utils.auth import get_current_principal
+from app.utils.principal_cache import Principal
+
+router = APIRouter()
+
+PAGE_LIMIT = 500
+CURSOR_LAG_SEC = 5
+SYNC_ENTITIES = ("lessons", "notices", "assignments", "portfolios", "notifications", "chat")
+_GATED = {"lessons", "assignments", "portfolios", "chat"}  # main.py GATE가 붙은 라우터의 엔티티
+
+_EPOCH = datetime(1970, 1, 1)
+_Pos = Tuple[int, str]  # (마이크로초, id 또는 삭제 seq 문자열)
+
+
+def _us(dt: datetime) -> int:
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _dt(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+# ── 커서 ──
+
+def encode_cursor(issued: datetime, positions: Dict[str, list]) -> str:
+    raw = json.dumps({"at": _us(issued), "e": positions}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _is_int(v) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+def _valid_pos(v) -> bool:
+    """엔티티 위치 = [행 시각(us), 행 id, 삭제 시각(us), 삭제 seq 또는 ""]."""
+    return (isinstance(v, list) and len(v) == 4 and _is_int(v[0]) and isinstance(v[1], str)
+            and _is_int(v[2]) and (_is_int(v[3]) or v[3] == ""))
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Dict[str, list]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        at, positions = _dt(int(data["at"])), data["e"]
+        # 오래됐거나 조작된 커서가 _collect에서 IndexError/TypeError(500)로 터지지 않게 모양을 검사
+        if not all(_valid_pos(v) for v in positions.values()):
+            raise ValueError("bad position")
+        return at, {k: list(v) for k, v in positions.items()}
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid sync cursor")
+
+
+# ── 엔티티별 범위·직렬화 ──
+
+def _scope_lessons(q, db: Session, p: Principal):
+    if p.role == UserRole.TEACHER:
+        return q.filter(or_(Lesson.class_id.in_(p.class_ids), Lesson.teacher_id == p.id))
+    if p.role == UserRole.STUDENT:
+        return q.filter(or_(Lesson.class_id.in_(p.class_ids), Lesson.is_private == True))  # noqa: E712
+    return q
+
+
+def _visible_lesson(l: Lesson, p: Principal) -> bool:
+    return p.role != UserRole.STUDENT or not l.is_private or p.id in (l.private_student_ids or [])
+
+
+def _visible_notice(n: Notice, p: Principal) -> bool:
+    if p.role == UserRole.DIRECTOR:
+        return True
+    targets = _notice_targets(n)
+    return not targets or bool(set(targets) & set(p.class_ids))
+
+
+def _scope_students(column):
+    def scope(q, db: Session, p: Principal):
+        if p.role == UserRole.TEACHER:
+            return q.filter(column.in_(teacher_student_ids(db, p.id)))
+        if p.role == UserRole.STUDENT:
+            return q.filter(column == p.id)
+        return q
+    return scope
+
+
+def _scope_chat(q, db: Session, p: Principal):
+    return q if p.role == UserRole.DIRECTOR else q.filter(ChatMessage.class_id.in_(p.class_ids))
+
+
+class _Spec:
+    def __init__(self, model, column, scope, serialize, options=(), visible=None):
+        self.model = model
+        self.column = column
+        self.scope = scope
+        self.serialize = serialize
+        self.options = options
+        self.visible = visible
+
+
+_SPECS: Dict[str, _Spec] = {
+    "lessons": _Spec(Lesson, Lesson.updated_at, _scope_lessons, lesson_to_response,
+                     (joinedload(Lesson.class_info), joinedload(Lesson.teacher)), _visible_lesson),
+    "notices": _Spec(Notice, Notice.updated_at, lambda q, db, p: q,
+                     lambda n: NoticeResponse.model_validate(n).model_dump(), visible=_visible_notice),
+    "assignments": _Spec(Assignment, Assignment.updated_at, _scope_students(Assignment.student_id),
+                         assignment_to_response, (joinedload(Assignment.student),)),
+    "portfolios": _Spec(Portfolio, Portfolio.updated_at, _scope_students(Portfolio.student_id),
+                        portfolio_to_response,
+                        (joinedload(Portfolio.student),
+                         joinedload(Portfolio.comments).joinedload(PortfolioComment.author),
+                         joinedload(Portfolio.videos), joinedload(Portfolio.attachments))),
+    "notifications": _Spec(Notification, Notification.updated_at,
+                           lambda q, db, p: q.filter(Notification.user_id == p.id),
+                           lambda n: NotificationResponse.model_validate(n).model_dump()),
+    "chat": _Spec(ChatMessage, ChatMessage.timestamp, _scope_chat, chat_to_response,
+                  (joinedload(ChatMessage.sender),)),
+}
+
+
+def _scope_tombstones(q, entity: str, p: Principal):
+    """삭제 id는 불투명 값이라 범위를 넓게 잡되, 남의 소유 행(학생)·남의 알림·안 속한 반은 거른다."""
+    if entity == "notifications" or (p.role == UserRole.STUDENT and entity in ("assignments", "portfolios")):
+        return q.filter(SyncTombstone.owner_id == p.id)
+    if p.role != UserRole.DIRECTOR and entity in ("lessons", "chat"):
+        return q.filter(or_(SyncTombstone.class_id.is_(None), SyncTombstone.class_id.in_(p.class_ids)))
+    return q
+
+
+def _after(column, id_column, pos: _Pos):
+    ts = _dt(pos[0])
+    return or_(column > ts, and_(column == ts, id_column > pos[1]))
+
+
+def _advance(old: _Pos, last: Optional[_Pos], hi: _Pos, truncated: bool) -> _Pos:
+    if truncated:
+        return last
+    new = min(last, hi) if last else hi
+    return max(old, new)
+
+
+def _collect(db: Session, p: Principal, entity: str, pos: Optional[list], limit: int, hi: _Pos):
+    """한 엔티티의 변경 페이지 → (upserted, deleted, 새 위치, 잘림 여부)."""
+    spec = _SPECS[entity]
+    model = spec.model
+    row_pos: _Pos = (pos[0], pos[1]) if pos else (0, "")
+    q = spec.scope(db.query(model).options(*spec.options), db, p)
+    if pos:
+        q = q.filter(_after(spec.column, model.id, row_pos))
+    rows = q.order_by(spec.column, model.id).limit(limit + 1).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    key = spec.column.key
+    last = (_us(getattr(rows[-1], key)), rows[-1].id) if rows else None
+    new_row_pos = _advance(row_pos, last, hi, more)
+    visible = [r for r in rows if spec.visible is None or spec.visible(r, p)]
+    upserted = [spec.serialize(r) for r in visible]
+
+    deleted: List[str] = []
+    if pos:  # 처음 받는 클라이언트는 지울 사본이 없다
+        tomb_pos: _Pos = (pos[2], int(pos[3]) if pos[3] != "" else 0)
+        tq = _scope_tombstones(db.query(SyncTombstone).filter(SyncTombstone.entity == entity), entity, p)
+        ts = _dt(tomb_pos[0])
+        tq = tq.filter(or_(SyncTombstone.deleted_at > ts,
+                           and_(SyncTombstone.deleted_at == ts, SyncTombstone.seq > tomb_pos[1])))
+        tombs = tq.order_by(SyncTombstone.deleted_at, SyncTombstone.seq).limit(limit + 1).all()
+        tmore = len(tombs) > limit
+        tombs = tombs[:limit]
+        tlast = (_us(tombs[-1].deleted_at), tombs[-1].seq) if tombs else None
+        new_tomb_pos = _advance(tomb_pos, tlast, (hi[0], 0), tmore)
+        deleted = [t.entity_id for t in tombs]
+        more = more or tmore
+    else:
+        new_tomb_pos = (hi[0], 0)
+    return upserted, deleted, [*new_row_pos, *new_tomb_pos], more
+
+
+@router.get("")
+def sync(
+    since: Optional[str] = Query(None, description="직전 응답의 cursor. 없으면 전체"),
+    entities: Optional[str] = Query(None, description="쉼표 구분 엔티티(기본 전체)"),
+    limit: int = Query(PAGE_LIMIT, ge=1, le=PAGE_LIMIT),
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal),
+):
+    wanted = SYNC_ENTITIES if not entities else tuple(e.strip() for e in entities.split(",") if e.strip())
+    unknown = [e for e in wanted if e not in _SPECS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown entities: {', '.join(unknown)}")
+    if not principal.enrolled:
+        wanted = tuple(e for e in wanted if e not in _GATED)
+
+    now = datetime.utcnow()
+    positions: Dict[str, list] = {}
+    reset = since is None
+    if since:
+        issued, positions = decode_cursor(since)
+        if now - issued > timedelta(days=TOMBSTONE_TTL_DAYS):
+            reset, positions = True, {}
+
+    hi: _Pos = (_us(now - timedelta(seconds=CURSOR_LAG_SEC)), "")
+    changes = {}
+    has_more = False
+    for entity in wanted:
+        upserted, deleted, positions[entity], more = _collect(db, principal, entity, positions.get(entity), limit, hi)
+        changes[entity] = {"upserted": upserted, "deleted": deleted}
+        has_more = has_more or more
+
+    # 커서 발급 시각은 전체 재동기화 시점부터 — 이어받는 페이지는 원래 시각을 유지
+    issued_at = now if reset else issued
+    return {
+        "cursor": encode_cursor(issued_at, positions),
+        "reset": reset,
+        "has_more": has_more,
+        "changes": changes,
+    }
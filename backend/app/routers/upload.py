@@ -1,18 +1,25 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Query, BackgroundTasks, Request, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Query, BackgroundTasks, Request, HTTPException
 from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Tuple
 from app.models.user import User
 from app.utils.auth import get_current_user
-from app.database import get_db
+from app.database import get_async_db, get_db
+from app.config import settings
 from app.services.file_upload import (
-    save_file, is_video, is_image, compress_video_sync, compress_image_sync,
+    save_file, is_video, is_image,
     extract_thumbnail, UPLOAD_DIR, get_max_size, validate_file_ext, safe_segment,
+    DIRECT_WRITE_SUPPORTED, preallocate, write_at, fsync_file,
 )
 from app.services.notification_service import emit_data_changed, get_teacher_ids_for_student, notify_users
+from app.services import media_jobs, upload_blobs
+from app.services.upload_sessions import get_upload_store
+from datetime import datetime, timedelta
 from pathlib import Path
 from pydantic import BaseModel
-import asyncio
+import hashlib
 import uuid
 import aiofiles
 import logging
@@ -20,42 +27,31 @@ import logging
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# In-memory registry of active chunked uploads {upload_id: metadata}
-_chunked_uploads: dict[str, dict] = {}
-# 공유 dict의 read-modify-write(청크 누적·pop)를 직렬화 — 병렬 청크/동시 완료 레이스 방지.
-# I/O는 절대 락 안에서 하지 않는다(글로벌 락이라 다른 세션까지 막힘): dict 접근만 짧게 보호.
-_uploads_lock = asyncio.Lock()
-
 # TTL for abandoned upload sessions (2 hours — enough for resume after phone sleep)
 _UPLOAD_SESSION_TTL = 2 * 60 * 60
 
 
-def _cleanup_expired_uploads():
+def _store():
+    # 세션은 공유 저장소(DB/Redis)에 — 재시작·다른 워커에서도 같은 upload_id로 이어받는다
+    return get_upload_store(_UPLOAD_SESSION_TTL)
+
+
+async def _cleanup_expired_uploads(db: AsyncSession):
     """Remove upload sessions older than TTL and delete their partial files.
-    (동기 함수 — 이벤트 루프 밖 threadpool에서 호출. dict를 순회 중 다른 스레드가 수정해도
-    안전하도록 items를 먼저 스냅샷. TTL(2h) 지난 세션만 만지므로 활성 업로드와 무관.)"""
-    import time
-    now = time.time()
-    expired = [uid for uid, meta in list(_chunked_uploads.items())
-               if now - meta.get("created_at", 0) > _UPLOAD_SESSION_TTL]
-    for uid in expired:
-        meta = _chunked_uploads.pop(uid, None)
-        if meta:
-            partial = Path(meta["path"])
-            partial.unlink(missing_ok=True)
-            # Clean up chunks directory
-            chunks_dir = meta.get("chunks_dir")
-            if chunks_dir:
-                import shutil
-                shutil.rmtree(chunks_dir, ignore_errors=True)
-            logger.info(f"Cleaned up expired upload session: {uid}")
+    (저장소가 원자적으로 집어간 세션만 정리 — 워커 여럿이 동시에 돌아도 한 번씩. rmtree는 threadpool.)"""
+    import shutil
+    for meta in await _store().expired(db, _UPLOAD_SESSION_TTL):
+        await run_in_threadpool(lambda: Path(meta["path"]).unlink(missing_ok=True))
+        if meta.get("chunks_dir"):
+            await run_in_threadpool(shutil.rmtree, meta["chunks_dir"], True)
+        logger.info(f"Cleaned up expired upload session: {meta['path']}")
 
 
 def sweep_orphan_chunk_dirs() -> int:
     """디스크 스윕: UPLOAD_DIR 하위의 `.chunks_*` 스크래치 디렉토리 중 TTL(2h) 지난 것을 삭제.
-    인메모리 세션(_chunked_uploads)은 서버 재시작 시 소멸하므로, 재시작 시점에 진행 중이던
-    업로드의 청크 디렉토리가 SSD에 영구 고아로 남는다(_cleanup_expired_uploads는 메모리에 남은
-    세션만 정리 가능). 이 함수가 그 고아를 회수한다. `.chunks_*`(부분 업로드 스크래치)만 만지고
+    세션 저장소와 디스크가 어긋난 경우(세션 없이 남은 디렉토리 — 저장소 이전·Redis 키 만료·
+    구버전의 인메모리 세션 등)의 청크 디렉토리는 _cleanup_expired_uploads가 찾지 못하고
+    SSD에 영구 고아로 남는다. 이 함수가 그 고아를 회수한다. `.chunks_*`(부분 업로드 스크래치)만 만지고
     최종 미디어 파일은 절대 건드리지 않는다. 동기 함수 — startup에서 threadpool로 호출.
     dir mtime을 기준으로 하므로 최근 청크가 쌓인 활성 세션은 TTL 안이라 보존된다."""
     import time
@@ -88,7 +84,7 @@ async def upload_file(
     target_type: Optional[str] = Query(None),  # "portfolio" or "assignment"
     target_id: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     # Pre-validate Content-Length before reading the full body.
     # Add 1MB headroom for multipart boundary overhead to avoid false rejections.
@@ -104,21 +100,24 @@ async def upload_file(
         except ValueError:
             pass  # Non-numeric Content-Length, let streaming validation handle it
 
-    url, filename = await save_file(file, subfolder=subfolder, user_id=current_user.id)
+    hasher = hashlib.sha256()
+    url, filename = await save_file(file, subfolder=subfolder, user_id=current_user.id, hasher=hasher)
+    content_key = hasher.hexdigest()
 
-    # 영상 썸네일은 ffmpeg 서브프로세스라 이벤트 루프를 막으므로 threadpool에서 1회만 추출해 재사용.
+    # 같은 내용이 이미 처리돼 있으면 그 결과를 링크(썸네일·압축 생략)
     video = is_video(filename)
-    thumbnail_url = None
+    url, thumbnail_url, deduped = await _link_duplicate(content_key, url, video)
     file_path = str(UPLOAD_DIR / url.removeprefix("/uploads/"))
-    if video:
+    # 영상 썸네일은 ffmpeg 서브프로세스라 이벤트 루프를 막으므로 threadpool에서 1회만 추출해 재사용.
+    if video and not deduped:
         thumbnail_url = await run_in_threadpool(extract_thumbnail, file_path)
 
     # Server-side DB patch: ensures file URL is saved even if client disconnects.
-    # 동기 DB + (없어진)ffmpeg를 이벤트 루프에서 직접 돌리지 않도록 threadpool로 오프로드.
+    # 동기 패치 로직은 요청의 AsyncSession 위에서 run_sync로(이벤트 루프 미차단).
     patched_owner: Optional[str] = None
     if target_type and target_id:
-        patched_owner = await run_in_threadpool(
-            _patch_target_file, db, target_type, target_id, url, current_user.id, thumbnail_url
+        patched_owner = await db.run_sync(
+            _patch_target_file, target_type, target_id, url, current_user.id, thumbnail_url
         )
         if patched_owner is None:
             # DB patch failed (target gone / not owned) — clean up orphan + signal failure
@@ -127,21 +126,74 @@ async def upload_file(
             logger.warning(f"Cleaned up orphaned upload: {url}")
             raise HTTPException(status_code=409, detail="업로드 대상을 찾을 수 없어요(삭제되었거나 권한이 없어요).")
 
-    # Start background video/image compression
-    if video:
-        background_tasks.add_task(compress_video_sync, file_path, current_user.id)
-    elif is_image(filename):
-        background_tasks.add_task(compress_image_sync, file_path)
+    # Start background video/image compression (media_jobs 큐 — 워커 프로세스가 처리)
+    media_job = None
+    if not deduped:
+        media_job = await _schedule_processing(
+            db, background_tasks, content_key, file_path, filename, current_user.id, target_type
+        )
 
     # Live-refresh owner + teachers once the (possibly background) upload landed
     if patched_owner is not None and target_type:
         await _emit_target_patched(db, target_type, patched_owner)
 
-    return {"url": url, "filename": filename, "is_video": video, "thumbnail_url": thumbnail_url}
+    return {"url": url, "filename": filename, "is_video": video, "thumbnail_url": thumbnail_url,
+            "media_job": media_job}
+
+
+async def _link_duplicate(content_key: str, url: str, video: bool) -> Tuple[str, Optional[str], bool]:
+    """같은 내용의 처리 결과가 blob에 있으면 방금 받은 파일 자리를 그 링크로 → (url, 썸네일 url, 중복 여부)."""
+    hit = await run_in_threadpool(upload_blobs.link_existing, content_key, UPLOAD_DIR / url.removeprefix("/uploads/"), video)
+    if hit is None:
+        return url, None, False
+    dest, thumb = hit
+    base = url.rsplit("/", 1)[0]
+    return f"{base}/{dest.name}", (f"{base}/{thumb.name}" if thumb else None), True
+
+
+async def _schedule_processing(db: AsyncSession, background_tasks: BackgroundTasks, content_key: str, file_path: str,
+                               filename: str, user_id: str, target_type: Optional[str]) -> Optional[dict]:
+    """영상·이미지는 media_jobs에 넣는다(압축 후 워커가 blob 등록) → {id, lane, position}.
+    처리할 게 없는 파일(PDF 등)은 바로 blob 등록."""
+    kind = "video" if is_video(filename) else "image" if is_image(filename) else None
+    if kind is None:
+        background_tasks.add_task(upload_blobs.adopt, content_key, file_path)
+        return None
+
+    def run(db: Session):
+        job = media_jobs.enqueue(db, kind, file_path, user_id, content_key, target_type)
+        db.commit()
+        return {"id": job.id, "lane": job.lane, "position": media_jobs.queue_position(db, job)}
+    queued = await db.run_sync(run)
+    if settings.MEDIA_WORKER_MODE == "inline":
+        media_jobs.worker.wake()
+    return queued
+
+
+@router.get("/upload/jobs")
+def list_media_jobs(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """미디어 처리 대기열 — 본인 작업의 상태·순번(원장은 전체 대기·실행 중 작업)."""
+    from app.models.media_job import MediaJob
+    from app.models.user import UserRole
+    q = db.query(MediaJob).filter(MediaJob.status.in_(media_jobs.ACTIVE_STATUSES))
+    if current_user.role != UserRole.DIRECTOR:
+        q = db.query(MediaJob).filter(MediaJob.user_id == current_user.id,
+                                      MediaJob.created_at > datetime.utcnow() - timedelta(days=1))
+    jobs = q.order_by(MediaJob.priority, MediaJob.created_at).all()
+    positions = media_jobs.queue_positions(db)  # 순번은 요청당 한 번에(작업별 COUNT N+1 방지)
+    return [media_jobs.job_to_response(db, j, positions) for j in jobs]
 
 
 # ── Chunked upload endpoints ──
 # Flow: POST /upload/chunked/init → POST /upload/chunked/{id} (repeat) → POST /upload/chunked/{id}/complete
+#
+# 직접 쓰기 모드: init에 chunk_size를 주면 최종 파일을 total_size로 미리 잡아두고(fallocate) 각 청크를
+# index * chunk_size 위치에 바로 pwrite한다. complete는 수신 비트맵·크기 확인 + fsync뿐(1GB 영상이면
+# 외장 SSD에서 조립용 1GB 읽기 + 1GB 쓰기가 사라진다). chunk_size가 없는 구 클라이언트·pwrite가 없는
+# 플랫폼·settings.UPLOAD_DIRECT_WRITE=False면 기존 청크 파일(.chunks_*) + 조립 모드.
 
 
 class ChunkedInitRequest(BaseModel):
@@ -150,24 +202,28 @@ class ChunkedInitRequest(BaseModel):
     subfolder: str = "assignments"
     target_type: Optional[str] = None
     target_id: Optional[str] = None
+    chunk_size: Optional[int] = None  # 마지막을 뺀 모든 청크의 크기 — 있으면 직접 쓰기 모드
+    offsets: bool = False  # 청크마다 바이트 offset을 보냄(크기가 바뀌는 클라) — 이것도 직접 쓰기 모드
 
 
 @router.post("/upload/chunked/init")
 async def chunked_init(
     data: ChunkedInitRequest,
     current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Start a chunked upload session. Returns upload_id."""
+    """Start a chunked upload session. Returns upload_id (direct=True면 청크를 제자리에 쓰는 모드)."""
     validate_file_ext(data.filename)
+    if data.chunk_size is not None and data.chunk_size <= 0:
+        raise HTTPException(status_code=400, detail="chunk_size must be positive")
 
     max_size = get_max_size(data.filename)
     if data.total_size > max_size:
         max_mb = max_size // (1024 * 1024)
         raise HTTPException(status_code=400, detail=f"File too large. Maximum size: {max_mb}MB")
 
-    import time
-    # Clean up expired sessions before creating new ones (rmtree I/O는 threadpool에서 — 루프 미차단)
-    await run_in_threadpool(_cleanup_expired_uploads)
+    # Clean up expired sessions before creating new ones
+    await _cleanup_expired_uploads(db)
 
     # 경로 우회 방지: 클라 입력(subfolder·filename)을 단일 안전 세그먼트로 정규화.
     subfolder = safe_segment(data.subfolder, "assignments")
@@ -178,39 +234,56 @@ async def chunked_init(
     target_dir.mkdir(parents=True, exist_ok=True)
     target_path = target_dir / unique_name
 
-    # Create chunks directory for parallel uploads
-    chunks_dir = target_dir / f".chunks_{upload_id}"
-    chunks_dir.mkdir(parents=True, exist_ok=True)
-
-    _chunked_uploads[upload_id] = {
+    direct = bool(data.chunk_size or data.offsets) and settings.UPLOAD_DIRECT_WRITE and DIRECT_WRITE_SUPPORTED
+    chunks_dir = None
+    if direct:
+        try:
+            await run_in_threadpool(preallocate, target_path, data.total_size)
+        except OSError as e:
+            target_path.unlink(missing_ok=True)
+            logger.error(f"Chunked upload preallocate failed ({target_path}): {e}")
+            raise HTTPException(status_code=507, detail="저장 공간이 부족해요. 잠시 후 다시 시도해주세요.")
+    else:
+        # Create chunks directory for parallel uploads
+        chunks_dir = target_dir / f".chunks_{upload_id}"
+        chunks_dir.mkdir(parents=True, exist_ok=True)
+
+    await _store().create(db, upload_id, {
         "path": str(target_path),
-        "chunks_dir": str(chunks_dir),
+        "chunks_dir": str(chunks_dir) if chunks_dir else None,
+        "chunk_size": data.chunk_size if direct else None,
         "filename": data.filename,
         "total_size": data.total_size,
-        "received": 0,
         "subfolder": subfolder,
         "user_id": current_user.id,
         "target_type": data.target_type,
         "target_id": data.target_id,
         "unique_name": unique_name,
-        "created_at": time.time(),
-    }
-    logger.warning(f"Chunked upload init: {upload_id} by {current_user.name}({current_user.id}) ({data.filename}, {data.total_size // 1024}KB, target={data.target_type}/{data.target_id})")
-    return {"upload_id": upload_id}
+    })
+    logger.warning(f"Chunked upload init: {upload_id} by {current_user.name}({current_user.id}) ({data.filename}, {data.total_size // 1024}KB, target={data.target_type}/{data.target_id}, direct={direct})")
+    return {"upload_id": upload_id, "direct": direct}
+
+
+async def _owned_session(db: AsyncSession, upload_id: str, user: User) -> dict:
+    meta = await _store().get(db, upload_id)
+    if not meta:
+        raise HTTPException(status_code=404, detail="Upload session not found or expired")
+    if meta["user_id"] != user.id:
+        raise HTTPException(status_code=403, detail="Not your upload session")
+    return meta
 
 
 @router.post("/upload/chunked/{upload_id}")
 async def chunked_upload(
     upload_id: str,
     file: UploadFile = File(...),
+    offset: Optional[int] = Form(None),
     current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Upload a single chunk. Saves as individual file for parallel support."""
-    meta = _chunked_uploads.get(upload_id)
-    if not meta:
-        raise HTTPException(status_code=404, detail="Upload session not found or expired")
-    if meta["user_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Not your upload session")
+    """Upload a single chunk. 직접 쓰기 모드면 최종 파일의 제 위치에, 아니면 청크 파일로(병렬 업로드 지원).
+    offset(바이트)이 오면 그 자리에 쓴다 — 청크 크기를 도중에 바꾸는 클라이언트용."""
+    meta = await _owned_session(db, upload_id, current_user)
 
     chunk_data = await file.read()
     chunk_size = len(chunk_data)
@@ -221,46 +294,93 @@ async def chunked_upload(
     try:
         chunk_idx = int(idx_str)
     except ValueError:
-        # 인덱스 파싱 실패 시 순번 채번 — 병렬 요청이 같은 번호를 받지 않도록 락으로 보호.
-        async with _uploads_lock:
-            chunk_idx = meta.get("_next_idx", 0)
-            meta["_next_idx"] = chunk_idx + 1
-
-    # Save as individual numbered file — overwrite-safe so resume re-sends are OK (I/O는 락 밖)
-    chunks_dir = Path(meta["chunks_dir"])
-    chunk_path = chunks_dir / f"{chunk_idx:06d}"
-    async with aiofiles.open(chunk_path, "wb") as f:
-        await f.write(chunk_data)
-
-    # received 바이트는 '새' 청크 인덱스일 때만 누적 — 재전송/이어받기 중복 카운트 방지.
-    # 병렬 청크의 read-modify-write 레이스를 막기 위해 dict 갱신만 짧게 락(디스크 I/O는 이미 끝남).
-    async with _uploads_lock:
-        received_idx = meta.setdefault("received_idx", set())
-        if chunk_idx not in received_idx:
-            received_idx.add(chunk_idx)
-            meta["received"] += chunk_size
-        received_total = meta["received"]
+        # 인덱스 파싱 실패 시 순번 채번 — 저장소의 원자 증가라 병렬 요청이 같은 번호를 받지 않는다.
+        chunk_idx = await _store().next_index(db, upload_id)
+    if chunk_idx < 0 or (offset is not None and offset < 0):
+        raise HTTPException(status_code=400, detail="청크 인덱스/위치가 올바르지 않아요.")
+
+    if not meta.get("chunks_dir"):
+        # 제자리 쓰기 — 같은 인덱스 재전송은 같은 자리를 덮어쓴다
+        if offset is None:
+            if not meta.get("chunk_size"):
+                raise HTTPException(status_code=400, detail="청크 offset이 필요해요.")
+            # 고정 크기 모드: 마지막 청크만 짧을 수 있다
+            offset = chunk_idx * meta["chunk_size"]
+            fixed = chunk_size == meta["chunk_size"] or offset + chunk_size == meta["total_size"]
+        else:
+            fixed = True
+        if chunk_size == 0 or offset + chunk_size > meta["total_size"] or not fixed:
+            raise HTTPException(status_code=400, detail=f"청크 {chunk_idx}의 크기({chunk_size})가 맞지 않아요.")
+        await run_in_threadpool(write_at, Path(meta["path"]), offset, chunk_data)
+        # 완료 때 파일을 다시 읽지 않도록 청크 해시를 세션에(중복 제거 키 — services/upload_blobs).
+        # 크기가 제각각인 offset 모드는 자리까지 기록해 완료 때 빈틈을 검사한다.
+        digest = await run_in_threadpool(lambda: hashlib.sha256(chunk_data).hexdigest())
+        if not meta.get("chunk_size"):
+            digest = f"{offset}:{chunk_size}:{digest}"
+    else:
+        # Save as individual numbered file — overwrite-safe so resume re-sends are OK
+        chunk_path = Path(meta["chunks_dir"]) / f"{chunk_idx:06d}"
+        async with aiofiles.open(chunk_path, "wb") as f:
+            await f.write(chunk_data)
+        digest = None  # 조립하며 해시
+
+    # received 바이트는 '새' 청크 인덱스일 때만 누적 — 재전송/이어받기 중복 카운트 방지(저장소 비트맵).
+    # 청크를 다 쓴 뒤에 기록해야 status가 "받았다"고 한 청크는 디스크에 있다.
+    received_total = await _store().add_chunk(db, upload_id, chunk_idx, chunk_size, digest)
     pct = min(100, received_total * 100 // max(meta["total_size"], 1))
     return {"received": received_total, "progress": pct, "chunk_idx": chunk_idx}
 
 
 @router.get("/upload/chunked/{upload_id}/status")
-async def chunked_status(upload_id: str, current_user: User = Depends(get_current_user)):
+async def chunked_status(
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
     """이어받기(resume)용 — 이미 받은 청크를 기준으로 다음에 보낼 인덱스를 알려준다.
     클라이언트는 같은 upload_id로 재시도 시 next_chunk부터 이어 보낸다.
-    세션이 없으면(만료/재시작) 404 → 클라이언트는 처음부터 새 init."""
-    meta = _chunked_uploads.get(upload_id)
-    if not meta:
-        raise HTTPException(status_code=404, detail="Upload session not found or expired")
-    if meta["user_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Not your upload session")
-    chunks_dir = Path(meta["chunks_dir"])
-    received = sorted(int(p.name) for p in chunks_dir.iterdir() if p.name.isdigit()) if chunks_dir.exists() else []
-    rec = set(received)
-    next_idx = 0
-    while next_idx in rec:
-        next_idx += 1
-    return {"received_count": len(received), "next_chunk": next_idx, "total_size": meta.get("total_size", 0)}
+    세션이 없으면(만료/완료) 404 → 클라이언트는 처음부터 새 init."""
+    meta = await _owned_session(db, upload_id, current_user)
+    received_count, next_idx = await _store().chunk_status(db, upload_id)
+    return {"received_count": received_count, "next_chunk": next_idx, "total_size": meta.get("total_size", 0)}
+
+
+def _covers(digests, total_size: int) -> bool:
+    """offset 모드 청크("offset:size:sha")들이 0..total_size를 빈틈없이 덮는지."""
+    end = 0
+    for off, size in sorted((int(a), int(b)) for a, b, _ in (d.split(":", 2) for d in digests if d)):
+        if off > end:
+            return False
+        end = max(end, off + size)
+    return end == total_size
+
+
+async def _assemble_chunks(chunks_dir: Path, target_path: Path) -> str:
+    """청크 파일 모드의 조립: 번호 순으로 이어 붙이며 해시하고 청크 디렉토리 삭제 → 내용 sha256."""
+    import shutil
+    # Assemble chunks in order
+    chunk_files = sorted(
+        [f for f in chunks_dir.iterdir() if not f.name.startswith('.')],
+        key=lambda p: int(p.name)
+    )
+    if not chunk_files:
+        raise HTTPException(status_code=400, detail="No chunks found")
+
+    # 스트리밍 조립(1MB 단위) — 청크 전체를 RAM에 올리지 않음(동시 업로드 시 메모리 폭주 방지).
+    hasher = hashlib.sha256()
+    async with aiofiles.open(target_path, "wb") as out:
+        for cf in chunk_files:
+            async with aiofiles.open(cf, "rb") as inp:
+                while True:
+                    buf = await inp.read(1024 * 1024)
+                    if not buf:
+                        break
+                    hasher.update(buf)
+                    await out.write(buf)
+
+    # Clean up chunk files (rmtree I/O는 threadpool)
+    await run_in_threadpool(shutil.rmtree, str(chunks_dir), True)
+    return hasher.hexdigest()
 
 
 @router.post("/upload/chunked/{upload_id}/complete")
@@ -268,48 +388,43 @@ async def chunked_complete(
     upload_id: str,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Finalize chunked upload: validate, patch DB, start compression."""
-    # 소유 확인 후 원자적으로 제거 — 동시 complete 이중처리(TOCTOU) 방지.
-    async with _uploads_lock:
-        meta = _chunked_uploads.get(upload_id)
-        if meta is None:
-            raise HTTPException(status_code=404, detail="Upload session not found or expired")
-        if meta["user_id"] != current_user.id:
-            raise HTTPException(status_code=403, detail="Not your upload session")
-        _chunked_uploads.pop(upload_id, None)
+    # 소유 확인 후 원자적으로 집어가기 — 동시 complete(다른 워커 포함) 중 하나만 통과(이중처리 방지).
+    meta = await _owned_session(db, upload_id, current_user)
+    direct = not meta.get("chunks_dir")
+    if direct:
+        # 빠진 청크가 있으면 세션을 유지한 채 400 — 클라이언트는 status의 next_chunk부터 이어 보낸다
+        received_count, next_idx = await _store().chunk_status(db, upload_id)
+        digests = await _store().chunk_digests(db, upload_id)  # claim이 지우기 전에
+        if meta.get("chunk_size"):
+            expected = -(-meta["total_size"] // meta["chunk_size"])
+            complete = received_count >= expected and meta["received"] == meta["total_size"]
+        else:
+            complete = _covers(digests, meta["total_size"])
+        if not complete:
+            raise HTTPException(status_code=400, detail=f"청크가 모두 도착하지 않았어요 (다음: {next_idx}).")
+    if not await _store().claim(db, upload_id):
+        raise HTTPException(status_code=404, detail="Upload session not found or expired")
 
     import shutil
     target_path = Path(meta["path"])
-    chunks_dir = Path(meta["chunks_dir"])
+    chunks_dir = Path(meta["chunks_dir"]) if meta.get("chunks_dir") else None
 
     async def _cleanup_partial():
         # 실패 시 부분 파일·청크 디렉토리 정리(고아 방지). I/O는 threadpool.
         await run_in_threadpool(lambda: target_path.unlink(missing_ok=True))
-        await run_in_threadpool(shutil.rmtree, str(chunks_dir), True)
+        if chunks_dir:
+            await run_in_threadpool(shutil.rmtree, str(chunks_dir), True)
 
     try:
-        # Assemble chunks in order
-        chunk_files = sorted(
-            [f for f in chunks_dir.iterdir() if not f.name.startswith('.')],
-            key=lambda p: int(p.name)
-        )
-        if not chunk_files:
-            raise HTTPException(status_code=400, detail="No chunks found")
-
-        # 스트리밍 조립(1MB 단위) — 청크 전체를 RAM에 올리지 않음(동시 업로드 시 메모리 폭주 방지).
-        async with aiofiles.open(target_path, "wb") as out:
-            for cf in chunk_files:
-                async with aiofiles.open(cf, "rb") as inp:
-                    while True:
-                        buf = await inp.read(1024 * 1024)
-                        if not buf:
-                            break
-                        await out.write(buf)
-
-        # Clean up chunk files (rmtree I/O는 threadpool)
-        await run_in_threadpool(shutil.rmtree, str(chunks_dir), True)
+        if direct:
+            # 청크는 이미 제자리에 — 조립 없이 디스크 반영만
+            await run_in_threadpool(fsync_file, target_path)
+            content_key = upload_blobs.chunk_list_key(meta.get("chunk_size") or 0, digests)
+        else:
+            content_key = await _assemble_chunks(chunks_dir, target_path)
 
         actual_size = target_path.stat().st_size
         if actual_size == 0:
@@ -325,27 +440,29 @@ async def chunked_complete(
         url = f"/uploads/{url_path}"
         filename = meta["filename"]
 
-        # 썸네일은 ffmpeg라 threadpool에서 1회만 추출해 재사용(이벤트 루프 미차단).
         video = is_video(filename)
-        thumbnail_url = None
-        file_path = str(UPLOAD_DIR / url.removeprefix("/uploads/"))
-        if video:
+        url, thumbnail_url, deduped = await _link_duplicate(content_key, url, video)
+        target_path = UPLOAD_DIR / url.removeprefix("/uploads/")  # 실패 정리 대상도 링크 쪽으로
+        file_path = str(target_path)
+        # 썸네일은 ffmpeg라 threadpool에서 1회만 추출해 재사용(이벤트 루프 미차단).
+        if video and not deduped:
             thumbnail_url = await run_in_threadpool(extract_thumbnail, file_path)
 
-        # DB patch (동기 DB → threadpool, 이벤트 루프 미차단)
+        # DB patch (동기 패치 로직 → run_sync, 이벤트 루프 미차단)
         patched_owner: Optional[str] = None
         if meta.get("target_type") and meta.get("target_id"):
-            patched_owner = await run_in_threadpool(
-                _patch_target_file, db, meta["target_type"], meta["target_id"], url, current_user.id, thumbnail_url
+            patched_owner = await db.run_sync(
+                _patch_target_file, meta["target_type"], meta["target_id"], url, current_user.id, thumbnail_url
             )
             if patched_owner is None:
                 raise HTTPException(status_code=409, detail="업로드 대상을 찾을 수 없어요(삭제되었거나 권한이 없어요).")
 
-        # Background video/image compression
-        if video:
-            background_tasks.add_task(compress_video_sync, file_path, current_user.id)
-        elif is_image(filename):
-            background_tasks.add_task(compress_image_sync, file_path)
+        # Background video/image compression (media_jobs 큐)
+        media_job = None
+        if not deduped:
+            media_job = await _schedule_processing(
+                db, background_tasks, content_key, file_path, filename, current_user.id, meta.get("target_type")
+            )
     except HTTPException:
         await _cleanup_partial()
         raise
@@ -359,7 +476,8 @@ async def chunked_complete(
         await _emit_target_patched(db, meta["target_type"], patched_owner)
 
     logger.warning(f"Chunked upload complete: {url} by {current_user.name}({current_user.id}) ({actual_size // 1024}KB)")
-    return {"url": url, "filename": filename, "is_video": video, "thumbnail_url": thumbnail_url}
+    return {"url": url, "filename": filename, "is_video": video, "thumbnail_url": thumbnail_url,
+            "media_job": media_job}
 
 
 def _patch_target_file(
@@ -373,7 +491,7 @@ def _patch_target_file(
     background upload). Returns the owner student_id on success, None otherwise.
 
     썸네일은 호출측이 threadpool에서 미리 추출해 넘긴다(여기서 ffmpeg를 돌려 DB 커넥션을
-    잡고 있지 않도록 — 커넥션 풀 고갈 방지). 이 함수 자체도 async 핸들러에서 run_in_threadpool로 호출됨.
+    잡고 있지 않도록 — 커넥션 풀 고갈 방지). 이 함수 자체도 async 핸들러에서 db.run_sync로 호출됨.
     """
     try:
         if target_type == "portfolio":
@@ -478,7 +596,7 @@ def _patch_target_file(
         return None
 
 
-async def _emit_target_patched(db: Session, target_type: str, owner_id: str) -> None:
+async def _emit_target_patched(db: AsyncSession, target_type: str, owner_id: str) -> None:
     """Notify owner + their teachers so the freshly-uploaded file appears live,
     even when the upload finished while the app was in the background.
     For a portfolio cover video, also push the teacher notification HERE (when the
@@ -490,10 +608,10 @@ async def _emit_target_patched(db: Session, target_type: str, owner_id: str) ->
             return
         # 모의테스트: 음원 제출 → 원장 알림 / 영상 배포 → 대상 학생 알림
         if target_type in ("mock_test_audio", "mock_test_video"):
-            student = db.query(User).filter(User.id == owner_id).first()
+            student = await db.scalar(select(User).where(User.id == owner_id))
             name = student.name if student else "학생"
             if target_type == "mock_test_audio":
-                director_ids = [r[0] for r in db.query(User.id).filter(User.role == UserRole.DIRECTOR).all()]
+                director_ids = list(await db.scalars(select(User.id).where(User.role == UserRole.DIRECTOR)))
                 await emit_data_changed([owner_id, *director_ids], "mock_tests")
                 if director_ids:
                     await notify_users(db, director_ids, f"{name}님이 모의테스트 음원을 제출했어요", entity="mock_tests")
@@ -503,11 +621,11 @@ async def _emit_target_patched(db: Session, target_type: str, owner_id: str) ->
             return
 
         entity = "assignments" if target_type == "assignment" else "portfolios"
-        teacher_ids = get_teacher_ids_for_student(db, owner_id)
+        teacher_ids = await db.run_sync(get_teacher_ids_for_student, owner_id)
         await emit_data_changed([owner_id, *teacher_ids], entity)
         # 새 영상 커버가 실제로 도착한 시점에 교사 알림(추가 영상 portfolio_video는 알림 생략)
         if target_type == "portfolio" and teacher_ids:
-            student = db.query(User).filter(User.id == owner_id).first()
+            student = await db.scalar(select(User).where(User.id == owner_id))
             name = student.name if student else "학생"
             await notify_users(db, teacher_ids, f"{name}님이 새 영상을 올렸어요", entity="portfolios")
     except Exception as e:
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User, UserRole
 from app.schemas.user import UserResponse, UserUpdate, PasswordChange
 from app.utils.auth import get_current_user, verify_password, get_password_hash
@@ -72,40 +74,40 @@ def change_password(
 async def update_user(
     user_id: str,
     update_data: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.id != user_id and current_user.role != UserRole.DIRECTOR:
         raise HTTPException(status_code=403, detail="Insufficient permissions")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     for field, value in update_data.model_dump(exclude_unset=True).items():
         setattr(user, field, value)
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
-    all_ids = get_all_user_ids(db)
+    all_ids = await db.run_sync(get_all_user_ids)
     if all_ids:
         await emit_data_changed(all_ids, "users")
 
-    return user
+    return await db.run_sync(lambda s: UserResponse.model_validate(user))
 
 
 # 본인 계정 삭제 — /{user_id} 보다 먼저 정의(경로 충돌 방지). 앱스토어 인앱 계정삭제 요건.
 @router.delete("/me")
 async def delete_my_account(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """로그인한 본인 계정과 모든 연관 데이터·파일을 영구 삭제한다(복구 불가)."""
     uid = current_user.id
-    all_ids = get_all_user_ids(db)
-    purge_user_data(db, uid)
-    db.commit()
+    all_ids = await db.run_sync(get_all_user_ids)
+    await db.run_sync(purge_user_data, uid)
+    await db.commit()
     purge_user_files(uid)  # DB 커밋 후 파일 정리(실패해도 삭제는 이미 확정)
 
     remaining_ids = [x for x in all_ids if x != uid]
@@ -117,21 +119,21 @@ async def delete_my_account(
 @router.delete("/{user_id}")
 async def delete_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != UserRole.DIRECTOR:
         raise HTTPException(status_code=403, detail="Only directors can delete users")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    all_ids = get_all_user_ids(db)
+    all_ids = await db.run_sync(get_all_user_ids)
     # 기존 db.delete(user)는 cascade 미커버 테이블(point_ledger·submissions 등)에서 FK 위반 →
     # 완전삭제 퍼지로 전 연관 데이터·파일까지 안전 제거.
-    purge_user_data(db, user_id)
-    db.commit()
+    await db.run_sync(purge_user_data, user_id)
+    await db.commit()
     purge_user_files(user_id)
 
     remaining_ids = [uid for uid in all_ids if uid != user_id]
@@ -7,8 +7,9 @@ from app.database import SessionLocal
 from app.models.user import User, UserRole
 from app.models.chat import ChatMessage
 from app.models.class_info import ClassInfo
+from app.routers.chat import message_cursor
 from app.services.websocket_manager import manager
-from app.services.notification_service import _send_web_push
+from app.services.push_outbox import drainer, enqueue_push
 import uuid
 
 router = APIRouter()
@@ -66,7 +67,7 @@ async def ws_stream(websocket: WebSocket, token: str = Query(...)):
             try:
                 data = await websocket.receive_json()
             except (ValueError, TypeError):
-                await websocket.send_json({"type": "error", "message": "Invalid JSON"})
+                await manager.send_to_socket(user_id, websocket, {"type": "error", "message": "Invalid JSON"})
                 continue
             msg_type = data.get("type")
 
@@ -89,6 +90,12 @@ async def ws_stream(websocket: WebSocket, token: str = Query(...)):
                         content=content,
                     )
                     db.add(message)
+                    member_ids = get_class_member_ids(db, class_id)
+                    # Web Push 아웃박스 — 보낸 사람 제외, 메시지와 같은 커밋(반 태그로 (user, tag) 병합)
+                    push_queued = bool(enqueue_push(
+                        db, [mid for mid in member_ids if mid != user_id],
+                        f"{sender.name}: {content[:100]}", tag=f"chat-{class_id}", native=False,
+                    ))
                     db.commit()
                     db.refresh(message)
 
@@ -103,24 +110,21 @@ async def ws_stream(websocket: WebSocket, token: str = Query(...)):
                             "avatar": sender.avatar or "",
                             "content": message.content,
                             "timestamp": message.timestamp.isoformat(),
+                            "cursor": message_cursor(message),
                         },
                     }
-                    member_ids = get_class_member_ids(db, class_id)
                 finally:
                     db.close()
 
                 await manager.broadcast_to_users(member_ids, response)
 
-                # Send Web Push to all members except sender
-                sender_name = sender.name
-                push_msg = f"{sender_name}: {content[:100]}"
-                chat_tag = f"chat-{class_id}"
-                for mid in member_ids:
-                    if mid != user_id:
-                        _send_web_push(mid, push_msg, tag=chat_tag)
+                if push_queued:
+                    drainer.wake()
 
             elif msg_type == "ping":
-                await websocket.send_json({"type": "pong"})
+                await manager.send_to_socket(user_id, websocket, {"type": "pong"})
 
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(user_id, websocket)
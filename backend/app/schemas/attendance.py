@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from app.models.attendance import AttendanceStatus
 
@@ -41,6 +41,15 @@ class AttendanceResponse(BaseModel):
         from_attributes = True
 
 
+class AttendanceCounts(BaseModel):
+    total: int
+    present: int
+    late: int
+    absent: int
+    excused: int
+    rate: float  # Attendance rate (present + late) / total
+
+
 class AttendanceStats(BaseModel):
     student_id: str
     student_name: str
@@ -50,3 +59,5 @@ class AttendanceStats(BaseModel):
     absent: int
     excused: int
     rate: float  # Attendance rate (present + late) / total
+    by_class: Optional[Dict[str, AttendanceCounts]] = None  # breakdown=class — 반 id("private"=개인레슨)
+    by_month: Optional[Dict[str, AttendanceCounts]] = None  # breakdown=month — "YYYY-MM"(수업일 기준)
@@ -19,6 +19,7 @@ class ChatMessageResponse(ChatMessageBase):
     sender_role: str
     avatar: str
     timestamp: datetime
+    cursor: str  # (timestamp, id) 위치 — GET /messages?before=/after=에 그대로 (WS new_message와 같은 형식)
 
     class Config:
         from_attributes = True
@@ -9,6 +9,7 @@ users.id를 참조하는 44개 FK를 FK 안전순으로 처리:
 """
 import logging
 import shutil
+from datetime import datetime
 from pathlib import Path
 from sqlalchemy import text
 from sqlalchemy.orm import Session
@@ -17,8 +18,15 @@ from app.services.file_upload import UPLOAD_DIR
 
 logger = logging.getLogger(__name__)
 
-# FK 안전순(손자→자식→주체→사용자). :uid 파라미터.
+# FK 안전순(손자→자식→주체→사용자). :uid·:now 파라미터.
 _PURGE_SQL = [
+    # /api/sync 삭제 기록(ORM after_delete를 타지 않는 raw 삭제라 직접 남김) — 지우기 전에
+    "INSERT INTO sync_tombstones (entity, entity_id, owner_id, deleted_at) "
+    "SELECT 'portfolios', id, student_id, :now FROM portfolios WHERE student_id=:uid",
+    "INSERT INTO sync_tombstones (entity, entity_id, owner_id, deleted_at) "
+    "SELECT 'assignments', id, student_id, :now FROM assignments WHERE student_id=:uid",
+    "INSERT INTO sync_tombstones (entity, entity_id, class_id, deleted_at) "
+    "SELECT 'chat', id, class_id, :now FROM chat_messages WHERE sender_id=:uid",
     # 손자: 내 콘텐츠를 참조하는 것 먼저
     "DELETE FROM answers WHERE question_id IN (SELECT id FROM questions WHERE author_id=:uid)",
     "DELETE FROM audition_checklists WHERE audition_id IN (SELECT id FROM auditions WHERE creator_id=:uid)",
@@ -63,12 +71,13 @@ _PURGE_SQL = [
     "DELETE FROM device_tokens WHERE user_id=:uid",
     "DELETE FROM push_subscriptions WHERE user_id=:uid",
     "DELETE FROM class_students WHERE student_id=:uid",
+    "DELETE FROM class_teachers WHERE teacher_id=:uid",
     "DELETE FROM mock_test_videos WHERE student_id=:uid",
     "DELETE FROM mock_test_entries WHERE student_id=:uid",
     "DELETE FROM scene_rehearsals WHERE student_id=:uid",
     "DELETE FROM interview_revisions WHERE student_id=:uid",
     # 학원 공용기록 보존(삭제된 사용자만 떼어냄)
-    "UPDATE lessons SET teacher_id=NULL WHERE teacher_id=:uid",
+    "UPDATE lessons SET teacher_id=NULL, updated_at=:now WHERE teacher_id=:uid",
     "UPDATE exam_schedules SET created_by=NULL WHERE created_by=:uid",
     "UPDATE music_tracks SET created_by=NULL WHERE created_by=:uid",
     "UPDATE mock_tests SET created_by=NULL WHERE created_by=:uid",
@@ -99,8 +108,14 @@ def _purge_scene_audio(db: Session, uid: str) -> None:
 def purge_user_data(db: Session, uid: str) -> None:
     """사용자와 연관 데이터 전부 삭제(FK 안전순). 커밋은 호출자. 파일은 별도(purge_user_files)."""
     _purge_scene_audio(db, uid)
+    params = {"uid": uid, "now": datetime.utcnow()}
     for stmt in _PURGE_SQL:
-        db.execute(text(stmt), {"uid": uid})
+        db.execute(text(stmt), params)
+    # raw SQL로 로스터/담당을 지웠으므로 반 범위 캐시는 커밋 시 전부 무효화
+    from app.services.class_scope import invalidate_on_commit
+    from app.utils import principal_cache
+    invalidate_on_commit(db, teachers=True)
+    principal_cache.invalidate_on_commit(db, [uid])
 
 
 def purge_user_files(uid: str) -> None:
@@ -0,0 +1,197 @@
+"""반 범위(ACL) 인덱스 — 교사 → 담당 반 → 학생 집합.
+
+교사용 화면 대부분(포트폴리오·식단·출결 통계·제출함·배지)이 get_teacher_student_ids로 범위를 정한다.
+예전엔 매 요청 subject_teachers JSON을 LIKE로 풀스캔하고 반마다 students를 지연 로딩했다.
+
+  - class_teachers 테이블: ClassInfo insert/update/delete 때 매퍼 이벤트가 같은 flush 안에서 동기화한다
+    (app.models 가 이 모듈을 import해 모델만 쓰는 스크립트에도 걸린다). 앱 시작 시 reconcile이 기존 DB·
+    이벤트 밖의 변경을 classes 기준으로 맞춘다.
+  - 프로세스 내 캐시: teacher → class ids, class → student ids. 로스터/담당 교사를 바꾼 세션이
+    커밋(또는 롤백)되면 해당 항목을 비운다 — 커밋 전에 비우면 동시 요청이 옛 값을 다시 채울 수 있다.
+    다른 uvicorn 워커에서 일어난 변경은 CACHE_TTL_SEC 안에 반영된다.
+"""
+import logging
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, attributes, object_session
+
+from app.models.class_info import ClassInfo, class_students, class_teachers
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SEC = 30.0
+_DIRTY_KEY = "class_scope_dirty"
+
+_lock = threading.Lock()
+_gen = 0  # 무효화 세대 — 조회 도중 무효화되면 그 결과는 캐시에 넣지 않는다
+_teacher_classes: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+_class_students: Dict[str, Tuple[float, FrozenSet[str]]] = {}
+
+
+# ── 조회 ──
+
+def teacher_class_ids(db: Session, teacher_id: str) -> List[str]:
+    """교사가 담당하는 반 id (class_teachers 인덱스 조회, 캐시)."""
+    now = time.monotonic()
+    hit = _teacher_classes.get(teacher_id)
+    if hit and hit[0] > now:
+        return list(hit[1])
+    gen = _gen
+    ids = tuple(sorted(set(db.execute(
+        select(class_teachers.c.class_id).where(class_teachers.c.teacher_id == teacher_id)
+    ).scalars())))
+    with _lock:
+        if gen == _gen:
+            _teacher_classes[teacher_id] = (now + CACHE_TTL_SEC, ids)
+    return list(ids)
+
+
+def class_student_sets(db: Session, class_ids: Iterable[str]) -> Dict[str, FrozenSet[str]]:
+    """반 id → 학생 id 집합. 캐시에 없는 반만 IN 쿼리 1회로 채운다."""
+    now = time.monotonic()
+    result: Dict[str, FrozenSet[str]] = {}
+    missing = []
+    for cid in dict.fromkeys(class_ids):
+        hit = _class_students.get(cid)
+        if hit and hit[0] > now:
+            result[cid] = hit[1]
+        else:
+            missing.append(cid)
+    if missing:
+        gen = _gen
+        loaded: Dict[str, set] = {cid: set() for cid in missing}
+        for cid, sid in db.execute(
+            select(class_students.c.class_id, class_students.c.student_id)
+            .where(class_students.c.class_id.in_(missing))
+        ):
+            loaded[cid].add(sid)
+        with _lock:
+            for cid, sids in loaded.items():
+                result[cid] = frozenset(sids)
+                if gen == _gen:
+                    _class_students[cid] = (now + CACHE_TTL_SEC, result[cid])
+    return result
+
+
+def teacher_student_ids(db: Session, teacher_id: str) -> List[str]:
+    """교사 담당 반 전체의 학생 id(중복 제거)."""
+    sets = class_student_sets(db, teacher_class_ids(db, teacher_id))
+    return list(frozenset().union(*sets.values()))
+
+
+# ── 무효화 ──
+
+def invalidate(class_ids: Optional[Iterable[str]] = None, teachers: bool = True) -> None:
+    """class_ids=None이면 로스터 전체, teachers=True면 교사 → 반 매핑도 비운다."""
+    global _gen
+    with _lock:
+        _gen += 1
+        if class_ids is None:
+            _class_students.clear()
+        else:
+            for cid in class_ids:
+                _class_students.pop(cid, None)
+        if teachers:
+            _teacher_classes.clear()
+    # 주체 캐시의 반배정 여부·반 id도 로스터에 의존 — 어느 학생이 바뀌었는지 모르므로 전체
+    from app.utils.principal_cache import invalidate as invalidate_principals
+    invalidate_principals()
+
+
+def invalidate_on_commit(db: Session, class_ids: Optional[Iterable[str]] = None, teachers: bool = False) -> None:
+    """세션이 커밋/롤백될 때 무효화하도록 예약(raw SQL로 로스터를 바꾸는 곳에서 호출)."""
+    dirty = db.info.setdefault(_DIRTY_KEY, {"all": False, "classes": set(), "teachers": False})
+    if class_ids is None:
+        dirty["all"] = True
+    else:
+        dirty["classes"].update(class_ids)
+    dirty["teachers"] = dirty["teachers"] or teachers
+
+
+def _mark(target: ClassInfo, teachers: bool = False) -> None:
+    session = object_session(target)
+    if session is None:
+        invalidate([target.id], teachers=teachers)
+    else:
+        invalidate_on_commit(session, [target.id], teachers=teachers)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _apply_dirty(session: Session) -> None:
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if dirty:
+        invalidate(None if dirty["all"] else dirty["classes"], teachers=dirty["teachers"])
+
+
+# ── class_teachers 동기화 ──
+
+def _teacher_rows(class_id: str, subject_teachers: Optional[dict]) -> List[dict]:
+    return [
+        {"class_id": class_id, "subject": subject, "teacher_id": tid}
+        for subject, tid in (subject_teachers or {}).items() if tid
+    ]
+
+
+@event.listens_for(ClassInfo, "after_insert")
+def _class_inserted(mapper, connection, target: ClassInfo) -> None:
+    rows = _teacher_rows(target.id, target.subject_teachers)
+    if rows:
+        connection.execute(insert(class_teachers), rows)
+    _mark(target, teachers=True)
+
+
+@event.listens_for(ClassInfo, "after_update")
+def _class_updated(mapper, connection, target: ClassInfo) -> None:
+    if not attributes.get_history(target, "subject_teachers").has_changes():
+        return
+    connection.execute(delete(class_teachers).where(class_teachers.c.class_id == target.id))
+    rows = _teacher_rows(target.id, target.subject_teachers)
+    if rows:
+        connection.execute(insert(class_teachers), rows)
+    _mark(target, teachers=True)
+
+
+@event.listens_for(ClassInfo, "before_delete")
+def _class_deleted(mapper, connection, target: ClassInfo) -> None:
+    connection.execute(delete(class_teachers).where(class_teachers.c.class_id == target.id))
+    _mark(target, teachers=True)
+
+
+def _roster_changed(target: ClassInfo, *args, **kwargs) -> None:
+    _mark(target)
+
+
+for _evt in ("append", "remove", "bulk_replace"):
+    event.listen(ClassInfo.students, _evt, _roster_changed)
+
+
+def reconcile(engine: Engine) -> None:
+    """class_teachers를 classes.subject_teachers에 맞춘다(없는 행 추가·남은 행 삭제, 재실행 안전).
+    앱 시작 시 create_all 직후 1회 — 매퍼 이벤트 밖에서 바뀐 classes(raw SQL·이벤트 등록 전 쓰기)를 보정."""
+    try:
+        with engine.begin() as conn:
+            expected = {
+                (row["class_id"], row["subject"]): row["teacher_id"]
+                for class_id, subject_teachers in conn.execute(select(ClassInfo.id, ClassInfo.subject_teachers))
+                for row in _teacher_rows(class_id, subject_teachers)
+            }
+            actual = {(c, s): t for c, s, t in conn.execute(
+                select(class_teachers.c.class_id, class_teachers.c.subject, class_teachers.c.teacher_id))}
+            stale = [key for key, tid in actual.items() if expected.get(key) != tid]
+            missing = [key for key, tid in expected.items() if actual.get(key) != tid]
+            for class_id, subject in stale:
+                conn.execute(delete(class_teachers).where(
+                    class_teachers.c.class_id == class_id, class_teachers.c.subject == subject))
+            if missing:
+                conn.execute(insert(class_teachers), [
+                    {"class_id": c, "subject": s, "teacher_id": expected[(c, s)]} for c, s in missing])
+        if stale or missing:
+            logger.info(f"class_scope: reconciled class_teachers (+{len(missing)} / -{len(stale)})")
+            invalidate()
+    except Exception as e:
+        logger.error(f"class_scope: reconcile failed: {e}")
@@ -0,0 +1,143 @@
+"""엔티티 버전 카운터 — 목록 GET의 약한 ETag / 304.
+
+클라이언트는 data_changed 이벤트를 받을 때마다 목록 전체를 다시 받는다(범위 안에서 바뀐 게 없어도).
+(엔티티, 범위)마다 카운터를 두고 data_changed / 알림 발행 때 올려, 목록 GET의 약한 ETag로 쓴다.
+If-None-Match가 현재 태그와 같으면 쿼리·직렬화 없이 304(conditional_list 의존성).
+
+  - 범위: 사용자 id. 원장은 이벤트 대상에서 빠지는 경우가 있어 엔티티 전체 범위("*")를 쓴다 —
+    어느 사용자에게 발행돼도 "*"는 함께 오른다.
+  - 올리는 곳: ConnectionManager._deliver_local(브로커 구독 콜백) — 다중 워커(redis)에서도 모든 워커가
+    같은 발행을 받으므로 워커마다 카운터가 오른다. notify_user_sync(WS 없이 저장)는 직접 올린다.
+  - 자기 쓰기: 이벤트를 자기에게 보내지 않는 쓰기도 있어, 인증된 요청 세션(get_db·get_async_db 모두)이
+    무언가 쓰고 커밋하면 그 사용자의 "자기" 카운터를 올린다(커밋 후 — 커밋 전에 올리면 옛 데이터에 새 태그가 붙는다).
+  - 안전망: 태그에 MAX_AGE_SEC 단위 시간 구간을 넣어, 발행이 빠진 변경도 그 안에 반영된다.
+  - 프로세스 epoch: 재시작·다른 워커가 발급한 태그는 일치하지 않는다(불일치 = 전체 응답, 안전한 쪽).
+"""
+import hashlib
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user import UserRole
+
+MAX_AGE_SEC = 300
+ALL_SCOPE = "*"
+_SELF = "__self__"
+_EVERYONE = "__everyone__"
+_PRINCIPAL_KEY = "entity_versions_principal"
+_WROTE_KEY = "entity_versions_wrote"
+_REQUEST_SESSIONS_KEY = "entity_versions_sessions"
+
+_epoch = uuid.uuid4().hex[:8]
+_lock = threading.Lock()
+_versions: Dict[Tuple[str, str], int] = defaultdict(int)
+
+
+def bump(entity: str, scopes: Iterable[str]) -> None:
+    with _lock:
+        for scope in scopes:
+            _versions[(entity, scope)] += 1
+        _versions[(entity, ALL_SCOPE)] += 1
+
+
+def bump_all(entity: str) -> None:
+    """범위를 특정하기 어려운 변경(백그라운드 URL 재작성 등) — 그 엔티티의 모든 사용자 태그를 무효화."""
+    with _lock:
+        _versions[(entity, _EVERYONE)] += 1
+
+
+def version(entity: str, scope: str) -> int:
+    # 카운터는 오르기만 하므로 합도 어느 쪽이 오르든 바뀐다
+    return _versions.get((entity, scope), 0) + _versions.get((entity, _EVERYONE), 0)
+
+
+def observe(user_ids: List[str], message: dict) -> None:
+    """실시간 발행 1건을 카운터에 반영(브로커 구독 콜백에서 호출)."""
+    kind = message.get("type")
+    if kind == "data_changed" and message.get("entity"):
+        bump(message["entity"], user_ids)
+    elif kind == "new_notification":
+        bump("notifications", user_ids)
+
+
+def etag(entity: str, user_id: str, role: UserRole, query: str = "") -> str:
+    scope = ALL_SCOPE if role == UserRole.DIRECTOR else user_id
+    bucket = int(time.time() // MAX_AGE_SEC)
+    q = hashlib.blake2s(query.encode(), digest_size=4).hexdigest() if query else "0"
+    return (f'W/"{_epoch}-{bucket:x}-{version(entity, scope):x}-'
+            f'{version(_SELF, user_id):x}-{q}"')
+
+
+def _matches(if_none_match: str, tag: str) -> bool:
+    # 약한 비교: W/ 접두사 무시
+    opaque = tag[2:]
+    return any(t.strip().removeprefix("W/") == opaque for t in if_none_match.split(","))
+
+
+def conditional_list(entity: str) -> Callable:
+    """목록 GET 의존성: If-None-Match가 현재 태그면 304(엔드포인트 본문 실행 안 함), 아니면 응답에 ETag."""
+    from app.utils.auth import get_current_principal
+
+    def check(request: Request, response: Response, principal=Depends(get_current_principal)) -> None:
+        tag = etag(entity, principal.id, principal.role, request.url.query)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, tag):
+            raise HTTPException(status_code=304, headers={"ETag": tag})
+        response.headers["ETag"] = tag
+
+    return check
+
+
+# ── 자기 쓰기 추적(세션 커밋 후) ──
+
+def track_writes(db: Session, user_id: str) -> None:
+    """요청 세션에 인증 주체를 표시 — 이 세션이 쓰고 커밋하면 그 사용자의 자기 카운터를 올린다."""
+    db.info[_PRINCIPAL_KEY] = user_id
+
+
+def track_request(request: Request, db: Optional[Session] = None, user_id: Optional[str] = None) -> None:
+    """요청 단위로 주체와 세션을 묶는다 — get_db·get_async_db(sync_session)·get_current_principal은
+    어느 순서로 해석될지 모르므로, 둘 중 나중에 온 쪽에서 지금까지 모인 세션 모두에 track_writes."""
+    state = request.state
+    sessions = getattr(state, _REQUEST_SESSIONS_KEY, None)
+    if sessions is None:
+        sessions = []
+        setattr(state, _REQUEST_SESSIONS_KEY, sessions)
+    if db is not None:
+        sessions.append(db)
+    if user_id is not None:
+        setattr(state, _PRINCIPAL_KEY, user_id)
+    principal_id = getattr(state, _PRINCIPAL_KEY, None)
+    if principal_id is not None:
+        for session in sessions:
+            track_writes(session, principal_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _flushed(session: Session, flush_context) -> None:
+    if _PRINCIPAL_KEY in session.info and (session.new or session.dirty or session.deleted):
+        session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _executed(orm_execute_state) -> None:
+    session = orm_execute_state.session
+    if _PRINCIPAL_KEY in session.info and not orm_execute_state.is_select:
+        session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _committed(session: Session) -> None:
+    if session.info.pop(_WROTE_KEY, False):
+        bump(_SELF, [session.info[_PRINCIPAL_KEY]])
+
+
+@event.listens_for(Session, "after_rollback")
+def _rolled_back(session: Session) -> None:
+    session.info.pop(_WROTE_KEY, None)
@@ -1,5 +1,6 @@
 from pathlib import Path
 from fastapi import UploadFile, HTTPException
+import errno
 import os
 import re
 import uuid
@@ -84,7 +85,48 @@ def is_video(filename: str) -> bool:
 CHUNK_SIZE = 4 * 1024 * 1024  # 4MB chunks
 MIN_VIDEO_SIZE = 1024  # 1KB — anything smaller is a failed/corrupt upload
 
-# Limit concurrent ffmpeg processes — M4 Pro 14-core can handle more
+# 청크를 최종 파일의 제 위치(offset)에 바로 쓰는 모드(pwrite) 지원 여부 — 없으면(Windows) 청크 파일 모드
+DIRECT_WRITE_SUPPORTED = hasattr(os, "pwrite")
+
+
+def preallocate(path: Path, size: int) -> None:
+    """최종 파일을 size로 미리 잡아둔다(동기 — threadpool에서). posix_fallocate가 있으면 실제 블록을 예약해
+    업로드 도중 디스크 부족을 init에서 드러내고, 없거나 파일시스템이 거부하면 sparse truncate."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if size and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, size)
+                return
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    raise
+        os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+def write_at(path: Path, offset: int, data: bytes) -> None:
+    """offset 위치에 쓰기(pwrite — 파일 포인터 공유 없음, 병렬 청크끼리 안전). 동기 — threadpool에서."""
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        view = memoryview(data)
+        while view:
+            n = os.pwrite(fd, view, offset)
+            view, offset = view[n:], offset + n
+    finally:
+        os.close(fd)
+
+
+def fsync_file(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# Limit concurrent ffmpeg processes per process — API에선 썸네일 추출만, 압축은 media_jobs 워커 프로세스마다 1개씩
 _compression_semaphore = threading.Semaphore(6)
 
 
@@ -92,11 +134,13 @@ async def save_file(
     file: UploadFile,
     subfolder: str = "assignments",
     user_id: Optional[str] = None,
+    hasher=None,
 ) -> Tuple[str, str]:
     """Save uploaded file and return (relative_url, original_filename).
 
     Files are stored under UPLOAD_DIR/subfolder/user_id/ when user_id is provided,
     making it easy to identify file ownership from the filesystem.
+    hasher(hashlib 객체)를 주면 저장하며 흘러가는 바이트를 함께 해시한다(중복 제거 — services/upload_blobs).
     """
     validate_file(file)
 
@@ -120,6 +164,8 @@ async def save_file(
                         status_code=400,
                         detail=f"File too large. Maximum size: {max_mb}MB",
                     )
+                if hasher is not None:
+                    hasher.update(chunk)
                 await f.write(chunk)
     except HTTPException:
         target_path.unlink(missing_ok=True)
@@ -152,7 +198,7 @@ def is_image(filename: str) -> bool:
 
 
 def compress_image_sync(file_path: str) -> None:
-    """Compress and resize image IN PLACE (writes JPEG bytes into the original path).
+    """Compress and resize image, replacing the file at the original path with JPEG bytes.
 
     The extension is intentionally NOT changed so the URL already stored on the
     record (portfolio/diet/assignment) stays valid. <img>/<video poster> sniff the
@@ -185,8 +231,16 @@ def compress_image_sync(file_path: str) -> None:
             img.thumbnail((IMAGE_MAX_DIMENSION, IMAGE_MAX_DIMENSION), Image.LANCZOS)
 
         original_size = src.stat().st_size
-        # Always write JPEG bytes into the SAME path (format forced; extension kept)
-        img.save(src, format='JPEG', quality=IMAGE_QUALITY, optimize=True)
+        # Always write JPEG bytes to the SAME path (format forced; extension kept) — via a sibling
+        # temp file + os.replace: the upload may be a hard link to a .blobs entry / other users'
+        # deduplicated URLs, and writing the inode in place would re-encode every linked copy.
+        tmp_out = src.with_name(f".{src.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            img.save(tmp_out, format='JPEG', quality=IMAGE_QUALITY, optimize=True)
+            img.close()
+            os.replace(tmp_out, src)
+        finally:
+            tmp_out.unlink(missing_ok=True)
         compressed_size = src.stat().st_size
 
         logger.info(
@@ -270,16 +324,21 @@ def _should_skip_compression(probe_data: dict) -> bool:
     return False
 
 
-def compress_video_sync(file_path: str, user_id: Optional[str] = None) -> None:
-    """Compress video with ffmpeg. Replaces original file on success."""
+def transcode_video(file_path: str, user_id: Optional[str] = None) -> dict:
+    """ffmpeg 변환만 — DB 갱신·알림 같은 부작용 없이 결과를 돌려준다(media_jobs 자식 프로세스에서 실행).
+
+    반환: {"status": "done" | "failed" | "skipped", "renamed_to": 바뀐 경로(.mov→.mp4 등, 없으면 None)}
+      - skipped: 원본 없음·ffmpeg 없음·ffmpeg 비정상 종료(원본 유지, 알림 없음)
+      - failed: 시간 초과·예외(원본 유지, 실패 알림 대상)
+    """
     src = Path(file_path)
     if not src.exists():
         logger.warning(f"compress_video: source not found: {file_path}")
-        return
+        return {"status": "skipped", "renamed_to": None}
 
     if not check_ffmpeg():
         logger.warning("ffmpeg not installed, skipping video compression")
-        return
+        return {"status": "skipped", "renamed_to": None}
 
     # Probe video to check if compression is needed
     probe = _probe_video(file_path)
@@ -296,26 +355,40 @@ def compress_video_sync(file_path: str, user_id: Optional[str] = None) -> None:
                 result = subprocess.run(remux_cmd, capture_output=True, timeout=60)
                 if result.returncode == 0:
                     src.unlink(missing_ok=True)
-                    _update_video_urls_in_db(str(src), str(final_path))
                     logger.info(f"Video re-muxed (no compression needed): {src.name} → {final_path.name}")
+                    return {"status": "done", "renamed_to": str(final_path)}
                 else:
                     logger.warning(f"Re-mux failed, falling through to compression: {result.stderr.decode(errors='replace')[:200]}")
                     final_path.unlink(missing_ok=True)
                     # Fall through to full compression below
                     with _compression_semaphore:
-                        _do_compress(src, user_id)
-                    return
+                        return _do_compress(src, user_id)
             except Exception as e:
                 logger.warning(f"Re-mux error: {e}")
                 final_path.unlink(missing_ok=True)
-        if user_id:
-            _notify_file_ready(user_id)
-        return
+        return {"status": "done", "renamed_to": None}
 
     # Throttle: wait if too many compressions already running
     logger.info(f"Waiting for compression slot: {src.name}")
     with _compression_semaphore:
-        _do_compress(src, user_id)
+        return _do_compress(src, user_id)
+
+
+def apply_video_outcome(file_path: str, user_id: Optional[str], outcome: dict) -> None:
+    """transcode_video 결과의 부작용 — 바뀐 URL 반영과 완료/실패 알림.
+
+    알림은 entity_versions·푸시 드레이너를 건드리므로 API(또는 워커 부모) 프로세스에서 호출해야 한다."""
+    if outcome.get("renamed_to"):
+        _update_video_urls_in_db(file_path, outcome["renamed_to"])
+    if user_id and outcome.get("status") == "done":
+        _notify_file_ready(user_id)
+    elif user_id and outcome.get("status") == "failed":
+        _notify_compression_failed(user_id)
+
+
+def compress_video_sync(file_path: str, user_id: Optional[str] = None) -> None:
+    """Compress video with ffmpeg. Replaces original file on success (변환 + 부작용, 같은 프로세스)."""
+    apply_video_outcome(file_path, user_id, transcode_video(file_path, user_id))
 
 
 def extract_thumbnail(video_path: str) -> Optional[str]:
@@ -347,18 +420,19 @@ def extract_thumbnail(video_path: str) -> Optional[str]:
     return None
 
 
-def _do_compress(src: Path, user_id: Optional[str]) -> None:
-    """Internal: run ffmpeg and notify on completion."""
+def _do_compress(src: Path, user_id: Optional[str]) -> dict:
+    """Internal: run ffmpeg. 결과는 transcode_video 와 같은 모양(알림·DB 갱신은 호출자)."""
     # Output to temp file, then swap
     tmp_out = src.with_suffix(".tmp.mp4")
     scale_filter = "scale='if(gte(iw,ih),min(1280,iw),-2)':'if(gte(iw,ih),-2,min(1280,ih))'"
 
     # libx264 with CRF gives better size control than VideoToolbox fixed bitrate
+    threads = str(settings.MEDIA_FFMPEG_THREADS)  # 머신별 CPU 예산(media_jobs)
     cmd = [
-        "ffmpeg", "-y", "-threads", "8", "-i", str(src),
+        "ffmpeg", "-y", "-threads", threads, "-i", str(src),
         "-map", "0:v:0", "-map", "0:a:0?",
         "-c:v", "libx264", "-preset", "fast", "-crf", "28",
-        "-threads", "8",
+        "-threads", threads,
         "-vf", scale_filter,
         "-c:a", "aac", "-b:a", "128k",
         "-movflags", "+faststart",
@@ -401,7 +475,7 @@ def _do_compress(src: Path, user_id: Optional[str]) -> None:
             stderr_data = b"".join(stderr_lines)
             logger.error(f"ffmpeg failed: {stderr_data.decode(errors='replace')[:500]}")
             tmp_out.unlink(missing_ok=True)
-            return
+            return {"status": "skipped", "renamed_to": None}
 
         # Swap: delete original, rename compressed
         original_size = src.stat().st_size
@@ -417,26 +491,18 @@ def _do_compress(src: Path, user_id: Optional[str]) -> None:
             f"({100 - compressed_size * 100 // max(original_size, 1)}% reduction)"
         )
 
-        # Update DB URLs if extension changed (.mov/.webm → .mp4)
-        if old_suffix != ".mp4":
-            _update_video_urls_in_db(str(src), str(final_path))
-
-        # Send WS notification if user connected
-        if user_id:
-            _notify_file_ready(user_id)
+        # DB URL은 확장자가 바뀐 경우만(.mov/.webm → .mp4)
+        return {"status": "done", "renamed_to": str(final_path) if old_suffix != ".mp4" else None}
 
     except subprocess.TimeoutExpired:
         proc.kill()
         proc.wait(timeout=5)
         logger.error(f"ffmpeg timeout (600s) for {src} ({src.stat().st_size // 1024}KB)")
         tmp_out.unlink(missing_ok=True)
-        if user_id:
-            _notify_compression_failed(user_id)
     except Exception as e:
         logger.error(f"compress_video error: {e}")
         tmp_out.unlink(missing_ok=True)
-        if user_id:
-            _notify_compression_failed(user_id)
+    return {"status": "failed", "renamed_to": None}
 
 
 def _update_video_urls_in_db(old_path: str, new_path: str) -> None:
@@ -497,6 +563,9 @@ def _update_video_urls_in_db(old_path: str, new_path: str) -> None:
 
             if updated:
                 db.commit()
+                # 피드 카드에 옛 파일 URL이 남은 304를 막는다(누구의 피드에 보이는지 여기선 모름)
+                from app.services import entity_versions
+                entity_versions.bump_all("portfolios")
                 logger.info(f"Updated {updated} DB record(s): {old_url} -> {new_url}")
             else:
                 db.rollback()
@@ -0,0 +1,368 @@
+"""미디어 처리 작업 큐 — 영상 압축·이미지 최적화를 API 프로세스 밖 프로세스 풀에서, 재시작에도 유실 없이.
+
+예전에는 업로드 응답 뒤 BackgroundTasks → compress_video_sync 가 API 프로세스 안에서 돌았다(썸네일과 공유하는
+Semaphore(6)만으로 제한). 재시작하면 작업이 사라지고, 대기열을 볼 수 없고, 8스레드 ffmpeg 6개가 API의 CPU를 잡아먹었다.
+
+흐름:
+  1) 업로드가 media_jobs 행을 넣고 커밋(enqueue) → wake().
+  2) MediaWorker 가 우선순위 순으로 빈 슬롯만큼 임대(lease)해 프로세스 풀(spawn)에 넘긴다.
+     실행 중인 작업은 하트비트로 임대를 연장 — 워커가 죽으면 LEASE_SEC 뒤 다른 워커/재시작 후 재수거.
+  3) 끝나면 done, 예외·자식 프로세스 사망이면 백오프 후 재시도, MAX_ATTEMPTS 넘기면 dead.
+
+  - 레인: LANES(작을수록 먼저). 모의테스트 영상 > 시청각 자료 > 과제 > 연습 영상(포트폴리오) > 기타.
+  - 동시 실행 수: settings.MEDIA_WORKER_CONCURRENCY(머신마다 그 머신의 환경 변수), ffmpeg 스레드는
+    settings.MEDIA_FFMPEG_THREADS — 둘의 곱이 그 머신에 내주는 CPU 예산.
+  - 실행 위치: settings.MEDIA_WORKER_MODE="inline"이면 API가 시작 시 워커를 띄우고(프로세스 풀이라 GIL·CPU
+    경합은 분리), "external"이면 API는 넣기만 하고 `python -m app.media_worker` 가 처리한다(다른 머신 가능 —
+    업로드 디렉토리와 DB를 공유해야 한다).
+  - 자식은 변환만 하고 결과(done/failed/skipped, 바뀐 경로)를 돌려준다. URL 재작성·완료/실패 알림은
+    부모(워커 스레드)가 finish 뒤에 apply_result 로 — 자식에서 하면 API 프로세스의 entity_versions 카운터가
+    오르지 않고(목록 304가 새 알림을 가린다), 자식마다 푸시 아웃박스 드레이너 스레드가 생긴다.
+    external 모드에서는 부모가 단독 워커 프로세스라 API 쪽 목록 태그는 MAX_AGE_SEC 구간 안에 반영된다.
+  - ffmpeg 실패는 transcode_video 가 스스로 처리(원본 유지)하고 결과로 알려주므로 그 경우도 done이다.
+    재시도는 예외·프로세스 크래시·임대 만료(처리 중 워커 사망) 때.
+"""
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.models.media_job import MediaJob
+
+logger = logging.getLogger(__name__)
+
+LANES: Dict[str, int] = {
+    "mock_test": 0,
+    "media": 10,
+    "assignment": 20,
+    "practice": 30,
+    "default": 40,
+}
+_TARGET_LANES = {
+    "mock_test_video": "mock_test",
+    "mock_test_audio": "mock_test",
+    "media_resource": "media",
+    "assignment": "assignment",
+    "portfolio": "practice",
+    "portfolio_video": "practice",
+}
+
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SEC = 60          # 1m, 2m …
+LEASE_SEC = 120
+HEARTBEAT_SEC = 30
+POLL_SEC = 5.0
+DONE_RETENTION = timedelta(days=3)
+DEAD_RETENTION = timedelta(days=14)
+ACTIVE_STATUSES = ("pending", "running")
+
+
+def lane_for(target_type: Optional[str]) -> str:
+    return _TARGET_LANES.get(target_type or "", "default")
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    path: str,
+    user_id: Optional[str] = None,
+    content_key: Optional[str] = None,
+    target_type: Optional[str] = None,
+) -> MediaJob:
+    """작업 행을 세션에 추가만 한다(커밋은 호출자)."""
+    lane = lane_for(target_type)
+    job = MediaJob(
+        id=f"mj{uuid.uuid4().hex[:12]}",
+        kind=kind,
+        path=path,
+        user_id=user_id,
+        content_key=content_key,
+        lane=lane,
+        priority=LANES[lane],
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+        created_at=datetime.utcnow(),
+    )
+    db.add(job)
+    return job
+
+
+def queue_position(db: Session, job: MediaJob) -> int:
+    """0 = 처리 중, n = 내 앞에 대기 중인 작업 n−1개(레인 우선, 같은 레인은 먼저 온 순)."""
+    if job.status != "pending":
+        return 0
+    ahead = db.query(func.count(MediaJob.id)).filter(
+        MediaJob.status == "pending",
+        or_(MediaJob.priority < job.priority,
+            and_(MediaJob.priority == job.priority, MediaJob.created_at < job.created_at)),
+    ).scalar()
+    return (ahead or 0) + 1
+
+
+def queue_positions(db: Session) -> Dict[str, int]:
+    """대기 중 작업 전체의 순번을 한 번의 쿼리로 → {job_id: 1부터}. 목록 응답에서 행마다 COUNT 하지 않도록."""
+    ids = db.query(MediaJob.id).filter(MediaJob.status == "pending").order_by(
+        MediaJob.priority, MediaJob.created_at, MediaJob.id,
+    ).all()
+    return {job_id: n for n, (job_id,) in enumerate(ids, 1)}
+
+
+def job_to_response(db: Session, job: MediaJob, positions: Optional[Dict[str, int]] = None) -> dict:
+    """positions(queue_positions 결과)를 넘기면 순번을 거기서 읽는다 — 없으면 작업별 COUNT."""
+    if positions is not None:
+        position = positions.get(job.id, 0) if job.status == "pending" else 0
+    else:
+        position = queue_position(db, job)
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "lane": job.lane,
+        "status": job.status,
+        "position": position,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "last_error": job.last_error,
+    }
+
+
+def run_job(kind: str, path: str, user_id: Optional[str], content_key: Optional[str]) -> dict:
+    """작업 1건 실행 — 프로세스 풀 자식에서 호출(피클 가능한 최상위 함수). 부작용 없이 결과만 돌려준다."""
+    from app.services.file_upload import compress_image_sync, transcode_video
+    from app.services import upload_blobs
+
+    if kind == "video":
+        outcome = transcode_video(path, user_id)
+    elif kind == "image":
+        compress_image_sync(path)
+        outcome = {"status": "done", "renamed_to": None}
+    else:
+        raise ValueError(f"unknown media job kind: {kind}")
+    if content_key:
+        upload_blobs.adopt(content_key, path)
+    return outcome
+
+
+def apply_result(kind: str, path: str, user_id: Optional[str], outcome: Optional[dict]) -> None:
+    """run_job 결과의 부작용(URL 재작성·완료/실패 알림) — 부모 프로세스에서."""
+    if kind == "video" and outcome:
+        from app.services.file_upload import apply_video_outcome
+        apply_video_outcome(path, user_id, outcome)
+
+
+# ── 임대 ──
+
+def _due(now: datetime):
+    return or_(
+        and_(MediaJob.status == "pending", MediaJob.next_attempt_at <= now),
+        and_(MediaJob.status == "running", MediaJob.lease_until < now),
+    )
+
+
+def claim(db: Session, owner: str, limit: int, now: Optional[datetime] = None) -> List[MediaJob]:
+    """기한 도래 작업을 우선순위 순으로 최대 limit건 임대. 임대 만료(처리 중 워커 사망)가 한도를 넘긴 작업은 dead."""
+    now = now or datetime.utcnow()
+    if limit <= 0:
+        return []
+    db.query(MediaJob).filter(
+        MediaJob.status == "running", MediaJob.lease_until < now, MediaJob.attempts >= MAX_ATTEMPTS,
+    ).update({MediaJob.status: "dead", MediaJob.lease_owner: None, MediaJob.finished_at: now,
+              MediaJob.last_error: "lease expired (worker crashed)"}, synchronize_session=False)
+    ids = [i for (i,) in db.query(MediaJob.id).filter(_due(now))
+           .order_by(MediaJob.priority, MediaJob.created_at).limit(limit).all()]
+    if not ids:
+        db.commit()
+        return []
+    # 조건부 UPDATE — 다른 워커가 그새 집어간 행은 빠진다
+    db.execute(
+        update(MediaJob)
+        .where(MediaJob.id.in_(ids), _due(now))
+        .values(status="running", lease_owner=owner, lease_until=now + timedelta(seconds=LEASE_SEC),
+                attempts=MediaJob.attempts + 1, started_at=now)
+    )
+    db.commit()
+    return (db.query(MediaJob)
+            .filter(MediaJob.id.in_(ids), MediaJob.lease_owner == owner, MediaJob.status == "running")
+            .order_by(MediaJob.priority, MediaJob.created_at).all())
+
+
+def renew(db: Session, owner: str, ids: List[str], now: Optional[datetime] = None) -> None:
+    """하트비트: 실행 중인 내 작업의 임대 연장."""
+    if not ids:
+        return
+    now = now or datetime.utcnow()
+    db.query(MediaJob).filter(MediaJob.id.in_(ids), MediaJob.lease_owner == owner).update(
+        {MediaJob.lease_until: now + timedelta(seconds=LEASE_SEC)}, synchronize_session=False)
+    db.commit()
+
+
+def finish(db: Session, job_id: str, owner: str, error: Optional[str] = None,
+           now: Optional[datetime] = None) -> bool:
+    """결과 반영. 임대를 잃은(다른 워커가 재수거한) 작업이면 아무것도 하지 않고 False."""
+    now = now or datetime.utcnow()
+    job = db.query(MediaJob).filter(MediaJob.id == job_id, MediaJob.lease_owner == owner).first()
+    if job is None or job.status != "running":
+        return False
+    job.lease_owner = None
+    job.lease_until = None
+    if error is None:
+        job.status = "done"
+        job.finished_at = now
+    else:
+        job.last_error = error[:500]
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = "dead"
+            job.finished_at = now
+            logger.warning(f"Media job gave up after {job.attempts} attempts: {job.id} ({job.path})")
+        else:
+            job.status = "pending"
+            job.next_attempt_at = now + timedelta(seconds=BACKOFF_BASE_SEC * 2 ** (job.attempts - 1))
+    db.commit()
+    return True
+
+
+def prune(db: Session, now: Optional[datetime] = None) -> int:
+    now = now or datetime.utcnow()
+    n = db.query(MediaJob).filter(
+        or_(and_(MediaJob.status == "done", MediaJob.finished_at < now - DONE_RETENTION),
+            and_(MediaJob.status == "dead", MediaJob.finished_at < now - DEAD_RETENTION))
+    ).delete(synchronize_session=False)
+    db.commit()
+    return n or 0
+
+
+# ── 워커 ──
+
+class MediaWorker:
+    """임대 루프 + 프로세스 풀. API 안(inline)에서는 스레드로, 단독 실행(app.media_worker)에서는 포그라운드로."""
+
+    def __init__(self, concurrency: Optional[int] = None, session_factory=None,
+                 executor_factory: Optional[Callable[[int], object]] = None,
+                 runner: Callable = run_job, on_result: Callable = apply_result):
+        self._concurrency = concurrency
+        self._session_factory = session_factory
+        self._executor_factory = executor_factory
+        self._runner = runner
+        self._on_result = on_result
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._executor = None
+        self._running: Dict[str, Tuple[Future, tuple]] = {}  # job id → (future, (kind, path, user_id))
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._last_heartbeat = datetime.min
+        self._last_prune = datetime.min
+
+    # ── 구성 ──
+    @property
+    def concurrency(self) -> int:
+        if self._concurrency is not None:
+            return self._concurrency
+        from app.config import settings
+        return max(1, settings.MEDIA_WORKER_CONCURRENCY)
+
+    def _session(self) -> Session:
+        if self._session_factory is not None:
+            return self._session_factory()
+        from app.database import SessionLocal
+        return SessionLocal()
+
+    def _pool(self):
+        # 첫 작업 때 생성 — 작업이 없으면 자식 프로세스를 띄우지 않는다
+        if self._executor is None:
+            if self._executor_factory is not None:
+                self._executor = self._executor_factory(self.concurrency)
+            else:
+                # spawn: 스레드가 도는 API 프로세스를 fork하지 않는다(macOS 기본과도 같음)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.concurrency, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    # ── 수명 ──
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive() and not self._stop.is_set():
+            return
+        with self._lock:
+            self._stop.clear()
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self.run_forever, name="media-worker", daemon=True)
+            self._thread.start()
+
+    def wake(self) -> None:
+        """새 작업 커밋 직후 호출 — 폴링 주기를 기다리지 않고 바로 수거."""
+        self.start()
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._executor is not None:
+            # 실행 중인 작업은 임대 만료 뒤 다음 실행에서 다시 처리된다
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def run_forever(self) -> None:
+        logger.info(f"Media worker started ({self.owner}, concurrency={self.concurrency})")
+        while not self._stop.is_set():
+            self._wake.wait(POLL_SEC)
+            self._wake.clear()
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Media worker tick failed: {e}")
+
+    # ── 한 주기 ──
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """끝난 작업 반영 → 하트비트 → 빈 슬롯만큼 임대·제출. 반환: 새로 제출한 수."""
+        now = now or datetime.utcnow()
+        db = self._session()
+        try:
+            self._reap(db)
+            if self._running and now - self._last_heartbeat >= timedelta(seconds=HEARTBEAT_SEC):
+                renew(db, self.owner, list(self._running), now)
+                self._last_heartbeat = now
+            jobs = claim(db, self.owner, self.concurrency - len(self._running), now)
+            for job in jobs:
+                fut = self._pool().submit(self._runner, job.kind, job.path, job.user_id, job.content_key)
+                fut.add_done_callback(lambda _: self._wake.set())
+                self._running[job.id] = (fut, (job.kind, job.path, job.user_id))
+                logger.info(f"Media job started: {job.id} [{job.lane}] {os.path.basename(job.path)}")
+            if not jobs and not self._running and now - self._last_prune >= timedelta(hours=1):
+                self._last_prune = now
+                prune(db, now)
+            return len(jobs)
+        finally:
+            db.close()
+
+    def _reap(self, db: Session) -> None:
+        for job_id, (fut, (kind, path, user_id)) in list(self._running.items()):
+            if not fut.done():
+                continue
+            del self._running[job_id]
+            error, outcome = None, None
+            try:
+                outcome = fut.result()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Media job failed: {job_id}: {error}")
+                if "BrokenProcessPool" in type(e).__name__:
+                    self._executor = None  # 자식이 죽어 풀이 망가짐 — 다음 제출 때 새로
+            # 임대를 잃은 작업의 결과는 새 주인이 반영한다(알림 중복 방지)
+            if finish(db, job_id, self.owner, error) and error is None:
+                try:
+                    self._on_result(kind, path, user_id, outcome)
+                except Exception as e:
+                    logger.error(f"Media job result handling failed: {job_id}: {e}")
+
+
+worker = MediaWorker()
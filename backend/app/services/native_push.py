@@ -1,21 +1,30 @@
 """네이티브 푸시(FCM=Android, APNs=iOS) 발송.
 
-설계 원칙: 자격증명/패키지가 없으면 **조용히 무동작**한다(웹푸시 _send_web_push_sync 와 동일).
+설계 원칙: 자격증명/패키지가 없으면 **조용히 무동작**한다(웹푸시 web_push_configured 와 동일).
 따라서 자격증명을 넣기 전에도 백엔드는 정상 구동하며, 넣는 즉시 켜진다.
 
 활성화하려면:
   - Android: settings.FCM_CREDENTIALS_FILE = Firebase 서비스계정 JSON 경로 (+ `pip install firebase-admin`)
   - iOS: settings.APNS_KEY_FILE/.APNS_KEY_ID/.APNS_TEAM_ID 설정 (+ `pip install "httpx[http2]"`)
+
+Android는 수신자 전체 토큰을 FCM_MULTICAST_MAX 단위 멀티캐스트로 묶어 보내고, FCM/APNs가
+등록 해제로 응답한 토큰은 DeviceToken에서 한 번에 지운다.
+APNs는 프로세스당 ApnsClient 1개가 환경별 HTTP/2 연결을 유지하며 토큰들을 동시 스트림으로 보낸다.
 """
+import asyncio
 import json
 import logging
 import threading
 import time
-from typing import List, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
 _fcm_initialized = False
+_apns_lock = threading.Lock()
 
 
 def native_push_configured() -> bool:
@@ -45,73 +54,388 @@ def _ensure_fcm_app():
         return None
 
 
-def _send_fcm(tokens: List[str], title: str, body: str, data: Optional[dict]) -> None:
-    if not tokens or not _ensure_fcm_app():
-        return
-    try:
+# FCM 멀티캐스트 1회 요청당 토큰 상한
+FCM_MULTICAST_MAX = 500
+
+
+class FcmTransport(ABC):
+    """FCM 발송 수단 인터페이스. 배치 1건(≤ FCM_MULTICAST_MAX 토큰)을 보내고 토큰별 결과를 돌려준다.
+    결과: 'sent' | 'unregistered'(앱 삭제 등) | 'invalid'(다른 프로젝트/잘못된 토큰)
+          | 'failed'(일시 오류 — 재시도 대상) | 'rejected'(잘못된 요청 등 재시도해도 같은 결과)"""
+
+    @abstractmethod
+    def send_multicast(self, tokens: List[str], title: str, body: str, data: Optional[dict]) -> List[str]:
+        ...
+
+
+class FirebaseTransport(FcmTransport):
+    """firebase-admin send_each_for_multicast — 배치 1건을 SDK가 병렬 HTTP 요청으로 보낸다."""
+
+    def send_multicast(self, tokens, title, body, data):
+        if not _ensure_fcm_app():
+            return ["failed"] * len(tokens)
         from firebase_admin import messaging
-        for t in tokens:
+        resp = messaging.send_each_for_multicast(messaging.MulticastMessage(
+            tokens=tokens,
+            notification=messaging.Notification(title=title, body=body),
+            data={k: str(v) for k, v in (data or {}).items()},
+        ))
+        results = []
+        for t, r in zip(tokens, resp.responses):
+            if r.success:
+                results.append("sent")
+            elif isinstance(r.exception, messaging.UnregisteredError):
+                results.append("unregistered")
+            elif isinstance(r.exception, messaging.SenderIdMismatchError):
+                results.append("invalid")
+            else:
+                logger.warning(f"FCM 전송 실패(token {t[:12]}…): {r.exception}")
+                results.append("failed" if isinstance(r.exception, _fcm_transient_errors()) else "rejected")
+        return results
+
+
+def _fcm_transient_errors() -> tuple:
+    """UNAVAILABLE·INTERNAL·시간 초과·할당량 초과 — 나중에 다시 보내면 성공할 수 있는 오류."""
+    from firebase_admin import exceptions, messaging
+    return (exceptions.UnavailableError, exceptions.InternalError, exceptions.DeadlineExceededError,
+            exceptions.UnknownError, messaging.QuotaExceededError)
+
+
+_fcm_transport: Optional[FcmTransport] = None
+
+
+def set_fcm_transport(transport: Optional[FcmTransport]) -> None:
+    """FCM 발송 수단 교체(테스트의 모의 전송). None이면 firebase-admin 기본값."""
+    global _fcm_transport
+    _fcm_transport = transport
+
+
+def _send_fcm(tokens: List[str], title: str, body: str, data: Optional[dict]) -> Dict[str, str]:
+    """수신자 전체 토큰을 FCM_MULTICAST_MAX 단위 멀티캐스트로. 반환: token → 결과."""
+    tokens = list(dict.fromkeys(tokens))
+    if not tokens:
+        return {}
+    transport = _fcm_transport
+    if transport is None:
+        from app.config import settings
+        if not settings.FCM_CREDENTIALS_FILE:
+            return {}
+        transport = FirebaseTransport()
+    results: Dict[str, str] = {}
+    for i in range(0, len(tokens), FCM_MULTICAST_MAX):
+        batch = tokens[i:i + FCM_MULTICAST_MAX]
+        try:
+            results.update(zip(batch, transport.send_multicast(batch, title, body, data)))
+        except ImportError:
+            logger.warning("firebase-admin 미설치 — Android 푸시 비활성 (pip install firebase-admin)")
+            return results
+        except Exception as e:
+            logger.warning(f"FCM 전송 오류: {e}")
+            results.update((t, "failed") for t in batch)
+    return results
+
+
+APNS_HOSTS = {
+    "production": "https://api.push.apple.com",
+    "sandbox": "https://api.sandbox.push.apple.com",
+}
+# Apple 규정: provider token은 20분~60분 사이에 갱신(너무 자주 서명하면 TooManyProviderTokenUpdates)
+APNS_JWT_TTL_SEC = 50 * 60
+# 연결당 동시 스트림 상한(APNs는 연결당 최대 1000 스트림 허용)
+APNS_CONCURRENCY = 100
+# 토큰 → 환경 기억 상한(오래된 것부터 잊음)
+_APNS_ENV_MEMORY_MAX = 50_000
+# 환경 불일치 사유 — 이 경우에만 다른 환경으로 재시도
+_APNS_ENV_MISMATCH = ("BadDeviceToken", "BadEnvironmentKeyInToken")
+
+
+def _apns_reason(r) -> str:
+    try:
+        return r.json().get("reason", "")
+    except Exception:
+        return r.text or ""
+
+
+class ApnsClient:
+    """장수명 APNs 클라이언트.
+
+    - 환경(production/sandbox)별 HTTP/2 연결 1개를 유지하고, 토큰 여러 개를 동시 스트림으로 다중화한다
+      (전용 이벤트루프 스레드의 httpx.AsyncClient — 디스패처 워커 스레드는 send()로 결과만 기다림).
+    - provider JWT는 키 파일을 1회만 읽고 APNS_JWT_TTL_SEC 동안 재사용, ExpiredProviderToken이면 재서명.
+    - 토큰마다 성공한 환경을 기억해, 다음부터는 그 환경으로 한 번만 요청한다
+      (TestFlight·App Store 토큰이 섞여도 환경 재시도는 토큰당 최초 1회뿐).
+    """
+
+    def __init__(self, key_file: str, key_id: str, team_id: str, topic: str,
+                 prefer_sandbox: bool = False, hosts: Optional[Dict[str, str]] = None,
+                 concurrency: int = APNS_CONCURRENCY, timeout: float = 10.0, key: Optional[str] = None):
+        self.key_file = key_file
+        self.key_id = key_id
+        self.team_id = team_id
+        self.topic = topic
+        self.hosts = hosts or APNS_HOSTS
+        self.order = ("sandbox", "production") if prefer_sandbox else ("production", "sandbox")
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._key = key
+        self._jwt: Optional[str] = None
+        self._jwt_at = 0.0
+        self._env: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[str, "httpx.AsyncClient"] = {}
+        # 지표
+        self.requests = 0
+        self.env_retries = 0
+        self.jwt_signed = 0
+
+    # ── provider token ──
+    def provider_token(self) -> str:
+        with self._lock:
+            now = time.time()
+            if self._jwt is None or now - self._jwt_at >= APNS_JWT_TTL_SEC:
+                from jose import jwt as jose_jwt  # 프로젝트 기존 의존성(python-jose) 재사용
+                if self._key is None:
+                    with open(self.key_file) as f:
+                        self._key = f.read()
+                self._jwt = jose_jwt.encode(
+                    {"iss": self.team_id, "iat": int(now)},
+                    self._key, algorithm="ES256", headers={"kid": self.key_id},
+                )
+                self._jwt_at = now
+                self.jwt_signed += 1
+            return self._jwt
+
+    def _expire_token(self, stale: str) -> None:
+        with self._lock:
+            if self._jwt == stale:
+                self._jwt = None
+
+    # ── 토큰 환경 기억 ──
+    def _envs_for(self, token: str) -> Tuple[str, ...]:
+        with self._lock:
+            known = self._env.get(token)
+            if known:
+                self._env.move_to_end(token)
+        if known is None:
+            return self.order
+        return (known,) + tuple(e for e in self.order if e != known)
+
+    def _remember(self, token: str, env: str) -> None:
+        with self._lock:
+            self._env[token] = env
+            self._env.move_to_end(token)
+            while len(self._env) > _APNS_ENV_MEMORY_MAX:
+                self._env.popitem(last=False)
+
+    def _forget(self, token: str) -> None:
+        with self._lock:
+            self._env.pop(token, None)
+
+    # ── 이벤트루프/연결 ──
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="apns-client", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def _client(self, env: str):
+        client = self._clients.get(env)
+        if client is None:
+            import httpx
+            # APNs는 HTTP/2 전용 — 연결 1개에 스트림 다중화(max_connections=1)
+            client = httpx.AsyncClient(
+                base_url=self.hosts[env], http1=False, http2=True, timeout=self.timeout,
+                limits=httpx.Limits(max_connections=1, max_keepalive_connections=1),
+            )
+            self._clients[env] = client
+        return client
+
+    async def _post(self, env: str, token: str, body: bytes):
+        r = None
+        for _ in range(2):
+            jwt_ = self.provider_token()
+            self.requests += 1
+            r = await self._client(env).post(f"/3/device/{token}", content=body, headers={
+                "authorization": f"bearer {jwt_}",
+                "apns-topic": self.topic,
+                "apns-push-type": "alert",
+            })
+            if r.status_code == 403 and _apns_reason(r) == "ExpiredProviderToken":
+                self._expire_token(jwt_)
+                continue
+            break
+        return r
+
+    async def _send_one(self, token: str, body: bytes) -> str:
+        envs = self._envs_for(token)
+        for i, env in enumerate(envs):
+            if i:
+                self.env_retries += 1
             try:
-                messaging.send(messaging.Message(
-                    token=t,
-                    notification=messaging.Notification(title=title, body=body),
-                    data={k: str(v) for k, v in (data or {}).items()},
-                ))
+                r = await self._post(env, token, body)
             except Exception as e:
-                logger.warning(f"FCM 전송 실패(token {t[:12]}…): {e}")
-    except Exception as e:
-        logger.warning(f"FCM 전송 오류: {e}")
+                logger.warning(f"APNs 전송 오류(token {token[:12]}…): {e}")
+                return "failed"
+            if r.status_code == 200:
+                self._remember(token, env)
+                return "sent"
+            reason = _apns_reason(r)
+            if r.status_code == 410 or reason == "Unregistered":
+                self._forget(token)
+                return "unregistered"
+            # 환경 불일치일 때만 다른 환경으로 재시도. 그 외(403 InvalidProviderToken 등)는 중단.
+            if reason not in _APNS_ENV_MISMATCH:
+                logger.warning(f"APNs 전송 실패 {r.status_code} (token {token[:12]}…): {reason[:120]}")
+                # 429(TooManyRequests)·5xx(InternalServerError/ServiceUnavailable)만 일시 오류
+                return "failed" if r.status_code == 429 or r.status_code >= 500 else "rejected"
+        self._forget(token)
+        return "invalid"
+
+    async def _send_all(self, tokens: List[str], body: bytes) -> Dict[str, str]:
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(t: str):
+            async with sem:
+                return t, await self._send_one(t, body)
+
+        return dict(await asyncio.gather(*(one(t) for t in tokens)))
 
+    def send(self, tokens: List[str], payload: dict) -> Dict[str, str]:
+        """동기 API(워커 스레드용). 반환: token → 'sent' | 'unregistered' | 'invalid' | 'failed' | 'rejected'."""
+        tokens = list(dict.fromkeys(tokens))
+        if not tokens:
+            return {}
+        body = json.dumps(payload).encode()
+        fut = asyncio.run_coroutine_threadsafe(self._send_all(tokens, body), self._ensure_loop())
+        return fut.result(timeout=self.timeout * (2 + len(tokens) / self.concurrency))
 
-def _send_apns(tokens: List[str], title: str, body: str, data: Optional[dict]) -> None:
+    def close(self) -> None:
+        if self._loop is None:
+            return
+
+        async def _aclose():
+            for c in self._clients.values():
+                await c.aclose()
+            self._clients.clear()
+
+        asyncio.run_coroutine_threadsafe(_aclose(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            remembered = len(self._env)
+        return {
+            "requests": self.requests,
+            "env_retries": self.env_retries,
+            "jwt_signed": self.jwt_signed,
+            "connections": len(self._clients),
+            "remembered_tokens": remembered,
+        }
+
+
+_apns_client: Optional[ApnsClient] = None
+
+
+def _get_apns_client() -> Optional[ApnsClient]:
+    """설정으로 ApnsClient를 1회 생성해 재사용(설정이 바뀌면 새로 만든다). 미설정 시 None."""
+    global _apns_client
     from app.config import settings
-    if not tokens or not (settings.APNS_KEY_FILE and settings.APNS_KEY_ID and settings.APNS_TEAM_ID):
-        return
+    if not (settings.APNS_KEY_FILE and settings.APNS_KEY_ID and settings.APNS_TEAM_ID):
+        return None
+    conf = (settings.APNS_KEY_FILE, settings.APNS_KEY_ID, settings.APNS_TEAM_ID,
+            settings.APNS_BUNDLE_ID, settings.APNS_USE_SANDBOX)
+    with _apns_lock:
+        c = _apns_client
+        if c is None or (c.key_file, c.key_id, c.team_id, c.topic, c.order[0] == "sandbox") != conf:
+            if c is not None:
+                c.close()
+            _apns_client = ApnsClient(*conf[:4], prefer_sandbox=settings.APNS_USE_SANDBOX)
+        return _apns_client
+
+
+def apns_stats() -> Optional[dict]:
+    """관리자 지표용 — APNs 클라이언트가 아직 없으면 None."""
+    return _apns_client.stats() if _apns_client is not None else None
+
+
+def _send_apns(tokens: List[str], title: str, body: str, data: Optional[dict]) -> Dict[str, str]:
+    if not tokens:
+        return {}
     try:
-        import httpx
-        from jose import jwt as jose_jwt  # 프로젝트 기존 의존성(python-jose) 재사용
-        with open(settings.APNS_KEY_FILE) as f:
-            key = f.read()
-        provider_jwt = jose_jwt.encode(
-            {"iss": settings.APNS_TEAM_ID, "iat": int(time.time())},
-            key, algorithm="ES256", headers={"kid": settings.APNS_KEY_ID},
-        )
+        import httpx  # noqa: F401
+        import h2  # noqa: F401
+        client = _get_apns_client()
+        if client is None:
+            return {}
         payload = {"aps": {"alert": {"title": title, "body": body}, "sound": "default"}}
         if data:
             payload.update({k: str(v) for k, v in data.items()})
-        body_bytes = json.dumps(payload).encode()
-        headers = {
-            "authorization": f"bearer {provider_jwt}",
-            "apns-topic": settings.APNS_BUNDLE_ID,
-            "apns-push-type": "alert",
-        }
-        # 설정 환경을 1순위로 시도하되, 환경 불일치(403 BadEnvironmentKeyInToken / 400 BadDeviceToken)면
-        # 다른 환경으로 자동 재시도. TestFlight(sandbox)·App Store(production) 토큰이 섞여도 모두 전달된다.
-        prod, sandbox = "api.push.apple.com", "api.sandbox.push.apple.com"
-        hosts = (sandbox, prod) if settings.APNS_USE_SANDBOX else (prod, sandbox)
-        # APNs는 HTTP/2 필수
-        with httpx.Client(http2=True, timeout=10) as client:
-            for t in tokens:
-                last = None
-                for host in hosts:
-                    try:
-                        r = client.post(f"https://{host}/3/device/{t}", headers=headers, content=body_bytes)
-                    except Exception as e:
-                        last = ("EXC", str(e))
-                        break
-                    if r.status_code == 200:
-                        last = None
-                        break
-                    last = (r.status_code, r.text)
-                    # 환경 불일치일 때만 다른 환경으로 재시도. 그 외(410 Unregistered·403 InvalidProviderToken 등)는 중단.
-                    if "BadEnvironmentKeyInToken" not in r.text and "BadDeviceToken" not in r.text:
-                        break
-                if last is not None:
-                    logger.warning(f"APNs 전송 실패 {last[0]} (token {t[:12]}…): {str(last[1])[:120]}")
+        return client.send(tokens, payload)
     except ImportError:
         logger.warning('APNs 의존성 미설치 — iOS 푸시 비활성 (pip install "httpx[http2]")')
     except Exception as e:
+        # 전체 시간 초과 등 — 결과를 모르므로 일시 실패로 보고 재시도에 맡긴다
         logger.warning(f"APNs 전송 오류: {e}")
+        return {t: "failed" for t in tokens}
+    return {}
+
+
+# 이 결과면 토큰을 DeviceToken에서 지운다(재등록 전까지 다시 성공할 일 없음)
+_DEAD_TOKEN_RESULTS = ("unregistered", "invalid")
+
+
+@dataclass
+class NativeOutcome:
+    sent: int = 0                                          # 전달 성공 토큰 수
+    dead: List[str] = field(default_factory=list)          # DeviceToken에서 지울 토큰
+    delivered: Set[str] = field(default_factory=set)       # 한 기기라도 받은 사용자
+    failed: Dict[str, str] = field(default_factory=dict)   # 일시 실패만 있고 받은 기기가 없는 사용자 → 사유
+
+
+def send_native_to_tokens(rows, title: str, body: str, data: Optional[dict] = None) -> NativeOutcome:
+    """이미 조회한 (token, platform, user_id) 목록으로 발송. 디스패처가 수신자 전체 토큰을 한 번에 넘긴다.
+    일시 오류(APNs 429/5xx·FCM UNAVAILABLE/INTERNAL·네트워크)는 사용자별 failed로 돌려준다 —
+    호출자(아웃박스)가 백오프 후 재시도. 절대 예외를 던지지 않음."""
+    ios = [t for t, platform, _ in rows if platform == "ios"]
+    android = [t for t, platform, _ in rows if platform == "android"]
+    results: Dict[str, str] = {}
+    try:
+        if android:
+            results.update(_send_fcm(android, title, body, data))
+        if ios:
+            results.update(_send_apns(ios, title, body, data))
+    except Exception as e:
+        logger.warning(f"native push 실패: {e}")
+    out = NativeOutcome()
+    for token, platform, user_id in rows:
+        # 발송 수단이 꺼져 결과가 없는 토큰은 재시도해도 같다 — 실패로 보지 않는다
+        result = results.get(token)
+        if result == "sent":
+            out.delivered.add(user_id)
+        elif result == "failed":
+            out.failed.setdefault(user_id, f"{platform} push failed")
+    out.sent = sum(1 for r in results.values() if r == "sent")
+    out.dead = [t for t, r in results.items() if r in _DEAD_TOKEN_RESULTS]
+    for user_id in out.delivered:
+        out.failed.pop(user_id, None)
+    return out
+
+
+def prune_device_tokens(db, tokens: List[str]) -> int:
+    """죽은 토큰을 한 번의 DELETE(… IN …)로 정리. 커밋은 호출자."""
+    if not tokens:
+        return 0
+    from app.models.device_token import DeviceToken
+    removed = 0
+    for i in range(0, len(tokens), FCM_MULTICAST_MAX):
+        removed += db.query(DeviceToken).filter(
+            DeviceToken.token.in_(tokens[i:i + FCM_MULTICAST_MAX])
+        ).delete(synchronize_session=False)
+    return removed
 
 
 def send_native_push_sync(user_id: str, title: str, body: str, data: Optional[dict] = None) -> None:
@@ -123,25 +447,22 @@ def send_native_push_sync(user_id: str, title: str, body: str, data: Optional[di
         from app.models.device_token import DeviceToken
         db = SessionLocal()
         try:
-            rows = db.query(DeviceToken).filter(DeviceToken.user_id == user_id).all()
-            ios = [r.token for r in rows if r.platform == "ios"]
-            android = [r.token for r in rows if r.platform == "android"]
+            rows = db.query(DeviceToken.token, DeviceToken.platform, DeviceToken.user_id).filter(
+                DeviceToken.user_id == user_id
+            ).all()
+            dead = send_native_to_tokens(rows, title, body, data).dead
+            if dead:
+                prune_device_tokens(db, dead)
+                db.commit()
         finally:
             db.close()
-        if android:
-            _send_fcm(android, title, body, data)
-        if ios:
-            _send_apns(ios, title, body, data)
     except Exception as e:
         logger.warning(f"native push 실패({user_id}): {e}")
 
 
 def send_native_push(user_id: str, title: str, body: str, data: Optional[dict] = None) -> None:
-    """fire-and-forget(백그라운드 스레드)."""
+    """fire-and-forget — 공용 푸시 디스패처 큐에 넣는다(호출마다 스레드를 만들지 않음)."""
     if not native_push_configured():
         return
-    threading.Thread(
-        target=send_native_push_sync,
-        args=(user_id, title, body, data),
-        daemon=True,
-    ).start()
+    from app.services.push_dispatcher import dispatcher
+    dispatcher.submit([user_id], body, title=title, data=data, web=False)
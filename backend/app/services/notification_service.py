@@ -1,98 +1,149 @@
 """Shared helper for creating notifications + WS push + Web Push."""
 import json
 import logging
-import threading
-from typing import List, Optional
-from sqlalchemy import cast, Text
+from typing import List, Optional, Union
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.notification import Notification, NotificationType
 from app.models.user import User, UserRole
 from app.models.class_info import ClassInfo
+from app.services import class_scope
 from app.services.websocket_manager import manager
+from datetime import datetime
 import uuid
 
 logger = logging.getLogger(__name__)
 
 
-def _send_web_push_sync(user_id: str, message: str, tag: str = "general") -> None:
-    """Send Web Push in a background thread with its own DB session.
+def web_push_configured() -> bool:
+    from app.config import settings
+    return bool(settings.VAPID_PRIVATE_KEY and settings.VAPID_PUBLIC_KEY)
 
-    Uses a separate DB session so the caller's session is not blocked.
-    Expired/invalid subscriptions are automatically cleaned up.
-    """
+
+def _web_push_payload(message: str, tag: str = "general") -> str:
+    return json.dumps({
+        "title": "SOL-ACT",
+        "body": message,
+        "icon": "/icon-192.png",
+        "badge": "/icon-192.png",
+        "tag": tag,
+    })
+
+
+def _webpush_one(sub, payload: str) -> str:
+    """구독 1건으로 Web Push 발송. 'sent' | 'gone'(만료·삭제 대상) | 'failed'."""
+    from app.config import settings
+    from pywebpush import webpush, WebPushException
     try:
-        from app.config import settings
-        if not settings.VAPID_PRIVATE_KEY or not settings.VAPID_PUBLIC_KEY:
-            logger.warning("Web push skipped: VAPID keys not configured")
-            return
+        webpush(
+            subscription_info={
+                "endpoint": sub.endpoint,
+                "keys": {
+                    "p256dh": sub.p256dh_key,
+                    "auth": sub.auth_key,
+                },
+            },
+            data=payload,
+            vapid_private_key=settings.VAPID_PRIVATE_KEY,
+            vapid_claims={"sub": settings.VAPID_CLAIMS_EMAIL},
+        )
+        return "sent"
+    except WebPushException as e:
+        status = getattr(e.response, 'status_code', None) if e.response else None
+        is_gone = status in (404, 410) or '410' in str(e) or '404' in str(e)
+        if is_gone:
+            logger.warning(f"Web push subscription removed (expired): {sub.endpoint[:50]}")
+            return "gone"
+        logger.warning(f"Web push failed for {sub.endpoint[:50]}: {e}")
+        return "failed"
+    except Exception as e:
+        logger.warning(f"Web push error: {e}")
+        return "failed"
 
-        from app.models.push_subscription import PushSubscription
-        from pywebpush import webpush, WebPushException
-        from app.database import SessionLocal
 
-        db = SessionLocal()
-        try:
-            subs = db.query(PushSubscription).filter(
-                PushSubscription.user_id == user_id
-            ).all()
-
-            payload = json.dumps({
-                "title": "SOL-ACT",
-                "body": message,
-                "icon": "/icon-192.png",
-                "badge": "/icon-192.png",
-                "tag": tag,
-            })
+def _enqueue_push(db, user_ids: List[str], message: str, tag: str, entity: Optional[str]) -> bool:
+    """Web Push + 네이티브 푸시를 아웃박스 행으로 세션에 추가(알림 행과 같은 커밋). 미설정 시 무동작.
 
-            if not subs:
-                logger.warning(f"Web push: no subscriptions for user {user_id}")
-
-            for sub in subs:
-                try:
-                    webpush(
-                        subscription_info={
-                            "endpoint": sub.endpoint,
-                            "keys": {
-                                "p256dh": sub.p256dh_key,
-                                "auth": sub.auth_key,
-                            },
-                        },
-                        data=payload,
-                        vapid_private_key=settings.VAPID_PRIVATE_KEY,
-                        vapid_claims={"sub": settings.VAPID_CLAIMS_EMAIL},
-                    )
-                    logger.warning(f"Web push sent to {user_id} via {sub.endpoint[:50]}")
-                except WebPushException as e:
-                    status = getattr(e.response, 'status_code', None) if e.response else None
-                    is_gone = status in (404, 410) or '410' in str(e) or '404' in str(e)
-                    if is_gone:
-                        db.delete(sub)
-                        db.commit()
-                        logger.warning(f"Web push subscription removed (expired): {sub.endpoint[:50]}")
-                    else:
-                        logger.warning(f"Web push failed for {sub.endpoint[:50]}: {e}")
-                except Exception as e:
-                    logger.warning(f"Web push error: {e}")
-        finally:
-            db.close()
-    except ImportError as e:
-        logger.warning(f"Web push import error: {e}")
+    실제 발송은 커밋 뒤 드레이너가 (user, tag)별로 병합해 디스패처에 넘기고, 실패는 백오프 재시도한다.
+    """
+    from app.services.push_outbox import enqueue_push
+    try:
+        return bool(enqueue_push(db, user_ids, message, tag=tag, data={"entity": entity or "general"}))
     except Exception as e:
-        logger.error(f"Web push setup error: {e}")
+        logger.warning(f"Push outbox enqueue failed: {e}")
+        return False
 
 
-def _send_web_push(user_id: str, message: str, tag: str = "general") -> None:
-    """Fire-and-forget Web Push in a background thread."""
-    logger.warning(f"Web push triggered for user {user_id}: {message[:50]} [tag={tag}]")
-    threading.Thread(
-        target=_send_web_push_sync,
-        args=(user_id, message, tag),
-        daemon=True,
-    ).start()
+def _wake_push_outbox() -> None:
+    from app.services.push_outbox import drainer
+    drainer.wake()
+
+
+def _notification_rows(user_ids: List[str], message: str, notif_type: NotificationType) -> List[dict]:
+    """알림 행을 dict로 만든다 — id·created_at·updated_at을 클라이언트에서 채워 INSERT 후 다시 읽을 필요가 없다."""
+    now = datetime.utcnow()
+    return [
+        {
+            "id": f"noti{uuid.uuid4().hex[:7]}",
+            "user_id": uid,
+            "type": notif_type,
+            "message": message,
+            "read": False,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for uid in user_ids
+    ]
+
+
+def _commit_notifications(db: Session, rows: List[dict]) -> None:
+    """동기 Session 경로: 다중 행 INSERT 1회 + commit (threadpool에서 실행)."""
+    db.execute(insert(Notification), rows)
+    db.commit()
+
+
+async def _save_notifications(db: Union[Session, AsyncSession], rows: List[dict]) -> None:
+    """알림 행 저장 — 이벤트루프를 막지 않는다.
+
+    executemany 형태의 INSERT 한 번(SQLAlchemy가 다중 VALUES로 묶음)이라 수신자 수와 무관하게
+    왕복 1회이며, 행마다 refresh SELECT를 하지 않는다. 세션에 먼저 add된 객체(푸시 아웃박스)도
+    같은 커밋에 들어간다.
+
+    AsyncSession이면 그대로 await, 레거시 동기 Session(스케줄러·미전환 라우트)이면
+    blocking commit을 threadpool로 넘긴다. 실패 시 롤백 후 예외를 그대로 올린다.
+    """
+    if isinstance(db, AsyncSession):
+        try:
+            await db.execute(insert(Notification), rows)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        return
+    try:
+        await run_in_threadpool(_commit_notifications, db, rows)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _notification_payload(row: dict) -> dict:
+    return {
+        "type": "new_notification",
+        "data": {
+            "id": row["id"],
+            "type": row["type"].value,
+            "message": row["message"],
+            "read": row["read"],
+            "created_at": row["created_at"].isoformat(),
+        },
+    }
 
 
 async def notify_user(
-    db: Session,
+    db: Union[Session, AsyncSession],
     user_id: str,
     message: str,
     notif_type: NotificationType = NotificationType.INFO,
@@ -103,119 +154,61 @@ async def notify_user(
 
     Never raises — failures are logged but don't break the caller.
     If entity is provided, also sends a data_changed event for auto-refresh.
+    Accepts either an AsyncSession or a legacy sync Session.
     """
-    try:
-        notif = Notification(
-            id=f"noti{uuid.uuid4().hex[:7]}",
-            user_id=user_id,
-            type=notif_type,
-            message=message,
-        )
-        db.add(notif)
-        db.commit()
-        db.refresh(notif)
-    except Exception as e:
-        logger.error(f"Failed to save notification for {user_id}: {e}")
-        db.rollback()
-        return
-    try:
-        await manager.send_to_user(user_id, {
-            "type": "new_notification",
-            "data": {
-                "id": notif.id,
-                "type": notif.type.value,
-                "message": notif.message,
-                "read": notif.read,
-                "created_at": notif.created_at.isoformat(),
-            },
-        })
-        if entity:
-            await manager.send_to_user(user_id, {
-                "type": "data_changed",
-                "entity": entity,
-            })
-    except Exception as e:
-        logger.warning(f"Failed to send WS notification to {user_id}: {e}")
-    # Web Push (PWA/브라우저) + 네이티브 푸시(FCM/APNs) — 둘 다 fire-and-forget, 미설정 시 무동작
-    _send_web_push(user_id, message, tag=push_tag or entity or "general")
-    from app.services.native_push import send_native_push
-    send_native_push(user_id, "SOL-ACT", message, {"entity": entity or "general"})
+    await notify_users(db, [user_id], message, notif_type, entity, push_tag)
 
 
 async def notify_users(
-    db: Session,
+    db: Union[Session, AsyncSession],
     user_ids: List[str],
     message: str,
     notif_type: NotificationType = NotificationType.INFO,
     entity: Optional[str] = None,
     push_tag: Optional[str] = None,
 ) -> None:
-    """Create notifications for multiple users with batch DB insert."""
+    """Create notifications for multiple users with one bulk INSERT."""
     if not user_ids:
         return
     # 같은 uid가 중복으로 들어와도(예: private_student_ids/클라이언트 student_ids에 중복)
     # 1회만 발송 — 중복 알림/푸시 방지. dict.fromkeys로 순서 보존.
     user_ids = list(dict.fromkeys(user_ids))
 
-    # 1) Batch insert all notifications in a single commit
-    notifs = []
-    for uid in user_ids:
-        notif = Notification(
-            id=f"noti{uuid.uuid4().hex[:7]}",
-            user_id=uid,
-            type=notif_type,
-            message=message,
-        )
-        db.add(notif)
-        notifs.append(notif)
+    # 1) 알림 행 + 푸시 아웃박스를 한 커밋으로 (행 refresh 없음)
+    rows = _notification_rows(user_ids, message, notif_type)
+    queued = _enqueue_push(db, user_ids, message, push_tag or entity or "general", entity)
     try:
-        db.commit()
-        for notif in notifs:
-            db.refresh(notif)
+        await _save_notifications(db, rows)
     except Exception as e:
-        logger.error(f"Failed to batch-save notifications: {e}")
-        db.rollback()
+        logger.error(f"Failed to save notifications for {len(user_ids)} user(s): {e}")
         return
 
-    # 2) Send WebSocket notifications
-    for notif in notifs:
-        try:
-            await manager.send_to_user(notif.user_id, {
-                "type": "new_notification",
-                "data": {
-                    "id": notif.id,
-                    "type": notif.type.value,
-                    "message": notif.message,
-                    "read": notif.read,
-                    "created_at": notif.created_at.isoformat(),
-                },
+    # 2) WebSocket — 페이로드는 위 dict에서 한 번에 만들고, data_changed는 한 번의 발행으로
+    try:
+        for row in rows:
+            await manager.send_to_user(row["user_id"], _notification_payload(row))
+        if entity:
+            await manager.broadcast_to_users(user_ids, {
+                "type": "data_changed",
+                "entity": entity,
             })
-            if entity:
-                await manager.send_to_user(notif.user_id, {
-                    "type": "data_changed",
-                    "entity": entity,
-                })
-        except Exception as e:
-            logger.warning(f"Failed to send WS to {notif.user_id}: {e}")
+    except Exception as e:
+        logger.warning(f"Failed to send WS notifications: {e}")
 
-    # 3) Fire-and-forget Web Push + 네이티브 푸시 (미설정 시 무동작)
-    tag = push_tag or entity or "general"
-    from app.services.native_push import send_native_push
-    for uid in user_ids:
-        _send_web_push(uid, message, tag=tag)
-        send_native_push(uid, "SOL-ACT", message, {"entity": entity or "general"})
+    # 3) Web Push + 네이티브 푸시 — 1)에서 같이 커밋된 아웃박스 행을 드레이너가 병합·발송
+    if queued:
+        _wake_push_outbox()
 
 
 async def emit_data_changed(user_ids: List[str], entity: str) -> None:
     """Send data_changed event without creating a notification."""
-    for uid in user_ids:
-        try:
-            await manager.send_to_user(uid, {
-                "type": "data_changed",
-                "entity": entity,
-            })
-        except Exception:
-            pass
+    try:
+        await manager.broadcast_to_users(list(user_ids), {
+            "type": "data_changed",
+            "entity": entity,
+        })
+    except Exception:
+        pass
 
 
 def notify_user_sync(
@@ -225,11 +218,12 @@ def notify_user_sync(
 ) -> None:
     """Synchronous version of notify_user — safe to call from background threads.
 
-    Creates a DB notification record and sends a Web Push.
+    Creates a DB notification record and queues a Web Push (push outbox, same commit).
     Does NOT send a WebSocket message (caller must handle that separately).
     """
     if notif_type is None:
         notif_type = NotificationType.INFO
+    queued = False
     try:
         from app.database import SessionLocal
         db = SessionLocal()
@@ -241,15 +235,22 @@ def notify_user_sync(
                 message=message,
             )
             db.add(notif)
+            from app.services.push_outbox import enqueue_push
+            queued = bool(enqueue_push(db, [user_id], message, native=False))
             db.commit()
+            # WS를 안 보내므로 목록 ETag 카운터를 직접 올린다
+            from app.services.entity_versions import bump
+            bump("notifications", [user_id])
         except Exception as e:
+            queued = False
             logger.error(f"notify_user_sync: failed to save notification: {e}")
             db.rollback()
         finally:
             db.close()
     except Exception as e:
         logger.error(f"notify_user_sync error: {e}")
-    _send_web_push_sync(user_id, message)
+    if queued:
+        _wake_push_outbox()
 
 
 def get_class_student_ids(db: Session, class_id: str) -> List[str]:
@@ -273,28 +274,13 @@ def get_all_user_ids(db: Session) -> List[str]:
 
 
 def get_teacher_class_ids(db: Session, teacher_id: str) -> List[str]:
-    """Get class IDs where the teacher is assigned."""
-    # Use SQL LIKE to filter at DB level instead of loading all classes
-    classes = db.query(ClassInfo).filter(
-        cast(ClassInfo.subject_teachers, Text).like(f'%"{teacher_id}"%')
-    ).all()
-    return [
-        cls.id for cls in classes
-        if cls.subject_teachers and teacher_id in cls.subject_teachers.values()
-    ]
+    """Get class IDs where the teacher is assigned (class_teachers 인덱스 + 프로세스 캐시)."""
+    return class_scope.teacher_class_ids(db, teacher_id)
 
 
 def get_teacher_student_ids(db: Session, teacher_id: str) -> List[str]:
-    """Get all student IDs from classes where the teacher is assigned."""
-    student_ids = set()
-    classes = db.query(ClassInfo).filter(
-        cast(ClassInfo.subject_teachers, Text).like(f'%"{teacher_id}"%')
-    ).all()
-    for cls in classes:
-        if cls.subject_teachers and teacher_id in cls.subject_teachers.values():
-            for s in cls.students:
-                student_ids.add(s.id)
-    return list(student_ids)
+    """Get all student IDs from classes where the teacher is assigned (인덱스 조회·캐시 히트)."""
+    return class_scope.teacher_student_ids(db, teacher_id)
 
 
 def validate_class_access(db: Session, class_id: str, user: "User") -> bool:
@@ -0,0 +1,251 @@
+"""푸시 발송 디스패처 — 고정 크기 워커 풀 + 큐.
+
+이전엔 수신자마다 웹푸시 스레드 1개 + 네이티브 푸시 스레드 1개를 띄우고 각자 DB 세션을 열었다.
+학원 전체 알림(오디션 접수 리마인더 등)이면 2×N 스레드·2×N 세션이 한꺼번에 생긴다.
+
+여기서는 notify_users 1회 = 작업 1건. 워커가 수신자 전체의 PushSubscription/DeviceToken을
+IN 쿼리 한 번씩으로 읽고, 만료 구독·죽은 디바이스 토큰은 모아서 한 번에 지운다. 큐가 가득 차면 작업을 버리고
+집계한다(푸시는 보조 채널 — 알림 DB 행과 WebSocket 전달은 이미 끝난 상태).
+
+아웃박스(push_outbox)에서 온 작업은 job.outbox(user_id → 행 id들)를 들고 오며, 발송 후
+수신자별 결과를 아웃박스에 반영한다(성공=sent, 일시 실패=백오프 재시도 — 웹푸시 오류와
+APNs 429/5xx·FCM UNAVAILABLE/INTERNAL·네트워크 오류 모두. 어느 채널로든 받았으면 성공). 큐 포화로 버려진
+아웃박스 작업은 submit이 False를 돌려주므로 드레이너가 임대를 풀고 다시 시도한다.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# SQLite 바인드 변수 한도(구버전 999) 안쪽으로 IN 목록을 자른다.
+_IN_CHUNK = 500
+# 처리량 집계 창(초)
+_RATE_WINDOW_SEC = 60.0
+
+
+@dataclass
+class PushJob:
+    user_ids: List[str]
+    message: str
+    title: str = "SOL-ACT"
+    tag: str = "general"
+    data: Optional[dict] = None
+    web: bool = True
+    native: bool = True
+    outbox: Optional[Dict[str, List[str]]] = None  # 아웃박스 행 매핑(user_id → ids)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+def _chunks(items: List[str], size: int = _IN_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class PushDispatcher:
+    def __init__(self, workers: int = 4, queue_max: int = 1000,
+                 session_factory: Optional[Callable] = None):
+        self.workers = max(1, workers)
+        self._queue: "queue.Queue[PushJob]" = queue.Queue(maxsize=queue_max)
+        self._session_factory = session_factory
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        # 지표
+        self.jobs_submitted = 0
+        self.jobs_done = 0
+        self.jobs_dropped = 0
+        self.jobs_failed = 0
+        self.in_flight = 0
+        self.web_sent = 0
+        self.web_failed = 0
+        self.web_expired = 0
+        self.native_sent = 0
+        self.native_pruned = 0
+        self._recent = deque()  # (monotonic ts, deliveries) — 최근 처리량
+        self._latency_total = 0.0
+
+    # ── 제출 ──
+    def submit(self, user_ids: List[str], message: str, *, title: str = "SOL-ACT", tag: str = "general",
+               data: Optional[dict] = None, web: bool = True, native: bool = True,
+               outbox: Optional[Dict[str, List[str]]] = None) -> bool:
+        """작업을 큐에 넣는다(절대 블로킹하지 않음). 채널이 하나도 설정 안 됐으면 무동작."""
+        from app.services.notification_service import web_push_configured
+        from app.services.native_push import native_push_configured
+        web = web and web_push_configured()
+        native = native and native_push_configured()
+        if not user_ids or not (web or native):
+            return False
+        self._ensure_started()
+        job = PushJob(list(dict.fromkeys(user_ids)), message, title, tag, data, web, native, outbox)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.jobs_dropped += 1
+            logger.warning(f"Push queue full — dropped push for {len(job.user_ids)} user(s)")
+            return False
+        with self._lock:
+            self.jobs_submitted += 1
+        return True
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"push-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    # ── 워커 ──
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self.in_flight += 1
+            try:
+                self._process(job)
+                with self._lock:
+                    self.jobs_done += 1
+            except Exception as e:
+                logger.error(f"Push job failed: {e}")
+                with self._lock:
+                    self.jobs_failed += 1
+                if job.outbox:
+                    self._settle(job, {uid: str(e) for uid in job.outbox})
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+                    self._latency_total += time.monotonic() - job.enqueued_at
+                self._queue.task_done()
+
+    def _open_session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        from app.database import SessionLocal
+        return SessionLocal()
+
+    def _process(self, job: PushJob) -> None:
+        from app.models.push_subscription import PushSubscription
+        from app.models.device_token import DeviceToken
+
+        db = self._open_session()
+        failed: Dict[str, str] = {}  # user_id → 사유 (일시 실패만 있고 어느 채널로도 못 받은 수신자)
+        delivered: Set[str] = set()
+        try:
+            subs, tokens = [], []
+            for ids in _chunks(job.user_ids):
+                if job.web:
+                    subs.extend(db.query(PushSubscription).filter(PushSubscription.user_id.in_(ids)).all())
+                if job.native:
+                    tokens.extend(
+                        db.query(DeviceToken.token, DeviceToken.platform, DeviceToken.user_id)
+                        .filter(DeviceToken.user_id.in_(ids)).all()
+                    )
+
+            sent = 0  # 전달 성공 건수(구독·토큰 단위, 처리량 지표)
+            if subs:
+                from app.services.notification_service import _web_push_payload, _webpush_one
+                payload = _web_push_payload(job.message, job.tag)
+                gone = []
+                ok_users, failed_users = set(), set()
+                for sub in subs:
+                    result = _webpush_one(sub, payload)
+                    if result == "sent":
+                        sent += 1
+                        ok_users.add(sub.user_id)
+                    elif result == "gone":
+                        gone.append(sub)
+                    else:
+                        failed_users.add(sub.user_id)
+                delivered |= ok_users
+                failed.update((uid, "web push failed") for uid in failed_users)
+                with self._lock:
+                    self.web_sent += sent
+                    self.web_failed += len(subs) - sent - len(gone)
+                    self.web_expired += len(gone)
+                if gone:
+                    for sub in gone:
+                        db.delete(sub)
+                    db.commit()
+
+            if tokens:
+                from app.services.native_push import prune_device_tokens, send_native_to_tokens
+                native = send_native_to_tokens(tokens, job.title, job.message, job.data)
+                sent += native.sent
+                delivered |= native.delivered
+                for uid, reason in native.failed.items():
+                    failed[uid] = f"{failed[uid]}; {reason}" if uid in failed else reason
+                removed = 0
+                if native.dead:
+                    removed = prune_device_tokens(db, native.dead)
+                    db.commit()
+                with self._lock:
+                    self.native_sent += native.sent
+                    self.native_pruned += removed
+        finally:
+            db.close()
+
+        if job.outbox:
+            # 어느 채널로든 하나라도 받았으면 성공 — 재시도는 한 곳도 못 받은 수신자만
+            self._settle(job, {uid: r for uid, r in failed.items() if uid not in delivered})
+        self._record(sent)
+
+    def _settle(self, job: PushJob, failed: Dict[str, str]) -> None:
+        from app.services.push_outbox import settle
+        db = self._open_session()
+        try:
+            settle(db, job.outbox, failed)
+        except Exception as e:
+            # 반영 실패 시 임대 만료 후 드레이너가 다시 집어간다(at-least-once)
+            logger.error(f"Push outbox settle failed: {e}")
+        finally:
+            db.close()
+
+    def _record(self, deliveries: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._recent.append((now, deliveries))
+            while self._recent and now - self._recent[0][0] > _RATE_WINDOW_SEC:
+                self._recent.popleft()
+
+    # ── 지표 ──
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            recent = sum(n for ts, n in self._recent if now - ts <= _RATE_WINDOW_SEC)
+            finished = self.jobs_done + self.jobs_failed
+            return {
+                "workers": self.workers,
+                "backlog": self._queue.qsize(),
+                "in_flight": self.in_flight,
+                "jobs_submitted": self.jobs_submitted,
+                "jobs_done": self.jobs_done,
+                "jobs_failed": self.jobs_failed,
+                "jobs_dropped": self.jobs_dropped,
+                "web_sent": self.web_sent,
+                "web_failed": self.web_failed,
+                "web_expired_removed": self.web_expired,
+                "native_sent": self.native_sent,
+                "native_tokens_pruned": self.native_pruned,
+                "deliveries_per_sec": round(recent / _RATE_WINDOW_SEC, 2),
+                "avg_job_latency_sec": round(self._latency_total / finished, 3) if finished else 0.0,
+            }
+
+    def join(self) -> None:
+        """큐가 빌 때까지 대기(테스트·종료용)."""
+        self._queue.join()
+
+
+def _build_dispatcher() -> PushDispatcher:
+    from app.config import settings
+    return PushDispatcher(workers=settings.PUSH_WORKERS, queue_max=settings.PUSH_QUEUE_MAX)
+
+
+dispatcher = _build_dispatcher()
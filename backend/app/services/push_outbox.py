@@ -0,0 +1,285 @@
+"""푸시 아웃박스 드레이너 — 재시도(지수 백오프) · (user, tag) 병합 · at-least-once.
+
+흐름:
+  1) notify_user(s)/채팅이 알림 행과 **같은 트랜잭션**으로 PushOutbox 행을 넣는다(enqueue_push).
+  2) 커밋 후 wake() → 드레이너 스레드가 기한 도래 행을 임대(lease)로 집어간다.
+  3) (user, tag)별 대기 행을 한 건의 다이제스트로 합쳐 푸시 디스패처 워커 풀에 넘긴다.
+  4) 워커가 발송 결과로 settle(): 성공=sent / 일시 실패=백오프 후 pending / 한도 초과=dead.
+
+병합 창(PUSH_COALESCE_SEC): 같은 (user, tag)로 최근 창 안에 이미 푸시가 나갔으면 새 행은 창 끝까지
+보류했다가 한 번에 보낸다 — 첫 메시지는 즉시, 이어지는 폭주는 다이제스트 1건.
+재시작하면 pending 행과 임대가 만료된 sending 행을 그대로 다시 집어가므로 유실이 없다.
+"""
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.models.push_outbox import PushOutbox
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SEC = 30          # 30s, 60s, 2m, 4m, 8m …
+BACKOFF_MAX_SEC = 3600
+LEASE_SEC = 120                # 워커가 죽어도 이 시간 뒤 재수거
+POLL_SEC = 5.0
+CLAIM_BATCH = 500
+SENT_RETENTION = timedelta(days=1)
+DEAD_RETENTION = timedelta(days=7)
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SEC * (2 ** max(0, attempts - 1)), BACKOFF_MAX_SEC))
+
+
+def digest_message(messages: List[str]) -> str:
+    """대기 메시지 여러 건 → 최신 1건 + 건수."""
+    if len(messages) == 1:
+        return messages[0]
+    return f"{messages[-1]} 외 {len(messages) - 1}건"
+
+
+def enqueue_push(
+    db: Session,
+    user_ids: List[str],
+    message: str,
+    tag: str = "general",
+    data: Optional[dict] = None,
+    title: str = "SOL-ACT",
+    web: bool = True,
+    native: bool = True,
+) -> List[PushOutbox]:
+    """아웃박스 행을 세션에 추가만 한다(커밋은 호출자 — 알림 행과 원자적으로).
+    설정된 채널이 하나도 없으면 아무것도 쌓지 않는다."""
+    from app.services.notification_service import web_push_configured
+    from app.services.native_push import native_push_configured
+    web = web and web_push_configured()
+    native = native and native_push_configured()
+    if not user_ids or not (web or native):
+        return []
+    now = datetime.utcnow()
+    rows = [
+        PushOutbox(
+            id=f"pob{uuid.uuid4().hex[:12]}",
+            user_id=uid,
+            tag=tag or "general",
+            title=title,
+            message=message,
+            data=data,
+            web=int(web),
+            native=int(native),
+            status="pending",
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+        )
+        for uid in dict.fromkeys(user_ids)
+    ]
+    db.add_all(rows)
+    return rows
+
+
+class OutboxDrainer:
+    def __init__(self, session_factory=None, coalesce_sec: Optional[float] = None, dispatcher=None):
+        self._session_factory = session_factory
+        self._coalesce_sec = coalesce_sec
+        self._dispatcher = dispatcher
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._last_prune = datetime.min
+
+    # ── 구성 ──
+    def _session(self) -> Session:
+        if self._session_factory is not None:
+            return self._session_factory()
+        from app.database import SessionLocal
+        return SessionLocal()
+
+    @property
+    def coalesce(self) -> timedelta:
+        if self._coalesce_sec is not None:
+            return timedelta(seconds=self._coalesce_sec)
+        from app.config import settings
+        return timedelta(seconds=settings.PUSH_COALESCE_SEC)
+
+    @property
+    def dispatcher(self):
+        if self._dispatcher is not None:
+            return self._dispatcher
+        from app.services.push_dispatcher import dispatcher
+        return dispatcher
+
+    # ── 수명 ──
+    def start(self) -> None:
+        if self._thread:
+            return
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._run, name="push-outbox", daemon=True)
+            self._thread.start()
+
+    def wake(self) -> None:
+        """새 행 커밋 직후 호출 — 폴링 주기를 기다리지 않고 바로 수거."""
+        self.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(POLL_SEC)
+            self._wake.clear()
+            try:
+                self.drain_once()
+            except Exception as e:
+                logger.error(f"Push outbox drain failed: {e}")
+
+    # ── 수거 ──
+    def drain_once(self, now: Optional[datetime] = None) -> int:
+        """기한 도래 행을 임대해 디스패처에 넘긴다. 반환: 넘긴 (user, tag) 그룹 수."""
+        now = now or datetime.utcnow()
+        db = self._session()
+        try:
+            claimed = self._claim(db, now)
+            if not claimed:
+                self._maybe_prune(db, now)
+                return 0
+            return self._submit(db, claimed, now)
+        finally:
+            db.close()
+
+    def _claim(self, db: Session, now: datetime) -> List[PushOutbox]:
+        due_filter = or_(
+            and_(PushOutbox.status == "pending", PushOutbox.next_attempt_at <= now),
+            and_(PushOutbox.status == "sending", PushOutbox.lease_until < now),
+        )
+        due = db.query(PushOutbox.user_id, PushOutbox.tag).filter(due_filter).limit(CLAIM_BATCH).all()
+        pairs = {(u, t) for u, t in due}
+        if not pairs:
+            return []
+        user_ids = list({u for u, _ in pairs})
+
+        # 병합 창: 최근 창 안에 이미 나간 (user, tag)는 창 끝까지 보류
+        window_start = now - self.coalesce
+        recent = db.query(PushOutbox.user_id, PushOutbox.tag, func.max(PushOutbox.pushed_at)).filter(
+            PushOutbox.user_id.in_(user_ids),
+            PushOutbox.status.in_(("sending", "sent")),
+            PushOutbox.pushed_at > window_start,
+        ).group_by(PushOutbox.user_id, PushOutbox.tag).all()
+        held: Dict[Tuple[str, str], datetime] = {
+            (u, t): last + self.coalesce for u, t, last in recent if (u, t) in pairs
+        }
+        for (u, t), until in held.items():
+            db.query(PushOutbox).filter(
+                PushOutbox.user_id == u, PushOutbox.tag == t, PushOutbox.status == "pending",
+                PushOutbox.next_attempt_at < until,
+            ).update({PushOutbox.next_attempt_at: until}, synchronize_session=False)
+        ready = pairs - set(held)
+        if held:
+            db.commit()
+        if not ready:
+            return []
+
+        # 준비된 (user, tag)의 대기 행 전부(아직 기한 전인 것까지) 임대 — 한 다이제스트로 합침
+        ready_users = list({u for u, _ in ready})
+        candidates = db.query(PushOutbox.id, PushOutbox.user_id, PushOutbox.tag).filter(
+            PushOutbox.user_id.in_(ready_users),
+            or_(PushOutbox.status == "pending",
+                and_(PushOutbox.status == "sending", PushOutbox.lease_until < now)),
+        ).all()
+        ids = [i for i, u, t in candidates if (u, t) in ready]
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        db.execute(
+            update(PushOutbox)
+            .where(PushOutbox.id.in_(ids), or_(
+                PushOutbox.status == "pending",
+                and_(PushOutbox.status == "sending", PushOutbox.lease_until < now),
+            ))
+            .values(status="sending", lease_owner=token, lease_until=now + timedelta(seconds=LEASE_SEC), pushed_at=now)
+        )
+        db.commit()
+        return db.query(PushOutbox).filter(PushOutbox.lease_owner == token).order_by(PushOutbox.created_at).all()
+
+    def _submit(self, db: Session, rows: List[PushOutbox], now: datetime) -> int:
+        groups: Dict[Tuple[str, str], List[PushOutbox]] = defaultdict(list)
+        for r in rows:
+            groups[(r.user_id, r.tag)].append(r)
+
+        # 같은 내용(다이제스트·채널·data)끼리 수신자를 묶어 작업 1건 → 디스패처가 IN 쿼리로 일괄 조회
+        jobs: Dict[tuple, Dict[str, List[str]]] = defaultdict(dict)
+        meta: Dict[tuple, PushOutbox] = {}
+        for (uid, tag), items in groups.items():
+            latest = items[-1]
+            key = (
+                digest_message([i.message for i in items]), tag, latest.title,
+                repr(sorted((latest.data or {}).items())),
+                any(i.web for i in items), any(i.native for i in items),
+            )
+            jobs[key][uid] = [i.id for i in items]
+            meta[key] = latest
+
+        submitted = 0
+        for key, outbox in jobs.items():
+            message, tag, title, _, web, native = key
+            ok = self.dispatcher.submit(
+                list(outbox), message, title=title, tag=tag, data=meta[key].data,
+                web=web, native=native, outbox=outbox,
+            )
+            if ok:
+                submitted += len(outbox)
+            else:
+                # 큐 포화/채널 미설정 — 임대 해제 후 곧 재시도
+                ids = [i for v in outbox.values() for i in v]
+                db.query(PushOutbox).filter(PushOutbox.id.in_(ids)).update({
+                    PushOutbox.status: "pending", PushOutbox.lease_owner: None,
+                    PushOutbox.next_attempt_at: now + timedelta(seconds=POLL_SEC),
+                }, synchronize_session=False)
+                db.commit()
+        return submitted
+
+    def _maybe_prune(self, db: Session, now: datetime) -> None:
+        if now - self._last_prune < timedelta(hours=1):
+            return
+        self._last_prune = now
+        db.query(PushOutbox).filter(
+            PushOutbox.status == "sent", PushOutbox.pushed_at < now - SENT_RETENTION
+        ).delete(synchronize_session=False)
+        db.query(PushOutbox).filter(
+            PushOutbox.status == "dead", PushOutbox.created_at < now - DEAD_RETENTION
+        ).delete(synchronize_session=False)
+        db.commit()
+
+
+def settle(db: Session, outbox: Dict[str, List[str]], failed: Dict[str, str]) -> None:
+    """발송 결과 반영(디스패처 워커에서 호출). failed: user_id → 오류 요약(일시 실패)."""
+    now = datetime.utcnow()
+    ok_ids = [i for uid, ids in outbox.items() if uid not in failed for i in ids]
+    if ok_ids:
+        db.query(PushOutbox).filter(PushOutbox.id.in_(ok_ids)).update({
+            PushOutbox.status: "sent", PushOutbox.lease_owner: None, PushOutbox.lease_until: None,
+        }, synchronize_session=False)
+    retry_ids = [i for uid in failed for i in outbox.get(uid, [])]
+    if retry_ids:
+        for row in db.query(PushOutbox).filter(PushOutbox.id.in_(retry_ids)).all():
+            row.attempts += 1
+            row.last_error = failed.get(row.user_id, "")[:500]
+            row.lease_owner = None
+            row.lease_until = None
+            if row.attempts >= MAX_ATTEMPTS:
+                row.status = "dead"
+                logger.warning(f"Push outbox gave up after {row.attempts} attempts: {row.id} ({row.user_id})")
+            else:
+                row.status = "pending"
+                row.next_attempt_at = now + backoff_delay(row.attempts)
+    db.commit()
+
+
+drainer = OutboxDrainer()
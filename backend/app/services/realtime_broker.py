@@ -0,0 +1,135 @@
+"""실시간(WebSocket) 메시지 브로커.
+
+ConnectionManager.connections 는 프로세스 로컬이라, uvicorn 워커가 여럿이면 워커 A에서 발행한
+채팅/data_changed 가 워커 B에 붙은 사용자에게 닿지 않는다. 발행을 브로커로 보내고, 모든 워커가
+구독해 자기 프로세스에 붙은 소켓에만 전달하게 해서 워커 수와 무관하게 전달을 보장한다.
+
+  - LocalBroker: 단일 프로세스용(기본값). 발행 즉시 같은 프로세스의 구독자에게 전달.
+  - RedisBroker: settings.REALTIME_BROKER="redis" 일 때 settings.REDIS_URL 의 pub/sub 채널 사용.
+    redis 패키지 미설치/연결 실패 시 경고 후 로컬 전달로 폴백(웹푸시/네이티브 푸시와 같은 원칙).
+"""
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# deliver(user_ids, message): 이 프로세스에 붙은 소켓 큐에 넣기만 하는 동기 콜백
+Deliver = Callable[[List[str], dict], None]
+
+REDIS_CHANNEL = "sol-act:ws"
+
+
+class Broker(ABC):
+    """브로커 인터페이스."""
+
+    @abstractmethod
+    async def start(self, deliver: Deliver) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, user_ids: List[str], message: dict) -> None:
+        ...
+
+    async def stop(self) -> None:
+        pass
+
+
+class LocalBroker(Broker):
+    """프로세스 내 브로커. 구독자가 여럿이면(테스트의 '가상 워커') 모두에게 전달한다."""
+
+    def __init__(self):
+        self._subscribers: List[Deliver] = []
+
+    async def start(self, deliver: Deliver) -> None:
+        if deliver not in self._subscribers:
+            self._subscribers.append(deliver)
+
+    async def publish(self, user_ids: List[str], message: dict) -> None:
+        for deliver in list(self._subscribers):
+            deliver(user_ids, message)
+
+    async def stop(self) -> None:
+        self._subscribers.clear()
+
+
+class RedisBroker(Broker):
+    """Redis pub/sub 브로커. 발행한 워커 자신도 구독으로 받아 로컬 전달한다(중복 전달 없음)."""
+
+    def __init__(self, url: str, channel: str = REDIS_CHANNEL, client=None):
+        self.url = url
+        self.channel = channel
+        self._redis = client
+        self._deliver: Optional[Deliver] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.url)
+        self._deliver = deliver
+        self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                backoff = 1.0
+                async for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    try:
+                        data = json.loads(item["data"])
+                        self._deliver(data["u"], data["m"])
+                    except Exception as e:
+                        logger.warning(f"Realtime broker: bad message dropped: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Realtime broker: redis subscribe failed ({e}); retry in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def publish(self, user_ids: List[str], message: dict) -> None:
+        try:
+            await self._redis.publish(self.channel, json.dumps({"u": user_ids, "m": message}))
+        except Exception as e:
+            # Redis 장애 시에도 최소한 이 워커에 붙은 사용자에게는 전달
+            logger.warning(f"Realtime broker: redis publish failed ({e}); delivering locally")
+            if self._deliver:
+                self._deliver(user_ids, message)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except Exception:
+                pass
+
+
+def build_broker() -> Broker:
+    """settings.REALTIME_BROKER 에 맞는 브로커 생성. redis 미설치면 로컬로 폴백."""
+    from app.config import settings
+    if settings.REALTIME_BROKER == "redis":
+        try:
+            import redis.asyncio  # noqa: F401
+            return RedisBroker(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("redis 미설치 — 실시간 브로커를 로컬(단일 워커)로 사용 (pip install redis)")
+    return LocalBroker()
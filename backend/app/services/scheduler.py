@@ -9,6 +9,7 @@ import time
 from datetime import date, timedelta, datetime
 from typing import List
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
@@ -147,6 +148,32 @@ async def check_plan_reminders() -> None:
         db.close()
 
 
+def prune_sync_tombstones() -> int:
+    """보존 기간(TOMBSTONE_TTL_DAYS)이 지난 /api/sync 삭제 기록 정리."""
+    from app.services.sync import prune_tombstones
+
+    db = SessionLocal()
+    try:
+        return prune_tombstones(db)
+    except Exception as e:
+        logger.error(f"Sync tombstone prune failed: {e}")
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+def sweep_upload_blobs() -> int:
+    """모든 URL 링크가 지워진 업로드 blob 회수(services/upload_blobs)."""
+    from app.services.upload_blobs import sweep_unreferenced
+
+    try:
+        return sweep_unreferenced()
+    except Exception as e:
+        logger.error(f"Upload blob sweep failed: {e}")
+        return 0
+
+
 def complete_past_lessons() -> int:
     """Flip SCHEDULED lessons whose end time has passed to COMPLETED.
 
@@ -233,6 +260,9 @@ async def start_scheduler() -> None:
             # 가입마감 알림은 하루 1회로 충분 (스케줄러는 1시간 주기라 24틱마다)
             if ticks % 24 == 0:
                 await check_registration_deadlines()
+                # 대량 DELETE·blob 디렉토리 순회는 동기 I/O — 이벤트 루프를 막지 않게 threadpool로
+                await run_in_threadpool(prune_sync_tombstones)
+                await run_in_threadpool(sweep_upload_blobs)
             # 학습 계획 리마인더: 저녁(19시 이후 KST) 첫 틱에 1회(20h 멱등 가드가 중복 차단).
             # '== 19'가 아니라 '>= 19'라 틱이 19시대를 살짝 비껴가도 그날 리마인더를 놓치지 않음.
             if (datetime.utcnow() + timedelta(hours=9)).hour >= 19:
@@ -0,0 +1,140 @@
+"""증분 동기화(/api/sync) 지원 — 변경 시각 컬럼·삭제 기록(tombstone)·스키마 보강.
+
+  - 변경 시각: lessons/notices/notifications/portfolios.updated_at(신규), assignments.updated_at(기존),
+    chat_messages.timestamp(메시지는 수정 없음). 포트폴리오 카드는 코멘트·영상·첨부가 바뀌어도 달라지므로
+    자식 행 변경 때 부모 updated_at을 같은 flush 안에서 올린다.
+  - 삭제: 대상 엔티티의 ORM 삭제(db.delete)와 일괄 삭제(query.delete()·delete(Model)) 모두
+    sync_tombstones에 한 행씩. raw SQL 삭제(계정 삭제)는 account_deletion이 직접 기록한다.
+    TOMBSTONE_TTL_DAYS가 지나면 정리 — 그보다 오래된 커서는 전체 재동기화.
+  - 기존 DB: create_all은 기존 테이블에 컬럼을 추가하지 않으므로 ensure_schema가 컬럼 추가 + created_at으로 채움.
+"""
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, insert, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.assignment import Assignment
+from app.models.chat import ChatMessage
+from app.models.lesson import Lesson
+from app.models.notice import Notice
+from app.models.notification import Notification
+from app.models.portfolio import Portfolio, PortfolioAttachment, PortfolioComment, PortfolioVideo
+from app.models.sync_tombstone import SyncTombstone
+
+logger = logging.getLogger(__name__)
+
+TOMBSTONE_TTL_DAYS = 30
+
+# 기존 DB에 추가할 변경 시각 컬럼: (테이블, 채울 원본 컬럼)
+_ADDED_COLUMNS = [("lessons", "created_at"), ("notices", "created_at"),
+                  ("notifications", "created_at"), ("portfolios", "created_at")]
+_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_lessons_updated_at ON lessons (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_notices_updated_at ON notices (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_notifications_updated_at ON notifications (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_portfolios_updated_at ON portfolios (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_assignments_updated_at ON assignments (updated_at)",
+    "CREATE INDEX IF NOT EXISTS ix_chat_messages_timestamp ON chat_messages (timestamp)",
+    # 채팅 이력 keyset(routers/chat.py) — 기존 DB에도
+    "CREATE INDEX IF NOT EXISTS ix_chat_messages_class_ts ON chat_messages (class_id, timestamp, id)",
+]
+
+
+def ensure_schema(engine: Engine) -> None:
+    """updated_at 컬럼·조회 인덱스 보강(무손실, 재실행 안전). 앱 시작 시 create_all 직후 1회."""
+    try:
+        insp = inspect(engine)
+        with engine.begin() as conn:
+            for table, source in _ADDED_COLUMNS:
+                if "updated_at" in {c["name"] for c in insp.get_columns(table)}:
+                    continue
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP"))
+                conn.execute(text(f"UPDATE {table} SET updated_at = {source}"))
+                logger.info(f"sync: added {table}.updated_at")
+            for ddl in _INDEXES:
+                conn.execute(text(ddl))
+    except Exception as e:
+        logger.error(f"sync: schema upgrade failed: {e}")
+
+
+# ── 삭제 기록 ──
+
+# 모델 → (엔티티 이름, 소유자 컬럼, 반 컬럼)
+_TRACKED = {
+    Lesson: ("lessons", None, "class_id"),
+    Notice: ("notices", None, None),
+    Assignment: ("assignments", "student_id", None),
+    Portfolio: ("portfolios", "student_id", None),
+    Notification: ("notifications", "user_id", None),
+    ChatMessage: ("chat", None, "class_id"),
+}
+_TRACKED_TABLES = {model.__table__: (model, spec) for model, spec in _TRACKED.items()}
+
+
+def _tombstone(entity: str, owner: str = None, klass: str = None):
+    def record(mapper, connection, target) -> None:
+        connection.execute(insert(SyncTombstone), {
+            "entity": entity,
+            "entity_id": target.id,
+            "owner_id": getattr(target, owner) if owner else None,
+            "class_id": getattr(target, klass) if klass else None,
+            "deleted_at": datetime.utcnow(),
+        })
+    return record
+
+
+for _model, _spec in _TRACKED.items():
+    event.listen(_model, "after_delete", _tombstone(*_spec))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _tombstone_bulk_delete(state) -> None:
+    """일괄 삭제(query.delete()·execute(delete(...)))는 매퍼 이벤트를 거치지 않으므로
+    실행 직전에 지워질 행을 같은 조건으로 골라 기록한다(AsyncSession도 내부 Session을 거친다)."""
+    if not state.is_delete:
+        return
+    tracked = _TRACKED_TABLES.get(state.statement.table)
+    if tracked is None:
+        return
+    model, (entity, owner, klass) = tracked
+    cols = [model.id] + [getattr(model, c) for c in (owner, klass) if c]
+    query = select(*cols)
+    if state.statement.whereclause is not None:
+        query = query.where(state.statement.whereclause)
+    connection = state.session.connection()
+    now = datetime.utcnow()
+    rows = [{
+        "entity": entity,
+        "entity_id": row.id,
+        "owner_id": getattr(row, owner) if owner else None,
+        "class_id": getattr(row, klass) if klass else None,
+        "deleted_at": now,
+    } for row in connection.execute(query)]
+    if rows:
+        connection.execute(insert(SyncTombstone), rows)
+
+
+# ── 포트폴리오 자식 변경 → 부모 updated_at ──
+
+def _touch_portfolio(mapper, connection, target) -> None:
+    if target.portfolio_id:
+        connection.execute(
+            update(Portfolio.__table__)
+            .where(Portfolio.__table__.c.id == target.portfolio_id)
+            .values(updated_at=datetime.utcnow())
+        )
+
+
+for _child in (PortfolioComment, PortfolioVideo, PortfolioAttachment):
+    for _evt in ("after_insert", "after_update", "after_delete"):
+        event.listen(_child, _evt, _touch_portfolio)
+
+
+def prune_tombstones(db: Session) -> int:
+    """보존 기간이 지난 삭제 기록 정리(스케줄러, 하루 1회)."""
+    cutoff = datetime.utcnow() - timedelta(days=TOMBSTONE_TTL_DAYS)
+    n = db.execute(delete(SyncTombstone).where(SyncTombstone.deleted_at < cutoff)).rowcount
+    db.commit()
+    return n or 0
@@ -0,0 +1,131 @@
+"""업로드 내용 주소(content-addressed) 저장 — 같은 파일의 재업로드를 한 벌로.
+
+학생은 같은 리허설 영상·사진을, 선생님은 같은 PDF를 여러 번 올린다. 업로드 바이트를 흘려보내며 해시하고,
+처리(압축·썸네일)가 끝난 결과를 UPLOAD_DIR/.blobs/<앞 2자>/<해시>/ 아래에 하드링크로 등록해 둔다.
+같은 해시가 다시 오면 방금 받은 사본을 버리고 등록된 결과를 새 URL 자리에 하드링크 — 디스크에 두 번째 사본이
+남지 않고 compress_video_sync / extract_thumbnail 을 다시 돌리지 않는다.
+
+  - URL: 업로드마다 기존처럼 <subfolder>/<user_id>/<이름> 경로가 생긴다(같은 inode의 링크).
+    /uploads/ 서빙·계정 삭제(사용자 폴더 rmtree)·압축 후 URL 갱신 등 기존 경로 기반 코드는 그대로 동작한다.
+  - 참조 수: 파일시스템 링크 수(st_nlink − 1). 사용자 폴더가 지워지면 저절로 줄고, sweep_unreferenced가
+    링크가 blob 자신뿐인 항목을 회수한다(스케줄러, 하루 1회).
+  - 키: 스트리밍 경로(save_file·청크 파일 조립)는 내용 sha256. 제자리 쓰기 청크(순서 없이 도착)는 한 번 더
+    읽지 않도록 청크별 sha256 목록의 해시(chunk_list_key) — 같은 파일도 청크 크기가 다르면 다른 키다.
+  - 하드링크를 못 거는 파일시스템(exFAT 등)이면 등록이 조용히 실패하고, 중복 제거 없이 기존처럼 저장된다.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from app.services import file_upload
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIRNAME = ".blobs"
+_DATA = "data"
+_THUMB = "thumb.jpg"
+_STALE_SEC = 24 * 60 * 60  # 데이터 없이 남은(등록 도중 실패한) 디렉토리 회수 기준
+
+
+def chunk_list_key(chunk_size: int, digests: Iterable[str]) -> str:
+    h = hashlib.sha256(f"chunks:{chunk_size}".encode())
+    for d in digests:
+        h.update(b":" + d.encode())
+    return h.hexdigest()
+
+
+def _root() -> Path:
+    return Path(file_upload.UPLOAD_DIR) / BLOB_DIRNAME
+
+
+def _blob_dir(key: str) -> Path:
+    return _root() / key[:2] / key
+
+
+def _data(blob: Path) -> Optional[Path]:
+    return next(iter(sorted(blob.glob(f"{_DATA}.*"))), None) if blob.is_dir() else None
+
+
+def _link(src: Path, dest: Path) -> None:
+    """dest를 src의 하드링크로(있으면 원자적으로 교체)."""
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.link")
+    os.link(src, tmp)
+    os.replace(tmp, dest)
+
+
+def link_existing(key: str, path: Path, video: bool) -> Optional[Tuple[Path, Optional[Path]]]:
+    """이미 처리된 같은 내용이 있으면 path 자리를 그 링크로 바꾼다 → (최종 경로, 썸네일 경로).
+
+    영상은 압축 결과의 확장자(.mp4)를 따른다. 없거나 링크 실패면 None(호출측은 평소처럼 처리).
+    동기 — threadpool에서."""
+    blob = _blob_dir(key)
+    data = _data(blob)
+    if data is None:
+        return None
+    dest = path.with_suffix(data.suffix) if video else path
+    try:
+        _link(data, dest)
+    except OSError as e:  # 그새 회수됨·하드링크 미지원
+        logger.info(f"upload dedup skipped ({key[:12]}): {e}")
+        return None
+    if dest != path:
+        path.unlink(missing_ok=True)
+    thumb = None
+    if video and (blob / _THUMB).exists():
+        thumb = dest.with_suffix(".thumb.jpg")
+        try:
+            _link(blob / _THUMB, thumb)
+        except OSError:
+            thumb = None
+    logger.info(f"Upload deduplicated: {dest.name} → blob {key[:12]}")
+    return dest, thumb
+
+
+def adopt(key: str, path: str) -> None:
+    """처리가 끝난 업로드를 blob으로 등록(이미 있으면 무시). 압축 뒤에 호출 — 영상은 .mp4로 바뀌었을 수 있다.
+    썸네일을 먼저, 데이터를 마지막에 링크한다(데이터가 보이면 등록 완료). 동기 — 백그라운드 태스크."""
+    src = Path(path)
+    if not src.exists() and src.with_suffix(".mp4").exists():
+        src = src.with_suffix(".mp4")
+    if not src.exists():
+        return
+    blob = _blob_dir(key)
+    if _data(blob) is not None:
+        return
+    try:
+        blob.mkdir(parents=True, exist_ok=True)
+        thumb = src.with_suffix(".thumb.jpg")
+        if thumb.exists() and not (blob / _THUMB).exists():
+            os.link(thumb, blob / _THUMB)
+        os.link(src, blob / f"{_DATA}{src.suffix.lower()}")
+    except FileExistsError:
+        pass  # 동시에 같은 내용이 등록됨
+    except OSError as e:
+        logger.info(f"upload blob not registered ({key[:12]}): {e}")
+        shutil.rmtree(blob, ignore_errors=True)
+
+
+def sweep_unreferenced() -> int:
+    """링크가 blob 자신뿐인(모든 URL이 지워진) 항목과, 등록 도중 남은 빈 디렉토리를 회수. 동기."""
+    root = _root()
+    reclaimed = 0
+    now = time.time()
+    for blob in root.glob("*/*") if root.exists() else []:
+        try:
+            data = _data(blob)
+            if data is None:
+                if now - blob.stat().st_mtime <= _STALE_SEC:
+                    continue
+            elif data.stat().st_nlink > 1:
+                continue
+            shutil.rmtree(blob, ignore_errors=True)
+            reclaimed += 1
+        except OSError:
+            continue
+    if reclaimed:
+        logger.info(f"Swept {reclaimed} unreferenced upload blob(s)")
+    return reclaimed
@@ -0,0 +1,296 @@
+"""청크 업로드 세션 저장소.
+
+세션이 routers/upload 의 프로세스 로컬 dict + asyncio.Lock 에 있으면, 재시작하면 진행 중이던 업로드를
+이어받을 수 없고(status 404 → 처음부터), uvicorn 워커가 여럿이면 init을 받은 워커가 아닌 곳으로 간
+청크·complete가 404가 된다. 세션을 공유 저장소에 두고 모든 갱신을 저장소 쪽 원자 연산으로 한다.
+
+  - DbUploadSessionStore(기본): upload_sessions + upload_session_chunks(청크당 한 행 = 수신 비트맵).
+    새 청크 판정은 (upload_id, idx) PK INSERT, 누적은 UPDATE ... SET received_bytes = received_bytes + ?.
+  - RedisUploadSessionStore: settings.UPLOAD_SESSION_STORE="redis". 해시(메타·누적) + 비트맵(SETBIT의
+    이전 비트로 새 청크 판정) + 생성 시각 ZSET(만료 정리). redis 미설치면 경고 후 DB로 폴백.
+
+complete의 "한 번만 처리"는 세션 삭제 결과(DELETE rowcount / DEL 반환값)로 판정한다 — 전역 락 없음.
+청크 파일 자체는 여전히 UPLOAD_DIR 아래에 있으므로, 여러 호스트로 나눌 때는 업로드 디렉토리를 공유해야 한다.
+"""
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from app.models.upload_session import UploadSession, UploadSessionChunk
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = "sol-act:upload:"
+
+# 세션 메타(dict) 키 — routers/upload 가 쓰는 모양 그대로
+_META_FIELDS = ("path", "chunks_dir", "chunk_size", "filename", "total_size", "subfolder", "user_id",
+                "target_type", "target_id", "unique_name")
+
+
+class UploadSessionStore(ABC):
+    """저장소 인터페이스. db는 요청의 AsyncSession(DB 저장소만 사용 — 동기 쿼리는 run_sync로)."""
+
+    @abstractmethod
+    async def create(self, db: AsyncSession, upload_id: str, meta: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, db: AsyncSession, upload_id: str) -> Optional[dict]:
+        """메타 + received(누적 바이트). 없거나 이미 complete됐으면 None."""
+        ...
+
+    @abstractmethod
+    async def add_chunk(self, db: AsyncSession, upload_id: str, idx: int, size: int, digest: str = None) -> int:
+        """청크 수신 기록 → 누적 바이트. 이미 받은 인덱스면 누적하지 않는다(재전송·이어받기).
+        digest는 재전송이면 마지막 것으로 덮는다(같은 자리를 덮어쓰므로)."""
+        ...
+
+    @abstractmethod
+    async def chunk_digests(self, db: AsyncSession, upload_id: str) -> List[Optional[str]]:
+        """인덱스 순 청크 digest 목록."""
+        ...
+
+    @abstractmethod
+    async def next_index(self, db: AsyncSession, upload_id: str) -> int:
+        """청크 이름에 인덱스가 없을 때의 순번 채번(병렬 요청끼리 겹치지 않음)."""
+        ...
+
+    @abstractmethod
+    async def chunk_status(self, db: AsyncSession, upload_id: str) -> Tuple[int, int]:
+        """(받은 청크 수, 처음 비어 있는 인덱스)."""
+        ...
+
+    @abstractmethod
+    async def claim(self, db: AsyncSession, upload_id: str) -> bool:
+        """세션을 지우며 집어간다. 동시 호출 중 정확히 하나만 True."""
+        ...
+
+    @abstractmethod
+    async def expired(self, db: AsyncSession, ttl_sec: int) -> List[dict]:
+        """TTL 지난 세션을 집어가 메타 목록으로(부분 파일 정리는 호출측)."""
+        ...
+
+
+class DbUploadSessionStore(UploadSessionStore):
+    """DB 저장소. 동기 세션이라 각 연산을 threadpool에서 실행."""
+
+    @staticmethod
+    def _meta(row: UploadSession) -> dict:
+        meta = {f: getattr(row, f) for f in _META_FIELDS}
+        meta["received"] = row.received_bytes
+        meta["created_at"] = row.created_at.timestamp()
+        return meta
+
+    async def create(self, db: AsyncSession, upload_id: str, meta: dict) -> None:
+        def run(db: Session):
+            db.add(UploadSession(id=upload_id, **{f: meta.get(f) for f in _META_FIELDS}))
+            db.commit()
+        await db.run_sync(run)
+
+    async def get(self, db: AsyncSession, upload_id: str) -> Optional[dict]:
+        def run(db: Session):
+            row = db.execute(select(UploadSession).where(UploadSession.id == upload_id)
+                             .execution_options(populate_existing=True)).scalar_one_or_none()
+            return self._meta(row) if row else None
+        return await db.run_sync(run)
+
+    async def add_chunk(self, db: AsyncSession, upload_id: str, idx: int, size: int, digest: str = None) -> int:
+        def run(db: Session):
+            try:
+                db.add(UploadSessionChunk(upload_id=upload_id, idx=idx, size=size, digest=digest))
+                db.flush()
+            except IntegrityError:
+                db.rollback()  # 이미 받은 청크
+                if digest:
+                    db.execute(update(UploadSessionChunk)
+                               .where(UploadSessionChunk.upload_id == upload_id, UploadSessionChunk.idx == idx)
+                               .values(digest=digest))
+            else:
+                res = db.execute(update(UploadSession).where(UploadSession.id == upload_id)
+                                 .values(received_bytes=UploadSession.received_bytes + size))
+                if res.rowcount == 1:
+                    db.commit()
+                else:
+                    db.rollback()  # 그새 complete/만료로 집어간 세션 — 고아 청크 행을 남기지 않는다
+            received = db.execute(select(UploadSession.received_bytes)
+                                  .where(UploadSession.id == upload_id)).scalar()
+            db.commit()
+            return received or 0
+        return await db.run_sync(run)
+
+    async def chunk_digests(self, db: AsyncSession, upload_id: str) -> List[Optional[str]]:
+        def run(db: Session):
+            return list(db.execute(select(UploadSessionChunk.digest)
+                                   .where(UploadSessionChunk.upload_id == upload_id)
+                                   .order_by(UploadSessionChunk.idx)).scalars())
+        return await db.run_sync(run)
+
+    async def next_index(self, db: AsyncSession, upload_id: str) -> int:
+        def run(db: Session):
+            # UPDATE가 행을 잠근 채 같은 트랜잭션에서 읽으므로 두 요청이 같은 번호를 받지 않는다
+            db.execute(update(UploadSession).where(UploadSession.id == upload_id)
+                       .values(next_idx=UploadSession.next_idx + 1))
+            n = db.execute(select(UploadSession.next_idx).where(UploadSession.id == upload_id)).scalar()
+            db.commit()
+            return (n or 1) - 1
+        return await db.run_sync(run)
+
+    async def chunk_status(self, db: AsyncSession, upload_id: str) -> Tuple[int, int]:
+        def run(db: Session):
+            mine = UploadSessionChunk.upload_id == upload_id
+            count = db.execute(select(func.count()).select_from(UploadSessionChunk).where(mine)).scalar()
+            has_zero = db.execute(select(UploadSessionChunk.idx).where(mine, UploadSessionChunk.idx == 0)).first()
+            if not has_zero:
+                return count, 0
+            # 첫 빈칸 = 바로 다음 인덱스가 없는 가장 작은 청크 + 1
+            nxt = aliased(UploadSessionChunk)
+            gap = db.execute(
+                select(func.min(UploadSessionChunk.idx + 1)).where(
+                    mine,
+                    ~select(nxt.idx).where(nxt.upload_id == upload_id, nxt.idx == UploadSessionChunk.idx + 1).exists(),
+                )
+            ).scalar()
+            return count, gap
+        return await db.run_sync(run)
+
+    @staticmethod
+    def _claim(db: Session, upload_id: str) -> bool:
+        won = db.execute(delete(UploadSession).where(UploadSession.id == upload_id)).rowcount == 1
+        db.execute(delete(UploadSessionChunk).where(UploadSessionChunk.upload_id == upload_id))
+        return won
+
+    async def claim(self, db: AsyncSession, upload_id: str) -> bool:
+        def run(db: Session):
+            won = self._claim(db, upload_id)
+            db.commit()
+            return won
+        return await db.run_sync(run)
+
+    async def expired(self, db: AsyncSession, ttl_sec: int) -> List[dict]:
+        def run(db: Session):
+            cutoff = datetime.utcnow() - timedelta(seconds=ttl_sec)
+            rows = db.execute(select(UploadSession).where(UploadSession.created_at < cutoff)).scalars().all()
+            metas = [self._meta(r) for r in rows]
+            claimed = [m for m, r in zip(metas, rows) if self._claim(db, r.id)]
+            db.commit()
+            return claimed
+        return await db.run_sync(run)
+
+
+class RedisUploadSessionStore(UploadSessionStore):
+    """Redis 저장소. 세션 키는 TTL의 두 배로 EXPIRE — 정리가 돌지 않아도 결국 사라진다."""
+
+    def __init__(self, url: str, ttl_sec: int, prefix: str = REDIS_PREFIX, client=None):
+        self.url = url
+        self.ttl_sec = ttl_sec
+        self.prefix = prefix
+        self._redis = client
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.url, decode_responses=True)
+        return self._redis
+
+    def _key(self, upload_id: str) -> str:
+        return f"{self.prefix}{upload_id}"
+
+    def _bits(self, upload_id: str) -> str:
+        return f"{self.prefix}{upload_id}:bits"
+
+    def _digests(self, upload_id: str) -> str:
+        return f"{self.prefix}{upload_id}:digests"
+
+    @property
+    def _index(self) -> str:
+        return f"{self.prefix}index"
+
+    async def create(self, db: AsyncSession, upload_id: str, meta: dict) -> None:
+        key = self._key(upload_id)
+        now = time.time()
+        data = {f: meta.get(f) for f in _META_FIELDS}
+        data["created_at"] = now
+        await self.redis.hset(key, mapping={"meta": json.dumps(data), "received": 0, "next_idx": 0})
+        await self.redis.expire(key, self.ttl_sec * 2)
+        await self.redis.zadd(self._index, {upload_id: now})
+
+    async def get(self, db: AsyncSession, upload_id: str) -> Optional[dict]:
+        data = await self.redis.hgetall(self._key(upload_id))
+        if not data or "meta" not in data:  # 집어간 뒤 늦은 HINCRBY가 만든 빈 해시 포함
+            return None
+        meta = json.loads(data["meta"])
+        meta["received"] = int(data.get("received", 0))
+        return meta
+
+    async def add_chunk(self, db: AsyncSession, upload_id: str, idx: int, size: int, digest: str = None) -> int:
+        key, bits = self._key(upload_id), self._bits(upload_id)
+        if digest:
+            await self.redis.hset(self._digests(upload_id), mapping={idx: digest})
+            await self.redis.expire(self._digests(upload_id), self.ttl_sec * 2)
+        was_set = await self.redis.setbit(bits, idx, 1)
+        await self.redis.expire(bits, self.ttl_sec * 2)
+        if was_set:
+            return int(await self.redis.hget(key, "received") or 0)
+        received = int(await self.redis.hincrby(key, "received", size))
+        await self.redis.expire(key, self.ttl_sec * 2)  # 집어간 뒤 도착한 청크가 만든 해시도 사라지게
+        return received
+
+    async def chunk_digests(self, db: AsyncSession, upload_id: str) -> List[Optional[str]]:
+        found = await self.redis.hgetall(self._digests(upload_id))
+        return [d for _, d in sorted((int(i), d) for i, d in found.items())]
+
+    async def next_index(self, db: AsyncSession, upload_id: str) -> int:
+        return int(await self.redis.hincrby(self._key(upload_id), "next_idx", 1)) - 1
+
+    async def chunk_status(self, db: AsyncSession, upload_id: str) -> Tuple[int, int]:
+        bits = self._bits(upload_id)
+        count = int(await self.redis.bitcount(bits))
+        # 키가 없으면 0, 모두 1이면 마지막 바이트 다음 비트 — 둘 다 "처음 빈칸"으로 맞다
+        return count, int(await self.redis.bitpos(bits, 0))
+
+    async def claim(self, db: AsyncSession, upload_id: str) -> bool:
+        won = await self.redis.delete(self._key(upload_id)) == 1
+        await self.redis.delete(self._bits(upload_id))
+        await self.redis.delete(self._digests(upload_id))
+        await self.redis.zrem(self._index, upload_id)
+        return won
+
+    async def expired(self, db: AsyncSession, ttl_sec: int) -> List[dict]:
+        ids = await self.redis.zrangebyscore(self._index, "-inf", time.time() - ttl_sec)
+        claimed = []
+        for upload_id in ids:
+            meta = await self.get(db, upload_id)
+            if await self.claim(db, upload_id) and meta:
+                claimed.append(meta)
+        return claimed
+
+
+_store: Optional[UploadSessionStore] = None
+
+
+def build_upload_store(ttl_sec: int) -> UploadSessionStore:
+    """settings.UPLOAD_SESSION_STORE 에 맞는 저장소 생성. redis 미설치면 DB로 폴백."""
+    from app.config import settings
+    if settings.UPLOAD_SESSION_STORE == "redis":
+        try:
+            import redis.asyncio  # noqa: F401
+            return RedisUploadSessionStore(settings.REDIS_URL, ttl_sec)
+        except ImportError:
+            logger.warning("redis 미설치 — 업로드 세션을 DB에 저장 (pip install redis)")
+    return DbUploadSessionStore()
+
+
+def get_upload_store(ttl_sec: int) -> UploadSessionStore:
+    global _store
+    if _store is None:
+        _store = build_upload_store(ttl_sec)
+    return _store
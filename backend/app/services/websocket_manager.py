@@ -1,44 +1,193 @@
+import asyncio
+import logging
 from fastapi import WebSocket
-from typing import Dict, List
+from typing import Dict, List, Optional
+from app.services import entity_versions
+from app.services.realtime_broker import Broker, LocalBroker
+
+logger = logging.getLogger(__name__)
+
+# 연결별 송신 큐 상한 — 느린 소비자(불안정한 폰 네트워크)가 메모리를 무한정 쌓지 못하게.
+SEND_QUEUE_MAX = 256
+# 한 번의 send_json이 이 시간을 넘기면 죽은/느린 소켓으로 보고 닫는다.
+SEND_TIMEOUT_SEC = 10.0
+# 큐가 가득 차 오래된 메시지를 이만큼 버리고도 따라오지 못하면 연결을 닫는다(재접속 시 앱이 전체 재조회).
+SLOW_CONSUMER_DROP_LIMIT = 64
+# 1013 Try Again Later — 클라이언트가 재접속하도록 유도
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class _Connection:
+    """소켓 1개 + 전용 송신 큐 + 그 큐를 비우는 writer 태스크."""
+
+    __slots__ = ("user_id", "websocket", "queue", "task", "dropped", "sent", "closed")
+
+    def __init__(self, user_id: str, websocket: WebSocket, maxsize: int):
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0  # 마지막 정상 송신 이후 버린 메시지 수
+        self.sent = 0
+        self.closed = False
 
 
 class ConnectionManager:
-    def __init__(self):
-        # user_id -> list of websockets (unified: chat + notifications)
-        self.connections: Dict[str, List[WebSocket]] = {}
+    """user_id → 소켓들. 송신은 연결별 큐에 넣기만 하고, 실제 send_json은 연결마다 독립된
+    writer 태스크가 수행한다. 따라서 브로드캐스트는 어떤 소켓도 기다리지 않으며, 느린 폰 하나가
+    반 전체의 채팅 전달을 지연시키지 않는다.
+
+    사용자 대상 발행(send_to_user/broadcast_to_users)은 브로커를 거친다 — 다중 워커에서도 각 워커가
+    구독해 자기 프로세스의 소켓에만 전달(_deliver_local)한다."""
+
+    def __init__(self, queue_max: int = SEND_QUEUE_MAX, send_timeout: float = SEND_TIMEOUT_SEC,
+                 drop_limit: int = SLOW_CONSUMER_DROP_LIMIT):
+        # user_id -> list of connections (unified: chat + notifications)
+        self.connections: Dict[str, List[_Connection]] = {}
+        self.queue_max = queue_max
+        self.send_timeout = send_timeout
+        self.drop_limit = drop_limit
+        # 누적 지표(프로세스 수명 동안)
+        self.total_sent = 0
+        self.total_dropped = 0
+        self.slow_consumers_closed = 0
+        self.broker: Broker = LocalBroker()
+        self._broker_started = False
+
+    async def start_broker(self, broker: Optional[Broker] = None) -> None:
+        """브로커 교체/구독 시작(앱 startup). 미호출 시 LocalBroker로 동작."""
+        if broker is not None and broker is not self.broker:
+            await self.stop_broker()
+            self.broker = broker
+        if not self._broker_started:
+            await self.broker.start(self._deliver_local)
+            self._broker_started = True
+
+    async def stop_broker(self) -> None:
+        if self._broker_started:
+            await self.broker.stop()
+            self._broker_started = False
 
     async def connect(self, user_id: str, websocket: WebSocket):
         await websocket.accept()
-        if user_id not in self.connections:
-            self.connections[user_id] = []
-        self.connections[user_id].append(websocket)
+        conn = _Connection(user_id, websocket, self.queue_max)
+        conn.task = asyncio.create_task(self._writer(conn))
+        self.connections.setdefault(user_id, []).append(conn)
 
     def disconnect(self, user_id: str, websocket: WebSocket):
-        if user_id in self.connections:
-            self.connections[user_id] = [
-                ws for ws in self.connections[user_id] if ws != websocket
-            ]
-            if not self.connections[user_id]:
-                del self.connections[user_id]
+        conns = self.connections.get(user_id)
+        if not conns:
+            return
+        for conn in conns:
+            if conn.websocket is websocket:
+                self._discard(conn)
+                break
 
-    async def send_to_user(self, user_id: str, message: dict):
-        if user_id not in self.connections:
+    def _discard(self, conn: _Connection) -> None:
+        conn.closed = True
+        if conn.task and conn.task is not asyncio.current_task():
+            conn.task.cancel()
+        conns = self.connections.get(conn.user_id)
+        if conns is not None:
+            remaining = [c for c in conns if c is not conn]
+            if remaining:
+                self.connections[conn.user_id] = remaining
+            else:
+                del self.connections[conn.user_id]
+
+    async def _writer(self, conn: _Connection) -> None:
+        """연결 전용 송신 루프. 송신 실패/타임아웃이면 연결을 정리하고 종료."""
+        try:
+            while True:
+                message = await conn.queue.get()
+                try:
+                    await asyncio.wait_for(conn.websocket.send_json(message), timeout=self.send_timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"WS send timeout — closing slow consumer {conn.user_id}")
+                    self.slow_consumers_closed += 1
+                    await self._close(conn, SLOW_CONSUMER_CLOSE_CODE)
+                    return
+                except Exception:
+                    self._discard(conn)
+                    return
+                conn.sent += 1
+                conn.dropped = 0
+                self.total_sent += 1
+        except asyncio.CancelledError:
+            pass
+
+    async def _close(self, conn: _Connection, code: int) -> None:
+        self._discard(conn)
+        try:
+            await conn.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def _enqueue(self, conn: _Connection, message: dict) -> None:
+        """큐에 넣기만 한다(절대 await 안 함). 가득 차면 가장 오래된 메시지를 버리고,
+        버린 수가 drop_limit을 넘으면 느린 소비자로 보고 연결을 닫는다."""
+        if conn.closed:
             return
-        dead = []
-        for ws in self.connections[user_id]:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.connections[user_id].remove(ws)
+        try:
+            conn.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+        try:
+            conn.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        conn.queue.put_nowait(message)
+        conn.dropped += 1
+        self.total_dropped += 1
+        if conn.dropped > self.drop_limit:
+            logger.warning(f"WS queue overflow — closing slow consumer {conn.user_id}")
+            self.slow_consumers_closed += 1
+            self._discard(conn)  # 즉시 분리해 이후 메시지가 더 쌓이지 않게
+            asyncio.create_task(self._close(conn, SLOW_CONSUMER_CLOSE_CODE))
+
+    def _deliver_local(self, user_ids: List[str], message: dict) -> None:
+        """브로커 구독 콜백 — 이 프로세스에 붙은 소켓 큐에만 넣는다.
+        모든 워커가 모든 발행을 받는 자리라, 목록 ETag 카운터도 여기서 올린다(소켓에 넣기 전)."""
+        entity_versions.observe(user_ids, message)
+        for user_id in user_ids:
+            for conn in list(self.connections.get(user_id, ())):
+                self._enqueue(conn, message)
+
+    async def send_to_user(self, user_id: str, message: dict):
+        await self.broadcast_to_users([user_id], message)
+
+    async def send_to_socket(self, user_id: str, websocket: WebSocket, message: dict):
+        """특정 소켓 1개에만(pong/error 응답). writer 태스크와 동시 send가 겹치지 않게 같은 큐를 탄다."""
+        for conn in self.connections.get(user_id, ()):
+            if conn.websocket is websocket:
+                self._enqueue(conn, message)
+                return
 
     def get_connected_user_ids(self) -> List[str]:
         return list(self.connections.keys())
 
     async def broadcast_to_users(self, user_ids: List[str], message: dict):
-        for user_id in user_ids:
-            await self.send_to_user(user_id, message)
+        if not user_ids:
+            return
+        if not self._broker_started:
+            await self.start_broker()
+        await self.broker.publish(list(user_ids), message)
+
+    def stats(self) -> dict:
+        """큐 깊이·드롭·종료 지표(관리자 대시보드용)."""
+        depths = [c.queue.qsize() for conns in self.connections.values() for c in conns]
+        return {
+            "users": len(self.connections),
+            "connections": len(depths),
+            "queued_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "queue_capacity": self.queue_max,
+            "sent_total": self.total_sent,
+            "dropped_total": self.total_dropped,
+            "slow_consumers_closed": self.slow_consumers_closed,
+            "broker": type(self.broker).__name__,
+        }
 
 
 manager = ConnectionManager()
@@ -2,13 +2,13 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.config import settings
 from app.database import get_db
 from app.models.user import User, UserRole
-from app.models.class_info import class_students
+from app.utils import principal_cache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -32,10 +32,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_current_user(
+def get_current_principal(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> User:
+) -> principal_cache.Principal:
+    """JWT 검증 + 주체 조회. (user_id, 토큰 해시) 캐시 적중이면 DB 쿼리 없음.
+    요청 내에서는 FastAPI 의존성 캐시로 1회만 실행된다."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -48,30 +51,35 @@ def get_current_user(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+
+    principal = principal_cache.load(db, user_id, token)
+    if principal is None:
         raise credentials_exception
-    return user
+    from app.services.entity_versions import track_request
+    track_request(request, db, principal.id)
+    return principal
 
 
-def require_enrolled_student(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+def get_current_user(
+    principal: principal_cache.Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
 ) -> User:
+    return principal_cache.attach(db, principal)
+
+
+def require_enrolled_student(
+    principal: principal_cache.Principal = Depends(get_current_principal),
+) -> principal_cache.Principal:
     """전면 차단 게이트: 반배정이 안 된 학생은 서비스 기능에 접근 불가(403).
 
     - 학생인데 class_students에 배정 레코드가 0건이면 차단.
     - 교사·원장은 반배정과 무관하게 항상 통과.
-    반에 배정되는 즉시 자동으로 해제되므로 별도 승인 단계가 필요 없다.
+    반에 배정되는 즉시 자동으로 해제되므로 별도 승인 단계가 필요 없다
+    (배정 커밋 시 주체 캐시가 무효화됨).
     """
-    if current_user.role == UserRole.STUDENT:
-        enrolled = db.query(class_students.c.class_id).filter(
-            class_students.c.student_id == current_user.id
-        ).first()
-        if enrolled is None:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="반배정 대기 중입니다. 관리자에게 문의해주세요.",
-            )
-    return current_user
+    if not principal.enrolled:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="반배정 대기 중입니다. 관리자에게 문의해주세요.",
+        )
+    return principal
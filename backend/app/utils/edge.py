@@ -0,0 +1,137 @@
+"""앱 앞단(edge) 순수 ASGI 미들웨어 — 슬래시 정규화 · CORS/ngrok 헤더 · 파일 서빙 접두사.
+
+예전엔 @app.middleware("http")(BaseHTTPMiddleware) 4겹이었다: 층마다 태스크·메모리 스트림이
+생기고, 슬래시 정규화는 /api/ 요청마다 app.routes 전체에 route.matches()를 돌렸다.
+이제 한 층에서 scope만 보고 처리한다.
+
+  - 슬래시 정규화: 라우트 경로를 정적 경로 집합 + (고정 접두사, 정규식) 목록으로 미리 컴파일한 표로
+    판정. 현재 경로가 어느 라우트와도 안 맞으면 끝 슬래시를 토글한다(307 리다이렉트는 교차 출처(ngrok)에서
+    Authorization 헤더를 떨어뜨린다). 라우트 수가 바뀌면 표를 다시 만든다.
+  - CORS preflight(허용 출처)는 바로 204 — ngrok이 CORSMiddleware 헤더를 벗길 수 있다.
+    그 외 응답 시작 메시지에 ngrok 경고 우회 + 허용 출처 CORS 헤더를 얹는다.
+  - 접두사 핸들러(/uploads/, /music-files/): Request → Response 함수를 그대로 ASGI 앱으로 실행
+    (기존처럼 이 응답들엔 ngrok/CORS 헤더를 얹지 않는다).
+"""
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Pattern, Set, Tuple, Union
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PrefixHandler = Callable[[Request], Union[Response, Awaitable[Response]]]
+
+_PREFLIGHT_HEADERS = [
+    (b"access-control-allow-credentials", b"true"),
+    (b"access-control-allow-methods", b"GET, POST, PUT, DELETE, PATCH, OPTIONS"),
+    (b"access-control-allow-headers", b"authorization, content-type, ngrok-skip-browser-warning"),
+    (b"access-control-max-age", b"86400"),
+    (b"ngrok-skip-browser-warning", b"true"),
+]
+
+
+class RouteTable:
+    """HTTP 라우트 경로 표 — 정적 경로는 집합 조회, 경로 변수가 있는 라우트만 접두사로 거른 뒤 정규식."""
+
+    MEMO_MAX = 4096
+
+    def __init__(self, routes: Iterable):
+        self.static: Set[str] = set()
+        self.dynamic: List[Tuple[str, Pattern]] = []
+        self._memo: Dict[str, bool] = {}
+        for route in routes:
+            # WebSocketRoute는 http scope와 매칭되지 않는다(route.matches와 같은 기준)
+            if isinstance(route, Mount):
+                self.dynamic.append((route.path, route.path_regex))
+            elif isinstance(route, Route):
+                if "{" in route.path:
+                    self.dynamic.append((route.path.split("{", 1)[0], route.path_regex))
+                else:
+                    self.static.add(route.path)
+
+    def matches(self, path: str) -> bool:
+        if path in self.static:
+            return True
+        hit = self._memo.get(path)
+        if hit is None:
+            hit = any(path.startswith(prefix) and regex.match(path) for prefix, regex in self.dynamic)
+            if len(self._memo) >= self.MEMO_MAX:
+                self._memo.clear()
+            self._memo[path] = hit
+        return hit
+
+    def resolve(self, path: str) -> str:
+        """맞는 라우트가 있으면 그대로, 없으면 끝 슬래시를 토글한 경로."""
+        if self.matches(path):
+            return path
+        return path.rstrip("/") if path.endswith("/") else path + "/"
+
+
+class EdgeMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        routes_app,
+        cors_origins: Iterable[str] = (),
+        prefix_handlers: Optional[Dict[str, PrefixHandler]] = None,
+        normalize_prefix: str = "/api/",
+    ):
+        self.app = app
+        self.routes_app = routes_app  # .routes를 가진 앱(라우트는 미들웨어 생성 뒤에도 추가될 수 있음)
+        self.cors_origins = frozenset(cors_origins)
+        self.prefix_handlers = tuple((prefix_handlers or {}).items())
+        self.normalize_prefix = normalize_prefix
+        self._table: Optional[RouteTable] = None
+        self._table_size = -1
+
+    def route_table(self) -> RouteTable:
+        routes = self.routes_app.routes
+        if self._table is None or len(routes) != self._table_size:
+            self._table = RouteTable(routes)
+            self._table_size = len(routes)
+        return self._table
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        for prefix, handler in self.prefix_handlers:
+            if path.startswith(prefix):
+                response = handler(Request(scope, receive))
+                if not isinstance(response, Response):
+                    response = await response
+                await response(scope, receive, send)
+                return
+
+        origin = Headers(scope=scope).get("origin")
+        allowed = origin is not None and origin in self.cors_origins
+        if allowed and scope["method"] == "OPTIONS":
+            await send({
+                "type": "http.response.start",
+                "status": 204,
+                "headers": [(b"access-control-allow-origin", origin.encode("latin-1")), *_PREFLIGHT_HEADERS],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if path.startswith(self.normalize_prefix):
+            resolved = self.route_table().resolve(path)
+            if resolved != path:
+                scope = {**scope, "path": resolved}
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                headers = MutableHeaders(scope=message)
+                headers["ngrok-skip-browser-warning"] = "true"
+                # 307·에러 응답 등에도 CORS 헤더 보장
+                if allowed:
+                    headers["access-control-allow-origin"] = origin
+                    headers["access-control-allow-credentials"] = "true"
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
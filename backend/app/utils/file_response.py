@@ -0,0 +1,252 @@
+"""파일 Range 응답 공용 구현 — /uploads/, /music-files/, 음원 스트림(music.stream_track)이 함께 쓴다.
+
+iOS Safari / WKWebView는 <video>/<audio> 재생·탐색에 Range(206)가 필요하다.
+예전엔 Range 처리가 세 군데 복사돼 있었고, 스트림 쪽은 요청 구간 전체를 f.read()로 메모리에 올렸다
+(끝이 열린 Range 하나면 긴 음원 파일 전체 적재).
+
+  - 검증자: ETag(mtime_ns-size), Last-Modified. If-None-Match / If-Modified-Since → 304,
+    If-Range가 현재 파일과 다르면 Range를 무시하고 200 전체.
+  - Range: 단일(206 + Content-Range), 접미(bytes=-N), 다중(multipart/byteranges, 최대 MAX_RANGES개),
+    만족 불가 → 416. 형식이 틀린 Range 헤더는 무시(200 전체).
+  - 전송: 서버가 ASGI 확장을 광고하면 커널에 맡긴다 — 전체 파일은 http.response.pathsend,
+    구간은 http.response.zerocopysend(파일 디스크립터 + offset/count → os.sendfile).
+    확장이 없으면(uvicorn 등) 스레드풀 파일 읽기로 CHUNK_SIZE씩 보낸다 — 메모리는 청크 크기로 제한.
+
+요청 헤더는 응답 실행 시점에 scope에서 읽으므로, 호출하는 쪽은 경로 검증 후 응답 객체만 돌려주면 된다.
+"""
+import mimetypes
+import os
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Mapping, Optional, Tuple
+
+import anyio
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+CHUNK_SIZE = 512 * 1024
+MAX_RANGES = 16  # 이보다 많은 구간 요청은 Range를 무시하고 전체로(잘게 쪼갠 요청 남용 방지)
+
+_Range = Tuple[int, int]  # [start, end] 양끝 포함
+
+
+def parse_range(header: str, size: int) -> Optional[List[_Range]]:
+    """'bytes=0-99,200-' → [(0, 99), (200, size-1)].
+
+    형식 오류 → None(헤더 무시). 만족 가능한 구간이 하나도 없으면 [] (416).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+    ranges: List[_Range] = []
+    for part in spec.split(","):
+        start_s, sep, end_s = part.strip().partition("-")
+        if not sep:
+            return None
+        try:
+            if not start_s:  # 접미 구간: 마지막 N바이트
+                length = int(end_s)
+                if length <= 0:
+                    continue
+                start, end = max(0, size - length), size - 1
+            else:
+                start = int(start_s)
+                end = int(end_s) if end_s else size - 1
+        except ValueError:
+            return None
+        if start < 0 or (end_s and start_s and end < start):
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+    return ranges
+
+
+def _etag(st: os.stat_result) -> str:
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    tags = [t.strip() for t in header.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+def _not_modified_since(header: str, st: os.stat_result) -> bool:
+    try:
+        return int(st.st_mtime) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class RangedFileResponse(Response):
+    """경로 하나를 Range/조건부 요청에 맞춰 보내는 응답(상태 코드는 실행 시점에 결정)."""
+
+    def __init__(
+        self,
+        path: str,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        default_media_type: str = "application/octet-stream",
+        stat_result: Optional[os.stat_result] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        self.path = path
+        self.status_code = 200
+        self.media_type = media_type or mimetypes.guess_type(path)[0] or default_media_type
+        self.background = background
+        self.stat_result = stat_result
+        self.init_headers(headers)
+        self.raw_headers = [(k, v) for k, v in self.raw_headers if k not in (b"content-length", b"content-type")]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        st = self.stat_result
+        if st is None:
+            try:
+                st = await anyio.to_thread.run_sync(os.stat, self.path)
+            except FileNotFoundError:
+                raise RuntimeError(f"File at path {self.path} does not exist.")
+        if not stat.S_ISREG(st.st_mode):
+            raise RuntimeError(f"File at path {self.path} is not a file.")
+
+        req = Headers(scope=scope)
+        size = st.st_size
+        etag = _etag(st)
+        validators = [
+            (b"accept-ranges", b"bytes"),
+            (b"etag", etag.encode()),
+            (b"last-modified", formatdate(st.st_mtime, usegmt=True).encode()),
+        ]
+        head = scope["method"].upper() == "HEAD"
+
+        if_none_match = req.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            since = req.get("if-modified-since")
+            not_modified = since is not None and _not_modified_since(since, st)
+        if not_modified:
+            await self._start(send, 304, validators, [])
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        ranges = None
+        range_header = req.get("range")
+        if range_header and self._if_range_ok(req.get("if-range"), etag, st):
+            ranges = parse_range(range_header, size)
+            if ranges is not None and len(ranges) > MAX_RANGES:
+                ranges = None
+
+        if ranges == []:
+            await self._start(send, 416, validators, [(b"content-range", f"bytes */{size}".encode())])
+            if not head:
+                await send({"type": "http.response.body", "body": b""})
+        elif not ranges:
+            await self._start(send, 200, validators, [
+                (b"content-type", self._content_type()), (b"content-length", str(size).encode()),
+            ])
+            if not head:
+                await self._send_parts(scope, send, [(None, 0, size)], full=True)
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            await self._start(send, 206, validators, [
+                (b"content-type", self._content_type()),
+                (b"content-range", f"bytes {start}-{end}/{size}".encode()),
+                (b"content-length", str(end - start + 1).encode()),
+            ])
+            if not head:
+                await self._send_parts(scope, send, [(None, start, end - start + 1)])
+        else:
+            boundary = os.urandom(12).hex()
+            parts = []
+            length = 0
+            for start, end in ranges:
+                preamble = (
+                    f"--{boundary}\r\nContent-Type: {self.media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                ).encode("latin-1")
+                parts.append((preamble, start, end - start + 1))
+                length += len(preamble) + end - start + 1 + 2
+            epilogue = f"--{boundary}--\r\n".encode("latin-1")
+            length += len(epilogue)
+            await self._start(send, 206, validators, [
+                (b"content-type", f"multipart/byteranges; boundary={boundary}".encode("latin-1")),
+                (b"content-length", str(length).encode()),
+            ])
+            if not head:
+                await self._send_parts(scope, send, parts, epilogue=epilogue)
+
+        if head:
+            await send({"type": "http.response.body", "body": b""})
+        if self.background is not None:
+            await self.background()
+
+    @staticmethod
+    def _if_range_ok(if_range: Optional[str], etag: str, st: os.stat_result) -> bool:
+        """If-Range가 없거나 현재 파일과 같으면 True(Range 적용)."""
+        if if_range is None:
+            return True
+        if if_range.startswith(('"', "W/")):
+            return if_range.strip() == etag  # If-Range는 강한 비교
+        return _not_modified_since(if_range, st)
+
+    def _content_type(self) -> bytes:
+        mt = self.media_type
+        if mt.startswith("text/") and "charset=" not in mt:
+            mt += f"; charset={self.charset}"
+        return mt.encode("latin-1")
+
+    async def _start(self, send: Send, status: int, validators, extra) -> None:
+        self.status_code = status
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [*self.raw_headers, *validators, *extra],
+        })
+
+    async def _send_parts(self, scope: Scope, send: Send, parts, full: bool = False, epilogue: bytes = b"") -> None:
+        """parts: [(앞에 붙일 바이트|None, offset, count)]. 마지막 메시지에 more_body=False."""
+        extensions = scope.get("extensions") or {}
+        if full and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+            return
+        multipart = parts[0][0] is not None
+
+        if "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as f:
+                for i, (preamble, offset, count) in enumerate(parts):
+                    if preamble:
+                        await send({"type": "http.response.body", "body": preamble, "more_body": True})
+                    last = i == len(parts) - 1 and not multipart
+                    await send({
+                        "type": "http.response.zerocopysend", "file": f.fileno(),
+                        "offset": offset, "count": count, "more_body": not last,
+                    })
+                    if multipart:
+                        await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+            if multipart:
+                await send({"type": "http.response.body", "body": epilogue, "more_body": False})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            for i, (preamble, offset, count) in enumerate(parts):
+                if preamble:
+                    await send({"type": "http.response.body", "body": preamble, "more_body": True})
+                await f.seek(offset)
+                remaining = count
+                while remaining > 0:
+                    chunk = await f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:  # 전송 도중 파일이 줄어듦 — 선언한 길이를 못 채우므로 끊는다
+                        raise RuntimeError(f"File at path {self.path} shrank while sending.")
+                    remaining -= len(chunk)
+                    last = remaining == 0 and i == len(parts) - 1 and not multipart
+                    await send({"type": "http.response.body", "body": chunk, "more_body": not last})
+                if multipart:
+                    await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+        if multipart:
+            await send({"type": "http.response.body", "body": epilogue, "more_body": False})
+        elif count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
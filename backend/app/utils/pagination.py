@@ -1,5 +1,8 @@
-from fastapi import Query
-from typing import Optional
+from datetime import datetime, timedelta
+from fastapi import HTTPException, Query
+from typing import Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
 
 
 def pagination_params(
@@ -7,3 +10,15 @@ def pagination_params(
     limit: int = Query(100, ge=1, le=500),
 ):
     return {"skip": skip, "limit": limit}
+
+
+def keyset_cursor(ts: datetime, key: str) -> str:
+    """(시각, 키) keyset 위치 → 불투명 커서 "<마이크로초>-<키>" (채팅 이력·영상 피드 공용)."""
+    return f"{(ts - _EPOCH) // timedelta(microseconds=1)}-{key}"
+
+
+def parse_keyset_cursor(cursor: str) -> Tuple[datetime, str]:
+    us, sep, key = cursor.partition("-")
+    if not sep or not key or not us.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return _EPOCH + timedelta(microseconds=int(us)), key
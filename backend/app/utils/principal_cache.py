@@ -0,0 +1,147 @@
+"""인증 주체(principal) 캐시 — get_current_user / require_enrolled_student 의 매 요청 쿼리 제거.
+
+키: (user_id, 토큰 해시). 값: 역할·이름·반배정 여부·반 id + 사용자 행 스냅샷(분리 상태).
+적중 시 스냅샷을 요청 세션에 SQL 없이 붙여(merge load=False) 라우트가 평소처럼 User를 쓴다
+(지연 로딩·수정·커밋 모두 동일).
+
+무효화:
+  - User 행 insert/update/delete(ORM) → 해당 사용자, 세션 커밋 시점에.
+  - 반 로스터·담당 교사 변경(class_scope) → 전체(드물게 일어남).
+  - 계정 삭제(raw SQL) → account_deletion 이 커밋 시 무효화 예약.
+다른 uvicorn 워커에서 일어난 변경은 TTL_SEC 안에 반영된다.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app.models.class_info import class_students
+from app.models.user import User, UserRole
+
+TTL_SEC = 30.0
+MAX_ENTRIES = 10_000
+_DIRTY_KEY = "principal_cache_dirty"
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: str
+    role: UserRole
+    name: str
+    enrolled: bool               # 학생: 반배정 1건 이상 / 교사·원장: 항상 True
+    class_ids: Tuple[str, ...]   # 학생: 수강 반 / 교사: 담당 반 / 원장: ()
+    user: User                   # 분리(detached)된 컬럼 스냅샷 — 직접 쓰지 말고 attach()로
+
+
+_lock = threading.Lock()
+_gen = 0
+_entries: "OrderedDict[Tuple[str, str], Tuple[float, Principal]]" = OrderedDict()
+hits = 0
+misses = 0
+
+
+def token_key(user_id: str, token: str) -> Tuple[str, str]:
+    return user_id, hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def _snapshot(user: User) -> User:
+    copy = User(**{c.key: getattr(user, c.key) for c in User.__mapper__.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+def load(db: Session, user_id: str, token: str) -> Optional[Principal]:
+    """캐시 적중이면 쿼리 없이, 아니면 users + 반 id 조회(2쿼리) 후 캐시. 사용자가 없으면 None."""
+    global hits, misses
+    key = token_key(user_id, token)
+    now = time.monotonic()
+    with _lock:
+        hit = _entries.get(key)
+        if hit and hit[0] > now:
+            _entries.move_to_end(key)
+            hits += 1
+            return hit[1]
+        misses += 1
+        gen = _gen
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        return None
+    if user.role == UserRole.STUDENT:
+        class_ids = tuple(db.execute(
+            select(class_students.c.class_id).where(class_students.c.student_id == user_id)
+        ).scalars())
+        enrolled = bool(class_ids)
+    elif user.role == UserRole.TEACHER:
+        from app.services.class_scope import teacher_class_ids
+        class_ids, enrolled = tuple(teacher_class_ids(db, user_id)), True
+    else:
+        class_ids, enrolled = (), True
+    principal = Principal(user.id, user.role, user.name, enrolled, class_ids, _snapshot(user))
+
+    with _lock:
+        if gen == _gen:
+            _entries[key] = (now + TTL_SEC, principal)
+            _entries.move_to_end(key)
+            while len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+    return principal
+
+
+def attach(db: Session, principal: Principal) -> User:
+    """스냅샷을 요청 세션의 영속 객체로(SQL 없음). 이미 세션에 있으면 그 객체를 돌려준다."""
+    return db.merge(principal.user, load=False)
+
+
+# ── 무효화 ──
+
+def invalidate(user_ids: Optional[Iterable[str]] = None) -> None:
+    """user_ids=None이면 전체."""
+    global _gen
+    with _lock:
+        _gen += 1
+        if user_ids is None:
+            _entries.clear()
+            return
+        targets = set(user_ids)
+        for key in [k for k in _entries if k[0] in targets]:
+            del _entries[key]
+
+
+def invalidate_on_commit(db: Session, user_ids: Optional[Iterable[str]] = None) -> None:
+    """세션이 커밋/롤백될 때 무효화하도록 예약."""
+    dirty = db.info.setdefault(_DIRTY_KEY, {"all": False, "users": set()})
+    if user_ids is None:
+        dirty["all"] = True
+    else:
+        dirty["users"].update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _apply_dirty(session: Session) -> None:
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if dirty:
+        invalidate(None if dirty["all"] else dirty["users"])
+
+
+def _user_changed(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is None:
+        invalidate([target.id])
+    else:
+        invalidate_on_commit(session, [target.id])
+
+
+for _evt in ("after_insert", "after_update", "after_delete"):
+    event.listen(User, _evt, _user_changed)
+
+
+def stats() -> dict:
+    with _lock:
+        return {"entries": len(_entries), "hits": hits, "misses": misses, "ttl_sec": TTL_SEC}
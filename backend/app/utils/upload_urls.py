@@ -0,0 +1,90 @@
+"""/uploads/ 서명 URL — 무인증 공개 접근 차단.
+
+서버가 응답에 실어 보내는 /uploads/ URL에만 HMAC 토큰(?t=)을 붙이고, 서빙 시 검증한다.
+경로 기반 안정 서명(만료 없음)이라 캐싱을 깨지 않고, SECRET_KEY 없이는 위조 불가.
+
+서명은 JSON 직렬화 단계에서 한다: SignedJSONResponse(앱 기본 응답 클래스)가 json 인코더의
+문자열 인코딩 훅에서 "/uploads/"가 든 문자열만 서명한 뒤 이어서 인코딩한다 — 본문을 다시 읽거나
+전체를 정규식으로 훑지 않는 1패스. 같은 파일 URL은 반복해서 나오므로 서명 결과는 LRU로 기억한다.
+"""
+import hashlib
+import hmac
+import json
+import re
+from functools import lru_cache
+
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+
+# 파일명에 콜론(타임스탬프 16:35:04)·공백·한글 등이 있을 수 있어, 안전문자 화이트리스트 대신
+# 따옴표/쿼리 구분자/역슬래시/제어문자만 제외하고 전부 경로로 캡처(=끊김 없이 정확히 서명).
+_UPLOADS_URL_RE = re.compile(r'/uploads/([^"?\\\x00-\x1f]+)')
+
+
+@lru_cache(maxsize=65536)
+def sign_upload(rel: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), ("uploads:" + rel).encode(), hashlib.sha256).hexdigest()[:24]
+
+
+def verify_upload(rel: str, token: str) -> bool:
+    return bool(token) and hmac.compare_digest(token, sign_upload(rel))
+
+
+def _sign_match(m) -> str:
+    return f"/uploads/{m.group(1)}?t={sign_upload(m.group(1))}"
+
+
+def sign_upload_urls(text: str) -> str:
+    """문자열 안의 /uploads/ URL에 서명 토큰 부착(없으면 그대로)."""
+    if "/uploads/" not in text:
+        return text
+    return _UPLOADS_URL_RE.sub(_sign_match, text)
+
+
+class _SigningEncoder(json.JSONEncoder):
+    """문자열 인코더 앞에 서명 단계를 끼운 JSONEncoder(C 가속 경로 유지)."""
+
+    def encode(self, o):
+        if isinstance(o, str):
+            o = sign_upload_urls(o)
+        return super().encode(o)
+
+    def iterencode(self, o, _one_shot=False):
+        base = json.encoder.encode_basestring_ascii if self.ensure_ascii else json.encoder.encode_basestring
+
+        def _encoder(s: str) -> str:
+            return base(sign_upload_urls(s))
+
+        if _one_shot and json.encoder.c_make_encoder is not None and self.indent is None:
+            return json.encoder.c_make_encoder(
+                {} if self.check_circular else None, self.default, _encoder, self.indent,
+                self.key_separator, self.item_separator, self.sort_keys,
+                self.skipkeys, self.allow_nan,
+            )(o, 0)
+        # C 가속이 없는 환경: 값을 먼저 서명한 사본으로 표준 경로 사용
+        return super().iterencode(_presign(o), _one_shot)
+
+
+def _presign(o):
+    if isinstance(o, str):
+        return sign_upload_urls(o)
+    if isinstance(o, dict):
+        return {k: _presign(v) for k, v in o.items()}
+    if isinstance(o, (list, tuple)):
+        return [_presign(v) for v in o]
+    return o
+
+
+class SignedJSONResponse(JSONResponse):
+    """JSONResponse와 같은 출력 + /uploads/ URL 서명."""
+
+    def render(self, content) -> bytes:
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+            cls=_SigningEncoder,
+        ).encode("utf-8")
@@ -0,0 +1,111 @@
+"""
+앞단 미들웨어 요청당 오버헤드 마이크로벤치 — 예전 @app.middleware("http") 4겹 vs EdgeMiddleware 1층.
+- 같은 라우트 표(app.main.app.routes)로 슬래시 정규화를 판정하고, 안쪽 앱은 빈 200 응답만 돌려준다
+  (라우팅·핸들러 비용 제외 = 순수 미들웨어 비용).
+- 예전 4겹은 이 파일 안에 그대로 재현(이전 main.py와 같은 코드).
+실행: cd backend && ./venv/bin/python bench_middleware.py [요청수]
+"""
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+from starlette.routing import Match
+
+from app.config import settings
+from app.main import app as real_app, serve_music_files, serve_uploads
+from app.utils.edge import EdgeMiddleware
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+ORIGIN = next(iter(settings.effective_cors_origins), "http://localhost:5173")
+PATHS = ["/api/notices/", "/api/chat/rooms", "/api/users/s1", "/api/portfolios/p123/comments/"]
+
+
+async def inner(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"0")]})
+    await send({"type": "http.response.body", "body": b""})
+
+
+# ── 예전 4겹(BaseHTTPMiddleware) ──
+
+async def normalize_trailing_slash(request, call_next):
+    path = request.scope.get("path", "")
+    if path.startswith("/api/"):
+        matched = any(route.matches(request.scope)[0] != Match.NONE for route in real_app.routes)
+        if not matched:
+            request.scope["path"] = path.rstrip("/") if path.endswith("/") else path + "/"
+    return await call_next(request)
+
+
+async def add_extra_headers(request, call_next):
+    origin = request.headers.get("origin")
+    response = await call_next(request)
+    response.headers["ngrok-skip-browser-warning"] = "true"
+    if origin and origin in settings.effective_cors_origins:
+        response.headers["access-control-allow-origin"] = origin
+        response.headers["access-control-allow-credentials"] = "true"
+    return response
+
+
+async def uploads_layer(request, call_next):
+    if request.url.path.startswith("/uploads/"):
+        return serve_uploads(request)
+    return await call_next(request)
+
+
+async def music_layer(request, call_next):
+    if request.url.path.startswith("/music-files/"):
+        return serve_music_files(request)
+    return await call_next(request)
+
+
+def build(middleware):
+    """FastAPI 미들웨어 스택 빌드 로직 그대로(ServerErrorMiddleware 등 포함)에 inner를 끼운다."""
+    bench = FastAPI(middleware=middleware)
+    bench.router = inner
+    return bench
+
+
+legacy = build([Middleware(BaseHTTPMiddleware, dispatch=fn) for fn in
+                (music_layer, uploads_layer, add_extra_headers, normalize_trailing_slash)])
+edge = build([Middleware(EdgeMiddleware, routes_app=real_app, cors_origins=settings.effective_cors_origins,
+                         prefix_handlers={"/music-files/": serve_music_files, "/uploads/": serve_uploads})])
+
+
+def scope_for(path):
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"origin", ORIGIN.encode())],
+        "client": ("127.0.0.1", 1), "server": ("localhost", 8000),
+    }
+
+
+async def run(asgi_app):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for path in PATHS:  # 워밍업(미들웨어 스택·라우트 표 빌드)
+        await asgi_app(scope_for(path), receive, send)
+    started = time.perf_counter()
+    for i in range(N):
+        await asgi_app(scope_for(PATHS[i % len(PATHS)]), receive, send)
+    return (time.perf_counter() - started) / N * 1e6
+
+
+async def main():
+    print(f"routes={len(real_app.routes)} requests={N}")
+    before = await run(legacy)
+    after = await run(edge)
+    print(f"before (BaseHTTPMiddleware x4): {before:8.1f} µs/req")
+    print(f"after  (EdgeMiddleware):        {after:8.1f} µs/req  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
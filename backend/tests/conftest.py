@@ -1,26 +1,48 @@
+import os
+import tempfile
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 from datetime import date, datetime
 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db
 from app.main import app
 from app.models.user import User, UserRole
 from app.models.invite_code import InviteCode
 from app.models.class_info import ClassInfo
 from app.models.lesson import Lesson, LessonStatus, LessonType, Subject
 from app.models.assignment import Assignment
+from app.services.entity_versions import track_request
 from app.utils.auth import get_password_hash, create_access_token
 
-# In-memory SQLite for tests
+# Temp-file SQLite for tests — 동기(get_db)·비동기(get_async_db) 세션이 같은 DB를 봐야 하므로
+# in-memory(StaticPool) 대신 임시 파일 하나를 두 엔진이 공유한다.
+_TEST_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="sol-act-test-"), "test.db")
 engine = create_engine(
-    "sqlite://",
+    f"sqlite:///{_TEST_DB_PATH}",
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{_TEST_DB_PATH}", poolclass=NullPool)
+
+
+def _test_pragmas(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=OFF")
+    cur.close()
+
+
+event.listen(engine, "connect", _test_pragmas)
+event.listen(async_engine.sync_engine, "connect", _test_pragmas)
+
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+)
 
 
 @pytest.fixture()
@@ -42,7 +64,13 @@ def client(db):
         finally:
             pass
 
+    async def override_get_async_db(request: Request):
+        async with TestingAsyncSessionLocal() as session:
+            track_request(request, session.sync_session)
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
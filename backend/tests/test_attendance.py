@@ -129,6 +129,37 @@ def test_attendance_stats(client, seed_lesson, teacher_headers):
     assert "rate" in stat
 
 
+def test_attendance_stats_breakdown(client, db, seed_lesson, director_headers):
+    from datetime import date
+    from app.models.attendance import Attendance, AttendanceStatus
+    from app.models.lesson import Lesson, LessonStatus, LessonType, Subject
+
+    db.add(Lesson(id="lsn_old", class_id=None, date=date(2025, 3, 4), start_time="10:00", end_time="11:00",
+                  status=LessonStatus.COMPLETED, lesson_type=LessonType.REGULAR, subject=Subject.ACTING,
+                  teacher_id="t1", is_private=True))
+    db.add_all([
+        Attendance(id="a1", lesson_id="lsn001", student_id="s1", status=AttendanceStatus.PRESENT, marked_by="t1"),
+        Attendance(id="a2", lesson_id="lsn_old", student_id="s1", status=AttendanceStatus.ABSENT, marked_by="t1"),
+        Attendance(id="a3", lesson_id="lsn001", student_id="s2", status=AttendanceStatus.LATE, marked_by="t1"),
+    ])
+    db.commit()
+
+    plain = client.get("/api/attendance/stats", headers=director_headers).json()
+    assert [(d["student_id"], d["total"], d["rate"]) for d in plain] == [("s1", 2, 50.0), ("s2", 1, 100.0)]
+    assert "by_class" not in plain[0]
+
+    res = client.get("/api/attendance/stats?breakdown=class,month&student_id=s1", headers=director_headers)
+    assert res.status_code == 200
+    (s1,) = res.json()
+    assert s1["student_name"] == "김배우"
+    assert s1["by_class"]["c1"]["present"] == 1 and s1["by_class"]["private"]["absent"] == 1
+    this_month = date.today().strftime("%Y-%m")
+    assert s1["by_month"]["2025-03"] == {"total": 1, "present": 0, "late": 0, "absent": 1, "excused": 0, "rate": 0.0}
+    assert s1["by_month"][this_month]["rate"] == 100.0
+
+    assert client.get("/api/attendance/stats?breakdown=week", headers=director_headers).status_code == 400
+
+
 # ---------------------------------------------------------------------------
 # Response shape
 # ---------------------------------------------------------------------------
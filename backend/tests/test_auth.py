@@ -142,3 +142,36 @@ def test_login_response_format(client, seed_users):
     # Verify camelCase keys are NOT present
     assert "accessToken" not in body
     assert "tokenType" not in body
+
+
+def test_principal_cache_skips_user_queries(client, seed_class, student_headers):
+    """두 번째 요청부터는 users / class_students 조회 없이 인증·게이트 통과."""
+    from sqlalchemy import event
+    from tests.conftest import engine
+
+    assert client.get("/api/assignments/", headers=student_headers).status_code == 200
+
+    statements = []
+
+    def record(conn, cursor, statement, params, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert client.get("/api/assignments/", headers=student_headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert not [s for s in statements if "FROM users WHERE users.id" in s]
+    assert not [s for s in statements if "FROM class_students WHERE class_students.student_id" in s]
+
+
+def test_enrolment_gate_follows_roster_changes(client, seed_class, student_headers, director_headers):
+    """로스터 변경은 커밋 즉시 게이트에 반영(캐시 무효화)."""
+    assert client.get("/api/assignments/", headers=student_headers).status_code == 200
+
+    client.delete("/api/classes/c1/students/s1", headers=director_headers)
+    assert client.get("/api/assignments/", headers=student_headers).status_code == 403
+
+    client.post("/api/classes/c1/students", json={"student_id": "s1"}, headers=director_headers)
+    assert client.get("/api/assignments/", headers=student_headers).status_code == 200
@@ -67,8 +67,9 @@ class TestListMessages:
         assert resp.status_code == 200
         data = resp.json()
         assert len(data) == 2
-        assert data[0]["content"] == "첫 번째"
-        assert data[1]["content"] == "두 번째"
+        # 기본은 최신순
+        assert data[0]["content"] == "두 번째"
+        assert data[1]["content"] == "첫 번째"
 
     def test_list_messages_pagination(self, client, seed_class, student_headers, student2_headers):
         # Send two messages
@@ -86,6 +87,35 @@ class TestListMessages:
         data = resp.json()
         assert len(data) == 1
 
+    def test_list_messages_keyset(self, client, seed_class, student_headers):
+        for i in range(5):
+            client.post("/api/chat/messages", json={
+                "class_id": "c1", "sender_id": "s1", "content": f"m{i}",
+            }, headers=student_headers)
+
+        latest = client.get("/api/chat/messages", params={"class_id": "c1", "limit": 2},
+                            headers=student_headers).json()
+        assert [m["content"] for m in latest] == ["m4", "m3"]
+
+        older = client.get("/api/chat/messages", params={
+            "class_id": "c1", "limit": 10, "before": latest[-1]["cursor"],
+        }, headers=student_headers).json()
+        assert [m["content"] for m in older] == ["m2", "m1", "m0"]
+
+        newer = client.get("/api/chat/messages", params={
+            "class_id": "c1", "after": older[1]["cursor"],
+        }, headers=student_headers).json()
+        assert [m["content"] for m in newer] == ["m2", "m3", "m4"]
+
+        legacy = client.get("/api/chat/messages", params={"class_id": "c1", "offset": 0, "limit": 2},
+                            headers=student_headers).json()
+        assert [m["content"] for m in legacy] == ["m0", "m1"]
+
+    def test_list_messages_invalid_cursor(self, client, seed_class, student_headers):
+        resp = client.get("/api/chat/messages", params={"class_id": "c1", "before": "nope"},
+                          headers=student_headers)
+        assert resp.status_code == 400
+
     def test_list_messages_unauthenticated(self, client, seed_class):
         resp = client.get("/api/chat/messages", params={"class_id": "c1"})
         assert resp.status_code == 401
@@ -104,7 +134,7 @@ class TestResponseFormat:
         data = resp.json()
         required_keys = {
             "id", "class_id", "sender_id", "sender_name",
-            "sender_role", "avatar", "content", "timestamp",
+            "sender_role", "avatar", "content", "timestamp", "cursor",
         }
         assert required_keys.issubset(data.keys())
         # timestamp must be a non-empty string
@@ -173,3 +203,39 @@ class TestLastMessages:
         resp = client.get("/api/chat/last-messages",
                           params={"class_ids": "c1"})
         assert resp.status_code == 401
+
+
+class TestOverview:
+    """GET /api/chat/overview — 내 반 전부의 최신 메시지 + 안 읽은 수"""
+
+    def test_overview_groups_by_class(self, client, db, seed_class, student_headers, teacher_headers):
+        from app.models.chat import ChatMessage
+        from app.models.class_info import ClassInfo
+
+        db.add(ClassInfo(id="c2", name="다른 반", description="", subject_teachers={"acting": "t1"}, schedule=[]))
+        db.commit()
+        db.add(ChatMessage(id="other1", class_id="c2", sender_id="t1", content="다른 반 공지"))
+        db.commit()
+        for text in ("하나", "둘"):
+            client.post("/api/chat/messages", json={
+                "class_id": "c1", "sender_id": "t1", "content": text,
+            }, headers=teacher_headers)
+        client.post("/api/chat/messages", json={
+            "class_id": "c1", "sender_id": "s1", "content": "내 답장",
+        }, headers=student_headers)
+
+        data = client.get("/api/chat/overview", headers=student_headers).json()
+        # 학생은 c1만 — 요청하지 않아도 내 반 전부, 남의 반(c2)은 빠진다
+        assert set(data["last_messages"]) == {"c1"}
+        assert data["last_messages"]["c1"]["content"] == "내 답장"
+        assert data["unread_counts"] == {"c1": 2}
+
+        client.put("/api/chat/mark-read", params={"class_id": "c1"}, headers=student_headers)
+        assert client.get("/api/chat/overview", headers=student_headers).json()["unread_counts"] == {}
+
+        # 교사는 담당 반 둘 다, 명시한 반만 요청도 가능
+        teacher = client.get("/api/chat/overview", headers=teacher_headers).json()
+        assert set(teacher["last_messages"]) == {"c1", "c2"}
+        only = client.get("/api/chat/last-messages", params={"class_ids": "c2,zzz"},
+                          headers=teacher_headers).json()
+        assert list(only) == ["c2"]
@@ -0,0 +1,102 @@
+"""Tests for the class_teachers index and teacher → class → student scope cache."""
+from sqlalchemy import event, select, text
+
+from app.models.class_info import class_teachers
+from app.services.notification_service import get_teacher_class_ids, get_teacher_student_ids
+from tests.conftest import engine
+
+
+def _selects(fn):
+    statements = []
+
+    def count(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return result, [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+
+
+def test_class_teachers_follow_class_writes(db, seed_class):
+    rows = db.execute(select(class_teachers.c.subject, class_teachers.c.teacher_id)).all()
+    assert rows == [("acting", "t1")]
+    assert get_teacher_class_ids(db, "t1") == ["c1"]
+
+    seed_class.subject_teachers = {"acting": "t1", "musical": "t2"}
+    db.commit()
+    assert get_teacher_class_ids(db, "t2") == ["c1"]
+
+    seed_class.subject_teachers = {"musical": "t2"}
+    db.commit()
+    assert get_teacher_class_ids(db, "t1") == []
+
+    db.delete(seed_class)
+    db.commit()
+    assert db.execute(select(class_teachers)).all() == []
+    assert get_teacher_class_ids(db, "t2") == []
+
+
+def test_teacher_scope_is_served_from_cache(db, seed_class):
+    first, _ = _selects(lambda: get_teacher_student_ids(db, "t1"))
+    assert sorted(first) == ["s1", "s2"]
+    again, selects = _selects(lambda: get_teacher_student_ids(db, "t1"))
+    assert sorted(again) == ["s1", "s2"]
+    assert selects == []
+
+
+def test_roster_changes_invalidate_cache(client, db, seed_class, director_headers):
+    assert sorted(get_teacher_student_ids(db, "t1")) == ["s1", "s2"]
+
+    res = client.delete("/api/classes/c1/students/s2", headers=director_headers)
+    assert res.status_code == 200
+    assert get_teacher_student_ids(db, "t1") == ["s1"]
+
+    res = client.post("/api/classes/c1/students", json={"student_id": "s2"}, headers=director_headers)
+    assert res.status_code == 200
+    assert sorted(get_teacher_student_ids(db, "t1")) == ["s1", "s2"]
+
+
+def test_startup_reconcile_fills_new_table(db, seed_class):
+    from app.services import class_scope
+    # 기존 DB 업그레이드: class_teachers 없이 쌓인 반들이 시작 시 reconcile로 채워진다
+    class_teachers.drop(engine)
+    db.execute(text(
+        "INSERT INTO classes (id, name, description, subject_teachers, schedule) "
+        "VALUES ('c2', 'B반', '', '{\"vocal\": \"t1\"}', '[]')"
+    ))
+    db.commit()
+    class_teachers.create(engine)
+    class_scope.reconcile(engine)
+    rows = sorted(db.execute(text("SELECT class_id, teacher_id FROM class_teachers")).all())
+    assert rows == [("c1", "t1"), ("c2", "t1")]
+    assert get_teacher_class_ids(db, "t1") == ["c1", "c2"]
+
+
+def test_reconcile_repairs_rows_written_outside_mapper_events(db, seed_class):
+    from app.services import class_scope
+    # 이벤트가 등록되기 전 쓰기·raw SQL 흉내: 인덱스가 classes와 어긋난 상태
+    db.execute(text("INSERT INTO classes (id, name, description, subject_teachers, schedule) "
+                    "VALUES ('c2', 'B반', '', '{\"musical\": \"t2\"}', '[]')"))
+    db.execute(text("UPDATE class_teachers SET teacher_id = 'ghost' WHERE class_id = 'c1'"))
+    db.commit()
+    class_scope.invalidate()
+    assert get_teacher_class_ids(db, "t2") == []
+
+    class_scope.reconcile(engine)
+    rows = sorted(db.execute(select(class_teachers.c.class_id, class_teachers.c.teacher_id)).all())
+    assert rows == [("c1", "t1"), ("c2", "t2")]
+    assert get_teacher_class_ids(db, "t1") == ["c1"] and get_teacher_class_ids(db, "t2") == ["c2"]
+    class_scope.reconcile(engine)  # 재실행 안전
+    assert len(db.execute(select(class_teachers)).all()) == 2
+
+
+def test_models_package_registers_class_teacher_listeners():
+    import subprocess
+    import sys
+    # seed_data.py처럼 모델만 import하는 스크립트에서도 매퍼 이벤트가 걸려야 한다
+    out = subprocess.run([sys.executable, "-c", "import sys, app.models; print('app.services.class_scope' in sys.modules)"],
+                         capture_output=True, text=True, timeout=60)
+    assert out.stdout.strip() == "True", out.stderr
@@ -0,0 +1,53 @@
+"""Tests for the staff dashboard (/api/dashboard) aggregates."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.submission import Submission
+from app.routers import dashboard
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    dashboard._cache.clear()
+    yield
+    dashboard._cache.clear()
+
+
+def _sub(db, sid, student, status="open", age_hours=1, lead_hours=None):
+    created = datetime.utcnow() - timedelta(hours=age_hours)
+    db.add(Submission(id=sid, student_id=student, kind="video", title="제출", status=status, created_at=created,
+                      first_feedback_at=created + timedelta(hours=lead_hours) if lead_hours else None))
+
+
+def test_stats_grouped_counts_and_median(client, db, seed_class, teacher_headers):
+    _sub(db, "x1", "s1")
+    _sub(db, "x2", "s2", status="done", age_hours=10, lead_hours=2)
+    _sub(db, "x3", "s2", status="done", age_hours=10, lead_hours=4)
+    _sub(db, "x4", "s1", status="done", age_hours=24 * 20, lead_hours=1)  # 주간·14일 창 밖
+    db.commit()
+
+    data = client.get("/api/dashboard/stats", headers=teacher_headers).json()
+    assert data["pending_feedback"] == 1
+    assert data["leadtime_median_hours"] == 3.0
+    assert data["classes"] == [{"id": "c1", "name": "입시 A반", "members": 2, "open": 1, "submissions_week": 3}]
+
+
+def test_roster_counts_by_student_and_scope(client, db, seed_class, teacher_headers, director_headers):
+    _sub(db, "x1", "s1")
+    _sub(db, "x2", "s1", age_hours=24 * 10)
+    db.commit()
+    rows = {r["id"]: r for r in client.get("/api/dashboard/roster", headers=teacher_headers).json()}
+    assert set(rows) == {"s1", "s2"}
+    assert rows["s1"]["week_submissions"] == 1 and rows["s2"]["week_submissions"] == 0
+    assert rows["s1"]["streak"] == 0 and rows["s1"]["slump"] is False
+
+
+def test_results_cached_per_scope(client, db, seed_class, teacher_headers, student_headers):
+    first = client.get("/api/dashboard/stats", headers=teacher_headers).json()
+    _sub(db, "x1", "s1")
+    db.commit()
+    assert client.get("/api/dashboard/stats", headers=teacher_headers).json() == first
+    dashboard._cache.clear()
+    assert client.get("/api/dashboard/stats", headers=teacher_headers).json()["pending_feedback"] == 1
+    assert client.get("/api/dashboard/stats", headers=student_headers).status_code == 403
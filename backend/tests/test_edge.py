@@ -0,0 +1,43 @@
+"""Tests for the pure-ASGI edge middleware (slash normalization, CORS/ngrok headers)."""
+from app.config import settings
+from app.main import app
+from app.utils.edge import RouteTable
+
+ORIGIN = next(iter(settings.effective_cors_origins))
+
+
+def test_route_table_toggles_only_unmatched_paths():
+    table = RouteTable(app.routes)
+    assert table.resolve("/api/notices/") == "/api/notices/"
+    assert table.resolve("/api/notices") == "/api/notices/"
+    assert table.resolve("/api/users/s1") == "/api/users/s1"
+    assert table.resolve("/api/users/s1/") == "/api/users/s1"
+    # 어느 쪽도 없는 경로는 토글만(라우터가 404)
+    assert table.resolve("/api/nope") == "/api/nope/"
+
+
+def test_slash_toggle_keeps_authorization(client, seed_users, student_headers):
+    with_slash = client.get("/api/notices/", headers=student_headers)
+    without = client.get("/api/notices", headers=student_headers)
+    assert with_slash.status_code == without.status_code == 200
+    assert without.json() == with_slash.json()
+
+
+def test_preflight_answered_at_edge(client):
+    res = client.options("/api/notices/", headers={"Origin": ORIGIN, "Access-Control-Request-Method": "GET"})
+    assert res.status_code == 204
+    assert res.headers["access-control-allow-origin"] == ORIGIN
+    assert res.headers["access-control-max-age"] == "86400"
+    assert res.headers["ngrok-skip-browser-warning"] == "true"
+
+
+def test_every_response_gets_ngrok_and_cors_headers(client):
+    res = client.get("/api/does-not-exist", headers={"Origin": ORIGIN})
+    assert res.status_code == 404
+    assert res.headers["ngrok-skip-browser-warning"] == "true"
+    assert res.headers["access-control-allow-origin"] == ORIGIN
+    assert res.headers["access-control-allow-credentials"] == "true"
+
+    other = client.get("/api/does-not-exist", headers={"Origin": "https://evil.example"})
+    assert other.headers["ngrok-skip-browser-warning"] == "true"
+    assert "access-control-allow-origin" not in other.headers
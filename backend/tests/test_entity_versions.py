@@ -0,0 +1,110 @@
+"""Tests for entity version counters and conditional list GETs (weak ETag / 304)."""
+import asyncio
+
+from sqlalchemy import event
+
+from app.services.notification_service import emit_data_changed, notify_users
+from tests.conftest import engine
+
+
+def _statements(fn):
+    statements = []
+
+    def record(conn, cursor, statement, params, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, statements
+
+
+def test_unchanged_list_returns_304_without_query(client, seed_class, student_headers):
+    first = client.get("/api/notices/", headers=student_headers)
+    assert first.status_code == 200
+    tag = first.headers["etag"]
+    assert tag.startswith('W/"')
+
+    again, statements = _statements(
+        lambda: client.get("/api/notices/", headers={**student_headers, "If-None-Match": tag})
+    )
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == tag
+    assert not any("FROM notices" in s for s in statements)
+
+
+def test_data_changed_in_scope_changes_tag(client, seed_class, student_headers, student2_headers):
+    s1 = client.get("/api/notices/", headers=student_headers).headers["etag"]
+    s2 = client.get("/api/notices/", headers=student2_headers).headers["etag"]
+
+    asyncio.run(emit_data_changed(["s2"], "notices"))
+    assert client.get("/api/notices/", headers={**student_headers, "If-None-Match": s1}).status_code == 304
+    res = client.get("/api/notices/", headers={**student2_headers, "If-None-Match": s2})
+    assert res.status_code == 200 and res.headers["etag"] != s2
+
+
+def test_own_write_and_notifications_change_tag(client, db, seed_class, teacher_headers, director_headers):
+    notices = client.get("/api/notices/", headers=director_headers).headers["etag"]
+    res = client.post("/api/notices/", json={"title": "공지", "content": "내용", "author": "박선생",
+                                             "class_id": "c1"}, headers=teacher_headers)
+    assert res.status_code == 201
+    # 원장은 엔티티 전체 범위 — 다른 사용자에게 간 발행에도 태그가 바뀐다
+    assert client.get("/api/notices/", headers={**director_headers, "If-None-Match": notices}).status_code == 200
+
+    inbox = client.get("/api/notifications/", headers=teacher_headers).headers["etag"]
+    db.info.pop("entity_versions_principal", None)  # 테스트 세션 공유 — 자기 쓰기로 잡히지 않게
+    asyncio.run(notify_users(db, ["t1"], "새 알림"))
+    res = client.get("/api/notifications/", headers={**teacher_headers, "If-None-Match": inbox})
+    assert res.status_code == 200
+    assert [n["message"] for n in res.json()] == ["새 알림"]
+
+
+def test_query_string_is_part_of_tag(client, seed_class, director_headers):
+    a = client.get("/api/portfolios/feed", headers=director_headers).headers["etag"]
+    b = client.get("/api/portfolios/feed?limit=5", headers=director_headers).headers["etag"]
+    assert a != b
+
+
+def test_staff_edit_and_delete_change_tags(client, seed_class, teacher_headers, director_headers):
+    def tag():
+        return client.get("/api/notices/", headers=teacher_headers).headers["etag"]
+
+    def stale(t):
+        return client.get("/api/notices/", headers={**teacher_headers, "If-None-Match": t}).status_code == 200
+
+    nid = client.post("/api/notices/", json={"title": "공지", "content": "내용", "author": "최원장",
+                                             "target_class_ids": ["c1"]}, headers=director_headers).json()["id"]
+    # 원장의 수정 — 대상 반 담당 교사의 목록도 바뀐다
+    before = tag()
+    assert client.put(f"/api/notices/{nid}", json={"title": "원장 수정"}, headers=director_headers).status_code == 200
+    assert stale(before)
+
+    before = tag()
+    assert client.put(f"/api/notices/{nid}", json={"title": "교사 수정"}, headers=teacher_headers).status_code == 200
+    assert stale(before)
+
+    before = tag()
+    assert client.delete(f"/api/notices/{nid}", headers=teacher_headers).status_code == 200
+    assert stale(before)
+
+
+def test_async_session_write_bumps_own_tag(client, seed_class, teacher_headers):
+    from app.services import entity_versions
+    before = entity_versions.version("__self__", "t1")
+    res = client.post("/api/notices/", json={"title": "공지", "content": "내용", "author": "박선생",
+                                             "class_id": "c1"}, headers=teacher_headers)
+    assert res.status_code == 201
+    assert entity_versions.version("__self__", "t1") > before
+
+
+def test_bump_all_invalidates_every_scope(client, seed_class, student_headers, director_headers):
+    from app.services import entity_versions
+    tags = {h["Authorization"]: client.get("/api/portfolios/feed", headers=h).headers["etag"]
+            for h in (student_headers, director_headers)}
+    entity_versions.bump_all("portfolios")  # 백그라운드 .mov→.mp4 URL 재작성
+    for h in (student_headers, director_headers):
+        res = client.get("/api/portfolios/feed", headers={**h, "If-None-Match": tags[h["Authorization"]]})
+        assert res.status_code == 200
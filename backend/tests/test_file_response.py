@@ -0,0 +1,122 @@
+"""Tests for the shared ranged file responder (Range, multi-range, validators, zero-copy send)."""
+import asyncio
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.utils import file_response
+from app.utils.file_response import RangedFileResponse, parse_range
+
+DATA = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def media(tmp_path):
+    path = tmp_path / "clip.mp3"
+    path.write_bytes(DATA)
+    return str(path)
+
+
+@pytest.fixture
+def fc(media):
+    app = Starlette(routes=[Route(
+        "/f", lambda request: RangedFileResponse(media, headers={"cache-control": "public, max-age=60"}),
+        methods=["GET", "HEAD"],
+    )])
+    return TestClient(app)
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == [(0, 99)]
+    assert parse_range("bytes=900-", 1000) == [(900, 999)]
+    assert parse_range("bytes=-100", 1000) == [(900, 999)]
+    assert parse_range("bytes=0-1,5-9999", 1000) == [(0, 1), (5, 999)]
+    assert parse_range("bytes=2000-", 1000) == []
+    assert parse_range("bytes=abc", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+
+
+def test_full_and_single_range(fc):
+    full = fc.get("/f")
+    assert full.status_code == 200
+    assert full.content == DATA
+    assert full.headers["content-type"] == "audio/mpeg"
+    assert full.headers["accept-ranges"] == "bytes"
+    assert full.headers["cache-control"] == "public, max-age=60"
+    assert full.headers["etag"] and full.headers["last-modified"]
+
+    part = fc.get("/f", headers={"Range": "bytes=100-199"})
+    assert part.status_code == 206
+    assert part.content == DATA[100:200]
+    assert part.headers["content-range"] == f"bytes 100-199/{len(DATA)}"
+
+    tail = fc.get("/f", headers={"Range": "bytes=-10"})
+    assert tail.content == DATA[-10:]
+
+    assert fc.get("/f", headers={"Range": "bytes=99999-"}).status_code == 416
+    assert fc.head("/f").content == b""
+
+
+def test_multi_range(fc):
+    res = fc.get("/f", headers={"Range": "bytes=0-3,10-13"})
+    assert res.status_code == 206
+    ctype = res.headers["content-type"]
+    assert ctype.startswith("multipart/byteranges; boundary=")
+    boundary = ctype.split("boundary=")[1]
+    body = res.content
+    assert int(res.headers["content-length"]) == len(body)
+    assert body.endswith(f"--{boundary}--\r\n".encode())
+    assert f"Content-Range: bytes 0-3/{len(DATA)}".encode() in body
+    assert DATA[0:4] + b"\r\n" in body and DATA[10:14] + b"\r\n" in body
+
+
+def test_validators(fc, media):
+    etag = fc.get("/f").headers["etag"]
+    last_modified = fc.get("/f").headers["last-modified"]
+    assert fc.get("/f", headers={"If-None-Match": etag}).status_code == 304
+    assert fc.get("/f", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    # If-Range가 현재 파일과 같으면 구간, 다르면 전체
+    assert fc.get("/f", headers={"Range": "bytes=0-9", "If-Range": etag}).status_code == 206
+    os.utime(media, (0, 1_000_000))
+    stale = fc.get("/f", headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert stale.status_code == 200 and stale.content == DATA
+
+
+def _run(response, headers=(), extensions=None):
+    scope = {"type": "http", "method": "GET", "headers": list(headers), "extensions": extensions or {}}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response(scope, receive, send))
+    return messages
+
+
+def test_pathsend_and_zerocopysend_extensions(media):
+    messages = _run(RangedFileResponse(media), extensions={"http.response.pathsend": {}})
+    assert messages[1] == {"type": "http.response.pathsend", "path": media}
+
+    messages = _run(RangedFileResponse(media), headers=[(b"range", b"bytes=100-")],
+                    extensions={"http.response.zerocopysend": {}})
+    assert messages[0]["status"] == 206
+    sent = messages[1]
+    assert sent["type"] == "http.response.zerocopysend"
+    assert (sent["offset"], sent["count"], sent["more_body"]) == (100, len(DATA) - 100, False)
+
+
+def test_open_ended_range_is_streamed_in_bounded_chunks(media, monkeypatch):
+    monkeypatch.setattr(file_response, "CHUNK_SIZE", 1024)
+    messages = _run(RangedFileResponse(media), headers=[(b"range", b"bytes=0-")])
+    bodies = [m for m in messages if m["type"] == "http.response.body"]
+    assert len(bodies) == 10
+    assert max(len(m["body"]) for m in bodies) == 1024
+    assert b"".join(m["body"] for m in bodies) == DATA
+    assert bodies[-1]["more_body"] is False
@@ -0,0 +1,46 @@
+"""Tests for the home-screen aggregate endpoint (/api/home)."""
+from app.config import settings
+from app.routers.home import SECTIONS
+
+
+def _timings(res):
+    return dict(part.strip().split(";dur=") for part in res.headers["server-timing"].split(","))
+
+
+def test_home_matches_individual_endpoints(client, seed_class, student_headers):
+    res = client.get("/api/home", params={"timing": 1}, headers=student_headers)
+    assert res.status_code == 200
+    body = res.json()
+    assert set(body) == {name for name, _, _ in SECTIONS}
+    assert body["gamification"] == client.get("/api/gamification/me", headers=student_headers).json()
+    assert body["routines"] == client.get("/api/routines/today", headers=student_headers).json()
+    assert body["summary"] == client.get("/api/sessions/summary", headers=student_headers).json()
+    assert body["notices"] == client.get("/api/notices/", headers=student_headers).json()
+    assert set(_timings(res)) == set(body) | {"total"}
+
+
+def test_server_timing_is_opt_in(client, seed_class, student_headers, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG", False)
+    assert "server-timing" not in client.get("/api/home", headers=student_headers).headers
+    monkeypatch.setattr(settings, "DEBUG", True)
+    assert "total" in _timings(client.get("/api/home", headers=student_headers))
+
+
+def test_staff_skip_student_sections(client, seed_class, teacher_headers):
+    body = client.get("/api/home", headers=teacher_headers).json()
+    assert "practice" not in body and "gamification" not in body
+    assert "notices" in body and "dday" in body
+
+
+def test_sections_filter_and_parallel_mode(client, seed_class, student_headers, monkeypatch):
+    sequential = client.get("/api/home?sections=quote,dday,notifications", headers=student_headers).json()
+    assert set(sequential) == {"quote", "dday", "notifications"}
+
+    monkeypatch.setattr(settings, "HOME_PARALLEL", True)
+    parallel = client.get("/api/home?sections=quote,dday,notifications", headers=student_headers)
+    assert parallel.status_code == 200
+    assert parallel.json() == sequential
+
+
+def test_unenrolled_student_is_gated(client, seed_users, student_headers):
+    assert client.get("/api/home", headers=student_headers).status_code == 403
@@ -0,0 +1,145 @@
+"""Tests for the durable media processing queue (lanes, leases, retries, queue position)."""
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+from app.models.media_job import MediaJob
+from app.routers import upload as upload_router
+from app.services import file_upload, media_jobs
+from app.services.media_jobs import MediaWorker, enqueue, queue_position, queue_positions
+from tests.conftest import TestingSessionLocal
+
+
+class InlineExecutor:
+    """Runs submitted jobs immediately (stands in for the process pool)."""
+
+    def __init__(self, workers):
+        self.workers = workers
+
+    def submit(self, fn, *args):
+        fut = Future()
+        try:
+            fut.set_result(fn(*args))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+
+    def shutdown(self, **kw):
+        pass
+
+
+class Recorder:
+    def __init__(self, fail=()):
+        self.ran = []
+        self.fail = set(fail)
+
+    def __call__(self, kind, path, user_id, content_key):
+        self.ran.append(path)
+        if path in self.fail:
+            raise RuntimeError("ffmpeg crashed")
+
+
+def _worker(runner, concurrency=2):
+    return MediaWorker(concurrency=concurrency, session_factory=TestingSessionLocal,
+                       executor_factory=InlineExecutor, runner=runner)
+
+
+def _later(sec):
+    return datetime.utcnow() + timedelta(seconds=sec)
+
+
+def _job(db, path, target_type=None, kind="video"):
+    job = enqueue(db, kind, path, "s1", target_type=target_type)
+    db.commit()
+    return job
+
+
+def test_lanes_order_and_queue_position(db, seed_users):
+    practice = _job(db, "/p1.mov", "portfolio")
+    practice2 = _job(db, "/p2.mov", "portfolio_video")
+    mock = _job(db, "/m1.mov", "mock_test_video")
+    assert (practice.lane, mock.lane) == ("practice", "mock_test")
+    assert [queue_position(db, j) for j in (mock, practice, practice2)] == [1, 2, 3]
+    positions = queue_positions(db)  # 목록용: 한 번의 쿼리로 같은 순번
+    assert [positions[j.id] for j in (mock, practice, practice2)] == [1, 2, 3]
+
+    runner = Recorder()
+    worker = _worker(runner, concurrency=2)
+    assert worker.tick(_later(1)) == 2
+    assert runner.ran == ["/m1.mov", "/p1.mov"]  # 모의테스트가 먼저, 동시 실행은 2건까지
+    worker.tick(_later(2))  # 끝난 작업 반영 후 남은 1건
+    assert runner.ran[-1] == "/p2.mov"
+    worker.tick(_later(3))
+    db.expire_all()
+    assert {j.status for j in db.query(MediaJob).all()} == {"done"}
+
+
+def test_failure_retries_with_backoff_then_dead(db, seed_users):
+    job = _job(db, "/bad.mov")
+    worker = _worker(Recorder(fail={"/bad.mov"}))
+    worker.tick(_later(1))
+    worker.tick(_later(1))
+    db.expire_all()
+    row = db.get(MediaJob, job.id)
+    assert row.status == "pending" and row.attempts == 1 and "ffmpeg crashed" in row.last_error
+    assert worker.tick(_later(5)) == 0  # 백오프 중
+
+    for attempt in range(media_jobs.MAX_ATTEMPTS - 1):
+        at = _later(3600 * (attempt + 1))
+        assert worker.tick(at) == 1
+        worker.tick()  # 결과 반영(백오프 중이라 다시 집지 않음)
+    db.expire_all()
+    assert db.get(MediaJob, job.id).status == "dead"
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(db, seed_users):
+    job = _job(db, "/clip.mov")
+    # 다른 워커가 집어간 뒤 죽음(하트비트 없음)
+    assert [j.id for j in media_jobs.claim(TestingSessionLocal(), "crashed-worker", 1)] == [job.id]
+    runner = Recorder()
+    worker = _worker(runner)
+    assert worker.tick(_later(5)) == 0
+    assert worker.tick(_later(media_jobs.LEASE_SEC + 5)) == 1
+    assert runner.ran == ["/clip.mov"]
+    # 되살아난 옛 워커의 결과 보고는 무시된다
+    media_jobs.finish(TestingSessionLocal(), job.id, "crashed-worker", "late")
+    worker.tick(_later(media_jobs.LEASE_SEC + 6))
+    db.expire_all()
+    assert db.get(MediaJob, job.id).status == "done"
+
+
+def test_video_side_effects_run_in_parent_after_finish(db, seed_users, monkeypatch):
+    events = []
+
+    def status():
+        with TestingSessionLocal() as s:
+            return s.get(MediaJob, job.id).status
+
+    def fake_transcode(path, user_id):
+        events.append("transcode")  # 자식: 변환만
+        return {"status": "done", "renamed_to": "/clip.mp4"}
+
+    monkeypatch.setattr(file_upload, "transcode_video", fake_transcode)
+    monkeypatch.setattr(file_upload, "_update_video_urls_in_db", lambda old, new: events.append(("urls", old, new)))
+    monkeypatch.setattr(file_upload, "_notify_file_ready", lambda uid: events.append(("ready", uid, status())))
+    job = _job(db, "/clip.mov")
+    worker = MediaWorker(concurrency=1, session_factory=TestingSessionLocal, executor_factory=InlineExecutor)
+    assert worker.tick(_later(1)) == 1
+    assert events == ["transcode"]
+    worker.tick(_later(2))
+    assert events[1:] == [("urls", "/clip.mov", "/clip.mp4"), ("ready", "s1", "done")]
+
+
+def test_image_upload_is_queued_and_listed(client, db, seed_class, student_headers, director_headers,
+                                           tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_router, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(file_upload, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(media_jobs.worker, "wake", lambda: None)
+    res = client.post("/api/upload", headers=student_headers, params={"subfolder": "photos"},
+                      files={"file": ("pose.png", b"\x89PNG fake image", "image/png")})
+    assert res.status_code == 200, res.text
+    queued = res.json()["media_job"]
+    assert queued["lane"] == "default" and queued["position"] == 1
+
+    mine = client.get("/api/upload/jobs", headers=student_headers).json()
+    assert [(j["id"], j["status"], j["position"]) for j in mine] == [(queued["id"], "pending", 1)]
+    assert [j["id"] for j in client.get("/api/upload/jobs", headers=director_headers).json()] == [queued["id"]]
@@ -0,0 +1,266 @@
+"""Tests for native push transports (APNs HTTP/2 client against a local stand-in server)."""
+import asyncio
+import json
+import threading
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+h2_config = pytest.importorskip("h2.config")
+import h2.connection  # noqa: E402
+import h2.events  # noqa: E402
+
+from app.services.native_push import ApnsClient  # noqa: E402
+
+
+class ApnsStandIn:
+    """APNs 흉내 HTTP/2(h2c) 서버 — valid 토큰만 200, 나머지 400 BadDeviceToken."""
+
+    def __init__(self, valid=(), unregistered=(), errors=None):
+        self.valid = set(valid)
+        self.unregistered = set(unregistered)
+        self.errors = dict(errors or {})  # token → (status, reason)
+        self.connections = 0
+        self.paths = []
+        self.auth = set()
+        self.open_streams = 0
+        self.max_concurrent = 0
+        self.port = None
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        conn = h2.connection.H2Connection(h2_config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        requests = {}
+
+        async def respond(stream_id, headers):
+            await asyncio.sleep(0.02)  # 응답을 늦춰 동시 스트림이 겹치게
+            token = headers[":path"].rsplit("/", 1)[-1]
+            if token in self.errors:
+                status, reason = self.errors[token]
+                body = {"reason": reason}
+            elif token in self.unregistered:
+                status, body = 410, {"reason": "Unregistered"}
+            elif token in self.valid:
+                status, body = 200, None
+            else:
+                status, body = 400, {"reason": "BadDeviceToken"}
+            data = json.dumps(body).encode() if body else b""
+            conn.send_headers(stream_id, [(":status", str(status)), ("content-length", str(len(data)))],
+                              end_stream=not data)
+            if data:
+                conn.send_data(stream_id, data, end_stream=True)
+            self.open_streams -= 1
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+        while True:
+            data = await reader.read(65535)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    requests[event.stream_id] = dict(event.headers)
+                    self.open_streams += 1
+                    self.max_concurrent = max(self.max_concurrent, self.open_streams)
+                elif isinstance(event, h2.events.DataReceived):
+                    conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    headers = requests.pop(event.stream_id)
+                    self.paths.append(headers[":path"])
+                    self.auth.add(headers["authorization"])
+                    asyncio.ensure_future(respond(event.stream_id, headers))
+            writer.write(conn.data_to_send())
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+def apns_servers():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    prod = ApnsStandIn(valid={f"prod{i:02d}" for i in range(20)}, unregistered={"gone"}, errors={
+        "busy": (429, "TooManyRequests"), "down": (503, "ServiceUnavailable"), "huge": (413, "PayloadTooLarge"),
+    })
+    sandbox = ApnsStandIn(valid={"dev01"})
+
+    async def start(server):
+        srv = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        server.port = srv.sockets[0].getsockname()[1]
+        return srv
+
+    servers = [asyncio.run_coroutine_threadsafe(start(s), loop).result(5) for s in (prod, sandbox)]
+    yield prod, sandbox
+
+    async def stop():
+        for srv in servers:
+            srv.close()
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task():
+                task.cancel()
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+@pytest.fixture
+def client(apns_servers, tmp_path):
+    prod, sandbox = apns_servers
+    key = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    key_file = tmp_path / "AuthKey.p8"
+    key_file.write_bytes(key)
+    c = ApnsClient(str(key_file), "KEYID", "TEAMID", "com.solact.academy", hosts={
+        "production": f"http://127.0.0.1:{prod.port}",
+        "sandbox": f"http://127.0.0.1:{sandbox.port}",
+    })
+    yield c
+    c.close()
+
+
+PAYLOAD = {"aps": {"alert": {"title": "SOL-ACT", "body": "공지"}}}
+
+
+def test_tokens_share_one_multiplexed_connection(apns_servers, client):
+    prod, _ = apns_servers
+    tokens = [f"prod{i:02d}" for i in range(20)]
+    assert set(client.send(tokens, PAYLOAD).values()) == {"sent"}
+    assert set(client.send(tokens[:5], PAYLOAD).values()) == {"sent"}
+
+    assert prod.connections == 1
+    assert prod.max_concurrent > 1
+    assert len(prod.paths) == 25
+    # provider JWT는 한 번만 서명해 재사용
+    assert client.jwt_signed == 1 and len(prod.auth) == 1
+
+
+def test_token_environment_is_remembered(apns_servers, client):
+    prod, sandbox = apns_servers
+    assert client.send(["dev01"], PAYLOAD) == {"dev01": "sent"}
+    assert (len(prod.paths), len(sandbox.paths)) == (1, 1)
+
+    # 두 번째부터는 sandbox로 바로 — 요청 수가 두 배가 되지 않는다
+    assert client.send(["dev01"], PAYLOAD) == {"dev01": "sent"}
+    assert (len(prod.paths), len(sandbox.paths)) == (1, 2)
+    assert client.stats()["env_retries"] == 1
+
+
+def test_unregistered_and_invalid_tokens(apns_servers, client):
+    assert client.send(["gone", "bogus"], PAYLOAD) == {"gone": "unregistered", "bogus": "invalid"}
+
+
+def test_throttling_and_outages_are_transient(apns_servers, client):
+    assert client.send(["busy", "down", "huge"], PAYLOAD) == {
+        "busy": "failed", "down": "failed", "huge": "rejected",
+    }
+
+
+def test_provider_token_is_resigned_after_ttl(apns_servers, client):
+    client.send(["prod00"], PAYLOAD)
+    client._jwt_at -= 60 * 60
+    client.send(["prod01"], PAYLOAD)
+    assert client.jwt_signed == 2
+
+
+# ── FCM 멀티캐스트 ──
+
+class MockFcm:
+    """모의 FCM 전송 — 호출(배치)마다 지연을 두고 토큰별 결과를 돌려준다."""
+
+    def __init__(self, unregistered=(), latency=0.0, unavailable=()):
+        self.unregistered = set(unregistered)
+        self.unavailable = set(unavailable)
+        self.latency = latency
+        self.batches = []
+
+    def send_multicast(self, tokens, title, body, data):
+        import time
+        time.sleep(self.latency)
+        self.batches.append(list(tokens))
+        return ["unregistered" if t in self.unregistered else "failed" if t in self.unavailable else "sent"
+                for t in tokens]
+
+
+@pytest.fixture
+def mock_fcm():
+    from app.services import native_push
+    fcm = MockFcm(unregistered={"and-0007", "and-1100"}, latency=0.05)
+    native_push.set_fcm_transport(fcm)
+    yield fcm
+    native_push.set_fcm_transport(None)
+
+
+def test_fcm_tokens_are_sent_in_multicast_batches(mock_fcm):
+    import time
+    from app.services.native_push import FCM_MULTICAST_MAX, send_native_to_tokens
+    rows = [(f"and-{i:04d}", "android", f"u{i}") for i in range(1200)]
+
+    started = time.monotonic()
+    out = send_native_to_tokens(rows, "SOL-ACT", "공지", {"entity": "notice"})
+    elapsed = time.monotonic() - started
+
+    assert [len(b) for b in mock_fcm.batches] == [FCM_MULTICAST_MAX, FCM_MULTICAST_MAX, 200]
+    assert out.sent == 1198 and len(out.delivered) == 1198 and out.failed == {}
+    assert sorted(out.dead) == ["and-0007", "and-1100"]
+    # 토큰당 1회 왕복이었다면 1200 × 50ms — 배치 3회면 1초 미만
+    assert elapsed < 1.0
+
+
+def test_dead_fcm_tokens_are_pruned_in_bulk(db, seed_users, mock_fcm, monkeypatch):
+    from app.models.device_token import DeviceToken
+    from app.services.push_dispatcher import PushDispatcher
+    from tests.conftest import TestingSessionLocal
+
+    db.add_all([
+        DeviceToken(id=f"dt{i}", user_id="s1" if i % 2 else "s2", token=f"and-{i:04d}", platform="android")
+        for i in range(10)
+    ])
+    db.commit()
+    monkeypatch.setattr("app.services.native_push.native_push_configured", lambda: True)
+
+    d = PushDispatcher(workers=1, queue_max=10, session_factory=TestingSessionLocal)
+    assert d.submit(["s1", "s2"], "공지", web=False)
+    d.join()
+
+    assert len(mock_fcm.batches) == 1 and len(mock_fcm.batches[0]) == 10
+    db.expire_all()
+    assert db.query(DeviceToken).filter(DeviceToken.token == "and-0007").first() is None
+    assert db.query(DeviceToken).count() == 9
+    assert d.stats()["native_tokens_pruned"] == 1
+
+
+def test_transient_native_failure_is_retried_through_outbox(db, seed_users, monkeypatch):
+    from app.models.device_token import DeviceToken
+    from app.models.push_outbox import PushOutbox
+    from app.services import native_push
+    from app.services.push_dispatcher import PushDispatcher
+    from tests.conftest import TestingSessionLocal
+
+    # s1: 유일한 기기가 UNAVAILABLE / s2: 한 기기는 실패해도 다른 기기로 받음
+    native_push.set_fcm_transport(MockFcm(unavailable={"and-s1", "and-s2a"}))
+    monkeypatch.setattr("app.services.native_push.native_push_configured", lambda: True)
+    db.add_all([
+        DeviceToken(id="dt1", user_id="s1", token="and-s1", platform="android"),
+        DeviceToken(id="dt2", user_id="s2", token="and-s2a", platform="android"),
+        DeviceToken(id="dt3", user_id="s2", token="and-s2b", platform="android"),
+        PushOutbox(id="pob1", user_id="s1", message="공지", status="sending"),
+        PushOutbox(id="pob2", user_id="s2", message="공지", status="sending"),
+    ])
+    db.commit()
+    try:
+        d = PushDispatcher(workers=1, queue_max=10, session_factory=TestingSessionLocal)
+        assert d.submit(["s1", "s2"], "공지", web=False, outbox={"s1": ["pob1"], "s2": ["pob2"]})
+        d.join()
+    finally:
+        native_push.set_fcm_transport(None)
+
+    db.expire_all()
+    retry, done = db.get(PushOutbox, "pob1"), db.get(PushOutbox, "pob2")
+    assert (retry.status, retry.attempts, retry.last_error) == ("pending", 1, "android push failed")
+    assert done.status == "sent"
+    assert db.query(DeviceToken).count() == 3  # 일시 실패 토큰은 지우지 않는다
+
@@ -86,3 +86,47 @@ class TestNotFound:
     def test_not_found(self, client, seed_users, student_headers):
         resp = client.put("/api/notifications/xxx", json={"read": True}, headers=student_headers)
         assert resp.status_code == 404
+
+
+class TestNotifyUsersBulk:
+    """notification_service.notify_users — 수신자 수와 무관하게 INSERT 1회, refresh SELECT 없음."""
+
+    def test_bulk_insert_single_round_trip(self, db, seed_users, monkeypatch):
+        import asyncio
+        from sqlalchemy import event
+        from app.models.notification import Notification
+        from app.models.user import User, UserRole
+        from app.services.notification_service import notify_users
+        from tests.conftest import engine
+
+        db.add_all([
+            User(id=f"bulk{i:03d}", email=f"bulk{i}@t.com", name=f"학생{i}",
+                 role=UserRole.STUDENT, hashed_password="x")
+            for i in range(300)
+        ])
+        db.commit()
+        ids = [f"bulk{i:03d}" for i in range(300)]
+
+        sent = []
+
+        async def fake_send(user_id, message):
+            sent.append((user_id, message))
+
+        monkeypatch.setattr("app.services.notification_service.manager.send_to_user", fake_send)
+
+        statements = []
+
+        def count(conn, cursor, statement, params, context, executemany):
+            statements.append(statement.split()[0].upper())
+
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            asyncio.run(notify_users(db, ids, "오디션 접수 마감 D-1"))
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert statements.count("INSERT") == 1
+        assert "SELECT" not in statements
+        assert db.query(Notification).count() == 300
+        assert len(sent) == 300
+        assert sent[0][1]["data"]["created_at"]
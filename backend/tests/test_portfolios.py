@@ -1,6 +1,8 @@
 """Tests for the portfolios router (/api/portfolios)."""
 import pytest
-from app.models.portfolio import Portfolio, PortfolioComment
+from datetime import datetime, timedelta
+
+from app.models.portfolio import Portfolio, PortfolioCategory, PortfolioComment, PortfolioVideo
 
 
 BASE = "/api/portfolios"
@@ -205,3 +207,57 @@ def test_response_has_comments_array(client, student_headers, teacher_headers, d
     assert isinstance(data["comments"], list)
     assert len(data["comments"]) == 1
     assert data["comments"][0]["content"] == "댓글 테스트"
+
+
+# ── FEED (SQL 카드 집계 + keyset) ─────────────────────────────────────
+def _seed_feed(db):
+    now = datetime.utcnow()
+
+    def add(pid, student, minutes_ago, group=None, video_url="/v.mp4", thumb=None):
+        db.add(Portfolio(id=pid, student_id=student, title=f"제목 {pid}", description="",
+                         video_url=video_url, thumbnail_url=thumb, practice_group=group,
+                         category=PortfolioCategory.MONOLOGUE, created_at=now - timedelta(minutes=minutes_ago)))
+
+    add("p1", "s1", 30, group="독백A", thumb="p1.jpg")   # 재생 가능·코멘트 없음 → 피드백 필요
+    add("p2", "s1", 20, group=" 독백A ", video_url="")    # 업로드 중(영상 없음)·썸네일 없음
+    add("p3", "s1", 10)                                 # 단건 + 자식 영상 2
+    add("p4", "s2", 40)
+    db.commit()
+    db.add_all([
+        PortfolioVideo(id="v2", portfolio_id="p3", video_url="/b.mp4", thumbnail_url="b.jpg", sort_order=1),
+        PortfolioVideo(id="v1", portfolio_id="p3", video_url="/a.mp4", thumbnail_url=None, sort_order=0),
+        PortfolioComment(id="c1", portfolio_id="p3", author_id="t1", content="좋아요"),
+    ])
+    db.commit()
+
+
+def test_feed_cards_grouped_in_sql(client, db, seed_class, director_headers):
+    _seed_feed(db)
+    cards = client.get(f"{BASE}/feed", headers=director_headers).json()
+    assert [c["key"] for c in cards] == ["p3", "s1::독백A", "p4"]
+
+    single, group, _ = cards
+    assert (single["kind"], single["count"], single["pending_feedback"]) == ("single", 3, 0)
+    assert single["cover_thumbnail"] == "b.jpg"
+    assert [v["id"] for v in single["portfolio"]["videos"]] == ["v1", "v2"]
+    assert single["student_name"] == "김배우"
+
+    assert (group["kind"], group["title"], group["count"]) == ("group", "독백A", 2)
+    assert group["pending_feedback"] == 1
+    assert group["cover_thumbnail"] == "p1.jpg"
+    assert group["upload_status"] == "ready"
+    assert group["portfolio"] is None
+
+
+def test_feed_cursor_pagination_and_scope(client, db, seed_class, director_headers, student2_headers):
+    _seed_feed(db)
+    first = client.get(f"{BASE}/feed", params={"limit": 2}, headers=director_headers).json()
+    rest = client.get(f"{BASE}/feed", params={"limit": 2, "cursor": first[-1]["cursor"]},
+                      headers=director_headers).json()
+    assert [c["key"] for c in first + rest] == ["p3", "s1::독백A", "p4"]
+    legacy = client.get(f"{BASE}/feed", params={"skip": 2}, headers=director_headers).json()
+    assert [c["key"] for c in legacy] == ["p4"]
+
+    mine = client.get(f"{BASE}/feed", headers=student2_headers).json()
+    assert [c["key"] for c in mine] == ["p4"]
+    assert client.get(f"{BASE}/feed", params={"cursor": "bad"}, headers=director_headers).status_code == 400
@@ -0,0 +1,70 @@
+"""Tests for the bounded push dispatcher (one job per notify, batched lookups)."""
+from app.models.device_token import DeviceToken
+from app.models.push_subscription import PushSubscription
+from app.services.native_push import NativeOutcome
+from app.services.push_dispatcher import PushDispatcher
+from tests.conftest import TestingSessionLocal
+
+
+def _seed_subs(db, seed_users):
+    db.add_all([
+        PushSubscription(id="ps1", user_id="s1", endpoint="https://push/s1", p256dh_key="k", auth_key="a"),
+        PushSubscription(id="ps2", user_id="s2", endpoint="https://push/s2-gone", p256dh_key="k", auth_key="a"),
+        DeviceToken(id="dt1", user_id="s1", token="ios-tok", platform="ios"),
+        DeviceToken(id="dt2", user_id="s2", token="and-tok", platform="android"),
+    ])
+    db.commit()
+
+
+def test_single_job_covers_all_recipients(db, seed_users, monkeypatch):
+    _seed_subs(db, seed_users)
+    sent_web, sent_native = [], []
+
+    def fake_webpush(sub, payload):
+        sent_web.append(sub.endpoint)
+        return "gone" if sub.endpoint.endswith("gone") else "sent"
+
+    def fake_native(rows, title, body, data):
+        sent_native.extend(sorted(rows))
+        return NativeOutcome(sent=len(rows) - 1, dead=["and-tok"], delivered={"s1"})
+
+    monkeypatch.setattr("app.services.notification_service.web_push_configured", lambda: True)
+    monkeypatch.setattr("app.services.native_push.native_push_configured", lambda: True)
+    monkeypatch.setattr("app.services.notification_service._webpush_one", fake_webpush)
+    monkeypatch.setattr("app.services.native_push.send_native_to_tokens", fake_native)
+
+    d = PushDispatcher(workers=2, queue_max=10, session_factory=TestingSessionLocal)
+    assert d.submit(["s1", "s2", "s1"], "공지", tag="notices")
+    d.join()
+
+    assert sorted(sent_web) == ["https://push/s1", "https://push/s2-gone"]
+    assert sent_native == [("and-tok", "android", "s2"), ("ios-tok", "ios", "s1")]
+    db.expire_all()
+    assert db.query(PushSubscription).filter(PushSubscription.id == "ps2").first() is None
+    assert [t.token for t in db.query(DeviceToken).all()] == ["ios-tok"]
+
+    stats = d.stats()
+    assert stats["jobs_submitted"] == 1
+    assert stats["jobs_done"] == 1
+    assert stats["web_sent"] == 1
+    assert stats["web_expired_removed"] == 1
+    assert stats["native_sent"] == 1
+    assert stats["native_tokens_pruned"] == 1
+    assert stats["backlog"] == 0
+
+
+def test_submit_is_noop_when_unconfigured(monkeypatch):
+    monkeypatch.setattr("app.services.notification_service.web_push_configured", lambda: False)
+    monkeypatch.setattr("app.services.native_push.native_push_configured", lambda: False)
+    d = PushDispatcher(workers=1, queue_max=1)
+    assert d.submit(["s1"], "hi") is False
+    assert d.stats()["jobs_submitted"] == 0
+
+
+def test_full_queue_drops_instead_of_blocking(monkeypatch):
+    monkeypatch.setattr("app.services.notification_service.web_push_configured", lambda: True)
+    d = PushDispatcher(workers=1, queue_max=1)
+    d._threads = ["stub"]  # 워커를 띄우지 않아 큐가 비워지지 않게
+    assert d.submit(["s1"], "a")
+    assert d.submit(["s2"], "b") is False
+    assert d.stats()["jobs_dropped"] == 1
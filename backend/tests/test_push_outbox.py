@@ -0,0 +1,117 @@
+"""Tests for the persistent push outbox (coalescing, retry backoff, restart resume)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.push_outbox import PushOutbox
+from app.models.push_subscription import PushSubscription
+from app.services import push_outbox
+from app.services.push_dispatcher import PushDispatcher
+from app.services.push_outbox import OutboxDrainer, enqueue_push, settle
+from tests.conftest import TestingSessionLocal
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, user_ids, message, **kw):
+        self.jobs.append((sorted(user_ids), message, kw))
+        return True
+
+
+@pytest.fixture
+def configured(monkeypatch):
+    monkeypatch.setattr("app.services.notification_service.web_push_configured", lambda: True)
+    monkeypatch.setattr("app.services.native_push.native_push_configured", lambda: False)
+
+
+def _enqueue(db, user_ids, message, tag="chat-c1"):
+    enqueue_push(db, user_ids, message, tag=tag)
+    db.commit()
+
+
+def _later(sec):
+    return datetime.utcnow() + timedelta(seconds=sec)
+
+
+def test_burst_is_coalesced_into_one_digest(db, seed_users, configured):
+    fake = FakeDispatcher()
+    drainer = OutboxDrainer(session_factory=TestingSessionLocal, coalesce_sec=60, dispatcher=fake)
+
+    _enqueue(db, ["s1", "s2"], "a")
+    assert drainer.drain_once(_later(1)) == 2
+    (users, message, kw), = fake.jobs
+    assert users == ["s1", "s2"] and message == "a"
+    assert kw["web"] is True and kw["native"] is False
+    settle(TestingSessionLocal(), kw["outbox"], {})
+
+    # 창 안에 이어진 메시지는 보류되었다가 창이 끝나면 한 건으로
+    _enqueue(db, ["s1"], "b")
+    _enqueue(db, ["s1"], "c")
+    assert drainer.drain_once(_later(2)) == 0
+    assert drainer.drain_once(_later(62)) == 1
+    assert fake.jobs[-1][:2] == (["s1"], "c 외 1건")
+
+    # 다른 tag는 병합 대상이 아님
+    _enqueue(db, ["s1"], "공지", tag="notices")
+    assert drainer.drain_once(_later(3)) == 1
+
+
+def test_failed_delivery_backs_off_then_dies(db, seed_users, configured, monkeypatch):
+    fake = FakeDispatcher()
+    drainer = OutboxDrainer(session_factory=TestingSessionLocal, coalesce_sec=0, dispatcher=fake)
+    _enqueue(db, ["s1"], "hi", tag="general")
+
+    for attempt in range(1, push_outbox.MAX_ATTEMPTS + 1):
+        assert drainer.drain_once(_later(3600 * attempt)) == 1
+        settle(TestingSessionLocal(), fake.jobs[-1][2]["outbox"], {"s1": "503"})
+        db.expire_all()
+        row = db.query(PushOutbox).one()
+        assert row.attempts == attempt
+        if attempt < push_outbox.MAX_ATTEMPTS:
+            assert row.status == "pending"
+            assert row.next_attempt_at > datetime.utcnow()
+            # 백오프 전에는 다시 집어가지 않는다
+            assert drainer.drain_once(_later(1)) == 0
+
+    assert row.status == "dead" and row.last_error == "503"
+
+
+def test_expired_lease_is_resumed_after_restart(db, seed_users, configured):
+    # 이전 프로세스가 임대 중 죽은 행
+    db.add(PushOutbox(
+        id="pob1", user_id="s1", tag="general", title="SOL-ACT", message="재시작 전",
+        status="sending", lease_owner="dead-worker", lease_until=datetime.utcnow() - timedelta(seconds=1),
+        pushed_at=datetime.utcnow() - timedelta(minutes=3),
+    ))
+    db.commit()
+    fake = FakeDispatcher()
+    drainer = OutboxDrainer(session_factory=TestingSessionLocal, coalesce_sec=60, dispatcher=fake)
+    assert drainer.drain_once() == 1
+    assert fake.jobs[0][1] == "재시작 전"
+
+
+def test_notify_users_enqueues_in_same_commit_and_delivers(db, seed_users, configured, monkeypatch):
+    import asyncio
+    from app.services.notification_service import notify_users
+
+    db.add(PushSubscription(id="ps1", user_id="s1", endpoint="https://push/s1", p256dh_key="k", auth_key="a"))
+    db.commit()
+    sent = []
+    monkeypatch.setattr("app.services.notification_service._webpush_one",
+                        lambda sub, payload: sent.append(sub.endpoint) or "sent")
+    monkeypatch.setattr("app.services.notification_service._wake_push_outbox", lambda: None)
+
+    asyncio.run(notify_users(db, ["s1", "s2"], "새 공지", entity="notice"))
+    assert db.query(PushOutbox).filter(PushOutbox.status == "pending").count() == 2
+
+    d = PushDispatcher(workers=1, queue_max=10, session_factory=TestingSessionLocal)
+    drainer = OutboxDrainer(session_factory=TestingSessionLocal, coalesce_sec=60, dispatcher=d)
+    assert drainer.drain_once(_later(1)) == 2
+    d.join()
+
+    assert sent == ["https://push/s1"]
+    db.expire_all()
+    # 구독이 없는 s2도 '보낼 것 없음'으로 완료 처리
+    assert {r.status for r in db.query(PushOutbox).all()} == {"sent"}
@@ -0,0 +1,141 @@
+"""Tests for incremental delta sync (/api/sync)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.assignment import Assignment
+from app.models.notice import Notice
+from app.models.portfolio import Portfolio, PortfolioCategory, PortfolioComment
+from app.models.sync_tombstone import SyncTombstone
+from app.routers import sync as sync_router
+from app.routers.sync import decode_cursor, encode_cursor
+
+
+@pytest.fixture(autouse=True)
+def no_lag(monkeypatch):
+    # 커서 지연 구간을 없애야 "방금 바뀐 것만" 돌아오는지 검증할 수 있다
+    monkeypatch.setattr(sync_router, "CURSOR_LAG_SEC", 0)
+
+
+def _sync(client, headers, cursor=None, **params):
+    if cursor:
+        params["since"] = cursor
+    res = client.get("/api/sync", params=params, headers=headers)
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def _ids(body, entity):
+    return [row["id"] for row in body["changes"][entity]["upserted"]]
+
+
+def _portfolio(db, pid, student_id):
+    p = Portfolio(id=pid, student_id=student_id, title="독백", description="연습",
+                  video_url="/uploads/videos/a.mp4", category=PortfolioCategory.MONOLOGUE)
+    db.add(p)
+    db.commit()
+    return p
+
+
+def test_snapshot_then_delta(client, db, seed_class, seed_lesson, seed_assignment, student_headers):
+    first = _sync(client, student_headers)
+    assert first["reset"] is True and first["has_more"] is False
+    assert _ids(first, "lessons") == ["lsn001"]
+    assert _ids(first, "assignments") == ["asgn001"]
+    assert first["changes"]["notices"]["deleted"] == []
+
+    idle = _sync(client, student_headers, first["cursor"])
+    assert idle["reset"] is False
+    assert all(not c["upserted"] and not c["deleted"] for c in idle["changes"].values())
+
+    db.add(Notice(id="n1", title="공지", content="내용", author="박선생", target_class_ids=["c1"]))
+    seed_assignment.status = "submitted"
+    db.commit()
+    delta = _sync(client, student_headers, idle["cursor"])
+    assert _ids(delta, "notices") == ["n1"]
+    assert _ids(delta, "assignments") == ["asgn001"]
+    assert delta["changes"]["assignments"]["upserted"][0]["status"] == "submitted"
+    assert _ids(delta, "lessons") == []
+
+
+def test_delete_is_reported_as_tombstone(client, db, seed_class, seed_lesson, student_headers):
+    cursor = _sync(client, student_headers)["cursor"]
+    db.delete(seed_lesson)
+    db.commit()
+    assert db.query(SyncTombstone).filter_by(entity="lessons", entity_id="lsn001").one().class_id == "c1"
+
+    delta = _sync(client, student_headers, cursor)
+    assert delta["changes"]["lessons"]["deleted"] == ["lsn001"]
+    assert _ids(delta, "lessons") == []
+
+
+def test_student_sees_only_own_rows(client, db, seed_class, student_headers, student2_headers):
+    _portfolio(db, "pf1", "s1")
+    db.add(Assignment(id="a2", title="과제", description="", due_date=datetime(2025, 12, 31),
+                      student_id="s2", status="pending"))
+    db.commit()
+    first = _sync(client, student_headers)
+    assert _ids(first, "portfolios") == ["pf1"]
+    assert _ids(first, "assignments") == []
+
+    db.delete(db.get(Assignment, "a2"))
+    db.commit()
+    assert _sync(client, student_headers, first["cursor"])["changes"]["assignments"]["deleted"] == []
+    assert _ids(_sync(client, student2_headers), "portfolios") == []
+
+
+def test_portfolio_comment_touches_parent(client, db, seed_class, student_headers):
+    p = _portfolio(db, "pf1", "s1")
+    cursor = _sync(client, student_headers, entities="portfolios")["cursor"]
+    db.add(PortfolioComment(id="pc1", portfolio_id=p.id, author_id="t1", content="좋아요"))
+    db.commit()
+
+    delta = _sync(client, student_headers, cursor, entities="portfolios")
+    assert list(delta["changes"]) == ["portfolios"]
+    assert _ids(delta, "portfolios") == ["pf1"]
+    assert [c["content"] for c in delta["changes"]["portfolios"]["upserted"][0]["comments"]] == ["좋아요"]
+
+
+def test_pages_and_invalid_or_expired_cursor(client, db, seed_class, student_headers):
+    for i in range(3):
+        db.add(Notice(id=f"n{i}", title="공지", content="내용", author="박선생"))
+    db.commit()
+    page = _sync(client, student_headers, entities="notices", limit=2)
+    assert page["has_more"] is True and _ids(page, "notices") == ["n0", "n1"]
+    rest = _sync(client, student_headers, page["cursor"], entities="notices", limit=2)
+    assert rest["has_more"] is False and _ids(rest, "notices") == ["n2"]
+
+    assert client.get("/api/sync", params={"since": "garbage"}, headers=student_headers).status_code == 400
+    assert client.get("/api/sync", params={"entities": "users"}, headers=student_headers).status_code == 400
+
+    # 모양이 틀린 위치(짧은 목록·문자열·숫자 아닌 시각)도 500이 아니라 400
+    issued, positions = decode_cursor(rest["cursor"])
+    good = positions["notices"]
+    for bad in ([1], "abcd", ["x", good[1], good[2], good[3]], [good[0], good[1], good[2], None]):
+        cursor = encode_cursor(issued, {"notices": bad})
+        res = client.get("/api/sync", params={"since": cursor, "entities": "notices"}, headers=student_headers)
+        assert res.status_code == 400 and res.json()["detail"] == "Invalid sync cursor"
+
+    stale = encode_cursor(datetime.utcnow() - timedelta(days=60), positions)
+    assert _sync(client, student_headers, stale, entities="notices")["reset"] is True
+
+
+def test_schedule_change_reports_regenerated_lessons_as_deleted(client, db, seed_class, student_headers,
+                                                                director_headers):
+    res = client.post("/api/classes/", headers=director_headers, json={
+        "name": "뮤지컬 B반", "description": "기초반",
+        "schedule": [{"day": "화", "start_time": "14:00", "end_time": "16:00"}],
+        "subject_teachers": {"musical": "t1"}, "student_ids": ["s1"],
+    })
+    assert res.status_code == 201, res.text
+    first = _sync(client, student_headers, entities="lessons")
+    old = set(_ids(first, "lessons"))
+    assert len(old) == 4
+
+    # 일괄 삭제 후 재생성 — 옛 수업은 커서 이후 삭제로 보고돼야 한다
+    res = client.put(f"/api/classes/{res.json()['id']}", headers=director_headers,
+                     json={"schedule": [{"day": "목", "start_time": "14:00", "end_time": "16:00"}]})
+    assert res.status_code == 200, res.text
+    delta = _sync(client, student_headers, first["cursor"], entities="lessons")
+    assert set(delta["changes"]["lessons"]["deleted"]) == old
+    assert len(_ids(delta, "lessons")) == 4 and not old & set(_ids(delta, "lessons"))
@@ -0,0 +1,97 @@
+"""Tests for content-addressed upload deduplication (services/upload_blobs)."""
+import hashlib
+import os
+
+import pytest
+
+from app.routers import upload as upload_router
+from app.services import file_upload, upload_blobs
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_router, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(file_upload, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+def _upload(client, headers, data, name="script.pdf"):
+    res = client.post("/api/upload", headers=headers, params={"subfolder": "docs"},
+                      files={"file": (name, data, "application/pdf")})
+    assert res.status_code == 200, res.text
+    return res.json()
+
+
+def _path(root, url):
+    return root / url.removeprefix("/uploads/").split("?")[0]
+
+
+def test_reupload_links_to_one_blob(client, seed_class, student_headers, student2_headers, upload_dir):
+    data = b"%PDF-1.4 same script" * 100
+    first = _upload(client, student_headers, data)
+    second = _upload(client, student2_headers, data)
+    a, b = _path(upload_dir, first["url"]), _path(upload_dir, second["url"])
+    assert a != b and a.read_bytes() == b.read_bytes() == data
+    assert os.path.samefile(a, b)
+    assert a.stat().st_nlink == 3  # 두 URL + blob
+
+    other = _path(upload_dir, _upload(client, student_headers, b"%PDF-1.4 other")["url"])
+    assert not os.path.samefile(a, other)
+
+    # 참조(URL 링크)가 모두 사라진 blob만 회수
+    a.unlink()
+    assert upload_blobs.sweep_unreferenced() == 0
+    b.unlink()
+    assert upload_blobs.sweep_unreferenced() == 1
+    # 회수 뒤 같은 내용은 새 blob으로 다시 등록된다
+    assert _path(upload_dir, _upload(client, student_headers, data)["url"]).stat().st_nlink == 2
+
+
+def test_direct_chunked_reupload_is_deduplicated(client, db, seed_class, student_headers, upload_dir):
+    def upload_once():
+        uid = client.post("/api/upload/chunked/init", headers=student_headers,
+                          json={"filename": "script.pdf", "total_size": 6, "subfolder": "docs",
+                                "chunk_size": 4}).json()["upload_id"]
+        for i, part in enumerate((b"abcd", b"ef")):
+            client.post(f"/api/upload/chunked/{uid}", headers=student_headers,
+                        files={"file": (f"chunk_{i}", part, "application/octet-stream")})
+        res = client.post(f"/api/upload/chunked/{uid}/complete", headers=student_headers)
+        assert res.status_code == 200, res.text
+        return _path(upload_dir, res.json()["url"])
+
+    first, second = upload_once(), upload_once()
+    assert first != second and os.path.samefile(first, second)
+    assert second.read_bytes() == b"abcdef"
+
+
+def test_video_duplicate_reuses_compressed_output_and_thumbnail(upload_dir):
+    user_dir = upload_dir / "videos" / "s1"
+    user_dir.mkdir(parents=True)
+    key = hashlib.sha256(b"raw mov").hexdigest()
+    # 첫 업로드: 압축 후 .mp4 + 썸네일이 남은 상태에서 등록
+    (user_dir / "aaa_clip.mp4").write_bytes(b"compressed")
+    (user_dir / "aaa_clip.thumb.jpg").write_bytes(b"jpg")
+    upload_blobs.adopt(key, str(user_dir / "aaa_clip.mov"))
+
+    dup = user_dir / "bbb_clip.mov"
+    dup.write_bytes(b"raw mov")
+    dest, thumb = upload_blobs.link_existing(key, dup, video=True)
+    assert dest.name == "bbb_clip.mp4" and dest.read_bytes() == b"compressed"
+    assert thumb.name == "bbb_clip.thumb.jpg" and thumb.read_bytes() == b"jpg"
+    assert not dup.exists()
+    assert upload_blobs.link_existing("0" * 64, dup, video=True) is None
+
+
+def test_image_recompression_leaves_hard_linked_copies_intact(upload_dir):
+    from PIL import Image
+    src = upload_dir / "a.png"
+    Image.new("RGB", (64, 64), "red").save(src, format="PNG")
+    original = src.read_bytes()
+    linked = upload_dir / "b.png"
+    os.link(src, linked)
+
+    # 링크된 뒤 작업이 다시 돌아도(리스 만료·크래시 재시도) 다른 링크는 그대로
+    file_upload.compress_image_sync(str(src))
+    assert src.read_bytes()[:2] == b"\xff\xd8"  # JPEG
+    assert linked.read_bytes() == original
+    assert not any(p.name.endswith(".tmp") for p in upload_dir.iterdir())
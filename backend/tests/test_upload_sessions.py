@@ -0,0 +1,232 @@
+"""Tests for chunked upload sessions kept in a shared store (DB / Redis)."""
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.upload_session import UploadSession, UploadSessionChunk
+from app.routers import upload as upload_router
+from app.services import file_upload
+from app.services.upload_sessions import DbUploadSessionStore, RedisUploadSessionStore
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_router, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(file_upload, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+def _init(client, headers, total_size, filename="script.pdf"):
+    res = client.post("/api/upload/chunked/init", headers=headers,
+                      json={"filename": filename, "total_size": total_size, "subfolder": "docs"})
+    assert res.status_code == 200, res.text
+    return res.json()["upload_id"]
+
+
+def _chunk(client, headers, upload_id, name, data):
+    return client.post(f"/api/upload/chunked/{upload_id}", headers=headers,
+                       files={"file": (name, data, "application/octet-stream")})
+
+
+def _status(client, headers, upload_id):
+    return client.get(f"/api/upload/chunked/{upload_id}/status", headers=headers)
+
+
+def test_chunks_resume_and_complete_once(client, db, seed_class, student_headers, upload_dir):
+    uid = _init(client, student_headers, 12)
+    assert _chunk(client, student_headers, uid, "chunk_0", b"aaaa").json()["received"] == 4
+    assert _chunk(client, student_headers, uid, "chunk_2", b"cccc").json()["received"] == 8
+    # 재전송은 누적하지 않는다
+    assert _chunk(client, student_headers, uid, "chunk_0", b"aaaa").json()["received"] == 8
+
+    # 다른 워커·재시작 뒤에도 세션은 저장소에서 읽힌다
+    db.expunge_all()
+    assert _status(client, student_headers, uid).json() == {"received_count": 2, "next_chunk": 1, "total_size": 12}
+    assert db.query(UploadSessionChunk).filter_by(upload_id=uid).count() == 2
+
+    _chunk(client, student_headers, uid, "chunk_1", b"bbbb")
+    assert _status(client, student_headers, uid).json()["next_chunk"] == 3
+
+    res = client.post(f"/api/upload/chunked/{uid}/complete", headers=student_headers)
+    assert res.status_code == 200, res.text
+    assert (upload_dir / res.json()["url"].removeprefix("/uploads/").split("?")[0]).read_bytes() == b"aaaabbbbcccc"
+    assert db.query(UploadSession).count() == 0 and db.query(UploadSessionChunk).count() == 0
+
+    assert client.post(f"/api/upload/chunked/{uid}/complete", headers=student_headers).status_code == 404
+    assert _status(client, student_headers, uid).status_code == 404
+
+
+def test_direct_write_mode_places_chunks_in_target(client, db, seed_class, student_headers, upload_dir):
+    res = client.post("/api/upload/chunked/init", headers=student_headers,
+                      json={"filename": "script.pdf", "total_size": 10, "subfolder": "docs", "chunk_size": 4})
+    assert res.json()["direct"] is True
+    uid = res.json()["upload_id"]
+    target = db.get(UploadSession, uid).path
+    assert os.path.getsize(target) == 10  # 미리 잡아둔 최종 파일
+    assert not list(upload_dir.glob("**/.chunks_*"))
+
+    assert _chunk(client, student_headers, uid, "chunk_2", b"cc").json()["received"] == 2
+    assert _chunk(client, student_headers, uid, "chunk_0", b"aaaa").json()["received"] == 6
+    # 마지막이 아닌 청크는 chunk_size와 같아야 한다
+    assert _chunk(client, student_headers, uid, "chunk_1", b"bb").status_code == 400
+
+    # 빠진 청크가 있으면 세션을 남긴 채 거절 — 이어 보내고 다시 완료
+    assert client.post(f"/api/upload/chunked/{uid}/complete", headers=student_headers).status_code == 400
+    assert _status(client, student_headers, uid).json()["next_chunk"] == 1
+    _chunk(client, student_headers, uid, "chunk_1", b"bbbb")
+
+    res = client.post(f"/api/upload/chunked/{uid}/complete", headers=student_headers)
+    assert res.status_code == 200, res.text
+    with open(target, "rb") as f:
+        assert f.read() == b"aaaabbbbcc"
+
+
+def test_offset_mode_accepts_changing_chunk_sizes(client, db, seed_class, student_headers, upload_dir):
+    # 웹 클라는 첫 묶음 뒤 청크 크기를 키운다 — 인덱스가 아니라 보낸 offset 자리에 써야 한다
+    res = client.post("/api/upload/chunked/init", headers=student_headers,
+                      json={"filename": "script.pdf", "total_size": 11, "subfolder": "docs", "offsets": True})
+    assert res.json()["direct"] is True
+    uid = res.json()["upload_id"]
+    target = db.get(UploadSession, uid).path
+
+    def send(idx, offset, data):
+        return client.post(f"/api/upload/chunked/{uid}", headers=student_headers, data={"offset": str(offset)},
+                           files={"file": (f"chunk_{idx}", data, "application/octet-stream")})
+
+    assert send(0, 0, b"aa").status_code == 200
+    assert send(2, 5, b"cccccc").status_code == 200
+    assert send(3, 9, b"dddd").status_code == 400  # 파일 끝을 넘는다
+    # 3..5 구간이 비어 있으면 완료 거절
+    assert client.post(f"/api/upload/chunked/{uid}/complete", headers=student_headers).status_code == 400
+    assert send(1, 2, b"bbb").status_code == 200
+
+    res = client.post(f"/api/upload/chunked/{uid}/complete", headers=student_headers)
+    assert res.status_code == 200, res.text
+    with open(target, "rb") as f:
+        assert f.read() == b"aabbbcccccc"
+
+
+def test_negative_chunk_index_or_offset_is_rejected(client, db, seed_class, student_headers):
+    uid = client.post("/api/upload/chunked/init", headers=student_headers,
+                      json={"filename": "script.pdf", "total_size": 8, "subfolder": "docs",
+                            "chunk_size": 4}).json()["upload_id"]
+    assert _chunk(client, student_headers, uid, "chunk_-1", b"aaaa").status_code == 400
+    res = client.post(f"/api/upload/chunked/{uid}", headers=student_headers, data={"offset": "-4"},
+                      files={"file": ("chunk_0", b"aaaa", "application/octet-stream")})
+    assert res.status_code == 400
+    assert _chunk(client, student_headers, _init(client, student_headers, 8), "chunk_-1", b"aaaa").status_code == 400
+
+
+def test_other_user_and_unnumbered_chunks(client, db, seed_class, student_headers, student2_headers):
+    uid = _init(client, student_headers, 8)
+    assert _status(client, student2_headers, uid).status_code == 403
+    assert _chunk(client, student2_headers, uid, "chunk_0", b"x").status_code == 403
+
+    assert _chunk(client, student_headers, uid, "blob", b"aaaa").json()["chunk_idx"] == 0
+    assert _chunk(client, student_headers, uid, "blob", b"bbbb").json()["chunk_idx"] == 1
+
+
+def test_expired_sessions_are_reclaimed(client, db, seed_class, student_headers):
+    uid = _init(client, student_headers, 8)
+    _chunk(client, student_headers, uid, "chunk_0", b"aaaa")
+    row = db.get(UploadSession, uid)
+    chunks_dir = row.chunks_dir
+    row.created_at = datetime.utcnow() - timedelta(hours=3)
+    db.commit()
+
+    _init(client, student_headers, 8)  # init이 만료 세션을 정리
+    assert db.get(UploadSession, uid) is None
+    assert not os.path.exists(chunks_dir)
+
+
+def test_db_store_claim_is_exclusive(db):
+    from tests.conftest import TestingAsyncSessionLocal
+    store = DbUploadSessionStore()
+
+    async def scenario():
+        async with TestingAsyncSessionLocal() as adb:
+            await store.create(adb, "u1", {"path": "/x", "chunks_dir": "/x.c", "filename": "a.pdf", "total_size": 4,
+                                           "subfolder": "docs", "user_id": "s1", "unique_name": "a.pdf"})
+            assert await store.chunk_status(adb, "u1") == (0, 0)
+            return [await store.claim(adb, "u1"), await store.claim(adb, "u1")]
+
+    assert asyncio.run(scenario()) == [True, False]
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis.asyncio hash/bitmap/zset commands the store uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    async def hincrby(self, key, field, amount):
+        h = self.data.setdefault(key, {})
+        h[field] = str(int(h.get(field, 0)) + amount)
+        return int(h[field])
+
+    async def setbit(self, key, offset, value):
+        bits = self.data.setdefault(key, set())
+        old = int(offset in bits)
+        (bits.add if value else bits.discard)(offset)
+        return old
+
+    async def bitcount(self, key):
+        return len(self.data.get(key, set()))
+
+    async def bitpos(self, key, bit):
+        bits = self.data.get(key, set())
+        pos = 0
+        while pos in bits:
+            pos += 1
+        return pos
+
+    async def expire(self, key, seconds):
+        return key in self.data
+
+    async def delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    async def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    async def zrem(self, key, member):
+        return 1 if self.data.get(key, {}).pop(member, None) is not None else 0
+
+    async def zrangebyscore(self, key, lo, hi):
+        return [m for m, score in self.data.get(key, {}).items() if score <= hi]
+
+
+def test_redis_store_bitmap_and_claim():
+    store = RedisUploadSessionStore("redis://fake", ttl_sec=60, client=FakeRedis())
+
+    async def scenario():
+        await store.create(None, "u1", {"path": "/x", "chunks_dir": "/x.c", "filename": "a.pdf", "total_size": 8,
+                                        "subfolder": "docs", "user_id": "s1", "unique_name": "a.pdf"})
+        assert await store.add_chunk(None, "u1", 1, 4) == 4
+        assert await store.add_chunk(None, "u1", 1, 4) == 4
+        assert await store.chunk_status(None, "u1") == (1, 0)
+        assert await store.add_chunk(None, "u1", 0, 4) == 8
+        assert await store.chunk_status(None, "u1") == (2, 2)
+        assert [await store.next_index(None, "u1") for _ in range(2)] == [0, 1]
+        assert (await store.get(None, "u1"))["received"] == 8
+        assert await store.claim(None, "u1") is True
+        assert await store.claim(None, "u1") is False
+        assert await store.get(None, "u1") is None
+
+        await store.create(None, "u2", {"user_id": "s1", "path": "/y", "chunks_dir": "/y.c"})
+        assert await store.expired(None, 60) == []
+        expired = await store.expired(None, -60)  # 생성 직후도 만료로
+        assert [m["path"] for m in expired] == ["/y"]
+
+    asyncio.run(scenario())
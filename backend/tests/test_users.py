@@ -96,3 +96,20 @@ def test_delete_user_not_found(client, director_headers):
     resp = client.delete("/api/users/xxx", headers=director_headers)
 
     assert resp.status_code == 404
+
+
+def test_upload_urls_are_signed_in_json(client, db, seed_users, student_headers):
+    """응답 JSON의 /uploads/ URL에는 직렬화 단계에서 서명 토큰(?t=)이 붙고, 그 URL로 서빙 검증을 통과한다."""
+    from app.utils.upload_urls import sign_upload
+
+    seed_users["s1"].avatar = "/uploads/avatars/s1/프로필 16:35:04.png"
+    db.commit()
+
+    resp = client.get("/api/users/s1", headers=student_headers)
+    assert resp.status_code == 200
+    rel = "avatars/s1/프로필 16:35:04.png"
+    assert resp.json()["avatar"] == f"/uploads/{rel}?t={sign_upload(rel)}"
+
+    # 서명 통과 → 파일이 없으니 404(서명 실패였다면 403)
+    assert client.get(resp.json()["avatar"]).status_code == 404
+    assert client.get(f"/uploads/{rel}?t=forged").status_code == 403
@@ -0,0 +1,153 @@
+"""Tests for the per-connection send queues in ConnectionManager."""
+import asyncio
+
+from app.services.websocket_manager import ConnectionManager
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_code = code
+
+
+async def _drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_broadcast_does_not_wait_on_slow_socket():
+    async def scenario():
+        mgr = ConnectionManager()
+        fast, slow = FakeSocket(), FakeSocket(delay=5)
+        await mgr.connect("fast", fast)
+        await mgr.connect("slow", slow)
+        await asyncio.wait_for(mgr.broadcast_to_users(["slow", "fast"], {"n": 1}), timeout=0.5)
+        await _drain()
+        assert fast.sent == [{"n": 1}]
+        assert slow.sent == []
+        mgr.disconnect("slow", slow)
+        mgr.disconnect("fast", fast)
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_is_closed_after_drop_limit():
+    async def scenario():
+        mgr = ConnectionManager(queue_max=2, drop_limit=3)
+        slow = FakeSocket(delay=5)
+        await mgr.connect("u1", slow)
+        for i in range(10):
+            await mgr.send_to_user("u1", {"n": i})
+        await _drain()
+        assert "u1" not in mgr.connections
+        assert slow.closed_code == 1013
+        stats = mgr.stats()
+        assert stats["slow_consumers_closed"] == 1
+        assert stats["dropped_total"] >= 4
+
+    asyncio.run(scenario())
+
+
+def test_stats_reports_queue_depth():
+    async def scenario():
+        mgr = ConnectionManager()
+        slow = FakeSocket(delay=5)
+        await mgr.connect("u1", slow)
+        for i in range(3):
+            await mgr.send_to_user("u1", {"n": i})
+        stats = mgr.stats()
+        assert stats["users"] == 1
+        assert stats["connections"] == 1
+        assert stats["queued_total"] == 3
+        mgr.disconnect("u1", slow)
+        assert mgr.stats()["connections"] == 0
+
+    asyncio.run(scenario())
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for redis.asyncio pub/sub (shared by 'workers')."""
+
+    def __init__(self):
+        self.queues = []
+
+    def pubsub(self):
+        hub = self
+
+        class _PubSub:
+            def __init__(self):
+                self.queue = asyncio.Queue()
+
+            async def subscribe(self, channel):
+                hub.queues.append(self.queue)
+
+            async def listen(self):
+                while True:
+                    yield await self.queue.get()
+
+            async def close(self):
+                if self.queue in hub.queues:
+                    hub.queues.remove(self.queue)
+
+        return _PubSub()
+
+    async def publish(self, channel, data):
+        for q in list(self.queues):
+            q.put_nowait({"type": "message", "data": data})
+
+    async def aclose(self):
+        pass
+
+
+def test_local_broker_fans_out_across_managers():
+    from app.services.realtime_broker import LocalBroker
+
+    async def scenario():
+        broker = LocalBroker()
+        worker_a, worker_b = ConnectionManager(), ConnectionManager()
+        await worker_a.start_broker(broker)
+        await worker_b.start_broker(broker)
+        sock = FakeSocket()
+        await worker_b.connect("u1", sock)
+        await worker_a.send_to_user("u1", {"type": "data_changed", "entity": "notices"})
+        await _drain()
+        assert sock.sent == [{"type": "data_changed", "entity": "notices"}]
+        worker_b.disconnect("u1", sock)
+
+    asyncio.run(scenario())
+
+
+def test_redis_broker_delivers_to_other_worker_once():
+    from app.services.realtime_broker import RedisBroker
+
+    async def scenario():
+        redis = FakeRedis()
+        worker_a, worker_b = ConnectionManager(), ConnectionManager()
+        await worker_a.start_broker(RedisBroker("redis://fake", client=redis))
+        await worker_b.start_broker(RedisBroker("redis://fake", client=redis))
+        await _drain()
+        sock_a, sock_b = FakeSocket(), FakeSocket()
+        await worker_a.connect("u1", sock_a)
+        await worker_b.connect("u2", sock_b)
+        await worker_a.broadcast_to_users(["u1", "u2"], {"n": 1})
+        await _drain()
+        assert sock_a.sent == [{"n": 1}]
+        assert sock_b.sent == [{"n": 1}]
+        await worker_a.stop_broker()
+        await worker_b.stop_broker()
+        worker_a.disconnect("u1", sock_a)
+        worker_b.disconnect("u2", sock_b)
+
+    asyncio.run(scenario())
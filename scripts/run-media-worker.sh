@@ -0,0 +1,14 @@
+#!/bin/bash
+# ============================================================
+# SOL-ACT 미디어 처리 워커 — launchd 감독용 포그라운드 실행기
+# MEDIA_WORKER_MODE=external(backend/.env)일 때 API 대신 영상 압축을 맡는다.
+# 동시 압축 수는 이 머신의 MEDIA_WORKER_CONCURRENCY(또는 첫 인자).
+# ============================================================
+cd "$(dirname "$0")/../backend" || exit 1
+
+PY="venv/bin/python"
+[ -x "$PY" ] || PY="python3"
+if [ -n "$1" ]; then
+    exec "$PY" -m app.media_worker --concurrency "$1"
+fi
+exec "$PY" -m app.media_worker
@@ -1266,6 +1266,7 @@ function _chunkedUpload(
           subfolder: subfolder || 'assignments',
           target_type: targetType || null,
           target_id: targetId || null,
+          offsets: true, // 청크 크기가 도중에 바뀌므로 서버가 인덱스 대신 offset 자리에 쓰게
         }),
       });
       uploadId = initRes.uploadId;
@@ -1286,6 +1287,7 @@ function _chunkedUpload(
 
       const formData = new FormData();
       formData.append('file', chunk, `chunk_${idx}`);
+      formData.append('offset', String(offset));
 
       const token = getToken();
       const headers: Record<string, string> = { 'ngrok-skip-browser-warning': 'true' };